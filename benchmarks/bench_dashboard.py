@@ -0,0 +1,126 @@
+"""
+Benchmark da atualização dos indicadores do dashboard.
+
+Compara, a várias escalas, os dois caminhos usados por
+`AplicacaoDashboard.atualizar`:
+    - listas: carrega todos os clientes, veículos, reservas e pagamentos
+      para dicionários e conta/soma em Python (caminho antigo);
+    - consulta única: `dashboard_servico.obter_indicadores_dashboard`
+      (lê a tabela kpi_counters, mantida por triggers, numa ida à base de dados).
+
+Para cada caminho mede o tempo (mediana) e o pico de memória alocada em
+Python (tracemalloc), e confirma que ambos devolvem os mesmos valores.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_dashboard [--escalas 100k 1M] [--diretorio-bases /tmp/bases]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.bench_servicos import ESCALAS, preparar_base
+from benchmarks.comum import medir_amostras
+from controllers.cliente.cliente_servico import listar_clientes
+from controllers.dashboard.dashboard_servico import obter_indicadores_dashboard
+from controllers.pagamentos.pagamento_servico import obter_pagamentos
+from controllers.reservas.reservas_servico import obter_reservas_servico
+from controllers.utils_bd import configurar_pool
+from controllers.veiculos.veiculos_servico import obter_veiculos_servico
+
+
+def indicadores_por_listas() -> Dict[str, float]:
+    """
+    Calcula os indicadores como o dashboard fazia antes: a partir das listas completas.
+
+    Returns:
+        Dict[str, float]: Mesmas chaves de `obter_indicadores_dashboard`.
+    """
+    veiculos = obter_veiculos_servico()
+    reservas = obter_reservas_servico()
+    pagamentos = obter_pagamentos()
+    return {
+        "total_clientes": len(listar_clientes()),
+        "total_veiculos_disponiveis": len([v for v in veiculos if v.get("estado") == "disponível"]),
+        "total_reservas_ativas": len([r for r in reservas if r.get("estado") in ("Confirmada", "Pendente")]),
+        "receita_total": sum(float(p.get("valor", 0.0)) for p in pagamentos) if pagamentos else 0.0,
+    }
+
+
+def _pico_memoria(funcao: Callable[[], object]) -> float:
+    """Executa a função uma vez e devolve o pico de memória alocada (MB)."""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def medir_escala(caminho: str, iteracoes: int, tempo_max_s: float) -> Dict[str, Dict[str, float]]:
+    """
+    Mede os dois caminhos numa base de dados.
+
+    Args:
+        caminho (str): Base de dados da escala.
+        iteracoes (int): Chamadas máximas por caminho.
+        tempo_max_s (float): Tempo máximo por caminho.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por caminho ("listas", "consulta_unica"):
+        mediana_ms e pico_mb.
+
+    Exceções:
+        AssertionError: Se os dois caminhos devolverem indicadores diferentes.
+    """
+    configurar_pool(caminho)
+    try:
+        esperado, obtido = indicadores_por_listas(), obter_indicadores_dashboard()
+        if {k: round(v, 2) for k, v in esperado.items()} != {k: round(v, 2) for k, v in obtido.items()}:
+            raise AssertionError(f"Indicadores diferentes: {esperado} != {obtido}")
+        resultados = {}
+        for nome, funcao in (("listas", indicadores_por_listas), ("consulta_unica", obter_indicadores_dashboard)):
+            tempos = medir_amostras(funcao, iteracoes, tempo_max_s)
+            resultados[nome] = {"mediana_ms": tempos["mediana_us"] / 1000, "pico_mb": _pico_memoria(funcao)}
+        return resultados
+    finally:
+        configurar_pool()
+
+
+def executar(escalas: List[str], iteracoes: int, tempo_max_s: float, diretorio_bases: Optional[str] = None) -> None:
+    """
+    Executa o benchmark nas escalas pedidas e imprime uma tabela de resultados.
+
+    Args:
+        escalas (List[str]): Chaves de `bench_servicos.ESCALAS`.
+        iteracoes (int): Chamadas máximas por caminho.
+        tempo_max_s (float): Tempo máximo por caminho.
+        diretorio_bases (str, opcional): Diretório para guardar e reutilizar as bases geradas.
+    """
+    diretorio = diretorio_bases or tempfile.mkdtemp(prefix="luxury_wheels_bench_")
+    os.makedirs(diretorio, exist_ok=True)
+    try:
+        print(f"{'Escala':<8}{'Caminho':<16}{'Mediana (ms)':>14}{'Pico (MB)':>12}")
+        for escala in escalas:
+            resultados = medir_escala(preparar_base(escala, diretorio), iteracoes, tempo_max_s)
+            for nome, r in resultados.items():
+                print(f"{escala:<8}{nome:<16}{r['mediana_ms']:>14.2f}{r['pico_mb']:>12.1f}")
+    finally:
+        if diretorio_bases is None:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["1k", "1M"])
+    parser.add_argument("--iteracoes", type=int, default=20, help="Chamadas máximas por caminho.")
+    parser.add_argument("--tempo-max", type=float, default=10.0, help="Segundos máximos por caminho.")
+    parser.add_argument("--diretorio-bases", help="Diretório onde guardar/reutilizar as bases geradas.")
+    args = parser.parse_args()
+
+    executar(args.escalas, args.iteracoes, args.tempo_max, args.diretorio_bases)
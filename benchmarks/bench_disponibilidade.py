@@ -0,0 +1,102 @@
+"""
+Benchmark da pesquisa de veículos disponíveis ao balcão.
+
+Mede `veiculos_servico.procurar_veiculos_disponiveis_servico` numa base com
+2 milhões de reservas (2000 veículos), contra o objetivo de 10 ms:
+    - pior_caso: período curto logo a seguir aos dados gerados, sem filtros
+      (quase todos os veículos estão livres e são devolvidos);
+    - filtros: o mesmo período com categoria, lugares e diária máxima;
+    - limite: o pior caso com `limite=50` (os 50 mais baratos).
+
+Para cada caso mostra a mediana (ms), o número de veículos devolvidos e se
+cumpre o objetivo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_disponibilidade [--reservas 2000000] [--diretorio-bases /tmp/bases]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+from benchmarks.bench_servicos import preparar_base
+from benchmarks.comum import medir_amostras
+from controllers.utils_bd import configurar_pool
+from controllers.veiculos.veiculos_servico import procurar_veiculos_disponiveis_servico
+
+OBJETIVO_MS = 10.0
+
+# Dias a seguir a `bench_servicos.DATA_REFERENCIA`, com as reservas futuras geradas
+PERIODO = ("2026-01-10", "2026-01-20")
+
+CASOS: Dict[str, Dict[str, object]] = {
+    "pior_caso": {},
+    "filtros": {"categoria": "SUV", "lugares_min": 5, "diaria_max": 150.0},
+    "limite": {"limite": 50},
+}
+
+
+def medir_base(caminho: str, iteracoes: int, tempo_max_s: float) -> Dict[str, Dict[str, float]]:
+    """
+    Mede cada caso da pesquisa numa base de dados.
+
+    Args:
+        caminho (str): Base de dados gerada.
+        iteracoes (int): Chamadas máximas por caso.
+        tempo_max_s (float): Tempo máximo por caso.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por caso: mediana_ms e veiculos devolvidos.
+    """
+    configurar_pool(caminho)
+    try:
+        resultados = {}
+        for nome, filtros in CASOS.items():
+            def pesquisar(filtros=filtros):
+                return procurar_veiculos_disponiveis_servico(*PERIODO, **filtros)
+
+            veiculos = len(pesquisar())
+            tempos = medir_amostras(pesquisar, iteracoes, tempo_max_s)
+            resultados[nome] = {"mediana_ms": tempos["mediana_us"] / 1000, "veiculos": veiculos}
+        return resultados
+    finally:
+        configurar_pool()
+
+
+def executar(reservas: int, iteracoes: int, tempo_max_s: float, diretorio_bases: Optional[str] = None) -> None:
+    """
+    Executa o benchmark e imprime uma tabela de resultados.
+
+    Args:
+        reservas (int): Número de reservas da base gerada.
+        iteracoes (int): Chamadas máximas por caso.
+        tempo_max_s (float): Tempo máximo por caso.
+        diretorio_bases (str, opcional): Diretório para guardar e reutilizar as bases geradas.
+    """
+    diretorio = diretorio_bases or tempfile.mkdtemp(prefix="luxury_wheels_bench_")
+    os.makedirs(diretorio, exist_ok=True)
+    try:
+        base = preparar_base(f"{reservas // 1_000_000}M" if reservas % 1_000_000 == 0 else str(reservas),
+                             diretorio, reservas=reservas)
+        print(f"{'Caso':<12}{'Mediana (ms)':>14}{'Veículos':>10}  Objetivo ({OBJETIVO_MS:.0f} ms)")
+        for nome, r in medir_base(base, iteracoes, tempo_max_s).items():
+            estado = "cumpre" if r["mediana_ms"] < OBJETIVO_MS else "FALHA"
+            print(f"{nome:<12}{r['mediana_ms']:>14.2f}{r['veiculos']:>10}  {estado}")
+    finally:
+        if diretorio_bases is None:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservas", type=int, default=2_000_000, help="Reservas da base gerada.")
+    parser.add_argument("--iteracoes", type=int, default=200, help="Chamadas máximas por caso.")
+    parser.add_argument("--tempo-max", type=float, default=10.0, help="Segundos máximos por caso.")
+    parser.add_argument("--diretorio-bases", help="Diretório onde guardar/reutilizar as bases geradas.")
+    args = parser.parse_args()
+
+    executar(args.reservas, args.iteracoes, args.tempo_max, args.diretorio_bases)
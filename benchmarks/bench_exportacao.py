@@ -0,0 +1,155 @@
+"""
+Benchmark das exportações: CSV a partir de listas em memória vs. motor em lotes, e XLSX.
+
+Para cada exportação compara, a várias escalas:
+    - lista: carrega a tabela inteira com a função de listagem e escreve o
+      CSV a partir da lista (caminho antigo);
+    - lotes: a exportação atual, que percorre o cursor com `fetchmany`
+      (ver controllers/exportacao/exportacao_csv.py);
+    - xlsx: a exportação para Excel em modo write-only, também em lotes
+      (ver controllers/exportacao/exportacao_xlsx.py).
+
+Para cada caminho mede o tempo (mediana), o débito (linhas/s) e o pico de
+memória alocada em Python (tracemalloc). No caminho em lotes o pico deve
+manter-se constante qualquer que seja a escala.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_exportacao [--escalas 100k 1M] [--diretorio-bases /tmp/bases]
+"""
+
+import argparse
+import csv
+import logging
+import os
+import shutil
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.bench_servicos import ESCALAS, preparar_base
+from benchmarks.comum import medir_amostras
+from controllers.cliente import cliente_repositorio, cliente_servico
+from controllers.formas_pagamento import formas_pag_repositorio, formas_pag_servico
+from controllers.pagamentos import pagamento_repositorio, pagamento_servico
+from controllers.reservas import reservas_repositorio, reservas_servico
+from controllers.utils_bd import configurar_pool
+from controllers.veiculos import veiculos_repositorio, veiculos_servico
+
+# (exportação, função de listagem usada pelo caminho antigo, exportação CSV atual, exportação XLSX)
+EXPORTACOES: List[Tuple[str, Callable[[], List[Dict]], Callable[[str], bool], Callable[[str], bool]]] = [
+    ("clientes", cliente_repositorio.listar_clientes, cliente_servico.salvar_clientes_csv,
+     cliente_servico.salvar_clientes_xlsx),
+    ("veiculos", veiculos_repositorio.listar_veiculos_bd, veiculos_servico.exportar_veiculos_servico,
+     veiculos_servico.exportar_veiculos_xlsx_servico),
+    ("reservas", reservas_repositorio.listar_reservas_bd, reservas_servico.exportar_reservas_para_csv,
+     reservas_servico.exportar_reservas_para_xlsx),
+    ("pagamentos", pagamento_repositorio.listar_pagamentos_bd, pagamento_servico.exportar_pagamentos_para_csv,
+     pagamento_servico.exportar_pagamentos_para_xlsx),
+    ("formas_pagamento", formas_pag_repositorio.listar_formas_pagamento_bd,
+     formas_pag_servico.exportar_formas_pagamento_para_csv, formas_pag_servico.exportar_formas_pagamento_para_xlsx),
+]
+
+
+def exportar_por_lista(listar: Callable[[], List[Dict]], caminho: str) -> int:
+    """
+    Exporta como as funções faziam antes: lista completa em memória e depois o CSV.
+
+    Returns:
+        int: Número de linhas escritas.
+    """
+    linhas = listar()
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        if linhas:
+            escritor = csv.DictWriter(f, fieldnames=linhas[0].keys())
+            escritor.writeheader()
+            escritor.writerows(linhas)
+    return len(linhas)
+
+
+def _pico_memoria(funcao: Callable[[], object]) -> float:
+    """Executa a função uma vez e devolve o pico de memória alocada (MB)."""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def medir_escala(caminho: str, diretorio_saida: str, iteracoes: int,
+                 tempo_max_s: float) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Mede os caminhos de cada exportação numa base de dados.
+
+    Args:
+        caminho (str): Base de dados da escala.
+        diretorio_saida (str): Diretório dos ficheiros gerados.
+        iteracoes (int): Chamadas máximas por caminho.
+        tempo_max_s (float): Tempo máximo por caminho.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: Por exportação e caminho ("lista",
+        "lotes", "xlsx"): linhas, mediana_ms, linhas_s e pico_mb.
+    """
+    configurar_pool(caminho)
+    try:
+        resultados = {}
+        for nome, listar, exportar, exportar_xlsx in EXPORTACOES:
+            saida = os.path.join(diretorio_saida, f"{nome}.csv")
+            saida_xlsx = os.path.join(diretorio_saida, f"{nome}.xlsx")
+            linhas = exportar_por_lista(listar, saida)
+            caminhos = {"lista": lambda: exportar_por_lista(listar, saida), "lotes": lambda: exportar(saida),
+                        "xlsx": lambda: exportar_xlsx(saida_xlsx)}
+            resultados[nome] = {}
+            for caminho_exportacao, funcao in caminhos.items():
+                tempos = medir_amostras(funcao, iteracoes, tempo_max_s)
+                mediana_s = tempos["mediana_us"] / 1e6
+                resultados[nome][caminho_exportacao] = {
+                    "linhas": linhas,
+                    "mediana_ms": mediana_s * 1000,
+                    "linhas_s": linhas / mediana_s if mediana_s else 0.0,
+                    "pico_mb": _pico_memoria(funcao),
+                }
+        return resultados
+    finally:
+        configurar_pool()
+
+
+def executar(escalas: List[str], iteracoes: int, tempo_max_s: float, diretorio_bases: Optional[str] = None) -> None:
+    """
+    Executa o benchmark nas escalas pedidas e imprime uma tabela de resultados.
+
+    Args:
+        escalas (List[str]): Chaves de `bench_servicos.ESCALAS`.
+        iteracoes (int): Chamadas máximas por caminho.
+        tempo_max_s (float): Tempo máximo por caminho.
+        diretorio_bases (str, opcional): Diretório para guardar e reutilizar as bases geradas.
+    """
+    diretorio = diretorio_bases or tempfile.mkdtemp(prefix="luxury_wheels_bench_")
+    os.makedirs(diretorio, exist_ok=True)
+    diretorio_saida = tempfile.mkdtemp(prefix="luxury_wheels_exportacao_")
+    try:
+        print(f"{'Escala':<8}{'Exportação':<18}{'Caminho':<8}{'Linhas':>10}{'Mediana (ms)':>14}"
+              f"{'Linhas/s':>12}{'Pico (MB)':>11}")
+        for escala in escalas:
+            resultados = medir_escala(preparar_base(escala, diretorio), diretorio_saida, iteracoes, tempo_max_s)
+            for nome, caminhos in resultados.items():
+                for caminho_exportacao, r in caminhos.items():
+                    print(f"{escala:<8}{nome:<18}{caminho_exportacao:<8}{r['linhas']:>10}"
+                          f"{r['mediana_ms']:>14.1f}{r['linhas_s']:>12.0f}{r['pico_mb']:>11.1f}")
+    finally:
+        shutil.rmtree(diretorio_saida, ignore_errors=True)
+        if diretorio_bases is None:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["1k", "1M"])
+    parser.add_argument("--iteracoes", type=int, default=5, help="Chamadas máximas por caminho.")
+    parser.add_argument("--tempo-max", type=float, default=10.0, help="Segundos máximos por caminho.")
+    parser.add_argument("--diretorio-bases", help="Diretório onde guardar/reutilizar as bases geradas.")
+    args = parser.parse_args()
+
+    executar(args.escalas, args.iteracoes, args.tempo_max, args.diretorio_bases)
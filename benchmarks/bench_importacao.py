@@ -0,0 +1,188 @@
+"""
+Benchmark da importação de CSV: linha a linha pelos formulários vs. importação em lotes.
+
+Para cada entidade (clientes, veículos, reservas e pagamentos) gera um CSV
+com linhas válidas e mede, numa cópia da base de cada escala:
+    - formulario: a mesma inserção pelo serviço usado nos formulários, uma
+      chamada (e uma transação) por linha, numa amostra das linhas;
+    - lotes: a importação em lotes (ver controllers/importacao/importacao_csv.py);
+    - repetida: a mesma importação outra vez, com todas as linhas rejeitadas
+      como repetidas (email/NIF, matrícula ou período já ocupado); nos
+      pagamentos, que não têm chave única, as linhas voltam a ser inseridas.
+
+Para cada caminho mostra o tempo total e o débito (linhas/s). No caminho em
+lotes os triggers de cada tabela ficam suspensos e o seu efeito (contadores,
+agregados, versões e registo para a exportação incremental) é aplicado uma
+vez por lote; o tempo inclui esse passo. O objetivo para clientes é de mais
+de 50 000 linhas/s.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_importacao [--escalas 100k] [--linhas 100000] [--diretorio-bases /tmp/bases]
+"""
+
+import argparse
+import csv
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.bench_servicos import ESCALAS, _dados_pagamento, _dados_veiculo, _periodo_futuro, preparar_base
+from controllers.cliente import cliente_servico
+from controllers.pagamentos import pagamento_servico
+from controllers.reservas import reservas_servico
+from controllers.utils_bd import configurar_pool
+from controllers.veiculos import veiculos_servico
+
+# Linhas inseridas pelo caminho "formulario" (uma transação por linha é lenta)
+AMOSTRA_FORMULARIO = 2000
+
+
+def _linhas_clientes(n: int, _contexto: Dict[str, int]) -> List[Dict[str, object]]:
+    return [{"nome": "Cliente Importado", "email": f"importado{i}@exemplo.pt", "telefone": "912345678",
+             "nif": f"3{i:08d}"} for i in range(n)]
+
+
+def _linhas_veiculos(n: int, _contexto: Dict[str, int]) -> List[Dict[str, object]]:
+    return [{**_dados_veiculo(i), "matricula": f"IM-{i:06d}"} for i in range(n)]
+
+
+def _linhas_reservas(n: int, contexto: Dict[str, int]) -> List[Dict[str, object]]:
+    # Períodos futuros distintos, repartidos pelos veículos existentes
+    return [dict(zip(("data_inicio", "data_fim"), _periodo_futuro(i // contexto["veiculos"])),
+                 id_cliente=1 + i % contexto["clientes"], id_veiculo=1 + i % contexto["veiculos"],
+                 estado="Pendente", valor_total=400.0) for i in range(n)]
+
+
+def _linhas_pagamentos(n: int, contexto: Dict[str, int]) -> List[Dict[str, object]]:
+    return [_dados_pagamento(1 + i % contexto["reservas"]) for i in range(n)]
+
+
+def _adicionar_reserva(linha: Dict[str, object]) -> object:
+    return reservas_servico.adicionar_reserva_servico(
+        linha["data_inicio"], linha["data_fim"], linha["id_cliente"], linha["id_veiculo"],
+        linha["estado"], linha["valor_total"])
+
+
+# (entidade, gerador das linhas do CSV, serviço do formulário para uma linha, importação em lotes)
+IMPORTACOES: List[Tuple[str, Callable[[int, Dict[str, int]], List[Dict[str, object]]],
+                        Callable[[Dict[str, object]], object], Callable[[str], Optional[Dict]]]] = [
+    ("clientes", _linhas_clientes,
+     lambda linha: cliente_servico.criar_cliente(linha["nome"], linha["email"], linha["telefone"], linha["nif"]),
+     cliente_servico.importar_clientes_csv),
+    ("veiculos", _linhas_veiculos, lambda linha: veiculos_servico.adicionar_veiculo_servico(**linha),
+     veiculos_servico.importar_veiculos_servico),
+    ("reservas", _linhas_reservas, _adicionar_reserva, reservas_servico.importar_reservas_de_csv),
+    ("pagamentos", _linhas_pagamentos, pagamento_servico.adicionar_pagamento,
+     pagamento_servico.importar_pagamentos_de_csv),
+]
+
+
+def _contexto(caminho: str) -> Dict[str, int]:
+    """Número de linhas das tabelas referenciadas pelas linhas geradas."""
+    conexao = sqlite3.connect(caminho)
+    try:
+        return {tabela: conexao.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                for tabela in ("clientes", "veiculos", "reservas")}
+    finally:
+        conexao.close()
+
+
+def _escrever_csv(caminho: str, linhas: List[Dict[str, object]]) -> None:
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(linhas[0]))
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+
+def _cronometrar(funcao: Callable[[], object]) -> Tuple[float, object]:
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def medir_escala(base: str, diretorio: str, linhas: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Mede os caminhos de cada importação em cópias de uma base de dados.
+
+    Args:
+        base (str): Base de dados da escala (não é alterada).
+        diretorio (str): Diretório para as cópias da base e os CSV gerados.
+        linhas (int): Linhas de cada CSV.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: Por entidade e caminho ("formulario",
+        "lotes", "repetida"): linhas, inseridas, segundos e linhas_s.
+    """
+    contexto = _contexto(base)
+    resultados = {}
+    for entidade, gerar, adicionar, importar in IMPORTACOES:
+        dados = gerar(linhas, contexto)
+        ficheiro = os.path.join(diretorio, f"{entidade}.csv")
+        _escrever_csv(ficheiro, dados)
+        resultados[entidade] = {}
+
+        copia = os.path.join(diretorio, f"{entidade}.db")
+        for caminho_importacao in ("formulario", "lotes"):
+            shutil.copyfile(base, copia)
+            configurar_pool(copia)
+            try:
+                if caminho_importacao == "formulario":
+                    amostra = dados[:AMOSTRA_FORMULARIO]
+                    segundos, _ = _cronometrar(lambda: [adicionar(linha) for linha in amostra])
+                    medicoes = {caminho_importacao: (len(amostra), len(amostra), segundos)}
+                else:
+                    segundos, resultado = _cronometrar(lambda: importar(ficheiro))
+                    medicoes = {caminho_importacao: (resultado["lidas"], resultado["inseridas"], segundos)}
+                    segundos, resultado = _cronometrar(lambda: importar(ficheiro))
+                    medicoes["repetida"] = (resultado["lidas"], resultado["inseridas"], segundos)
+            finally:
+                configurar_pool()
+            for nome, (lidas, inseridas, segundos) in medicoes.items():
+                resultados[entidade][nome] = {"linhas": lidas, "inseridas": inseridas, "segundos": segundos,
+                                              "linhas_s": lidas / segundos if segundos else 0.0}
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(copia + sufixo):
+                os.remove(copia + sufixo)
+    return resultados
+
+
+def executar(escalas: List[str], linhas: int, diretorio_bases: Optional[str] = None) -> None:
+    """
+    Executa o benchmark nas escalas pedidas e imprime uma tabela de resultados.
+
+    Args:
+        escalas (List[str]): Chaves de `bench_servicos.ESCALAS`.
+        linhas (int): Linhas de cada CSV importado.
+        diretorio_bases (str, opcional): Diretório para guardar e reutilizar as bases geradas.
+    """
+    diretorio_bases_efetivo = diretorio_bases or tempfile.mkdtemp(prefix="luxury_wheels_bench_")
+    os.makedirs(diretorio_bases_efetivo, exist_ok=True)
+    diretorio = tempfile.mkdtemp(prefix="luxury_wheels_importacao_")
+    try:
+        print(f"{'Escala':<8}{'Entidade':<12}{'Caminho':<12}{'Linhas':>10}{'Inseridas':>11}"
+              f"{'Tempo (s)':>11}{'Linhas/s':>12}")
+        for escala in escalas:
+            resultados = medir_escala(preparar_base(escala, diretorio_bases_efetivo), diretorio, linhas)
+            for entidade, caminhos in resultados.items():
+                for caminho_importacao, r in caminhos.items():
+                    print(f"{escala:<8}{entidade:<12}{caminho_importacao:<12}{r['linhas']:>10}{r['inseridas']:>11}"
+                          f"{r['segundos']:>11.2f}{r['linhas_s']:>12.0f}")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        if diretorio_bases is None:
+            shutil.rmtree(diretorio_bases_efetivo, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["100k"])
+    parser.add_argument("--linhas", type=int, default=100_000, help="Linhas de cada CSV importado.")
+    parser.add_argument("--diretorio-bases", help="Diretório onde guardar/reutilizar as bases geradas.")
+    args = parser.parse_args()
+
+    executar(args.escalas, args.linhas, args.diretorio_bases)
@@ -0,0 +1,94 @@
+"""
+Benchmark de débito de escrita e leitura para cada perfil de conexão.
+
+Para cada perfil de `db.conexao.PERFIS_CONEXAO` mede, sobre uma cópia
+temporária da base de dados:
+    - inserções de reservas com um commit por linha (como fazem os formulários);
+    - leituras de reservas por ID;
+    - agregações completas sobre a tabela de reservas.
+
+O perfil "readonly-analytics" bloqueia escritas, pelo que só é medido em leitura.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_perfis_bd [--insercoes 2000] [--leituras 20000]
+"""
+
+import argparse
+import random
+import sqlite3
+import time
+
+from benchmarks.comum import copiar_base_dados_temporaria, remover_base_dados_temporaria
+from db.conexao import PERFIS_CONEXAO, conectar_base_dados
+
+
+def _medir_insercoes(conexao: sqlite3.Connection, total: int) -> float:
+    """Insere `total` reservas, uma transação por linha, e devolve linhas/s."""
+    inicio = time.perf_counter()
+    for i in range(total):
+        conexao.execute(
+            "INSERT INTO Reservas (id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (1, 1 + i % 17, "2030-01-01", "2030-01-05", "Pendente", 100.0),
+        )
+        conexao.commit()
+    return total / (time.perf_counter() - inicio)
+
+
+def _medir_leituras(conexao: sqlite3.Connection, total: int) -> float:
+    """Lê `total` reservas aleatórias pelo ID e devolve leituras/s."""
+    maximo = conexao.execute("SELECT MAX(id) FROM Reservas").fetchone()[0] or 1
+    aleatorio = random.Random(42)
+    inicio = time.perf_counter()
+    for _ in range(total):
+        conexao.execute("SELECT * FROM Reservas WHERE id = ?", (aleatorio.randint(1, maximo),)).fetchone()
+    return total / (time.perf_counter() - inicio)
+
+
+def _medir_agregacoes(conexao: sqlite3.Connection, total: int) -> float:
+    """Executa `total` agregações completas e devolve agregações/s."""
+    inicio = time.perf_counter()
+    for _ in range(total):
+        conexao.execute("SELECT estado, COUNT(*), SUM(valor_total) FROM Reservas GROUP BY estado").fetchall()
+    return total / (time.perf_counter() - inicio)
+
+
+def executar(insercoes: int, leituras: int) -> None:
+    """
+    Executa o benchmark para todos os perfis e imprime uma tabela de resultados.
+
+    Args:
+        insercoes (int): Número de inserções (com commit) por perfil.
+        leituras (int): Número de leituras por ID por perfil.
+    """
+    print(f"{'perfil':<22}{'inserções/s':>14}{'leituras/s':>14}{'agregações/s':>16}")
+    for nome in PERFIS_CONEXAO:
+        caminho = copiar_base_dados_temporaria()
+        try:
+            if "query_only" in PERFIS_CONEXAO[nome]:
+                # Perfil só de leitura: os mesmos dados são inseridos com o perfil "fast"
+                conexao = conectar_base_dados(caminho, "fast")
+                _medir_insercoes(conexao, insercoes)
+                ritmo_insercao = None
+            else:
+                conexao = conectar_base_dados(caminho, nome)
+                ritmo_insercao = _medir_insercoes(conexao, insercoes)
+            conexao.close()
+
+            conexao = conectar_base_dados(caminho, nome)
+            ritmo_leitura = _medir_leituras(conexao, leituras)
+            ritmo_agregacao = _medir_agregacoes(conexao, max(1, leituras // 100))
+            conexao.close()
+        finally:
+            remover_base_dados_temporaria(caminho)
+
+        texto_insercao = f"{ritmo_insercao:>14.0f}" if ritmo_insercao else f"{'—':>14}"
+        print(f"{nome:<22}{texto_insercao}{ritmo_leitura:>14.0f}{ritmo_agregacao:>16.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--insercoes", type=int, default=2000)
+    parser.add_argument("--leituras", type=int, default=20000)
+    args = parser.parse_args()
+    executar(args.insercoes, args.leituras)
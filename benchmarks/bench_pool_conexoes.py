@@ -0,0 +1,54 @@
+"""
+Benchmark do custo por chamada de `obter_cursor` com e sem pool de conexões.
+
+Compara `buscar_veiculo_por_id` e `buscar_cliente_por_email` com o pool
+desativado (tamanho 0, uma conexão nova por chamada, como antes do pool)
+e com o pool ativo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_pool_conexoes [--iteracoes 5000] [--tamanho 5]
+"""
+
+import argparse
+import logging
+
+from benchmarks.comum import copiar_base_dados_temporaria, remover_base_dados_temporaria, medir
+from controllers.utils_bd import configurar_pool, TAMANHO_POOL_PADRAO
+from controllers.veiculos.veiculos_repositorio import buscar_veiculo_por_id
+from controllers.cliente.cliente_repositorio import buscar_cliente_por_email
+
+
+def executar(iteracoes: int, tamanho: int) -> None:
+    """
+    Executa o benchmark e imprime o custo médio por chamada.
+
+    Args:
+        iteracoes (int): Número de chamadas por função e configuração.
+        tamanho (int): Tamanho do pool na configuração "depois".
+    """
+    caminho = copiar_base_dados_temporaria()
+    funcoes = {
+        "buscar_veiculo_por_id": lambda: buscar_veiculo_por_id(1),
+        "buscar_cliente_por_email": lambda: buscar_cliente_por_email("joao.silva@gmail.com"),
+    }
+    try:
+        print(f"{'função':<28}{'sem pool (µs)':>16}{'com pool (µs)':>16}{'ganho':>10}")
+        for nome, funcao in funcoes.items():
+            configurar_pool(caminho, tamanho=0)
+            antes = medir(funcao, iteracoes)["por_chamada_us"]
+            configurar_pool(caminho, tamanho=tamanho)
+            funcao()  # aquece o pool
+            depois = medir(funcao, iteracoes)["por_chamada_us"]
+            print(f"{nome:<28}{antes:>16.1f}{depois:>16.1f}{antes / depois:>9.1f}x")
+    finally:
+        configurar_pool()
+        remover_base_dados_temporaria(caminho)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iteracoes", type=int, default=5000)
+    parser.add_argument("--tamanho", type=int, default=max(1, TAMANHO_POOL_PADRAO))
+    args = parser.parse_args()
+    executar(args.iteracoes, args.tamanho)
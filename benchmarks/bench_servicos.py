@@ -0,0 +1,504 @@
+"""
+Benchmark de todas as funções públicas dos serviços, a várias escalas de dados.
+
+Para cada escala (1k, 100k e 1M reservas, com as restantes tabelas em
+proporção) cria uma base de dados com `db.dados_sinteticos`, aponta o pool
+de `obter_cursor` para ela e mede cada função pública de:
+    cliente_servico, veiculos_servico, reservas_servico, pagamento_servico,
+    formas_pag_servico e dashboard_servico.
+
+Os resultados (mediana, média e máximo por chamada) são gravados em JSON e
+podem ser comparados com uma base de referência: uma função é considerada
+regressão quando a mediana piora mais do que o limiar (padrão 25%) e pelo
+menos 100 µs. A base de referência depende da máquina, pelo que não é
+versionada: grava-se com `--gravar-base` antes de uma alteração e
+compara-se com `--comparar` depois.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_servicos [--escalas 1k 100k] [--saida resultados.json]
+        [--comparar benchmarks/base_servicos.json] [--limiar 0.25] [--gravar-base]
+        [--diretorio-bases /tmp/bases]
+
+Com `--diretorio-bases` as bases geradas são mantidas e reutilizadas nas
+execuções seguintes (gerar 1M de reservas demora cerca de um minuto).
+"""
+
+import argparse
+import csv
+import inspect
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from itertools import count
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.comum import medir_amostras
+from controllers.cliente import cliente_servico
+from controllers.dashboard import dashboard_servico
+from controllers.formas_pagamento import formas_pag_servico
+from controllers.pagamentos import pagamento_servico
+from controllers.reservas import reservas_servico
+from controllers.utils_bd import configurar_pool
+from controllers.veiculos import veiculos_servico
+from db.conexao import conectar_base_dados
+from db.dados_sinteticos import gerar_dados_sinteticos
+from db.migracoes import aplicar_migracoes
+
+CAMINHO_BASE_REFERENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "base_servicos.json")
+LIMIAR_PADRAO = 0.25
+# Diferenças absolutas abaixo deste valor são ruído de medição, não regressões
+DIFERENCA_MINIMA_US = 100.0
+
+# Reservas por escala; as restantes tabelas são dimensionadas em proporção
+ESCALAS: Dict[str, int] = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+MODULOS: Tuple[ModuleType, ...] = (
+    cliente_servico, veiculos_servico, reservas_servico,
+    pagamento_servico, formas_pag_servico, dashboard_servico,
+)
+
+# Data de referência fixa para que as bases de cada escala sejam sempre iguais
+DATA_REFERENCIA = date(2025, 1, 1)
+
+Caso = Tuple[str, Callable[[], object]]
+
+# Linhas dos ficheiros CSV usados nos casos de importação
+LINHAS_IMPORTACAO = 20
+
+
+def funcoes_publicas(modulo: ModuleType) -> List[str]:
+    """
+    Lista as funções públicas definidas num módulo de serviço.
+
+    Funções importadas de outros módulos (ex.: do repositório) são ignoradas.
+
+    Args:
+        modulo (ModuleType): Módulo de serviço.
+
+    Returns:
+        List[str]: Nomes das funções, por ordem alfabética.
+    """
+    return sorted(
+        nome for nome, objeto in inspect.getmembers(modulo, inspect.isfunction)
+        if not nome.startswith("_") and objeto.__module__ == modulo.__name__
+    )
+
+
+def escala_tabelas(reservas: int) -> Dict[str, int]:
+    """
+    Devolve as quantidades de cada tabela para um número de reservas.
+
+    Args:
+        reservas (int): Número de reservas.
+
+    Returns:
+        Dict[str, int]: Quantidades no formato de `gerar_dados_sinteticos`.
+    """
+    return {
+        "clientes": max(50, reservas // 40),
+        "veiculos": max(20, reservas // 1000),
+        "reservas": reservas,
+        "pagamentos": reservas * 3 // 2,
+        "manutencoes": max(10, reservas // 20),
+    }
+
+
+def preparar_base(escala: str, diretorio: str, reservas: Optional[int] = None) -> str:
+    """
+    Cria (ou reutiliza) a base de dados de uma escala.
+
+    Args:
+        escala (str): Chave de `ESCALAS` (ou, com `reservas`, só o nome da base).
+        diretorio (str): Diretório onde a base é guardada.
+        reservas (int, opcional): Número de reservas, para escalas fora de `ESCALAS`.
+
+    Returns:
+        str: Caminho da base de dados.
+    """
+    caminho = os.path.join(diretorio, f"servicos_{escala}.db")
+    if os.path.exists(caminho):
+        return caminho
+    temporario = caminho + ".parcial"
+    conexao = conectar_base_dados(temporario, "fast")
+    try:
+        aplicar_migracoes(conexao)
+        gerar_dados_sinteticos(conexao, semente=7, data_referencia=DATA_REFERENCIA,
+                               **escala_tabelas(reservas or ESCALAS[escala]))
+        conexao.execute("ANALYZE")
+        conexao.commit()
+        # Junta o WAL ao ficheiro principal antes de o renomear
+        conexao.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        conexao.close()
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def _ids_acima(caminho: str, tabela: str, id_minimo: int) -> List[int]:
+    """Devolve os ids de uma tabela maiores que `id_minimo`, por ordem."""
+    conexao = sqlite3.connect(caminho)
+    try:
+        linhas = conexao.execute(f"SELECT id FROM {tabela} WHERE id > ? ORDER BY id", (id_minimo,)).fetchall()
+    finally:
+        conexao.close()
+    return [linha[0] for linha in linhas]
+
+
+def _dados_veiculo(n: int) -> Dict[str, object]:
+    """Dados válidos para `adicionar_veiculo_servico`/`atualizar_veiculo_servico`."""
+    return {
+        "marca": "Bench", "modelo": f"Modelo {n}", "matricula": f"BE-{n:06d}", "ano": 2022,
+        "categoria": "SUV", "transmissao": "Automática", "tipo": "Diesel", "lugares": 5,
+        "imagem": "bench.jpg", "diaria": 99.0,
+        "data_ultima_revisao": "2024-01-01", "data_proxima_revisao": "2024-07-01",
+        "data_ultima_inspecao": "2024-01-01", "data_proxima_inspecao": "2025-01-01",
+    }
+
+
+def _periodo_futuro(n: int) -> Tuple[str, str]:
+    """Período de 3 dias, distinto para cada `n`, depois de todos os dados gerados."""
+    inicio = date(2040, 1, 1) + timedelta(days=5 * n)
+    return inicio.isoformat(), (inicio + timedelta(days=2)).isoformat()
+
+
+def _dados_pagamento(id_reserva: int, **extra) -> Dict[str, object]:
+    """Dados válidos para `adicionar_pagamento`/`editar_pagamento`."""
+    return {"id_reserva": id_reserva, "id_forma_pagamento": 1, "valor": 50.0,
+            "data_pagamento": "2024-06-01", **extra}
+
+
+def _csv_importacao(caminho: str, linhas: List[Dict[str, object]]) -> str:
+    """Escreve um CSV de importação (cabeçalho com as chaves da primeira linha) e devolve o caminho."""
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(linhas[0]))
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    return caminho
+
+
+def casos_por_modulo(caminho: str, diretorio_saida: str, iteracoes: int) -> Dict[str, List[Caso]]:
+    """
+    Constrói os casos de benchmark de cada módulo de serviço.
+
+    Os casos de cada módulo correm pela ordem devolvida: leituras, inserções,
+    atualizações das linhas inseridas e, por fim, remoção dessas linhas,
+    pelo que a base volta ao volume original no fim de cada módulo (exceto
+    as linhas importadas que não chegam a ser removidas: no máximo
+    LINHAS_IMPORTACAO por módulo, ou por chamada nos pagamentos).
+
+    Args:
+        caminho (str): Base de dados em uso pelo pool.
+        diretorio_saida (str): Diretório para os ficheiros exportados.
+        iteracoes (int): Número máximo de chamadas por caso (define quantas
+            linhas são inseridas, atualizadas e removidas).
+
+    Returns:
+        Dict[str, List[Caso]]: Para cada módulo, lista de (função, chamada sem argumentos).
+    """
+    seq = count(1)
+    criados: Dict[str, List[int]] = {}
+    conexao = sqlite3.connect(caminho)
+    ultimos = {
+        tabela: conexao.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]
+        for tabela in ("clientes", "veiculos", "reservas", "pagamentos", "formaspagamento")
+    }
+    email_existente = conexao.execute("SELECT email FROM clientes ORDER BY id LIMIT 1").fetchone()[0]
+    reserva_existente = conexao.execute("SELECT MIN(id) FROM reservas").fetchone()[0]
+    conexao.close()
+
+    def ids_inseridos(tabela: str) -> Callable[[], int]:
+        """
+        Chamada que devolve, à vez, os ids das linhas inseridas pelo benchmark.
+
+        Os ids são lidos na primeira chamada (depois do caso de inserção) e
+        cada chamada a `ids_inseridos` tem o seu próprio contador.
+        """
+        contador = count()
+
+        def obter() -> int:
+            if tabela not in criados:
+                criados[tabela] = _ids_acima(caminho, tabela, ultimos[tabela]) or [ultimos[tabela] + 1]
+            ids = criados[tabela]
+            return ids[next(contador) % len(ids)]
+        return obter
+
+    def saida(nome: str) -> str:
+        return os.path.join(diretorio_saida, nome)
+
+    # Ficheiros de importação com LINHAS_IMPORTACAO linhas: a primeira chamada insere-as e as
+    # seguintes medem a rejeição (email/NIF, matrícula ou período já ocupados), exceto nos
+    # pagamentos, que não têm chave única e são inseridos em todas as chamadas
+    importar_clientes = _csv_importacao(saida("importar_clientes.csv"), [
+        {"nome": "Cliente Importado", "email": f"importado{n}@exemplo.pt", "telefone": "912345678",
+         "nif": f"3{n:08d}"} for n in range(LINHAS_IMPORTACAO)])
+    importar_veiculos = _csv_importacao(saida("importar_veiculos.csv"), [
+        {**_dados_veiculo(n), "matricula": f"IM-{n:06d}"} for n in range(LINHAS_IMPORTACAO)])
+    importar_reservas = _csv_importacao(saida("importar_reservas.csv"), [
+        dict(zip(("data_inicio", "data_fim"), _periodo_futuro(10_000 + n)),
+             id_cliente=1, id_veiculo=1, estado="Pendente", valor_total=400.0) for n in range(LINHAS_IMPORTACAO)])
+    importar_pagamentos = _csv_importacao(saida("importar_pagamentos.csv"), [
+        _dados_pagamento(reserva_existente) for _ in range(LINHAS_IMPORTACAO)])
+
+    editar_cliente, excluir_cliente = ids_inseridos("clientes"), ids_inseridos("clientes")
+    editar_veiculo, excluir_veiculo = ids_inseridos("veiculos"), ids_inseridos("veiculos")
+    manutencao_veiculo = ids_inseridos("veiculos")
+    editar_reserva, excluir_reserva = ids_inseridos("reservas"), ids_inseridos("reservas")
+    editar_pagamento, excluir_pagamento = ids_inseridos("pagamentos"), ids_inseridos("pagamentos")
+    editar_forma, excluir_forma = ids_inseridos("formaspagamento"), ids_inseridos("formaspagamento")
+
+    return {
+        "cliente_servico": [
+            ("listar_clientes", cliente_servico.listar_clientes),
+            ("procurar_cliente_por_email", lambda: cliente_servico.procurar_cliente_por_email(email_existente)),
+            ("salvar_clientes_csv", lambda: cliente_servico.salvar_clientes_csv(saida("clientes.csv"))),
+            ("salvar_clientes_xlsx", lambda: cliente_servico.salvar_clientes_xlsx(saida("clientes.xlsx"))),
+            ("importar_clientes_csv", lambda: cliente_servico.importar_clientes_csv(importar_clientes)),
+            # O NIF é único: cada inserção/edição usa um NIF novo
+            ("criar_cliente", lambda: cliente_servico.criar_cliente(
+                "Cliente Bench", f"bench{next(seq)}@exemplo.pt", "912345678", f"1{next(seq):08d}")),
+            ("editar_cliente", lambda: cliente_servico.editar_cliente(
+                editar_cliente(), "Cliente Bench", f"bench{next(seq)}@exemplo.pt", "912345678", f"1{next(seq):08d}")),
+            ("verificar_duplicados_cliente", lambda: cliente_servico.verificar_duplicados_cliente(
+                email_existente, "123456789", 1)),
+            ("excluir_cliente", lambda: cliente_servico.excluir_cliente(excluir_cliente())),
+        ],
+        "veiculos_servico": [
+            ("obter_veiculos_servico", veiculos_servico.obter_veiculos_servico),
+            ("obter_veiculo_por_id_servico", lambda: veiculos_servico.obter_veiculo_por_id_servico(1)),
+            ("procurar_veiculos_disponiveis_servico", lambda: veiculos_servico.procurar_veiculos_disponiveis_servico(
+                "2025-01-10", "2025-01-20", categoria="SUV", lugares_min=5, diaria_max=200)),
+            ("exportar_veiculos_servico", lambda: veiculos_servico.exportar_veiculos_servico(saida("veiculos.csv"))),
+            ("exportar_veiculos_xlsx_servico",
+             lambda: veiculos_servico.exportar_veiculos_xlsx_servico(saida("veiculos.xlsx"))),
+            ("importar_veiculos_servico", lambda: veiculos_servico.importar_veiculos_servico(importar_veiculos)),
+            ("adicionar_veiculo_servico", lambda: veiculos_servico.adicionar_veiculo_servico(
+                **_dados_veiculo(next(seq)))),
+            ("atualizar_veiculo_servico", lambda: veiculos_servico.atualizar_veiculo_servico(
+                editar_veiculo(), **_dados_veiculo(next(seq)))),
+            ("marcar_veiculo_manutencao_servico",
+             lambda: veiculos_servico.marcar_veiculo_manutencao_servico(manutencao_veiculo())),
+            ("remover_veiculo_servico", lambda: veiculos_servico.remover_veiculo_servico(excluir_veiculo())),
+        ],
+        "reservas_servico": [
+            ("obter_reservas_servico", reservas_servico.obter_reservas_servico),
+            ("obter_pagina_reservas_servico", lambda: reservas_servico.obter_pagina_reservas_servico(
+                200, ("2024-06-01", 2 ** 62))),
+            ("exportar_reservas_para_csv", lambda: reservas_servico.exportar_reservas_para_csv(saida("reservas.csv"))),
+            ("exportar_reservas_para_xlsx",
+             lambda: reservas_servico.exportar_reservas_para_xlsx(saida("reservas.xlsx"))),
+            ("importar_reservas_de_csv", lambda: reservas_servico.importar_reservas_de_csv(importar_reservas)),
+            ("adicionar_reserva_servico", lambda: reservas_servico.adicionar_reserva_servico(
+                *_periodo_futuro(next(seq)), 1, 1, "Pendente", 400.0)),
+            ("atualizar_reserva_servico", lambda: reservas_servico.atualizar_reserva_servico(
+                editar_reserva(), *_periodo_futuro(next(seq)), 1, 1, "Confirmada", 400.0)),
+            ("veiculo_disponivel_servico", lambda: reservas_servico.veiculo_disponivel_servico(
+                1, *_periodo_futuro(next(seq)))),
+            ("excluir_reserva_servico", lambda: reservas_servico.excluir_reserva_servico(excluir_reserva())),
+            ("utilizacao_frota_servico", lambda: reservas_servico.utilizacao_frota_servico(
+                "2024-01-01", "2024-12-31")),
+            ("procurar_periodos_livres_servico", lambda: reservas_servico.procurar_periodos_livres_servico(
+                7, "2025-01-01", "2025-03-31")),
+        ],
+        "pagamento_servico": [
+            ("obter_pagamentos", pagamento_servico.obter_pagamentos),
+            ("obter_pagina_pagamentos", lambda: pagamento_servico.obter_pagina_pagamentos(
+                200, ("2024-06-01", 2 ** 62))),
+            ("exportar_pagamentos_para_csv",
+             lambda: pagamento_servico.exportar_pagamentos_para_csv(saida("pagamentos.csv"))),
+            ("exportar_pagamentos_para_xlsx",
+             lambda: pagamento_servico.exportar_pagamentos_para_xlsx(saida("pagamentos.xlsx"))),
+            ("validar_dados_pagamento", lambda: pagamento_servico.validar_dados_pagamento(
+                _dados_pagamento(reserva_existente))),
+            ("importar_pagamentos_de_csv",
+             lambda: pagamento_servico.importar_pagamentos_de_csv(importar_pagamentos)),
+            ("adicionar_pagamento", lambda: pagamento_servico.adicionar_pagamento(
+                _dados_pagamento(reserva_existente))),
+            ("editar_pagamento", lambda: pagamento_servico.editar_pagamento(
+                _dados_pagamento(reserva_existente, id_pagamento=editar_pagamento(), valor=60.0))),
+            ("excluir_pagamento", lambda: pagamento_servico.excluir_pagamento(excluir_pagamento())),
+        ],
+        "formas_pag_servico": [
+            ("inicializar_formas_pagamento", formas_pag_servico.inicializar_formas_pagamento),
+            ("obter_formas_pagamento", formas_pag_servico.obter_formas_pagamento),
+            ("buscar_forma_pagamento", lambda: formas_pag_servico.buscar_forma_pagamento(1)),
+            ("exportar_formas_pagamento_para_csv",
+             lambda: formas_pag_servico.exportar_formas_pagamento_para_csv(saida("formas.csv"))),
+            ("exportar_formas_pagamento_para_xlsx",
+             lambda: formas_pag_servico.exportar_formas_pagamento_para_xlsx(saida("formas.xlsx"))),
+            ("adicionar_forma_pagamento", lambda: formas_pag_servico.adicionar_forma_pagamento("Transferência")),
+            ("editar_forma_pagamento", lambda: formas_pag_servico.editar_forma_pagamento(editar_forma(), "MB Way")),
+            ("excluir_forma_pagamento", lambda: formas_pag_servico.excluir_forma_pagamento(excluir_forma())),
+        ],
+        "dashboard_servico": [
+            (nome, getattr(dashboard_servico, nome)) for nome in funcoes_publicas(dashboard_servico)
+        ],
+    }
+
+
+def casos_em_falta(casos: Dict[str, List[Caso]]) -> List[str]:
+    """
+    Lista as funções públicas dos serviços que não têm caso de benchmark.
+
+    Args:
+        casos (Dict[str, List[Caso]]): Resultado de `casos_por_modulo`.
+
+    Returns:
+        List[str]: Nomes "modulo.funcao" sem caso.
+    """
+    em_falta = []
+    for modulo in MODULOS:
+        nome_modulo = modulo.__name__.rsplit(".", 1)[-1]
+        cobertas = {nome for nome, _ in casos.get(nome_modulo, [])}
+        em_falta.extend(f"{nome_modulo}.{nome}" for nome in funcoes_publicas(modulo) if nome not in cobertas)
+    return em_falta
+
+
+def executar_escala(caminho: str, iteracoes: int, tempo_max_s: float) -> Dict[str, Dict[str, float]]:
+    """
+    Mede todos os casos numa base de dados.
+
+    Args:
+        caminho (str): Base de dados da escala (é alterada durante a medição
+            e reposta, quase por inteiro, ao volume original).
+        iteracoes (int): Chamadas máximas por caso.
+        tempo_max_s (float): Tempo máximo por caso.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Métricas por "modulo.funcao".
+    """
+    diretorio_saida = tempfile.mkdtemp(prefix="luxury_wheels_bench_export_")
+    configurar_pool(caminho)
+    resultados = {}
+    try:
+        casos = casos_por_modulo(caminho, diretorio_saida, iteracoes)
+        for nome in casos_em_falta(casos):
+            print(f"  aviso: {nome} sem caso de benchmark", file=sys.stderr)
+        for modulo, lista in casos.items():
+            for funcao, chamada in lista:
+                chave = f"{modulo}.{funcao}"
+                resultados[chave] = medir_amostras(chamada, iteracoes, tempo_max_s)
+                print(f"  {chave:<60}{resultados[chave]['mediana_us']:>14.1f} µs"
+                      f"  ({resultados[chave]['iteracoes']} chamadas)")
+    finally:
+        configurar_pool()
+        shutil.rmtree(diretorio_saida, ignore_errors=True)
+    return resultados
+
+
+def comparar_com_base(resultados: Dict[str, Dict[str, Dict[str, float]]],
+                      base: Dict[str, Dict[str, Dict[str, float]]],
+                      limiar: float = LIMIAR_PADRAO,
+                      diferenca_minima_us: float = DIFERENCA_MINIMA_US) -> List[Dict[str, object]]:
+    """
+    Compara as medianas com as de uma base de referência.
+
+    Só são comparadas as escalas e funções presentes em ambos os resultados.
+
+    Args:
+        resultados (dict): Métricas por escala e função (campo "escalas" do JSON).
+        base (dict): Métricas de referência no mesmo formato.
+        limiar (float): Aumento relativo da mediana a partir do qual há regressão
+            (0.25 = 25% mais lento).
+        diferenca_minima_us (float): Aumento absoluto mínimo (µs) para haver regressão.
+
+    Returns:
+        List[Dict[str, object]]: Regressões com as chaves escala, funcao,
+        base_us, atual_us e variacao, da pior para a melhor.
+    """
+    regressoes = []
+    for escala, funcoes in resultados.items():
+        for funcao, metricas in funcoes.items():
+            referencia = base.get(escala, {}).get(funcao)
+            if not referencia or referencia["mediana_us"] <= 0:
+                continue
+            variacao = metricas["mediana_us"] / referencia["mediana_us"] - 1
+            if variacao > limiar and metricas["mediana_us"] - referencia["mediana_us"] >= diferenca_minima_us:
+                regressoes.append({
+                    "escala": escala, "funcao": funcao, "base_us": referencia["mediana_us"],
+                    "atual_us": metricas["mediana_us"], "variacao": variacao,
+                })
+    regressoes.sort(key=lambda r: r["variacao"], reverse=True)
+    return regressoes
+
+
+def executar(escalas: List[str], iteracoes: int, tempo_max_s: float,
+             diretorio_bases: Optional[str] = None) -> Dict[str, object]:
+    """
+    Executa o benchmark nas escalas pedidas.
+
+    Args:
+        escalas (List[str]): Chaves de `ESCALAS`.
+        iteracoes (int): Chamadas máximas por caso.
+        tempo_max_s (float): Tempo máximo por caso.
+        diretorio_bases (str, opcional): Diretório para guardar e reutilizar
+            as bases geradas. Por defeito usa um diretório temporário.
+
+    Returns:
+        Dict[str, object]: Resultado no formato gravado em JSON.
+    """
+    diretorio = diretorio_bases or tempfile.mkdtemp(prefix="luxury_wheels_bench_")
+    os.makedirs(diretorio, exist_ok=True)
+    resultado = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "iteracoes": iteracoes,
+        "escalas": {},
+    }
+    try:
+        for escala in escalas:
+            print(f"Escala {escala}: a preparar a base de dados...")
+            caminho = preparar_base(escala, diretorio)
+            resultado["escalas"][escala] = executar_escala(caminho, iteracoes, tempo_max_s)
+    finally:
+        if diretorio_bases is None:
+            shutil.rmtree(diretorio, ignore_errors=True)
+    return resultado
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=list(ESCALAS))
+    parser.add_argument("--iteracoes", type=int, default=50, help="Chamadas máximas por função.")
+    parser.add_argument("--tempo-max", type=float, default=5.0, help="Segundos máximos por função.")
+    parser.add_argument("--saida", help="Ficheiro JSON para os resultados.")
+    parser.add_argument("--comparar", nargs="?", const=CAMINHO_BASE_REFERENCIA,
+                        help="Base de referência a comparar (padrão: benchmarks/base_servicos.json).")
+    parser.add_argument("--limiar", type=float, default=LIMIAR_PADRAO,
+                        help="Aumento relativo da mediana considerado regressão (padrão 0.25).")
+    parser.add_argument("--diferenca-minima", type=float, default=DIFERENCA_MINIMA_US,
+                        help="Aumento absoluto mínimo (µs) para haver regressão (padrão 100).")
+    parser.add_argument("--gravar-base", action="store_true",
+                        help="Grava os resultados como nova base de referência.")
+    parser.add_argument("--diretorio-bases", help="Diretório onde guardar/reutilizar as bases geradas.")
+    args = parser.parse_args()
+
+    resultado = executar(args.escalas, args.iteracoes, args.tempo_max, args.diretorio_bases)
+
+    destinos = [args.saida] if args.saida else []
+    if args.gravar_base:
+        destinos.append(CAMINHO_BASE_REFERENCIA)
+    for destino in destinos:
+        with open(destino, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Resultados gravados em {destino}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)["escalas"]
+        regressoes = comparar_com_base(resultado["escalas"], base, args.limiar, args.diferenca_minima)
+        for r in regressoes:
+            print(f"REGRESSÃO {r['escala']:>5} {r['funcao']:<60} "
+                  f"{r['base_us']:>12.1f} -> {r['atual_us']:>12.1f} µs (+{r['variacao']:.0%})")
+        print(f"{len(regressoes)} regressão(ões) acima de {args.limiar:.0%}.")
+        if regressoes:
+            sys.exit(1)
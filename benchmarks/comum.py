@@ -0,0 +1,85 @@
+"""
+Funções auxiliares partilhadas pelos benchmarks.
+
+Os benchmarks correm sempre sobre uma cópia temporária da base de dados,
+para nunca alterarem o ficheiro `db/luxury_wheels.db` da aplicação.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict
+
+from db.conexao import CAMINHO_BASE_DADOS
+
+
+def copiar_base_dados_temporaria() -> str:
+    """
+    Copia a base de dados da aplicação para um diretório temporário.
+
+    Returns:
+        str: Caminho da cópia criada.
+    """
+    diretorio = tempfile.mkdtemp(prefix="luxury_wheels_bench_")
+    destino = os.path.join(diretorio, "luxury_wheels.db")
+    shutil.copyfile(CAMINHO_BASE_DADOS, destino)
+    return destino
+
+
+def remover_base_dados_temporaria(caminho: str) -> None:
+    """
+    Remove o diretório temporário criado por `copiar_base_dados_temporaria`.
+
+    Args:
+        caminho (str): Caminho da base de dados temporária.
+    """
+    shutil.rmtree(os.path.dirname(caminho), ignore_errors=True)
+
+
+def medir(funcao: Callable[[], object], iteracoes: int) -> Dict[str, float]:
+    """
+    Executa uma função várias vezes e mede o tempo médio por chamada.
+
+    Args:
+        funcao (Callable): Função sem argumentos a medir.
+        iteracoes (int): Número de chamadas.
+
+    Returns:
+        Dict[str, float]: Tempo total (s) e custo médio por chamada (µs).
+    """
+    inicio = time.perf_counter()
+    for _ in range(iteracoes):
+        funcao()
+    total = time.perf_counter() - inicio
+    return {"total_s": total, "por_chamada_us": total / iteracoes * 1e6}
+
+
+def medir_amostras(funcao: Callable[[], object], iteracoes_max: int, tempo_max_s: float) -> Dict[str, float]:
+    """
+    Mede cada chamada individualmente até `iteracoes_max` ou até esgotar o tempo.
+
+    Faz sempre pelo menos uma chamada, pelo que funções lentas (ex.: listar
+    1 milhão de reservas) não prendem o benchmark durante minutos.
+
+    Args:
+        funcao (Callable): Função sem argumentos a medir.
+        iteracoes_max (int): Número máximo de chamadas.
+        tempo_max_s (float): Tempo máximo (s) a partir do qual não se fazem mais chamadas.
+
+    Returns:
+        Dict[str, float]: Número de chamadas, mediana, média e máximo por chamada (µs).
+    """
+    amostras = []
+    limite = time.perf_counter() + tempo_max_s
+    while len(amostras) < iteracoes_max and (not amostras or time.perf_counter() < limite):
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append(time.perf_counter() - inicio)
+    amostras.sort()
+    return {
+        "iteracoes": len(amostras),
+        "mediana_us": amostras[len(amostras) // 2] * 1e6,
+        "media_us": sum(amostras) / len(amostras) * 1e6,
+        "max_us": amostras[-1] * 1e6,
+    }
@@ -5,48 +5,55 @@ Este módulo fornece funções para adicionar, listar, atualizar, remover e
 exportar clientes da base de dados. Também inclui a função de busca por email.
 
 Funções principais:
-- adicionar_cliente: insere novo cliente (se o email ainda não existir).
+- adicionar_cliente: insere novo cliente (se o email e o NIF ainda não existirem).
 - listar_clientes: devolve lista de todos os clientes registados.
 - atualizar_cliente: atualiza dados de um cliente existente.
 - remover_cliente: elimina cliente da base de dados.
 - buscar_cliente_por_email: pesquisa cliente pelo email.
+- verificar_duplicados: indica se o email ou o NIF já pertencem a outro cliente.
 - exportar_clientes_para_csv: exporta lista de clientes para um ficheiro CSV.
+- exportar_clientes_para_xlsx: exporta lista de clientes para um ficheiro Excel.
+- importar_clientes_csv_bd: importa clientes de um ficheiro CSV, em lotes.
 """
 
-import csv
 import logging
-from typing import List, Optional, Dict
+import sqlite3
+from typing import Any, Callable, List, Optional, Dict
 from controllers.utils_bd import obter_cursor
+from controllers.exportacao.exportacao_csv import exportar_consulta_csv
+from controllers.exportacao.exportacao_xlsx import exportar_consulta_xlsx
+from controllers.importacao.importacao_csv import Preparar, importar_csv
 
 logger = logging.getLogger(__name__)
 
 
 def adicionar_cliente(nome: str, email: str, telefone: str, nif: str) -> bool:
     """
-    Adiciona um novo cliente à base de dados se o email não existir ainda.
+    Adiciona um novo cliente à base de dados se o email e o NIF não existirem ainda.
+
+    A unicidade é garantida pelos índices únicos da base de dados (ver
+    db/migracoes.py), sem uma consulta prévia que outra escrita pudesse
+    ultrapassar.
 
     Args:
         nome (str): Nome do cliente.
-        email (str): Email do cliente (único).
+        email (str): Email do cliente (único, sem distinção de maiúsculas).
         telefone (str): Número de telefone do cliente.
-        nif (str): Número de identificação fiscal.
+        nif (str): Número de identificação fiscal (único).
 
     Returns:
         bool: True se o cliente foi adicionado, False caso contrário.
     """
     try:
-        # Verifica se o cliente com o mesmo email já existe
-        existente = buscar_cliente_por_email(email)
-        if existente:
-            logger.warning("Cliente com email '%s' já existe (ID %s).", email, existente["id"])
-            return False
-
         with obter_cursor(commit=True) as cur:
             cur.execute(
                 "INSERT INTO Clientes (nome, email, telefone, nif) VALUES (?, ?, ?, ?)",
                 (nome.strip(), email.strip(), telefone.strip(), nif.strip())
             )
         return True
+    except sqlite3.IntegrityError as e:
+        logger.warning("Cliente com email '%s' ou NIF '%s' já existe: %s", email, nif, e)
+        return False
     except Exception:
         logger.exception("Erro ao adicionar cliente")
         return False
@@ -93,6 +100,9 @@ def atualizar_cliente(id_cliente: int, nome: str, email: str, telefone: str, nif
             atualizado = cursor.rowcount > 0
             logger.info("Cliente ID %s atualizado: %s", id_cliente, atualizado)
             return atualizado
+    except sqlite3.IntegrityError as e:
+        logger.warning("Email '%s' ou NIF '%s' já pertence a outro cliente: %s", email, nif, e)
+        return False
     except Exception as e:
         logger.exception("Erro ao atualizar cliente ID %s: %s", id_cliente, e)
         return False
@@ -142,29 +152,108 @@ def buscar_cliente_por_email(email: str) -> Optional[Dict]:
         return None
 
 
-def exportar_clientes_para_csv(caminho: str = "clientes_export.csv") -> bool:
+def verificar_duplicados(email: str, nif: str, excluir_id: Optional[int] = None) -> Dict[str, bool]:
     """
-    Exporta todos os clientes para um ficheiro CSV.
+    Indica, numa só consulta, se o email ou o NIF já pertencem a outro cliente.
+
+    Cada condição é resolvida pelo respetivo índice (`idx_clientes_email_normalizado`
+    e `idx_clientes_nif`). O email é comparado sem distinção de maiúsculas.
+
+    Args:
+        email (str): Email a verificar.
+        nif (str): NIF a verificar.
+        excluir_id (int, optional): ID do cliente a ignorar (o próprio, numa atualização).
+
+    Returns:
+        Dict[str, bool]: {"email": bool, "nif": bool}; True quando o valor já está em uso.
+        Em caso de erro devolve um dicionário vazio.
+    """
+    query = """
+        SELECT
+            EXISTS (SELECT 1 FROM clientes WHERE lower(email) = lower(?) AND id IS NOT ?) AS email,
+            EXISTS (SELECT 1 FROM clientes WHERE nif = ? AND id IS NOT ?) AS nif
+    """
+    try:
+        with obter_cursor() as cur:
+            cur.execute(query, ((email or "").strip(), excluir_id, (nif or "").strip(), excluir_id))
+            linha = cur.fetchone()
+            return {"email": bool(linha["email"]), "nif": bool(linha["nif"])}
+    except Exception:
+        logger.exception("Erro ao verificar duplicados de cliente")
+        return {}
+
+
+def exportar_clientes_para_csv(caminho: str = "clientes_export.csv",
+                               progresso: Optional[Callable[[int], None]] = None,
+                               cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta todos os clientes para um ficheiro CSV, em lotes (memória constante).
 
     Args:
         caminho (str, optional): Caminho do ficheiro CSV a gerar.
                                  Por defeito 'clientes_export.csv'.
+        progresso (Callable[[int], None], optional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], optional): Interrompe a exportação quando devolve True.
 
     Returns:
         bool: True se a exportação foi realizada com sucesso, False caso contrário.
     """
-    clientes = listar_clientes()
-    if not clientes:
+    linhas = exportar_consulta_csv(
+        caminho, "SELECT id, nome, email, telefone, nif, data_registo FROM clientes ORDER BY id",
+        progresso=progresso, cancelado=cancelado,
+    )
+    if linhas == 0:
         logger.warning("Nenhum cliente para exportar")
-        return False
+    return bool(linhas)
 
-    try:
-        with open(caminho, mode="w", newline="", encoding="utf-8") as f:
-            escritor = csv.DictWriter(f, fieldnames=["id", "nome", "email", "telefone", "nif", "data_registo"])
-            escritor.writeheader()
-            escritor.writerows(clientes)
-        logger.info("Clientes exportados com sucesso para %s", caminho)
-        return True
-    except Exception as e:
-        logger.exception("Erro ao exportar CSV: %s", e)
-        return False
+
+def exportar_clientes_para_xlsx(caminho: str = "clientes_export.xlsx",
+                                progresso: Optional[Callable[[int], None]] = None,
+                                cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta todos os clientes para um ficheiro Excel, em lotes (memória constante).
+
+    Args:
+        caminho (str, optional): Caminho do ficheiro XLSX a gerar.
+                                 Por defeito 'clientes_export.xlsx'.
+        progresso (Callable[[int], None], optional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], optional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        bool: True se a exportação foi realizada com sucesso, False caso contrário.
+    """
+    linhas = exportar_consulta_xlsx(
+        caminho, "SELECT id, nome, email, telefone, nif, data_registo FROM clientes ORDER BY id",
+        cabecalho=["ID", "Nome", "Email", "Telefone", "NIF", "Data de Registo"],
+        tipos=["inteiro", "texto", "texto", "texto", "texto", "data_hora"],
+        folha="Clientes", progresso=progresso, cancelado=cancelado,
+    )
+    if linhas == 0:
+        logger.warning("Nenhum cliente para exportar")
+    return bool(linhas)
+
+
+def importar_clientes_csv_bd(caminho: str, preparar: Preparar, caminho_rejeicoes: Optional[str] = None,
+                             progresso: Optional[Callable[[int], None]] = None,
+                             cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa clientes de um ficheiro CSV, em lotes de `executemany`.
+
+    Emails ou NIFs já existentes (ou repetidos no ficheiro) são rejeitados
+    pelos índices únicos e ficam no relatório de rejeições.
+
+    Args:
+        caminho (str): Ficheiro CSV com as colunas nome, email, telefone e nif.
+        preparar (Preparar): Valida uma linha e devolve (nome, email, telefone, nif).
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já lidas.
+        cancelado (Callable[[], bool], opcional): Interrompe a importação quando devolve True.
+
+    Returns:
+        Optional[Dict[str, Any]]: Resultado de `importacao_csv.importar_csv`, ou None em caso de erro.
+    """
+    return importar_csv(
+        caminho, "INSERT INTO Clientes (nome, email, telefone, nif) VALUES (?, ?, ?, ?)",
+        ["nome", "email", "telefone", "nif"], preparar,
+        caminho_rejeicoes=caminho_rejeicoes, progresso=progresso, cancelado=cancelado,
+    )
@@ -11,11 +11,14 @@ Funções principais:
 - excluir_cliente: remove cliente pelo ID.
 - listar_clientes: retorna lista de clientes cadastrados.
 - procurar_cliente_por_email: busca cliente específico.
+- verificar_duplicados_cliente: indica se email/NIF já pertencem a outro cliente.
 - salvar_clientes_csv: exporta dados para CSV.
+- salvar_clientes_xlsx: exporta dados para Excel.
+- importar_clientes_csv: importa clientes de um ficheiro CSV.
 """
 
 import logging
-from typing import Tuple, List, Optional, Dict
+from typing import Any, Callable, Tuple, List, Optional, Dict
 from controllers.cliente.cliente_validacoes import validar_dados_cliente
 from controllers.cliente import cliente_repositorio
 
@@ -45,8 +48,8 @@ def criar_cliente(nome: str, email: str, telefone: str, nif: str) -> Tuple[bool,
     if sucesso:
         logger.info("Cliente '%s' adicionado com sucesso.", nome)
         return True, "Cliente adicionado com sucesso."
-    logger.warning("Cliente '%s' não pôde ser adicionado (email já existente ou erro).", nome)
-    return False, "Cliente não pôde ser adicionado: email já existe ou erro no BD."
+    logger.warning("Cliente '%s' não pôde ser adicionado (email/NIF já existente ou erro).", nome)
+    return False, "Cliente não pôde ser adicionado: email ou NIF já existe ou erro no BD."
 
 
 def editar_cliente(id_cliente: int, nome: str, email: str, telefone: str, nif: str) -> Tuple[bool, str]:
@@ -133,20 +136,100 @@ def procurar_cliente_por_email(email: str) -> Optional[Dict]:
     return cliente
 
 
-def salvar_clientes_csv(caminho: str = "clientes_export.csv") -> bool:
+def verificar_duplicados_cliente(email: str, nif: str, id_cliente: Optional[int] = None) -> Dict[str, bool]:
+    """
+    Verifica se o email ou o NIF já pertencem a um cliente diferente de `id_cliente`.
+
+    Args:
+        email (str): Email a verificar (sem distinção de maiúsculas).
+        nif (str): NIF a verificar.
+        id_cliente (int, optional): Cliente a ignorar (o que está a ser editado).
+
+    Returns:
+        Dict[str, bool]: {"email": bool, "nif": bool}; vazio se a verificação falhar.
+    """
+    duplicados = cliente_repositorio.verificar_duplicados(email, nif, id_cliente)
+    if any(duplicados.values()):
+        logger.debug("Duplicados para email '%s' / NIF '%s': %s", email, nif, duplicados)
+    return duplicados
+
+
+def salvar_clientes_csv(caminho: str = "clientes_export.csv",
+                        progresso: Optional[Callable[[int], None]] = None,
+                        cancelado: Optional[Callable[[], bool]] = None) -> bool:
     """
     Exporta todos os clientes para um ficheiro CSV.
 
     Args:
         caminho (str, optional): Caminho de saída do ficheiro CSV.
             Por defeito, "clientes_export.csv".
+        progresso (Callable[[int], None], optional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], optional): Interrompe a exportação quando devolve True.
 
     Returns:
         bool: True se exportação for bem-sucedida, False caso contrário.
     """
-    sucesso = cliente_repositorio.exportar_clientes_para_csv(caminho)
+    sucesso = cliente_repositorio.exportar_clientes_para_csv(caminho, progresso, cancelado)
     if sucesso:
         logger.info("Clientes exportados com sucesso para CSV: %s", caminho)
     else:
         logger.warning("Falha ao exportar clientes para CSV: %s", caminho)
     return sucesso
+
+
+def salvar_clientes_xlsx(caminho: str = "clientes_export.xlsx",
+                         progresso: Optional[Callable[[int], None]] = None,
+                         cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta todos os clientes para um ficheiro Excel.
+
+    Args:
+        caminho (str, optional): Caminho de saída do ficheiro XLSX.
+            Por defeito, "clientes_export.xlsx".
+        progresso (Callable[[int], None], optional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], optional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        bool: True se exportação for bem-sucedida, False caso contrário.
+    """
+    sucesso = cliente_repositorio.exportar_clientes_para_xlsx(caminho, progresso, cancelado)
+    if sucesso:
+        logger.info("Clientes exportados com sucesso para Excel: %s", caminho)
+    else:
+        logger.warning("Falha ao exportar clientes para Excel: %s", caminho)
+    return sucesso
+
+
+def _preparar_cliente_importacao(linha: Dict[str, str]) -> Tuple[Optional[tuple], str]:
+    """Valida uma linha do CSV de importação com `validar_dados_cliente`."""
+    nome, email, telefone, nif = (linha.get(campo, "") for campo in ("nome", "email", "telefone", "nif"))
+    valido, msg = validar_dados_cliente(nome, email, telefone, nif)
+    if not valido:
+        return None, msg
+    return (nome.strip(), email.strip(), telefone.strip(), nif.strip()), ""
+
+
+def importar_clientes_csv(caminho: str, caminho_rejeicoes: Optional[str] = None,
+                          progresso: Optional[Callable[[int], None]] = None,
+                          cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa clientes de um ficheiro CSV (colunas nome, email, telefone e nif).
+
+    Cada linha é validada como no formulário; as linhas inválidas ou com
+    email/NIF já existente são rejeitadas sem impedir as restantes.
+
+    Args:
+        caminho (str): Ficheiro CSV a importar.
+        caminho_rejeicoes (str, optional): CSV onde escrever as linhas rejeitadas e o motivo.
+        progresso (Callable[[int], None], optional): Recebe o número de linhas já lidas.
+        cancelado (Callable[[], bool], optional): Interrompe a importação quando devolve True.
+
+    Returns:
+        Optional[Dict[str, Any]]: Linhas lidas, inseridas e rejeitadas (com os motivos),
+        ou None se o ficheiro não puder ser importado.
+    """
+    resultado = cliente_repositorio.importar_clientes_csv_bd(
+        caminho, _preparar_cliente_importacao, caminho_rejeicoes, progresso, cancelado)
+    if resultado is None:
+        logger.warning("Falha ao importar clientes de %s", caminho)
+    return resultado
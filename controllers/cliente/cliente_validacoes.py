@@ -114,8 +114,8 @@ def validar_dados_cliente(nome: str, email: str, telefone: str, nif: str) -> Tup
             - True, "" se todos os campos forem válidos.
             - False, mensagem de erro do primeiro campo inválido.
     """
-    for func in (nome_valido, email_valido, telefone_valido, nif_valido):
-        valido, msg = func(locals()[func.__name__.split('_')[0]])
+    for func, valor in ((nome_valido, nome), (email_valido, email), (telefone_valido, telefone), (nif_valido, nif)):
+        valido, msg = func(valor)
         if not valido:
             return False, msg
     return True, ""
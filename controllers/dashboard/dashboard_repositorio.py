@@ -6,16 +6,47 @@ tais como contagem de clientes, veículos disponíveis, reservas ativas
 e cálculo de receita total.
 
 Também inclui consultas agrupadas (ex.: reservas por mês) para
-uso em dashboards ou relatórios.
+uso em dashboards ou relatórios, e `calcular_indicadores`, que obtém
+todos os indicadores do dashboard numa única consulta.
+
+Os indicadores são lidos da tabela `kpi_counters`, mantida por triggers
+(migração 6) a cada escrita em Clientes, Veiculos, Reservas e Pagamentos,
+pelo que a leitura não percorre nenhuma tabela. `verificar_contadores_kpi`
+recalcula-os de raiz e indica (ou corrige) diferenças.
+
+Do mesmo modo, os agregados mensais vêm das tabelas `reservas_por_mes`
+(mês × categoria × estado) e `receita_por_mes` (mês × forma de pagamento),
+mantidas por triggers (migração 7); `recalcular_agregados_mensais` refaz-os
+para um intervalo de meses ou na totalidade.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from controllers.utils_bd import executar_query_valor_unico, obter_cursor
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Recalcula os indicadores de raiz (o mesmo que os triggers de kpi_counters mantêm)
+SQL_RECALCULAR_INDICADORES = """
+    SELECT 'total_clientes', COUNT(*) FROM Clientes
+    UNION ALL SELECT 'total_veiculos_disponiveis', COUNT(*) FROM Veiculos WHERE estado = 'disponível'
+    UNION ALL SELECT 'total_reservas_ativas', COUNT(*) FROM Reservas WHERE estado IN ('Confirmada', 'Pendente')
+    UNION ALL SELECT 'receita_total', COALESCE(SUM(valor), 0.0) FROM Pagamentos
+"""
+
+INDICADORES = ("total_clientes", "total_veiculos_disponiveis", "total_reservas_ativas", "receita_total")
+
+# Diferença a partir da qual a receita acumulada pelos triggers é considerada desvio
+# (somas sucessivas de reais acumulam erros de arredondamento)
+TOLERANCIA_RECEITA = 0.005
+
+
+def _ler_contador(chave: str) -> float:
+    """Lê um contador de `kpi_counters` (0 se não existir)."""
+    return executar_query_valor_unico("SELECT valor FROM kpi_counters WHERE chave = ?", (chave,)) or 0
+
+
 def contar_clientes() -> Dict[str, int]:
     """
     Conta o número total de clientes registados.
@@ -24,8 +55,7 @@ def contar_clientes() -> Dict[str, int]:
         Dict[str, int]: Dicionário com a chave "total_clientes" e respetivo valor.
     """
     try:
-        total = executar_query_valor_unico("SELECT COUNT(*) FROM Clientes") or 0
-        return {"total_clientes": int(total)}
+        return {"total_clientes": int(_ler_contador("total_clientes"))}
     except Exception:
         logger.exception("Erro ao contar clientes")
         return {"total_clientes": 0}
@@ -39,10 +69,7 @@ def contar_veiculos_disponiveis() -> Dict[str, int]:
         Dict[str, int]: Dicionário com a chave "total_veiculos_disponiveis" e respetivo valor.
     """
     try:
-        total = executar_query_valor_unico(
-            "SELECT COUNT(*) FROM Veiculos WHERE estado = ?", ("disponível",)
-        ) or 0
-        return {"total_veiculos_disponiveis": int(total)}
+        return {"total_veiculos_disponiveis": int(_ler_contador("total_veiculos_disponiveis"))}
     except Exception:
         logger.exception("Erro ao contar veículos disponíveis")
         return {"total_veiculos_disponiveis": 0}
@@ -56,10 +83,7 @@ def contar_reservas_ativas() -> Dict[str, int]:
         Dict[str, int]: Dicionário com a chave "total_reservas_ativas" e respetivo valor.
     """
     try:
-        total = executar_query_valor_unico(
-            "SELECT COUNT(*) FROM Reservas WHERE estado IN (?, ?)", ("Confirmada", "Pendente")
-        ) or 0
-        return {"total_reservas_ativas": int(total)}
+        return {"total_reservas_ativas": int(_ler_contador("total_reservas_ativas"))}
     except Exception:
         logger.exception("Erro ao contar reservas ativas")
         return {"total_reservas_ativas": 0}
@@ -73,32 +97,229 @@ def somar_valor_pagamentos() -> Dict[str, float]:
         Dict[str, float]: Dicionário com a chave "receita_total" e respetivo valor.
     """
     try:
-        total = executar_query_valor_unico("SELECT SUM(valor) FROM Pagamentos") or 0.0
-        return {"receita_total": float(total)}
+        return {"receita_total": round(float(_ler_contador("receita_total")), 2)}
     except Exception:
         logger.exception("Erro ao somar valor dos pagamentos")
         return {"receita_total": 0.0}
 
 
+def calcular_indicadores() -> Dict[str, float]:
+    """
+    Obtém todos os indicadores do dashboard numa única consulta.
+
+    Returns:
+        Dict[str, float]: Chaves "total_clientes", "total_veiculos_disponiveis",
+        "total_reservas_ativas" e "receita_total" (zeros em caso de erro).
+    """
+    indicadores = {"total_clientes": 0, "total_veiculos_disponiveis": 0, "total_reservas_ativas": 0,
+                   "receita_total": 0.0}
+    try:
+        with obter_cursor() as cursor:
+            cursor.execute("SELECT chave, valor FROM kpi_counters")
+            for chave, valor in cursor.fetchall():
+                if chave in indicadores:
+                    indicadores[chave] = round(float(valor), 2) if chave == "receita_total" else int(valor)
+    except Exception:
+        logger.exception("Erro ao calcular indicadores do dashboard")
+    return indicadores
+
+
+def verificar_contadores_kpi(corrigir: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Recalcula os indicadores de raiz e compara-os com `kpi_counters`.
+
+    A comparação é feita numa transação de escrita (BEGIN IMMEDIATE), pelo
+    que nenhuma escrita concorrente altera os contadores entretanto.
+
+    Args:
+        corrigir (bool): Se True, grava os valores recalculados nos contadores com desvio.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Por indicador com desvio, o valor do contador
+        ("contador") e o valor real ("real"). Vazio se tudo estiver correto
+        ou em caso de erro.
+    """
+    try:
+        with obter_cursor(commit=corrigir) as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(SQL_RECALCULAR_INDICADORES)
+            reais = {chave: valor for chave, valor in cursor.fetchall()}
+            cursor.execute("SELECT chave, valor FROM kpi_counters")
+            contadores = {chave: valor for chave, valor in cursor.fetchall()}
+
+            desvios = {}
+            for chave in INDICADORES:
+                contador, real = contadores.get(chave), float(reais[chave])
+                tolerancia = TOLERANCIA_RECEITA if chave == "receita_total" else 0
+                if contador is None or abs(contador - real) > tolerancia:
+                    desvios[chave] = {"contador": contador, "real": real}
+            if desvios:
+                logger.warning("Contadores do dashboard com desvio: %s", desvios)
+            if corrigir:
+                cursor.executemany("INSERT OR REPLACE INTO kpi_counters (chave, valor) VALUES (?, ?)",
+                                   [(chave, reais[chave]) for chave in INDICADORES])
+            return desvios
+    except Exception:
+        logger.exception("Erro ao verificar os contadores do dashboard")
+        return {}
+
+
 def reservas_agrupadas_por_mes() -> List[Dict[str, int]]:
     """
     Retorna uma lista com o total de reservas agrupadas por mês.
 
+    Lê o agregado `reservas_por_mes` (algumas dezenas de linhas por mês) em vez
+    de agrupar todas as reservas.
+
     Returns:
         List[Dict[str, int]]: Lista de dicionários no formato:
             [{"mes": "2025-01", "total": 5}, {"mes": "2025-02", "total": 8}]
     """
     query = """
-        SELECT strftime('%Y-%m', data_inicio) AS mes, COUNT(*) AS total
-        FROM Reservas
+        SELECT mes, SUM(total) AS total
+        FROM reservas_por_mes
         GROUP BY mes
-        ORDER BY mes;
+        HAVING SUM(total) > 0
+        ORDER BY mes
     """
     try:
         with obter_cursor() as cursor:
             cursor.execute(query)
             resultados = cursor.fetchall()
-            return [{"mes": mes, "total": total} for mes, total in resultados]
+            # Reservas sem data válida ficam no mês '' do agregado
+            return [{"mes": mes or None, "total": total} for mes, total in resultados]
     except Exception:
         logger.exception("Erro ao obter reservas agrupadas por mês")
         return []
+
+
+def listar_reservas_por_mes(mes_inicio: Optional[str] = None, mes_fim: Optional[str] = None) -> List[Dict]:
+    """
+    Retorna o agregado mensal de reservas por categoria de veículo e estado.
+
+    Args:
+        mes_inicio (str, opcional): Primeiro mês (AAAA-MM). Por omissão, sem limite.
+        mes_fim (str, opcional): Último mês (AAAA-MM). Por omissão, sem limite.
+
+    Returns:
+        List[Dict]: Dicionários com mes, categoria, estado, total e valor_total,
+        ordenados por mês, categoria e estado.
+    """
+    query = """
+        SELECT mes, categoria, estado, total, ROUND(valor_total, 2) AS valor_total
+        FROM reservas_por_mes
+        WHERE mes >= :inicio AND mes <= :fim AND total > 0
+        ORDER BY mes, categoria, estado
+    """
+    try:
+        with obter_cursor() as cursor:
+            cursor.execute(query, {"inicio": mes_inicio or "", "fim": mes_fim or "9999-12"})
+            colunas = [desc[0] for desc in cursor.description]
+            return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+    except Exception:
+        logger.exception("Erro ao listar reservas por mês")
+        return []
+
+
+def listar_receita_por_mes(mes_inicio: Optional[str] = None, mes_fim: Optional[str] = None) -> List[Dict]:
+    """
+    Retorna o agregado mensal de pagamentos por forma de pagamento.
+
+    Args:
+        mes_inicio (str, opcional): Primeiro mês (AAAA-MM). Por omissão, sem limite.
+        mes_fim (str, opcional): Último mês (AAAA-MM). Por omissão, sem limite.
+
+    Returns:
+        List[Dict]: Dicionários com mes, id_forma_pagamento (0 se não definida),
+        total (número de pagamentos) e valor, ordenados por mês.
+    """
+    query = """
+        SELECT mes, id_forma_pagamento, total, ROUND(valor, 2) AS valor
+        FROM receita_por_mes
+        WHERE mes >= :inicio AND mes <= :fim AND total > 0
+        ORDER BY mes, id_forma_pagamento
+    """
+    try:
+        with obter_cursor() as cursor:
+            cursor.execute(query, {"inicio": mes_inicio or "", "fim": mes_fim or "9999-12"})
+            colunas = [desc[0] for desc in cursor.description]
+            return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+    except Exception:
+        logger.exception("Erro ao listar receita por mês")
+        return []
+
+
+def _mes_seguinte(mes: str) -> str:
+    """Devolve o mês seguinte a "AAAA-MM" (ex.: "2025-12" -> "2026-01")."""
+    ano, numero = int(mes[:4]), int(mes[5:7])
+    return f"{ano + numero // 12:04d}-{numero % 12 + 1:02d}"
+
+
+def recalcular_agregados_mensais(mes_inicio: Optional[str] = None, mes_fim: Optional[str] = None) -> bool:
+    """
+    Recalcula de raiz os agregados mensais de reservas e receita.
+
+    Sem argumentos recalcula tudo (backfill); com um intervalo só apaga e
+    recalcula os meses indicados, lendo apenas as reservas e pagamentos desses
+    meses (pelos índices de data). Corre numa única transação de escrita.
+
+    Args:
+        mes_inicio (str, opcional): Primeiro mês a recalcular (AAAA-MM).
+        mes_fim (str, opcional): Último mês a recalcular (AAAA-MM).
+
+    Returns:
+        bool: True se o recálculo foi concluído, False em caso de erro.
+    """
+    parcial = mes_inicio is not None or mes_fim is not None
+    parametros = {
+        # Num recálculo parcial o mês '' (datas inválidas) nunca é apagado: o
+        # INSERT parcial não o volta a calcular
+        "inicio": mes_inicio or ("0000-01" if parcial else ""), "fim": mes_fim or "9999-12",
+        "de": f"{mes_inicio}-01" if mes_inicio else "",
+        "ate": _mes_seguinte(mes_fim) if mes_fim else "9999-13",
+    }
+    if parcial:
+        sql_reservas = """
+            INSERT INTO reservas_por_mes (mes, categoria, estado, total, valor_total)
+            SELECT COALESCE(strftime('%Y-%m', r.data_inicio), ''), COALESCE(v.categoria, ''),
+                   COALESCE(r.estado, ''), COUNT(*), COALESCE(SUM(r.valor_total), 0)
+            FROM Reservas r LEFT JOIN Veiculos v ON v.id = r.id_veiculo
+            WHERE r.data_inicio >= :de AND r.data_inicio < :ate AND strftime('%Y-%m', r.data_inicio) IS NOT NULL
+            GROUP BY 1, 2, 3
+        """
+        sql_pagamentos = """
+            INSERT INTO receita_por_mes (mes, id_forma_pagamento, total, valor)
+            SELECT COALESCE(strftime('%Y-%m', data_pagamento), ''), COALESCE(id_forma_pagamento, 0),
+                   COUNT(*), COALESCE(SUM(valor), 0)
+            FROM Pagamentos
+            WHERE data_pagamento >= :de AND data_pagamento < :ate AND strftime('%Y-%m', data_pagamento) IS NOT NULL
+            GROUP BY 1, 2
+        """
+    else:
+        # Sem intervalo também entram as linhas com datas inválidas (mês '')
+        sql_reservas = """
+            INSERT INTO reservas_por_mes (mes, categoria, estado, total, valor_total)
+            SELECT COALESCE(strftime('%Y-%m', r.data_inicio), ''), COALESCE(v.categoria, ''),
+                   COALESCE(r.estado, ''), COUNT(*), COALESCE(SUM(r.valor_total), 0)
+            FROM Reservas r LEFT JOIN Veiculos v ON v.id = r.id_veiculo
+            GROUP BY 1, 2, 3
+        """
+        sql_pagamentos = """
+            INSERT INTO receita_por_mes (mes, id_forma_pagamento, total, valor)
+            SELECT COALESCE(strftime('%Y-%m', data_pagamento), ''), COALESCE(id_forma_pagamento, 0),
+                   COUNT(*), COALESCE(SUM(valor), 0)
+            FROM Pagamentos
+            GROUP BY 1, 2
+        """
+    try:
+        with obter_cursor(commit=True) as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM reservas_por_mes WHERE mes >= :inicio AND mes <= :fim", parametros)
+            cursor.execute(sql_reservas, parametros)
+            cursor.execute("DELETE FROM receita_por_mes WHERE mes >= :inicio AND mes <= :fim", parametros)
+            cursor.execute(sql_pagamentos, parametros)
+        logger.info("Agregados mensais recalculados (%s a %s).", mes_inicio or "início", mes_fim or "fim")
+        return True
+    except Exception:
+        logger.exception("Erro ao recalcular agregados mensais")
+        return False
@@ -5,18 +5,30 @@ Fornece funções de alto nível para acesso às estatísticas do sistema,
 baseadas em consultas do módulo `dashboard_repositorio`.
 
 As funções retornam contagens de clientes, veículos, reservas e receita,
-bem como relatórios agregados de reservas por mês.
+bem como relatórios agregados de reservas por mês. `obter_indicadores_dashboard`
+devolve todos os indicadores de uma só vez (uma consulta). Os relatórios
+mensais (por categoria, estado e forma de pagamento) leem agregados mantidos
+por triggers, que podem ser recalculados para um intervalo de meses.
 """
 
-from typing import List, Dict
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional
 from controllers.dashboard.dashboard_repositorio import (
     contar_clientes,
     contar_veiculos_disponiveis,
     contar_reservas_ativas,
     somar_valor_pagamentos,
-    reservas_agrupadas_por_mes
+    calcular_indicadores,
+    verificar_contadores_kpi,
+    reservas_agrupadas_por_mes,
+    listar_reservas_por_mes,
+    listar_receita_por_mes,
+    recalcular_agregados_mensais
 )
 
+logger = logging.getLogger(__name__)
+
 
 def obter_total_clientes() -> int:
     """
@@ -58,6 +70,31 @@ def calcular_receita_total_pagamentos() -> float:
     return somar_valor_pagamentos().get("receita_total", 0.0)
 
 
+def obter_indicadores_dashboard() -> Dict[str, float]:
+    """
+    Obtém todos os indicadores do dashboard numa única consulta.
+
+    Returns:
+        Dict[str, float]: Chaves "total_clientes", "total_veiculos_disponiveis",
+        "total_reservas_ativas" e "receita_total".
+    """
+    return calcular_indicadores()
+
+
+def verificar_indicadores_dashboard(corrigir: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Verifica (e opcionalmente corrige) os contadores mantidos por triggers.
+
+    Args:
+        corrigir (bool): Se True, substitui os contadores pelos valores recalculados.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Indicadores com desvio, com o valor do
+        contador e o valor real (vazio se não houver desvios).
+    """
+    return verificar_contadores_kpi(corrigir)
+
+
 def obter_reservas_agrupadas_por_mes() -> List[Dict[str, int]]:
     """
     Obtém a lista de reservas agrupadas por mês.
@@ -67,3 +104,74 @@ def obter_reservas_agrupadas_por_mes() -> List[Dict[str, int]]:
             [{"mes": "2025-01", "total": 5}, {"mes": "2025-02", "total": 8}]
     """
     return reservas_agrupadas_por_mes()
+
+
+def _validar_intervalo_meses(mes_inicio: Optional[str], mes_fim: Optional[str]) -> bool:
+    """Valida meses opcionais no formato AAAA-MM, com mes_inicio <= mes_fim."""
+    for mes in (mes_inicio, mes_fim):
+        if mes is None:
+            continue
+        try:
+            valido = len(mes) == 7 and datetime.strptime(mes, "%Y-%m") is not None
+        except (TypeError, ValueError):
+            valido = False
+        if not valido:
+            logger.error("Mês inválido: '%s' (formato AAAA-MM).", mes)
+            return False
+    if mes_inicio and mes_fim and mes_fim < mes_inicio:
+        logger.error("O mês final é anterior ao mês inicial.")
+        return False
+    return True
+
+
+def obter_reservas_por_mes_detalhadas(mes_inicio: Optional[str] = None,
+                                      mes_fim: Optional[str] = None) -> List[Dict]:
+    """
+    Obtém o total e o valor das reservas por mês, categoria de veículo e estado.
+
+    Args:
+        mes_inicio (str, opcional): Primeiro mês (AAAA-MM)
+        mes_fim (str, opcional): Último mês (AAAA-MM)
+
+    Returns:
+        List[Dict]: Dicionários com mes, categoria, estado, total e valor_total
+        (lista vazia se o intervalo for inválido).
+    """
+    if not _validar_intervalo_meses(mes_inicio, mes_fim):
+        return []
+    return listar_reservas_por_mes(mes_inicio, mes_fim)
+
+
+def obter_receita_por_mes(mes_inicio: Optional[str] = None, mes_fim: Optional[str] = None) -> List[Dict]:
+    """
+    Obtém o número e o valor dos pagamentos por mês e forma de pagamento.
+
+    Args:
+        mes_inicio (str, opcional): Primeiro mês (AAAA-MM)
+        mes_fim (str, opcional): Último mês (AAAA-MM)
+
+    Returns:
+        List[Dict]: Dicionários com mes, id_forma_pagamento, total e valor
+        (lista vazia se o intervalo for inválido).
+    """
+    if not _validar_intervalo_meses(mes_inicio, mes_fim):
+        return []
+    return listar_receita_por_mes(mes_inicio, mes_fim)
+
+
+def reconstruir_agregados_mensais(mes_inicio: Optional[str] = None, mes_fim: Optional[str] = None) -> bool:
+    """
+    Recalcula os agregados mensais a partir das reservas e pagamentos.
+
+    Sem argumentos recalcula todos os meses (backfill).
+
+    Args:
+        mes_inicio (str, opcional): Primeiro mês a recalcular (AAAA-MM)
+        mes_fim (str, opcional): Último mês a recalcular (AAAA-MM)
+
+    Returns:
+        bool: True se o recálculo foi concluído, False caso contrário.
+    """
+    if not _validar_intervalo_meses(mes_inicio, mes_fim):
+        return False
+    return recalcular_agregados_mensais(mes_inicio, mes_fim)
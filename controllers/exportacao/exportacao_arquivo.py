@@ -0,0 +1,248 @@
+"""
+Exportação de várias tabelas para um único arquivo comprimido.
+
+Substitui a entrega à contabilidade tabela a tabela (um diálogo de gravação
+por tabela) por uma só chamada que produz um arquivo `.zip` ou `.tar.gz` com
+um CSV por tabela e um `manifesto.json` com o número de linhas, o tamanho e
+o SHA-256 de cada CSV.
+
+Todas as tabelas refletem o mesmo instante: é feito primeiro um instantâneo
+da base de dados com `VACUUM INTO` (uma única leitura consistente, que não
+bloqueia as escritas em modo WAL). Cada tabela é depois exportada numa thread
+de trabalho, com a sua própria conexão só de leitura ao instantâneo, em lotes
+(ver `exportacao_csv.escrever_cursor_csv`). O SQLite liberta o GIL enquanto
+lê, pelo que as tabelas grandes (reservas, pagamentos) são lidas em paralelo.
+
+O arquivo é escrito num temporário e só substitui o destino no fim.
+
+Uso (a partir da raiz do projeto):
+    python -m controllers.exportacao.exportacao_arquivo entrega.zip [--formato tar.gz] [--threads 4]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from controllers.exportacao.exportacao_csv import escrever_cursor_csv
+from controllers.utils_bd import obter_cursor
+from db.conexao import conectar_base_dados
+from db.migracoes import versao_atual
+
+logger = logging.getLogger(__name__)
+
+# Tabelas incluídas por defeito (e as únicas aceites)
+TABELAS_ARQUIVO = ("clientes", "veiculos", "reservas", "pagamentos", "formaspagamento", "manutencoes")
+FORMATOS = ("zip", "tar.gz")
+MAX_THREADS = 4
+NOME_MANIFESTO = "manifesto.json"
+# Nível de compressão deflate: o 1 é ~6x mais rápido do que o 6 (por defeito)
+# e gera arquivos só ~20% maiores com CSVs
+NIVEL_COMPRESSAO = 1
+# Texto acumulado antes de codificar, calcular o resumo e escrever no disco
+TAMANHO_BLOCO = 1 << 20
+
+
+class _EscritaComResumo:
+    """
+    Recebe o texto do `csv.writer` e escreve-o num ficheiro binário em blocos,
+    calculando o SHA-256 e o tamanho (bytes UTF-8) do conteúdo.
+
+    Codificar e calcular o resumo por bloco, e não por linha, evita milhões de
+    chamadas pequenas; `hashlib` e a escrita libertam o GIL em blocos grandes.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.resumo = hashlib.sha256()
+        self.bytes = 0
+        self._partes = []
+        self._pendente = 0
+
+    def write(self, texto: str) -> int:
+        self._partes.append(texto)
+        self._pendente += len(texto)
+        if self._pendente >= TAMANHO_BLOCO:
+            self.descarregar()
+        return len(texto)
+
+    def descarregar(self) -> None:
+        """Escreve o texto acumulado."""
+        if not self._partes:
+            return
+        dados = "".join(self._partes).encode("utf-8")
+        self._partes, self._pendente = [], 0
+        self.resumo.update(dados)
+        self.bytes += len(dados)
+        self.f.write(dados)
+
+
+def formato_por_extensao(destino: str) -> str:
+    """
+    Deduz o formato do arquivo a partir da extensão do destino.
+
+    Args:
+        destino (str): Caminho do arquivo.
+
+    Returns:
+        str: "tar.gz" para `.tar.gz`/`.tgz`; "zip" nos restantes casos.
+    """
+    nome = destino.lower()
+    return "tar.gz" if nome.endswith((".tar.gz", ".tgz")) else "zip"
+
+
+def criar_instantaneo(caminho: str) -> None:
+    """
+    Copia a base de dados da aplicação para `caminho` com `VACUUM INTO`.
+
+    Args:
+        caminho (str): Ficheiro de destino (não pode existir).
+    """
+    with obter_cursor() as cur:
+        cur.execute("VACUUM INTO ?", (caminho,))
+
+
+def _exportar_tabela(instantaneo: str, tabela: str, ficheiro: str,
+                     cancelado: Optional[Callable[[], bool]]) -> Optional[Dict[str, Any]]:
+    """
+    Exporta uma tabela do instantâneo para CSV (corre numa thread de trabalho).
+
+    Returns:
+        Optional[Dict[str, Any]]: Entrada do manifesto, ou None se for cancelada.
+    """
+    conexao = conectar_base_dados(instantaneo, perfil="readonly-analytics")
+    try:
+        with open(ficheiro, "wb") as f:
+            escrita = _EscritaComResumo(f)
+            # `tabela` vem sempre de TABELAS_ARQUIVO
+            cur = conexao.execute(f"SELECT * FROM {tabela} ORDER BY id")
+            linhas = escrever_cursor_csv(cur, escrita, cancelado=cancelado)
+            escrita.descarregar()
+    finally:
+        conexao.close()
+    if linhas is None:
+        return None
+    return {"ficheiro": os.path.basename(ficheiro), "linhas": linhas,
+            "bytes": escrita.bytes, "sha256": escrita.resumo.hexdigest()}
+
+
+def _empacotar(destino: str, formato: str, ficheiros: Sequence[str]) -> None:
+    """Junta os ficheiros (pela ordem dada) num arquivo zip ou tar.gz."""
+    if formato == "zip":
+        with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED,
+                             compresslevel=NIVEL_COMPRESSAO) as arquivo:
+            for ficheiro in ficheiros:
+                arquivo.write(ficheiro, os.path.basename(ficheiro))
+    else:
+        with tarfile.open(destino, "w:gz", compresslevel=NIVEL_COMPRESSAO) as arquivo:
+            for ficheiro in ficheiros:
+                arquivo.add(ficheiro, os.path.basename(ficheiro))
+
+
+def exportar_arquivo(destino: str, tabelas: Sequence[str] = TABELAS_ARQUIVO, formato: Optional[str] = None,
+                     max_threads: int = MAX_THREADS, progresso: Optional[Callable[[str, int], None]] = None,
+                     cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Exporta várias tabelas, de um mesmo instantâneo, para um arquivo comprimido.
+
+    Args:
+        destino (str): Ficheiro do arquivo a criar.
+        tabelas (Sequence[str]): Tabelas a incluir (subconjunto de TABELAS_ARQUIVO).
+        formato (str, opcional): "zip" ou "tar.gz". Por defeito, deduzido da extensão.
+        max_threads (int): Número máximo de tabelas exportadas em paralelo.
+        progresso (Callable[[str, int], None], opcional): Chamado, na thread que
+            chamou esta função, com o nome e o número de linhas de cada tabela concluída.
+        cancelado (Callable[[], bool], opcional): Consultado entre lotes; se devolver
+            True a exportação é interrompida e o destino não é alterado.
+
+    Returns:
+        Optional[Dict[str, Any]]: Manifesto gravado no arquivo, ou None se a
+        exportação falhar ou for cancelada.
+
+    Exceções:
+        ValueError: Se uma tabela ou o formato não forem suportados.
+    """
+    desconhecidas = [t for t in tabelas if t not in TABELAS_ARQUIVO]
+    if desconhecidas or not tabelas:
+        raise ValueError(f"Tabelas não suportadas: {desconhecidas or 'nenhuma indicada'}")
+    formato = formato or formato_por_extensao(destino)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato não suportado: {formato}")
+
+    diretorio = tempfile.mkdtemp(prefix="luxury_wheels_arquivo_")
+    temporario = None
+    try:
+        instantaneo = os.path.join(diretorio, "instantaneo.db")
+        criar_instantaneo(instantaneo)
+        conexao = conectar_base_dados(instantaneo, perfil="readonly-analytics")
+        try:
+            versao = versao_atual(conexao)
+        finally:
+            conexao.close()
+
+        entradas: Dict[str, Optional[Dict[str, Any]]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_threads, len(tabelas))),
+                                thread_name_prefix="luxury_wheels_arquivo") as executor:
+            futuros = {
+                tabela: executor.submit(_exportar_tabela, instantaneo, tabela,
+                                        os.path.join(diretorio, f"{tabela}.csv"), cancelado)
+                for tabela in tabelas
+            }
+            for tabela, futuro in futuros.items():
+                entradas[tabela] = futuro.result()
+                if entradas[tabela] is not None and progresso is not None:
+                    progresso(tabela, entradas[tabela]["linhas"])
+
+        if any(entrada is None for entrada in entradas.values()):
+            logger.info("Exportação do arquivo %s cancelada.", destino)
+            return None
+
+        manifesto = {
+            "gerado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "versao_esquema": versao,
+            "algoritmo": "sha256",
+            "tabelas": entradas,
+        }
+        caminho_manifesto = os.path.join(diretorio, NOME_MANIFESTO)
+        with open(caminho_manifesto, "w", encoding="utf-8") as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(destino)),
+                                                 prefix=".arquivo_", suffix=".tmp")
+        os.close(descritor)
+        _empacotar(temporario, formato,
+                   [caminho_manifesto] + [os.path.join(diretorio, entradas[t]["ficheiro"]) for t in tabelas])
+        os.replace(temporario, destino)
+        temporario = None
+        logger.info("Arquivo %s criado: %s", destino,
+                    ", ".join(f"{t}={entradas[t]['linhas']}" for t in tabelas))
+        return manifesto
+    except Exception:
+        logger.exception("Erro ao exportar o arquivo %s", destino)
+        return None
+    finally:
+        if temporario is not None and os.path.exists(temporario):
+            os.remove(temporario)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("destino", help="Arquivo a criar (.zip ou .tar.gz).")
+    parser.add_argument("--formato", choices=FORMATOS, help="Por defeito, deduzido da extensão.")
+    parser.add_argument("--tabelas", nargs="+", choices=TABELAS_ARQUIVO, default=list(TABELAS_ARQUIVO))
+    parser.add_argument("--threads", type=int, default=MAX_THREADS)
+    args = parser.parse_args()
+
+    resultado = exportar_arquivo(args.destino, args.tabelas, args.formato, args.threads,
+                                 progresso=lambda tabela, linhas: print(f"{tabela}: {linhas} linhas"))
+    raise SystemExit(0 if resultado is not None else 1)
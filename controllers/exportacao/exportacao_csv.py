@@ -0,0 +1,116 @@
+"""
+Motor de exportação de consultas para CSV em memória constante.
+
+As exportações carregavam a tabela inteira numa lista de dicionários antes
+de escrever o ficheiro, o que com milhões de reservas ou pagamentos ocupa
+centenas de MB. `exportar_consulta_csv` percorre o cursor do SQLite (que só
+avança na base de dados à medida que as linhas são pedidas) em lotes de
+`fetchmany` e escreve cada lote diretamente no ficheiro: a memória usada
+depende do tamanho do lote e não do número de linhas.
+
+O ficheiro é escrito num temporário no mesmo diretório e só substitui o
+destino no fim, pelo que uma exportação cancelada ou com erro nunca deixa um
+CSV incompleto (nem apaga uma exportação anterior).
+
+Uso (nos repositórios, com o SQL como literal para a auditoria de planos):
+    linhas = exportar_consulta_csv(caminho, "SELECT id, metodo FROM FormasPagamento",
+                                   cabecalho=["ID", "Nome"], progresso=print,
+                                   cancelado=evento.is_set)
+"""
+
+import csv
+import logging
+import os
+import tempfile
+from typing import Callable, Optional, Sequence, TextIO
+
+from controllers.utils_bd import obter_cursor
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas e escritas de cada vez
+TAMANHO_LOTE = 5000
+
+
+def escrever_cursor_csv(cur, f: TextIO, cabecalho: Optional[Sequence[str]] = None,
+                        tamanho_lote: int = TAMANHO_LOTE, progresso: Optional[Callable[[int], None]] = None,
+                        cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Escreve num ficheiro aberto, lote a lote, as linhas de um cursor já executado.
+
+    Args:
+        cur: Cursor com a consulta já executada.
+        f (TextIO): Ficheiro de texto aberto com `newline=""`.
+        cabecalho, tamanho_lote, progresso, cancelado: Ver `exportar_consulta_csv`.
+
+    Returns:
+        Optional[int]: Número de linhas escritas, ou None se for cancelado.
+    """
+    escritor = csv.writer(f)
+    escritor.writerow(cabecalho if cabecalho is not None else [d[0] for d in cur.description])
+    escritas = 0
+    while True:
+        if cancelado is not None and cancelado():
+            return None
+        lote = cur.fetchmany(tamanho_lote)
+        if not lote:
+            return escritas
+        escritor.writerows(lote)
+        escritas += len(lote)
+        if progresso is not None:
+            progresso(escritas)
+
+
+def exportar_consulta_csv(caminho: str, sql: str, parametros: Sequence = (),
+                          cabecalho: Optional[Sequence[str]] = None, tamanho_lote: int = TAMANHO_LOTE,
+                          progresso: Optional[Callable[[int], None]] = None,
+                          cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Executa uma consulta e escreve o resultado num ficheiro CSV, lote a lote.
+
+    Args:
+        caminho (str): Ficheiro CSV de destino.
+        sql (str): Consulta SELECT a exportar.
+        parametros (Sequence, opcional): Parâmetros da consulta.
+        cabecalho (Sequence[str], opcional): Primeira linha do CSV. Por
+            defeito, os nomes das colunas da consulta.
+        tamanho_lote (int): Linhas por `fetchmany`.
+        progresso (Callable[[int], None], opcional): Chamado depois de cada
+            lote com o total de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Consultado antes de cada
+            lote (ex.: `threading.Event().is_set`); se devolver True a
+            exportação é interrompida e o destino não é alterado.
+
+    Returns:
+        Optional[int]: Número de linhas exportadas (0 se a consulta não devolver
+        linhas; nesse caso o ficheiro não é criado), ou None se a exportação
+        falhar ou for cancelada.
+    """
+    if tamanho_lote <= 0:
+        raise ValueError("tamanho_lote deve ser maior que zero")
+
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    temporario = None
+    try:
+        descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=".exportacao_", suffix=".csv.tmp")
+        with os.fdopen(descritor, "w", newline="", encoding="utf-8") as f, obter_cursor() as cur:
+            # Tuplos simples em vez de sqlite3.Row: o csv só precisa de sequências
+            cur.row_factory = None
+            cur.execute(sql, tuple(parametros))
+            escritas = escrever_cursor_csv(cur, f, cabecalho, tamanho_lote, progresso, cancelado)
+
+        if escritas is None:
+            logger.info("Exportação para %s cancelada.", caminho)
+            return None
+        if escritas == 0:
+            return 0
+        os.replace(temporario, caminho)
+        temporario = None
+        logger.info("%d linhas exportadas para %s", escritas, caminho)
+        return escritas
+    except Exception:
+        logger.exception("Erro ao exportar para %s", caminho)
+        return None
+    finally:
+        if temporario is not None and os.path.exists(temporario):
+            os.remove(temporario)
@@ -0,0 +1,237 @@
+"""
+Exportação incremental: só as linhas criadas, alteradas ou removidas desde a
+última exportação de cada consumidor.
+
+Os triggers da migração 10 registam cada escrita em clientes, reservas e
+pagamentos na tabela `registo_alteracoes` (tabela, id da linha, operação e um
+`seq` sempre crescente), só enquanto a tabela tiver algum consumidor. Cada
+consumidor (ex.: "contabilidade") guarda em `marcas_exportacao` o último
+`seq` que já recebeu, por tabela. Uma exportação
+lê só o intervalo `(marca, último seq]` do índice (tabela, seq), agrupa as
+alterações por linha e junta o estado atual de cada uma:
+
+    - "I": linha criada no intervalo;
+    - "U": linha já existente e alterada no intervalo;
+    - "D": linha removida (tombstone: só o id e o seq, restantes colunas vazias).
+
+Uma linha criada e removida no mesmo intervalo sai como "D"; o consumidor
+deve ignorar remoções de ids que não conhece. Sem marca (primeira exportação
+do consumidor) a tabela é exportada por inteiro, com todas as linhas como "I";
+antes disso o consumidor fica registado com uma marca provisória (seq -1),
+para que as escritas feitas durante a exportação já entrem no registo. As
+cargas em massa que não passam pelo registo (dados sintéticos) apagam as
+marcas da tabela: a exportação seguinte volta a ser completa.
+
+O último seq e as linhas são lidos na mesma transação de leitura, pelo que o
+ficheiro e a nova marca correspondem ao mesmo instante. As marcas só avançam
+depois de todos os ficheiros estarem escritos: uma exportação cancelada ou com
+erro volta a exportar o mesmo intervalo na vez seguinte. No fim, as entradas
+do registo já recebidas por todos os consumidores de uma tabela são apagadas.
+
+Uso (a partir da raiz do projeto):
+    python -m controllers.exportacao.exportacao_incremental diretorio/ [--consumidor contabilidade]
+"""
+
+import logging
+import os
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from controllers.exportacao.exportacao_csv import escrever_cursor_csv
+from controllers.utils_bd import obter_cursor
+from db.migracoes import TABELAS_INCREMENTAIS
+
+logger = logging.getLogger(__name__)
+
+CONSUMIDOR_PADRAO = "contabilidade"
+# Marca de um consumidor cuja primeira exportação ainda não terminou
+MARCA_PROVISORIA = -1
+# Colunas exportadas por tabela (o id é sempre a primeira)
+COLUNAS_INCREMENTAIS = {
+    "clientes": ("id", "nome", "email", "telefone", "nif", "data_registo"),
+    "reservas": ("id", "id_cliente", "id_veiculo", "data_inicio", "data_fim", "estado", "valor_total"),
+    "pagamentos": ("id", "id_reserva", "id_forma_pagamento", "valor", "data_pagamento"),
+}
+
+
+def _sql_alteracoes(tabela: str) -> str:
+    """Consulta das alterações de uma tabela num intervalo de seq, agrupadas por linha."""
+    colunas = ", ".join(f"t.{coluna}" for coluna in COLUNAS_INCREMENTAIS[tabela][1:])
+    return f"""
+        SELECT CASE WHEN t.id IS NULL THEN 'D' WHEN a.inserida THEN 'I' ELSE 'U' END AS operacao,
+               a.seq, a.id_linha AS id, {colunas}
+        FROM (
+            SELECT id_linha, MAX(seq) AS seq, MAX(operacao = 'I') AS inserida
+            FROM registo_alteracoes
+            WHERE tabela = ? AND seq > ? AND seq <= ?
+            GROUP BY id_linha
+        ) AS a
+        LEFT JOIN {tabela} AS t ON t.id = a.id_linha
+        ORDER BY a.id_linha
+    """
+
+
+def _sql_completa(tabela: str) -> str:
+    """Consulta da tabela inteira, no formato das alterações (todas as linhas como "I")."""
+    return f"SELECT 'I' AS operacao, ? AS seq, {', '.join(COLUNAS_INCREMENTAIS[tabela])} FROM {tabela} ORDER BY id"
+
+
+def obter_marcas(consumidor: str = CONSUMIDOR_PADRAO) -> Dict[str, int]:
+    """
+    Devolve as marcas (último seq exportado) de um consumidor.
+
+    Args:
+        consumidor (str): Nome do consumidor.
+
+    Returns:
+        Dict[str, int]: seq por tabela; as tabelas nunca exportadas não aparecem.
+    """
+    with obter_cursor() as cur:
+        cur.execute("SELECT tabela, seq FROM marcas_exportacao WHERE consumidor = ? AND seq > ?",
+                    (consumidor, MARCA_PROVISORIA))
+        return {linha["tabela"]: linha["seq"] for linha in cur.fetchall()}
+
+
+def _registar_consumidor(consumidor: str, tabelas: Sequence[str]) -> None:
+    """Dá uma marca provisória ao consumidor nas tabelas em que ainda não tem marca (ativa o registo)."""
+    with obter_cursor(commit=True) as cur:
+        cur.executemany(
+            "INSERT OR IGNORE INTO marcas_exportacao (consumidor, tabela, seq) VALUES (?, ?, ?)",
+            [(consumidor, tabela, MARCA_PROVISORIA) for tabela in tabelas],
+        )
+
+
+def _remover_marcas_provisorias(consumidor: str) -> None:
+    """Remove as marcas provisórias de uma primeira exportação que não terminou."""
+    try:
+        with obter_cursor(commit=True) as cur:
+            cur.execute("DELETE FROM marcas_exportacao WHERE consumidor = ? AND seq = ?",
+                        (consumidor, MARCA_PROVISORIA))
+    except Exception:
+        logger.exception("Erro ao remover as marcas provisórias de %s", consumidor)
+
+
+def _guardar_marcas(consumidor: str, tabelas: Sequence[str], seq: int) -> None:
+    """Avança as marcas do consumidor e apaga o registo já recebido por todos os consumidores."""
+    with obter_cursor(commit=True) as cur:
+        cur.executemany(
+            "INSERT INTO marcas_exportacao (consumidor, tabela, seq, exportado_em) "
+            "VALUES (?, ?, ?, datetime('now')) "
+            "ON CONFLICT (consumidor, tabela) DO UPDATE SET seq = excluded.seq, exportado_em = excluded.exportado_em",
+            [(consumidor, tabela, seq) for tabela in tabelas],
+        )
+        cur.executemany(
+            "DELETE FROM registo_alteracoes WHERE tabela = ? "
+            "AND seq <= (SELECT MIN(seq) FROM marcas_exportacao WHERE tabela = ?)",
+            [(tabela, tabela) for tabela in tabelas],
+        )
+
+
+def exportar_alteracoes(diretorio: str, consumidor: str = CONSUMIDOR_PADRAO,
+                        tabelas: Sequence[str] = TABELAS_INCREMENTAIS,
+                        progresso: Optional[Callable[[str, int], None]] = None,
+                        cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Exporta, para um CSV por tabela, as alterações desde a última exportação do consumidor.
+
+    Cada CSV tem as colunas `operacao` (I/U/D), `seq` (última alteração da
+    linha) e as de `COLUNAS_INCREMENTAIS`, e chama-se
+    `<tabela>_<marca anterior>_<nova marca>.csv` (`<tabela>_completa_<nova marca>.csv`
+    na primeira exportação). Tabelas sem alterações não geram ficheiro.
+
+    Args:
+        diretorio (str): Diretório onde escrever os ficheiros (tem de existir).
+        consumidor (str): Nome do consumidor, dono das marcas.
+        tabelas (Sequence[str]): Tabelas a exportar (subconjunto de TABELAS_INCREMENTAIS).
+        progresso (Callable[[str, int], None], opcional): Chamado com o nome e o
+            número de linhas de cada tabela concluída.
+        cancelado (Callable[[], bool], opcional): Consultado entre lotes; se devolver
+            True a exportação é interrompida e as marcas não avançam.
+
+    Returns:
+        Optional[Dict[str, Any]]: {"consumidor", "ate" (nova marca), "tabelas":
+        {tabela: {"de", "ficheiro", "linhas"}}}, com "de" a None na primeira
+        exportação e "ficheiro" a None sem alterações; ou None se a exportação
+        falhar ou for cancelada.
+
+    Exceções:
+        ValueError: Se uma tabela não for suportada.
+    """
+    desconhecidas = [t for t in tabelas if t not in TABELAS_INCREMENTAIS]
+    if desconhecidas or not tabelas:
+        raise ValueError(f"Tabelas não suportadas: {desconhecidas or 'nenhuma indicada'}")
+
+    temporarios: List[str] = []
+    # (temporário, destino) das tabelas com linhas, renomeados só no fim
+    prontos: List[Tuple[str, str]] = []
+    concluida = False
+    try:
+        marcas = obter_marcas(consumidor)
+        _registar_consumidor(consumidor, [t for t in tabelas if t not in marcas])
+        resultado: Dict[str, Any] = {"consumidor": consumidor, "tabelas": {}}
+        with obter_cursor() as cur:
+            cur.row_factory = None
+            # Uma só transação de leitura: a nova marca e as linhas exportadas são do mesmo instante
+            cur.execute("BEGIN")
+            cur.execute("SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'registo_alteracoes'), 0)")
+            ate = cur.fetchone()[0]
+            resultado["ate"] = ate
+
+            for tabela in tabelas:
+                de = marcas.get(tabela)
+                entrada = {"de": de, "ficheiro": None, "linhas": 0}
+                resultado["tabelas"][tabela] = entrada
+                if de is not None and de >= ate:
+                    continue
+                if de is None:
+                    cur.execute(_sql_completa(tabela), (ate,))
+                    nome = f"{tabela}_completa_{ate}.csv"
+                else:
+                    cur.execute(_sql_alteracoes(tabela), (tabela, de, ate))
+                    nome = f"{tabela}_{de}_{ate}.csv"
+
+                descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=".incremental_", suffix=".csv.tmp")
+                temporarios.append(temporario)
+                with os.fdopen(descritor, "w", newline="", encoding="utf-8") as f:
+                    linhas = escrever_cursor_csv(cur, f, ["operacao", "seq", *COLUNAS_INCREMENTAIS[tabela]],
+                                                 cancelado=cancelado)
+                if linhas is None:
+                    logger.info("Exportação incremental para %s cancelada.", consumidor)
+                    return None
+                if linhas:
+                    entrada["ficheiro"], entrada["linhas"] = nome, linhas
+                    prontos.append((temporario, os.path.join(diretorio, nome)))
+                if progresso is not None:
+                    progresso(tabela, linhas)
+            cur.execute("COMMIT")
+
+        for temporario, destino in prontos:
+            os.replace(temporario, destino)
+        _guardar_marcas(consumidor, tabelas, ate)
+        concluida = True
+        logger.info("Exportação incremental para %s até %d: %s", consumidor, ate,
+                    ", ".join(f"{t}={e['linhas']}" for t, e in resultado["tabelas"].items()))
+        return resultado
+    except Exception:
+        logger.exception("Erro na exportação incremental para %s", consumidor)
+        return None
+    finally:
+        for temporario in temporarios:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        if not concluida:
+            _remover_marcas_provisorias(consumidor)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("diretorio", help="Diretório onde escrever os CSV.")
+    parser.add_argument("--consumidor", default=CONSUMIDOR_PADRAO)
+    parser.add_argument("--tabelas", nargs="+", choices=TABELAS_INCREMENTAIS, default=list(TABELAS_INCREMENTAIS))
+    args = parser.parse_args()
+
+    resultado = exportar_alteracoes(args.diretorio, args.consumidor, args.tabelas,
+                                    progresso=lambda tabela, linhas: print(f"{tabela}: {linhas} linhas"))
+    raise SystemExit(0 if resultado is not None else 1)
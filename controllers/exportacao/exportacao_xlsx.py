@@ -0,0 +1,237 @@
+"""
+Motor de exportação de consultas para Excel (XLSX) em memória constante.
+
+Usa o modo write-only do openpyxl: cada linha é serializada para um ficheiro
+temporário assim que é acrescentada, em vez de ficar em memória como um
+objeto `Cell`. As linhas são lidas da base de dados em lotes de `fetchmany`
+(como em `exportacao_csv`), pelo que a memória usada não depende do número
+de linhas exportadas.
+
+Cada coluna tem um tipo (ver `TIPOS`): datas e valores monetários são
+gravados como datas e números do Excel, com o formato adequado, e não como
+texto. As células com formato são reaproveitadas linha a linha (uma por
+coluna), o que evita criar um objeto por célula.
+
+Uma folha do Excel tem no máximo 1 048 576 linhas; as exportações maiores
+continuam em folhas seguintes ("Pagamentos", "Pagamentos (2)", ...), cada
+uma com o seu cabeçalho.
+
+O openpyxl usa automaticamente o lxml, se estiver instalado, o que torna a
+escrita várias vezes mais rápida.
+"""
+
+import logging
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from controllers.exportacao.exportacao_csv import TAMANHO_LOTE
+from controllers.utils_bd import obter_cursor
+
+logger = logging.getLogger(__name__)
+
+# Tipos de coluna e respetivo formato numérico do Excel (None: formato geral)
+TIPOS = {
+    "texto": None,
+    "inteiro": None,
+    "decimal": "0.00",
+    "moeda": '#,##0.00 "€"',
+    "data": "yyyy-mm-dd",
+    "data_hora": "yyyy-mm-dd hh:mm:ss",
+}
+# Largura das colunas por tipo (as de texto usam o tamanho do cabeçalho)
+LARGURAS = {"decimal": 12, "moeda": 14, "data": 12, "data_hora": 20}
+# Linhas de dados por folha (o limite do Excel menos o cabeçalho)
+MAX_LINHAS_FOLHA = 1_048_575
+
+
+def _converter_data(valor: Any) -> Any:
+    """Converte "AAAA-MM-DD[ ...]" numa data; outros valores ficam como estão."""
+    if isinstance(valor, str) and len(valor) >= 10:
+        try:
+            return date.fromisoformat(valor[:10])
+        except ValueError:
+            pass
+    return valor
+
+
+def _converter_data_hora(valor: Any) -> Any:
+    """Converte "AAAA-MM-DD HH:MM:SS" num datetime; outros valores ficam como estão."""
+    if isinstance(valor, str):
+        try:
+            return datetime.fromisoformat(valor)
+        except ValueError:
+            pass
+    return valor
+
+
+def _converter_numero(valor: Any) -> Any:
+    """Converte valores numéricos guardados como texto em float."""
+    if isinstance(valor, str):
+        try:
+            return float(valor)
+        except ValueError:
+            pass
+    return valor
+
+
+CONVERSORES = {
+    "decimal": _converter_numero,
+    "moeda": _converter_numero,
+    "data": _converter_data,
+    "data_hora": _converter_data_hora,
+}
+
+
+class _Folhas:
+    """Cria as folhas à medida que são precisas e escreve as linhas com o tipo de cada coluna."""
+
+    def __init__(self, livro: Workbook, nome: str, cabecalho: Sequence[str], tipos: Sequence[str],
+                 linhas_por_folha: int):
+        self.livro = livro
+        self.nome = nome
+        self.cabecalho = list(cabecalho)
+        self.tipos = list(tipos)
+        self.linhas_por_folha = linhas_por_folha
+        self.folhas = 0
+        self.folha = None
+        self.linhas_na_folha = 0
+        self.celulas: List[Optional[WriteOnlyCell]] = []
+        self.conversores = [CONVERSORES.get(tipo) for tipo in self.tipos]
+
+    def _nova_folha(self) -> None:
+        """Cria a folha seguinte, com larguras, painel fixo e cabeçalho a negrito."""
+        self.folhas += 1
+        nome = self.nome if self.folhas == 1 else f"{self.nome} ({self.folhas})"
+        self.folha = self.livro.create_sheet(nome[:31])
+        self.folha.freeze_panes = "A2"
+        for indice, (titulo, tipo) in enumerate(zip(self.cabecalho, self.tipos), start=1):
+            largura = LARGURAS.get(tipo, min(max(len(str(titulo)) + 2, 10), 40))
+            self.folha.column_dimensions[get_column_letter(indice)].width = largura
+
+        negrito = Font(bold=True)
+        titulos = []
+        for titulo in self.cabecalho:
+            celula = WriteOnlyCell(self.folha, value=titulo)
+            celula.font = negrito
+            titulos.append(celula)
+        self.folha.append(titulos)
+
+        # Uma célula com formato por coluna, reaproveitada em todas as linhas da folha
+        self.celulas = []
+        for tipo in self.tipos:
+            formato = TIPOS[tipo]
+            if formato is None:
+                self.celulas.append(None)
+            else:
+                celula = WriteOnlyCell(self.folha)
+                celula.number_format = formato
+                self.celulas.append(celula)
+        self.linhas_na_folha = 0
+
+    def escrever(self, linhas: Sequence[Sequence[Any]]) -> None:
+        """Acrescenta um lote de linhas, convertendo e formatando cada coluna pelo seu tipo."""
+        for linha in linhas:
+            if self.folha is None or self.linhas_na_folha >= self.linhas_por_folha:
+                self._nova_folha()
+            valores = list(linha)
+            for indice, celula in enumerate(self.celulas):
+                conversor = self.conversores[indice]
+                valor = conversor(valores[indice]) if conversor is not None else valores[indice]
+                if celula is not None:
+                    celula.value = valor
+                    valor = celula
+                valores[indice] = valor
+            self.folha.append(valores)
+            self.linhas_na_folha += 1
+
+
+def exportar_consulta_xlsx(caminho: str, sql: str, parametros: Sequence = (),
+                           cabecalho: Optional[Sequence[str]] = None, tipos: Optional[Sequence[str]] = None,
+                           folha: str = "Dados", tamanho_lote: int = TAMANHO_LOTE,
+                           progresso: Optional[Callable[[int], None]] = None,
+                           cancelado: Optional[Callable[[], bool]] = None,
+                           linhas_por_folha: int = MAX_LINHAS_FOLHA) -> Optional[int]:
+    """
+    Executa uma consulta e escreve o resultado num ficheiro XLSX, lote a lote.
+
+    Args:
+        caminho (str): Ficheiro XLSX de destino.
+        sql (str): Consulta SELECT a exportar.
+        parametros (Sequence, opcional): Parâmetros da consulta.
+        cabecalho (Sequence[str], opcional): Títulos das colunas. Por defeito,
+            os nomes das colunas da consulta.
+        tipos (Sequence[str], opcional): Tipo de cada coluna (chaves de `TIPOS`).
+            Por defeito, todas "texto" (valores gravados como vêm da base de dados).
+        folha (str): Nome da (primeira) folha.
+        tamanho_lote (int): Linhas por `fetchmany`.
+        progresso (Callable[[int], None], opcional): Chamado depois de cada
+            lote com o total de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Consultado antes de cada
+            lote; se devolver True a exportação é interrompida e o destino
+            não é alterado.
+        linhas_por_folha (int): Linhas de dados por folha antes de começar outra.
+
+    Returns:
+        Optional[int]: Número de linhas exportadas (0 se a consulta não devolver
+        linhas; nesse caso o ficheiro não é criado), ou None se a exportação
+        falhar (incluindo um número de tipos diferente do de colunas) ou for cancelada.
+
+    Exceções:
+        ValueError: Se um tipo de coluna for desconhecido.
+    """
+    if tamanho_lote <= 0 or linhas_por_folha <= 0:
+        raise ValueError("tamanho_lote e linhas_por_folha devem ser maiores que zero")
+    desconhecidos = [tipo for tipo in tipos or () if tipo not in TIPOS]
+    if desconhecidos:
+        raise ValueError(f"Tipos de coluna desconhecidos: {desconhecidos}")
+
+    temporario = None
+    escritas = 0
+    try:
+        with obter_cursor() as cur:
+            cur.row_factory = None
+            cur.execute(sql, tuple(parametros))
+            colunas = [d[0] for d in cur.description]
+            tipos_colunas = list(tipos) if tipos is not None else ["texto"] * len(colunas)
+            if len(tipos_colunas) != len(colunas):
+                logger.error("Exportação para %s: %d colunas mas %d tipos.", caminho, len(colunas), len(tipos_colunas))
+                return None
+
+            livro = Workbook(write_only=True)
+            folhas = _Folhas(livro, folha, cabecalho if cabecalho is not None else colunas,
+                             tipos_colunas, linhas_por_folha)
+            while True:
+                if cancelado is not None and cancelado():
+                    logger.info("Exportação para %s cancelada após %d linhas.", caminho, escritas)
+                    return None
+                lote = cur.fetchmany(tamanho_lote)
+                if not lote:
+                    break
+                folhas.escrever(lote)
+                escritas += len(lote)
+                if progresso is not None:
+                    progresso(escritas)
+
+        if escritas == 0:
+            return 0
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(caminho)),
+                                                 prefix=".exportacao_", suffix=".xlsx.tmp")
+        os.close(descritor)
+        livro.save(temporario)
+        os.replace(temporario, caminho)
+        temporario = None
+        logger.info("%d linhas exportadas para %s", escritas, caminho)
+        return escritas
+    except Exception:
+        logger.exception("Erro ao exportar para %s", caminho)
+        return None
+    finally:
+        if temporario is not None and os.path.exists(temporario):
+            os.remove(temporario)
@@ -6,8 +6,10 @@ Responsável por operações CRUD (Create, Read, Update, Delete) na tabela
 """
 
 import logging
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict
 from controllers.utils_bd import obter_cursor
+from controllers.exportacao.exportacao_csv import exportar_consulta_csv
+from controllers.exportacao.exportacao_xlsx import exportar_consulta_xlsx
 
 logger = logging.getLogger(__name__)
 
@@ -141,3 +143,38 @@ def buscar_forma_pagamento_por_id(id_pagamento: int) -> Optional[Dict]:
     except Exception:
         logger.exception("Erro ao buscar forma de pagamento por ID")
         return None
+
+
+def exportar_formas_pagamento_csv_bd(caminho: str, progresso: Optional[Callable[[int], None]] = None,
+                                     cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Exporta as formas de pagamento para um ficheiro CSV em lotes.
+
+    Args:
+        caminho (str): Ficheiro CSV de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        Optional[int]: Número de formas exportadas, ou None em caso de erro ou cancelamento.
+    """
+    return exportar_consulta_csv(caminho, "SELECT id, metodo FROM FormasPagamento", cabecalho=["ID", "Nome"],
+                                 progresso=progresso, cancelado=cancelado)
+
+
+def exportar_formas_pagamento_xlsx_bd(caminho: str, progresso: Optional[Callable[[int], None]] = None,
+                                      cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Exporta as formas de pagamento para um ficheiro Excel em lotes.
+
+    Args:
+        caminho (str): Ficheiro XLSX de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        Optional[int]: Número de formas exportadas, ou None em caso de erro ou cancelamento.
+    """
+    return exportar_consulta_xlsx(caminho, "SELECT id, metodo FROM FormasPagamento", cabecalho=["ID", "Nome"],
+                                  tipos=["inteiro", "texto"], folha="Formas de Pagamento",
+                                  progresso=progresso, cancelado=cancelado)
@@ -4,12 +4,11 @@ Módulo de controle para Formas de Pagamento.
 Responsável por:
 - Inicialização da tabela na base de dados
 - Operações CRUD com validação
-- Exportação de dados para CSV
+- Exportação de dados para CSV e Excel
 """
 
 import logging
-import csv
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from controllers.formas_pagamento.formas_pag_validacao import nome_forma_pagamento_valido
 from controllers.formas_pagamento.formas_pag_repositorio import (
     criar_tabela_formas_pagamento,
@@ -17,7 +16,9 @@ from controllers.formas_pagamento.formas_pag_repositorio import (
     listar_formas_pagamento_bd,
     atualizar_forma_pagamento_bd,
     remover_forma_pagamento_bd,
-    buscar_forma_pagamento_por_id
+    buscar_forma_pagamento_por_id,
+    exportar_formas_pagamento_csv_bd,
+    exportar_formas_pagamento_xlsx_bd
 )
 
 logger = logging.getLogger(__name__)
@@ -109,27 +110,43 @@ def buscar_forma_pagamento(id_pagamento: int) -> Dict:
     return buscar_forma_pagamento_por_id(id_pagamento)
 
 
-def exportar_formas_pagamento_para_csv(nome_arquivo: str = "formas_pagamento_export.csv") -> bool:
+def exportar_formas_pagamento_para_csv(nome_arquivo: str = "formas_pagamento_export.csv",
+                                       progresso: Optional[Callable[[int], None]] = None,
+                                       cancelado: Optional[Callable[[], bool]] = None) -> bool:
     """
-    Exporta as formas de pagamento para um ficheiro CSV.
+    Exporta as formas de pagamento para um ficheiro CSV, em lotes (memória constante).
 
     Args:
         nome_arquivo (str, opcional): Nome do arquivo destino.
         Default = "formas_pagamento_export.csv".
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
 
     Returns:
         bool: True se exportado com sucesso, False caso contrário.
     """
-    formas = obter_formas_pagamento()
-    if not formas:
+    linhas = exportar_formas_pagamento_csv_bd(nome_arquivo, progresso, cancelado)
+    if linhas == 0:
         logger.warning("Nenhuma forma de pagamento para exportar.")
-        return False
-    try:
-        with open(nome_arquivo, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "Nome"])
-            writer.writerows(formas)
-        return True
-    except Exception:
-        logger.exception("Erro ao exportar formas de pagamento")
-        return False
+    return bool(linhas)
+
+
+def exportar_formas_pagamento_para_xlsx(nome_arquivo: str = "formas_pagamento_export.xlsx",
+                                        progresso: Optional[Callable[[int], None]] = None,
+                                        cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta as formas de pagamento para um ficheiro Excel, em lotes (memória constante).
+
+    Args:
+        nome_arquivo (str, opcional): Nome do arquivo destino.
+        Default = "formas_pagamento_export.xlsx".
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        bool: True se exportado com sucesso, False caso contrário.
+    """
+    linhas = exportar_formas_pagamento_xlsx_bd(nome_arquivo, progresso, cancelado)
+    if linhas == 0:
+        logger.warning("Nenhuma forma de pagamento para exportar.")
+    return bool(linhas)
@@ -0,0 +1,230 @@
+"""
+Motor de importação de ficheiros CSV em lotes.
+
+Até aqui os dados só entravam pelos formulários, uma linha (e uma transação)
+de cada vez. `importar_csv` lê o ficheiro linha a linha, valida cada linha
+com a função `preparar` da camada de serviço (que usa os validadores de cada
+entidade) e grava as linhas válidas em lotes: um `executemany` por lote,
+numa transação por lote. A memória usada depende do tamanho do lote e não do
+tamanho do ficheiro.
+
+Durante o `executemany` os triggers da tabela (contadores do dashboard,
+agregados mensais, versões e registo de alterações) ficam suspensos, dentro
+da transação do lote; no fim do lote o seu efeito é aplicado de uma vez a
+todas as linhas inseridas (ver `db.migracoes.repor_triggers`). Só as
+guardas de unicidade (trg_idx_*) continuam ativas linha a linha.
+
+Cada linha rejeitada fica no relatório com o número da linha no ficheiro e o
+motivo:
+    - pela validação (`preparar`);
+    - pelas verificações que precisam da base de dados (`verificar`, ex.:
+      cliente inexistente ou veículo já reservado no período);
+    - pela própria base de dados (ex.: NIF ou matrícula repetidos): quando o
+      `executemany` de um lote falha, o lote é desfeito e repetido linha a
+      linha, para rejeitar só as linhas em causa.
+
+Os lotes já gravados ficam gravados: uma importação cancelada (ou que pare
+num erro inesperado) pode ser retomada com o mesmo ficheiro, sendo as linhas
+já importadas rejeitadas como repetidas quando a tabela tem chaves únicas.
+
+Uso (nos repositórios, com o SQL como literal para a auditoria de planos):
+    resultado = importar_csv(caminho, "INSERT INTO FormasPagamento (metodo) VALUES (?)",
+                             ["metodo"], preparar, caminho_rejeicoes="rejeicoes.csv")
+"""
+
+import csv
+import logging
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from controllers.utils_bd import obter_cursor
+from db.migracoes import repor_triggers, suspender_triggers
+
+logger = logging.getLogger(__name__)
+
+# Linhas validadas e gravadas de cada vez (uma transação por lote)
+TAMANHO_LOTE = 5000
+# Rejeições devolvidas no resultado (o relatório em ficheiro tem todas)
+MAX_REJEICOES_RESULTADO = 1000
+# Triggers que continuam ativos durante a gravação de um lote (guardas de unicidade)
+TRIGGERS_MANTIDOS = ("trg_idx_",)
+
+# Recebe a linha do CSV (coluna -> texto) e devolve os valores a inserir, ou None e o motivo
+Preparar = Callable[[Dict[str, str]], Tuple[Optional[tuple], str]]
+# Recebe o cursor (dentro da transação do lote) e os valores do lote; devolve um motivo por linha ("" se aceite)
+Verificar = Callable[[Any, List[tuple]], List[str]]
+
+
+class _Rejeicoes:
+    """Conta as rejeições, guarda as primeiras e escreve todas no relatório (criado só se preciso)."""
+
+    def __init__(self, caminho: Optional[str], cabecalho: Sequence[str]):
+        self.caminho = caminho
+        self.cabecalho = list(cabecalho)
+        self.total = 0
+        self.primeiras: List[Dict[str, Any]] = []
+        self._ficheiro = None
+        self._escritor = None
+
+    def registar(self, numero: int, motivo: str, campos: Sequence[str]) -> None:
+        self.total += 1
+        if len(self.primeiras) < MAX_REJEICOES_RESULTADO:
+            self.primeiras.append({"linha": numero, "motivo": motivo})
+        if self.caminho is None:
+            return
+        if self._escritor is None:
+            self._ficheiro = open(self.caminho, "w", newline="", encoding="utf-8")
+            self._escritor = csv.writer(self._ficheiro)
+            self._escritor.writerow(["linha", "motivo", *self.cabecalho])
+        self._escritor.writerow([numero, motivo, *campos])
+
+    def fechar(self) -> None:
+        if self._ficheiro is not None:
+            self._ficheiro.close()
+
+
+def _gravar_lote(cur, tabela: str, sql: str, lote: List[Tuple[int, tuple, List[str]]],
+                 verificar: Optional[Verificar], rejeicoes: _Rejeicoes) -> int:
+    """
+    Grava um lote numa transação e devolve o número de linhas inseridas.
+
+    Args:
+        cur: Cursor da importação.
+        tabela (str): Tabela do INSERT.
+        sql (str): INSERT com um parâmetro por valor.
+        lote: (número da linha, valores, campos originais) das linhas válidas.
+        verificar (Verificar, opcional): Verificações na base de dados.
+        rejeicoes (_Rejeicoes): Onde registar as linhas rejeitadas.
+    """
+    # IMMEDIATE: o bloqueio de escrita é obtido já, antes das verificações
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        if verificar is not None:
+            motivos = verificar(cur, [valores for _, valores, _ in lote])
+            aceites = []
+            for item, motivo in zip(lote, motivos):
+                if motivo:
+                    rejeicoes.registar(item[0], motivo, item[2])
+                else:
+                    aceites.append(item)
+        else:
+            aceites = lote
+
+        anterior = cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]
+        triggers = suspender_triggers(cur, tabela, manter=TRIGGERS_MANTIDOS)
+        cur.execute("SAVEPOINT lote")
+        try:
+            cur.executemany(sql, [valores for _, valores, _ in aceites])
+            cur.execute("RELEASE lote")
+            inseridas = len(aceites)
+        except sqlite3.IntegrityError:
+            # As linhas anteriores à que falhou já foram inseridas: desfaz o lote e repete linha a linha
+            cur.execute("ROLLBACK TO lote")
+            cur.execute("RELEASE lote")
+            inseridas = 0
+            for numero, valores, campos in aceites:
+                try:
+                    cur.execute(sql, valores)
+                    inseridas += 1
+                except sqlite3.IntegrityError as erro:
+                    rejeicoes.registar(numero, f"Rejeitada pela base de dados: {erro}", campos)
+        # Os ids AUTOINCREMENT só crescem: as linhas do lote são as de id acima do máximo anterior
+        ultimo = cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]
+        repor_triggers(cur, tabela, triggers, anterior + 1, ultimo)
+        cur.execute("COMMIT")
+        return inseridas
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+
+
+def _concluir_lote(cur, tabela: str, sql: str, lote: List[Tuple[int, tuple, List[str]]],
+                   verificar: Optional[Verificar], rejeicoes: _Rejeicoes, resultado: Dict[str, Any], lidas: int,
+                   progresso: Optional[Callable[[int], None]]) -> None:
+    """Grava um lote e atualiza as contagens do resultado."""
+    resultado["inseridas"] += _gravar_lote(cur, tabela, sql, lote, verificar, rejeicoes)
+    resultado["lidas"] += lidas
+    if progresso is not None:
+        progresso(resultado["lidas"])
+
+
+def importar_csv(caminho: str, sql: str, obrigatorias: Sequence[str], preparar: Preparar,
+                 verificar: Optional[Verificar] = None, tamanho_lote: int = TAMANHO_LOTE,
+                 caminho_rejeicoes: Optional[str] = None, progresso: Optional[Callable[[int], None]] = None,
+                 cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa um ficheiro CSV para uma tabela, em lotes, com relatório de rejeições por linha.
+
+    O cabeçalho do CSV é comparado sem distinção de maiúsculas e espaços;
+    colunas a mais são ignoradas.
+
+    Args:
+        caminho (str): Ficheiro CSV (UTF-8, com ou sem BOM).
+        sql (str): INSERT com um parâmetro por valor devolvido por `preparar`.
+        obrigatorias (Sequence[str]): Colunas que o cabeçalho tem de ter.
+        preparar (Preparar): Valida e converte uma linha.
+        verificar (Verificar, opcional): Verificações de cada lote na base de dados.
+        tamanho_lote (int): Linhas lidas por lote (e por transação).
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas
+            (número da linha, motivo e campos originais); só é criado se houver rejeições.
+            Em cada lote, as linhas rejeitadas na validação aparecem antes das
+            rejeitadas na base de dados.
+        progresso (Callable[[int], None], opcional): Chamado depois de cada lote
+            com o total de linhas já lidas.
+        cancelado (Callable[[], bool], opcional): Consultado antes de cada lote;
+            se devolver True a importação para (os lotes anteriores ficam gravados).
+
+    Returns:
+        Optional[Dict[str, Any]]: {"lidas", "inseridas", "rejeitadas", "rejeicoes"
+        (as primeiras MAX_REJEICOES_RESULTADO, com "linha" e "motivo"), "cancelada"},
+        ou None se o ficheiro não puder ser lido, faltarem colunas ou ocorrer um erro.
+    """
+    if tamanho_lote <= 0:
+        raise ValueError("tamanho_lote deve ser maior que zero")
+
+    # INSERT INTO <tabela> ...: os triggers e as tabelas derivadas usam o nome em minúsculas
+    tabela = sql.split()[2].lower()
+    resultado: Dict[str, Any] = {"lidas": 0, "inseridas": 0, "rejeitadas": 0, "rejeicoes": [], "cancelada": False}
+    rejeicoes = None
+    try:
+        with open(caminho, newline="", encoding="utf-8-sig") as f, obter_cursor() as cur:
+            leitor = csv.reader(f)
+            cabecalho = [coluna.strip().lower() for coluna in next(leitor, [])]
+            em_falta = [coluna for coluna in obrigatorias if coluna not in cabecalho]
+            if em_falta:
+                logger.error("Importação de %s: faltam as colunas %s.", caminho, em_falta)
+                return None
+
+            rejeicoes = _Rejeicoes(caminho_rejeicoes, cabecalho)
+            lote: List[Tuple[int, tuple, List[str]]] = []
+            lidas_lote = 0
+            for campos in leitor:
+                if not campos:
+                    continue
+                if lidas_lote == 0 and cancelado is not None and cancelado():
+                    resultado["cancelada"] = True
+                    break
+                lidas_lote += 1
+                valores, motivo = preparar(dict(zip(cabecalho, campos)))
+                if valores is None:
+                    rejeicoes.registar(leitor.line_num, motivo, campos)
+                else:
+                    lote.append((leitor.line_num, valores, campos))
+                if lidas_lote == tamanho_lote:
+                    _concluir_lote(cur, tabela, sql, lote, verificar, rejeicoes, resultado, lidas_lote, progresso)
+                    lote, lidas_lote = [], 0
+            if lidas_lote:
+                _concluir_lote(cur, tabela, sql, lote, verificar, rejeicoes, resultado, lidas_lote, progresso)
+
+        resultado["rejeitadas"] = rejeicoes.total
+        resultado["rejeicoes"] = rejeicoes.primeiras
+        logger.info("Importação de %s: %d linhas lidas, %d inseridas, %d rejeitadas%s.", caminho,
+                    resultado["lidas"], resultado["inseridas"], resultado["rejeitadas"],
+                    " (cancelada)" if resultado["cancelada"] else "")
+        return resultado
+    except Exception:
+        logger.exception("Erro ao importar %s", caminho)
+        return None
+    finally:
+        if rejeicoes is not None:
+            rejeicoes.fechar()
@@ -0,0 +1,289 @@
+"""
+Instrumentação de latência das consultas SQL.
+
+Quando ativa, `obter_cursor` devolve um cursor instrumentado que mede o
+tempo de cada execute/fetch e acumula um histograma de latências por
+instrução SQL normalizada (literais substituídos por '?'). As instruções
+acima de um limiar são registadas no log de consultas lentas, com os
+parâmetros e o resultado de `EXPLAIN QUERY PLAN`.
+
+Com a instrumentação desativada (padrão) o único custo em `obter_cursor`
+é a verificação de uma variável do módulo.
+
+Funções principais:
+- configurar_instrumentacao: ativa/desativa e define o limiar de consultas lentas.
+- relatorio_latencias: devolve p50/p95/p99 por instrução.
+- formatar_relatorio_latencias: devolve o relatório em texto.
+- limpar_metricas: descarta os histogramas acumulados.
+
+Variáveis de ambiente:
+- LUXURY_WHEELS_INSTRUMENTAR_BD=1 ativa a instrumentação no arranque.
+- LUXURY_WHEELS_LIMIAR_LENTA_MS define o limiar (padrão 100 ms).
+"""
+
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from itertools import chain
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+logger_lentas = logging.getLogger(__name__ + ".lentas")
+
+ativa: bool = os.environ.get("LUXURY_WHEELS_INSTRUMENTAR_BD") == "1"
+limiar_lenta_s: float = float(os.environ.get("LUXURY_WHEELS_LIMIAR_LENTA_MS", "100")) / 1000
+
+_histogramas: Dict[str, "HistogramaLatencia"] = {}
+_trinco = threading.Lock()
+
+_PADRAO_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_PADRAO_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PADRAO_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_PADRAO_ESPACOS = re.compile(r"\s+")
+
+
+class HistogramaLatencia:
+    """
+    Histograma de latências com baldes em escala logarítmica.
+
+    Cada balde é 10% mais largo que o anterior (a partir de 1 µs), pelo que
+    os percentis têm um erro relativo máximo de 10% com memória constante.
+    """
+
+    BASE = 1.1
+
+    def __init__(self):
+        self.baldes: Dict[int, int] = {}
+        self.total = 0
+        self.soma_s = 0.0
+        self.maximo_s = 0.0
+
+    def registar(self, segundos: float) -> None:
+        """
+        Acrescenta uma medição ao histograma.
+
+        Args:
+            segundos (float): Latência medida.
+        """
+        micros = segundos * 1e6
+        indice = math.ceil(math.log(micros, self.BASE)) if micros > 1 else 0
+        self.baldes[indice] = self.baldes.get(indice, 0) + 1
+        self.total += 1
+        self.soma_s += segundos
+        self.maximo_s = max(self.maximo_s, segundos)
+
+    def percentil(self, p: float) -> float:
+        """
+        Estima um percentil da latência.
+
+        Args:
+            p (float): Percentil entre 0 e 100.
+
+        Returns:
+            float: Latência estimada em segundos (0.0 sem medições).
+        """
+        if not self.total:
+            return 0.0
+        alvo = max(1, math.ceil(self.total * p / 100))
+        acumulado = 0
+        for indice in sorted(self.baldes):
+            acumulado += self.baldes[indice]
+            if acumulado >= alvo:
+                return min(self.BASE ** indice / 1e6, self.maximo_s)
+        return self.maximo_s
+
+
+def normalizar_sql(sql: str) -> str:
+    """
+    Normaliza uma instrução SQL para agrupar execuções equivalentes.
+
+    Substitui literais de texto e números por '?', reduz listas `(?, ?, ...)`
+    a `(?...)` e colapsa espaços em branco.
+
+    Args:
+        sql (str): Instrução SQL original.
+
+    Returns:
+        str: Instrução normalizada.
+    """
+    sql = _PADRAO_TEXTO.sub("?", sql)
+    sql = _PADRAO_NUMERO.sub("?", sql)
+    sql = _PADRAO_LISTA.sub("(?...)", sql)
+    return _PADRAO_ESPACOS.sub(" ", sql).strip().rstrip(";")
+
+
+def configurar_instrumentacao(ativar: bool = True, limiar_ms: Optional[float] = None) -> None:
+    """
+    Ativa ou desativa a instrumentação das consultas.
+
+    Args:
+        ativar (bool): True para medir as consultas feitas via `obter_cursor`.
+        limiar_ms (float, opcional): Latência a partir da qual uma consulta é
+            registada como lenta.
+    """
+    global ativa, limiar_lenta_s
+    ativa = ativar
+    if limiar_ms is not None:
+        limiar_lenta_s = limiar_ms / 1000
+
+
+def limpar_metricas() -> None:
+    """Descarta todos os histogramas acumulados."""
+    with _trinco:
+        _histogramas.clear()
+
+
+def _registar(sql: str, segundos: float) -> None:
+    """Acrescenta uma medição ao histograma da instrução normalizada."""
+    chave = normalizar_sql(sql)
+    with _trinco:
+        histograma = _histogramas.get(chave)
+        if histograma is None:
+            histograma = _histogramas[chave] = HistogramaLatencia()
+        histograma.registar(segundos)
+
+
+def _registar_lenta(conexao: sqlite3.Connection, sql: str, parametros: Any, segundos: float) -> None:
+    """Escreve uma consulta lenta no log, com o respetivo plano de execução."""
+    try:
+        plano = [linha[3] for linha in conexao.execute("EXPLAIN QUERY PLAN " + sql, parametros or ())]
+    except sqlite3.Error as erro:
+        plano = [f"(plano indisponível: {erro})"]
+    logger_lentas.warning(
+        "Consulta lenta (%.1f ms): %s | parâmetros=%r | plano=%s",
+        segundos * 1000, normalizar_sql(sql), parametros, "; ".join(plano)
+    )
+
+
+class CursorInstrumentado:
+    """
+    Envolve um sqlite3.Cursor e mede o tempo de execute/fetch por instrução.
+
+    O tempo de uma instrução é a soma do execute com os fetch seguintes e é
+    registado quando é executada outra instrução ou quando o cursor é fechado.
+    Os restantes atributos (description, rowcount, lastrowid...) são delegados
+    no cursor original.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor a instrumentar.
+    """
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+        self._sql: Optional[str] = None
+        self._parametros: Any = None
+        self._decorrido = 0.0
+
+    def _concluir(self) -> None:
+        """Regista a instrução corrente (se existir) no histograma."""
+        if self._sql is None:
+            return
+        _registar(self._sql, self._decorrido)
+        if self._decorrido >= limiar_lenta_s:
+            _registar_lenta(self._cursor.connection, self._sql, self._parametros, self._decorrido)
+        self._sql = None
+
+    def _medir(self, metodo, *args):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args)
+        finally:
+            self._decorrido += time.perf_counter() - inicio
+
+    def execute(self, sql: str, parametros: Any = ()):
+        self._concluir()
+        self._sql, self._parametros, self._decorrido = sql, parametros, 0.0
+        self._medir(self._cursor.execute, sql, parametros)
+        return self
+
+    def executemany(self, sql: str, sequencia_parametros):
+        self._concluir()
+        # Só o primeiro conjunto de parâmetros é lido à parte (para o registo das
+        # lentas); o resto segue como iterador, sem materializar cargas em massa
+        iterador = iter(sequencia_parametros)
+        primeiro = next(iterador, None)
+        self._sql, self._parametros, self._decorrido = sql, primeiro or (), 0.0
+        restantes = iterador if primeiro is None else chain((primeiro,), iterador)
+        self._medir(self._cursor.executemany, sql, restantes)
+        return self
+
+    def fetchone(self):
+        return self._medir(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._medir(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._medir(self._cursor.fetchall)
+
+    def close(self) -> None:
+        self._concluir()
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    @property
+    def row_factory(self):
+        return self._cursor.row_factory
+
+    @row_factory.setter
+    def row_factory(self, valor) -> None:
+        # Atribuído no cursor original (ex.: tuplos simples nas exportações)
+        self._cursor.row_factory = valor
+
+    def __getattr__(self, nome: str):
+        return getattr(self._cursor, nome)
+
+
+def relatorio_latencias() -> List[Dict[str, Any]]:
+    """
+    Devolve as estatísticas de latência por instrução normalizada.
+
+    Returns:
+        List[Dict[str, Any]]: Uma entrada por instrução, ordenada pelo tempo
+        total acumulado, com as chaves sql, chamadas, total_ms, p50_ms, p95_ms,
+        p99_ms e max_ms.
+    """
+    with _trinco:
+        itens = list(_histogramas.items())
+    relatorio = [
+        {
+            "sql": sql,
+            "chamadas": h.total,
+            "total_ms": h.soma_s * 1000,
+            "p50_ms": h.percentil(50) * 1000,
+            "p95_ms": h.percentil(95) * 1000,
+            "p99_ms": h.percentil(99) * 1000,
+            "max_ms": h.maximo_s * 1000,
+        }
+        for sql, h in itens
+    ]
+    relatorio.sort(key=lambda linha: linha["total_ms"], reverse=True)
+    return relatorio
+
+
+def formatar_relatorio_latencias(largura_sql: int = 70) -> str:
+    """
+    Devolve o relatório de latências formatado como tabela de texto.
+
+    Args:
+        largura_sql (int): Número máximo de caracteres da instrução SQL por linha.
+
+    Returns:
+        str: Tabela com chamadas, total, p50, p95, p99 e máximo (em ms).
+    """
+    linhas = [
+        f"{'chamadas':>9} {'total':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  sql"
+    ]
+    for item in relatorio_latencias():
+        linhas.append(
+            f"{item['chamadas']:>9} {item['total_ms']:>10.2f} {item['p50_ms']:>8.3f} "
+            f"{item['p95_ms']:>8.3f} {item['p99_ms']:>8.3f} {item['max_ms']:>8.3f}  "
+            f"{item['sql'][:largura_sql]}"
+        )
+    return "\n".join(linhas)
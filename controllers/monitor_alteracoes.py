@@ -0,0 +1,255 @@
+"""
+Monitor de alterações da base de dados.
+
+Notifica as janelas quando as tabelas que mostram são alteradas, para que
+recarreguem os dados só quando é preciso (em vez de o fazerem num
+temporizador ou apenas após ações explícitas).
+
+A deteção tem dois níveis:
+    - `PRAGMA data_version` muda sempre que outra conexão confirma uma
+      escrita na base de dados; enquanto não mudar, cada verificação custa
+      apenas este PRAGMA (não lê nenhuma tabela);
+    - quando muda, lê a tabela `alteracoes_tabelas` (um contador por tabela,
+      mantido por triggers — ver migração 8) e publica, para cada tabela
+      alterada, a versão anterior e a nova aos subscritores interessados.
+
+O monitor usa uma conexão própria (nunca a do pool), porque
+`data_version` só reflete as escritas feitas por outras conexões.
+
+Uso numa janela Tkinter:
+    obter_monitor().acompanhar(self, ["reservas"], lambda alteracoes: self._carregar_lista())
+"""
+
+import logging
+import sqlite3
+import threading
+from itertools import count
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from db.conexao import conectar_base_dados
+from controllers.utils_bd import obter_pool
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre verificações quando o monitor é agendado numa janela Tkinter
+INTERVALO_PADRAO_MS = 1000
+
+# {tabela: (versao_anterior, versao_nova)}
+Alteracoes = Dict[str, Tuple[int, int]]
+
+
+class MonitorAlteracoes:
+    """
+    Deteta escritas na base de dados e publica as tabelas alteradas aos subscritores.
+
+    Args:
+        caminho (str, opcional): Ficheiro da base de dados. Por defeito segue o
+            pool ativo (`obter_pool().caminho`), voltando a ligar-se se o pool mudar.
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self._conexao: Optional[sqlite3.Connection] = None
+        self._caminho_ligado: Optional[str] = None
+        self._data_version: Optional[int] = None
+        self._versoes: Dict[str, int] = {}
+        self._subscricoes: Dict[int, Tuple[FrozenSet[str], Callable[[Alteracoes], None]]] = {}
+        self._ids = count(1)
+        self._agendado = None
+        self._trinco = threading.Lock()
+
+    # -------------------- Subscrições --------------------
+
+    def subscrever(self, tabelas: Iterable[str], callback: Callable[[Alteracoes], None]) -> int:
+        """
+        Regista um callback chamado quando alguma das tabelas for alterada.
+
+        O callback recebe um dicionário {tabela: (versao_anterior, versao_nova)}
+        só com as tabelas subscritas que mudaram, e é chamado no máximo uma
+        vez por verificação.
+
+        Args:
+            tabelas (Iterable[str]): Nomes das tabelas a acompanhar.
+            callback (Callable): Função a chamar com as alterações.
+
+        Returns:
+            int: Identificador da subscrição (para `cancelar`).
+        """
+        with self._trinco:
+            identificador = next(self._ids)
+            self._subscricoes[identificador] = (frozenset(t.lower() for t in tabelas), callback)
+        return identificador
+
+    def cancelar(self, identificador: int) -> None:
+        """
+        Remove uma subscrição. Ignora identificadores desconhecidos.
+
+        Args:
+            identificador (int): Valor devolvido por `subscrever`.
+        """
+        with self._trinco:
+            self._subscricoes.pop(identificador, None)
+
+    def versao(self, tabela: str) -> int:
+        """
+        Retorna a última versão conhecida de uma tabela (0 se nunca foi lida).
+
+        Args:
+            tabela (str): Nome da tabela.
+
+        Returns:
+            int: Versão lida na última verificação.
+        """
+        return self._versoes.get(tabela.lower(), 0)
+
+    # -------------------- Verificação --------------------
+
+    def _ligar(self) -> sqlite3.Connection:
+        """Devolve a conexão do monitor, abrindo-a (ou reabrindo-a se o pool mudou de base de dados)."""
+        pool = obter_pool()
+        caminho = self.caminho or pool.caminho
+        if self._conexao is not None and self._caminho_ligado == caminho:
+            return self._conexao
+
+        self.fechar()
+        if self.caminho is None:
+            # A primeira conexão do pool aplica as migrações (cria alteracoes_tabelas)
+            pool.devolver(pool.obter())
+        self._conexao = conectar_base_dados(caminho)
+        self._caminho_ligado = caminho
+        return self._conexao
+
+    def _ler_versoes(self, conexao: sqlite3.Connection) -> Dict[str, int]:
+        """Lê o contador de alterações de todas as tabelas monitorizadas."""
+        return dict(conexao.execute("SELECT tabela, versao FROM alteracoes_tabelas").fetchall())
+
+    def verificar(self) -> Alteracoes:
+        """
+        Verifica se houve escritas desde a última chamada e notifica os subscritores.
+
+        A primeira chamada apenas regista as versões atuais (não publica nada).
+
+        Returns:
+            Dict[str, Tuple[int, int]]: Tabelas alteradas e respetivas versões
+            (anterior, nova). Vazio se nada mudou ou em caso de erro.
+        """
+        try:
+            conexao = self._ligar()
+            data_version = conexao.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return {}
+            versoes = self._ler_versoes(conexao)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao verificar alterações na base de dados: {e}")
+            self.fechar()
+            return {}
+
+        primeira = self._data_version is None
+        self._data_version = data_version
+        alteracoes = {
+            tabela: (self._versoes.get(tabela, 0), versao)
+            for tabela, versao in versoes.items()
+            if versao != self._versoes.get(tabela, 0)
+        }
+        self._versoes = versoes
+        if primeira or not alteracoes:
+            return {}
+
+        self._publicar(alteracoes)
+        return alteracoes
+
+    def _publicar(self, alteracoes: Alteracoes) -> None:
+        """Chama cada subscritor com as alterações das tabelas que acompanha."""
+        with self._trinco:
+            subscricoes = list(self._subscricoes.values())
+        for tabelas, callback in subscricoes:
+            relevantes = {t: v for t, v in alteracoes.items() if t in tabelas}
+            if not relevantes:
+                continue
+            try:
+                callback(relevantes)
+            except Exception:
+                logger.exception("Erro num subscritor do monitor de alterações.")
+
+    def fechar(self) -> None:
+        """Fecha a conexão do monitor (é reaberta na próxima verificação)."""
+        if self._conexao is not None:
+            self._conexao.close()
+        self._conexao = None
+        self._caminho_ligado = None
+        self._data_version = None
+
+    # -------------------- Integração com Tkinter --------------------
+
+    def acompanhar(self, widget, tabelas: Iterable[str], callback: Callable[[Alteracoes], None],
+                   intervalo_ms: int = INTERVALO_PADRAO_MS) -> int:
+        """
+        Subscreve as tabelas enquanto o widget existir e garante que o monitor está agendado.
+
+        A subscrição é cancelada automaticamente quando o widget é destruído.
+        Os callbacks correm na thread do Tkinter (via `after`).
+
+        Args:
+            widget: Widget Tkinter dono da subscrição (normalmente a janela).
+            tabelas (Iterable[str]): Tabelas mostradas pelo widget.
+            callback (Callable): Função a chamar com as alterações.
+            intervalo_ms (int): Intervalo entre verificações.
+
+        Returns:
+            int: Identificador da subscrição.
+        """
+        identificador = self.subscrever(tabelas, callback)
+
+        def _ao_destruir(evento):
+            if evento.widget is widget:
+                self.cancelar(identificador)
+
+        widget.bind("<Destroy>", _ao_destruir, add="+")
+        self.agendar(widget._root(), intervalo_ms)
+        return identificador
+
+    def agendar(self, raiz, intervalo_ms: int = INTERVALO_PADRAO_MS) -> None:
+        """
+        Verifica alterações periodicamente no ciclo de eventos do Tkinter.
+
+        O agendamento para sozinho quando deixa de haver subscrições (ou a raiz
+        é destruída) e volta a ser criado pela próxima chamada a `acompanhar`.
+
+        Args:
+            raiz: Janela principal (Tk) em cujo ciclo de eventos correm as verificações.
+            intervalo_ms (int): Intervalo entre verificações.
+        """
+        if self._agendado is not None:
+            return
+        # Regista as versões atuais para só publicar alterações futuras
+        self.verificar()
+
+        def _ciclo():
+            self._agendado = None
+            if not self._subscricoes:
+                self.fechar()
+                return
+            self.verificar()
+            try:
+                self._agendado = raiz.after(intervalo_ms, _ciclo)
+            except Exception:
+                # A raiz foi destruída
+                self.fechar()
+
+        self._agendado = raiz.after(intervalo_ms, _ciclo)
+
+
+_monitor: Optional[MonitorAlteracoes] = None
+
+
+def obter_monitor() -> MonitorAlteracoes:
+    """
+    Retorna o monitor partilhado pelas janelas da aplicação.
+
+    Returns:
+        MonitorAlteracoes: Monitor que segue a base de dados do pool ativo.
+    """
+    global _monitor
+    if _monitor is None:
+        _monitor = MonitorAlteracoes()
+    return _monitor
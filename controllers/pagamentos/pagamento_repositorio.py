@@ -6,8 +6,11 @@ atualização, remoção e busca por ID.
 """
 
 import logging
-from typing import List, Optional, Dict
+from typing import Any, Callable, List, Optional, Dict, Tuple
 from controllers.utils_bd import obter_cursor
+from controllers.exportacao.exportacao_csv import exportar_consulta_csv
+from controllers.exportacao.exportacao_xlsx import exportar_consulta_xlsx
+from controllers.importacao.importacao_csv import Preparar, importar_csv
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +71,56 @@ def listar_pagamentos_bd() -> List[Dict]:
         return []
 
 
+def listar_pagamentos_pagina_bd(limite: int, apos: Optional[Tuple[Optional[str], int]] = None) -> List[Dict]:
+    """
+    Lista uma página de pagamentos pela ordem de `listar_pagamentos_bd` (data_pagamento DESC, id DESC).
+
+    Usa paginação por chave (keyset): cada página começa a seguir à chave
+    (data_pagamento, id) da última linha da página anterior, pelo que o custo
+    não depende da profundidade da página. Os pagamentos sem data vêm no fim.
+
+    Args:
+        limite (int): Número máximo de pagamentos a devolver.
+        apos (Tuple[Optional[str], int], opcional): Chave (data_pagamento, id)
+            do último pagamento já mostrado. None para a primeira página.
+
+    Returns:
+        List[Dict]: Pagamentos da página (lista vazia no fim ou em caso de erro).
+    """
+    try:
+        with obter_cursor() as cursor:
+            if apos is None:
+                cursor.execute("""
+                    SELECT id, id_reserva, id_forma_pagamento, valor, data_pagamento
+                    FROM Pagamentos WHERE data_pagamento IS NOT NULL
+                    ORDER BY data_pagamento DESC, id DESC LIMIT ?
+                """, (int(limite),))
+                linhas = cursor.fetchall()
+            elif apos[0] is not None:
+                cursor.execute("""
+                    SELECT id, id_reserva, id_forma_pagamento, valor, data_pagamento
+                    FROM Pagamentos WHERE (data_pagamento, id) < (?, ?)
+                    ORDER BY data_pagamento DESC, id DESC LIMIT ?
+                """, (apos[0], int(apos[1]), int(limite)))
+                linhas = cursor.fetchall()
+            else:
+                linhas = []
+
+            # A comparação por tuplo exclui os NULL: seguem-se os pagamentos sem data
+            if len(linhas) < int(limite):
+                id_maximo = apos[1] if apos is not None and apos[0] is None else None
+                cursor.execute("""
+                    SELECT id, id_reserva, id_forma_pagamento, valor, data_pagamento
+                    FROM Pagamentos WHERE data_pagamento IS NULL AND id < COALESCE(?, 9223372036854775807)
+                    ORDER BY id DESC LIMIT ?
+                """, (id_maximo, int(limite) - len(linhas)))
+                linhas += cursor.fetchall()
+            return [dict(linha) for linha in linhas]
+    except Exception:
+        logger.exception("Erro ao buscar página de pagamentos.")
+        return []
+
+
 def atualizar_pagamento_bd(dados: Dict) -> bool:
     """
     Atualiza os dados de um pagamento existente.
@@ -149,3 +202,107 @@ def buscar_pagamento_por_id(pagamento_id: int) -> Optional[Dict]:
     except Exception:
         logger.exception("Erro ao buscar pagamento por ID.")
         return None
+
+
+def exportar_pagamentos_csv_bd(caminho: str, progresso: Optional[Callable[[int], None]] = None,
+                               cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Exporta os pagamentos, pela ordem de `listar_pagamentos_bd`, para um ficheiro CSV em lotes.
+
+    Args:
+        caminho (str): Ficheiro CSV de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        Optional[int]: Número de pagamentos exportados, ou None em caso de erro ou cancelamento.
+    """
+    query = """
+        SELECT id, id_reserva, id_forma_pagamento, valor, data_pagamento
+        FROM Pagamentos
+        ORDER BY data_pagamento DESC
+    """
+    return exportar_consulta_csv(
+        caminho, query,
+        cabecalho=["ID Pagamento", "ID Reserva", "ID Forma de Pagamento", "Valor (€)", "Data Pagamento"],
+        progresso=progresso, cancelado=cancelado,
+    )
+
+
+def exportar_pagamentos_xlsx_bd(caminho: str, progresso: Optional[Callable[[int], None]] = None,
+                                cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Exporta os pagamentos, pela ordem de `listar_pagamentos_bd`, para um ficheiro Excel em lotes.
+
+    Args:
+        caminho (str): Ficheiro XLSX de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        Optional[int]: Número de pagamentos exportados, ou None em caso de erro ou cancelamento.
+    """
+    query = """
+        SELECT id, id_reserva, id_forma_pagamento, valor, data_pagamento
+        FROM Pagamentos
+        ORDER BY data_pagamento DESC
+    """
+    return exportar_consulta_xlsx(
+        caminho, query,
+        cabecalho=["ID Pagamento", "ID Reserva", "ID Forma de Pagamento", "Valor (€)", "Data Pagamento"],
+        tipos=["inteiro", "inteiro", "inteiro", "moeda", "data"],
+        folha="Pagamentos", progresso=progresso, cancelado=cancelado,
+    )
+
+
+def _verificar_pagamentos_importacao(cur, linhas: List[tuple]) -> List[str]:
+    """
+    Verifica, dentro da transação do lote, que a reserva e a forma de pagamento de cada pagamento existem.
+
+    Args:
+        cur: Cursor da importação.
+        linhas (List[tuple]): (data_pagamento, valor, id_forma_pagamento, id_reserva) de cada pagamento.
+
+    Returns:
+        List[str]: Motivo da rejeição de cada linha ("" se aceite).
+    """
+    motivos = []
+    for _, _, id_forma_pagamento, id_reserva in linhas:
+        cur.execute(
+            "SELECT EXISTS (SELECT 1 FROM Reservas WHERE id = ?), "
+            "EXISTS (SELECT 1 FROM FormasPagamento WHERE id = ?)",
+            (id_reserva, id_forma_pagamento),
+        )
+        reserva_existe, forma_existe = cur.fetchone()
+        if not reserva_existe:
+            motivos.append(f"Reserva {id_reserva} não existe.")
+        elif not forma_existe:
+            motivos.append(f"Forma de pagamento {id_forma_pagamento} não existe.")
+        else:
+            motivos.append("")
+    return motivos
+
+
+def importar_pagamentos_csv_bd(caminho: str, preparar: Preparar, caminho_rejeicoes: Optional[str] = None,
+                               progresso: Optional[Callable[[int], None]] = None,
+                               cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa pagamentos de um ficheiro CSV, em lotes de `executemany`.
+
+    Args:
+        caminho (str): Ficheiro CSV com as colunas id_reserva, id_forma_pagamento, valor e data_pagamento.
+        preparar (Preparar): Valida uma linha e devolve (data_pagamento, valor, id_forma_pagamento, id_reserva).
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já lidas.
+        cancelado (Callable[[], bool], opcional): Interrompe a importação quando devolve True.
+
+    Returns:
+        Optional[Dict[str, Any]]: Resultado de `importacao_csv.importar_csv`, ou None em caso de erro.
+    """
+    return importar_csv(
+        caminho,
+        "INSERT INTO Pagamentos (data_pagamento, valor, id_forma_pagamento, id_reserva) VALUES (?, ?, ?, ?)",
+        ["id_reserva", "id_forma_pagamento", "valor", "data_pagamento"], preparar,
+        verificar=_verificar_pagamentos_importacao, caminho_rejeicoes=caminho_rejeicoes,
+        progresso=progresso, cancelado=cancelado,
+    )
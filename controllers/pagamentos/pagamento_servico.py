@@ -2,19 +2,22 @@
 Camada de serviço para a lógica de negócio dos pagamentos.
 
 Este módulo valida os dados de pagamentos e interage com o repositório (CRUD).
-Fornece funções para adicionar, editar, excluir, listar e exportar pagamentos.
+Fornece funções para adicionar, editar, excluir, listar, exportar e importar pagamentos.
 """
 
-import csv
 import logging
-from typing import List, Tuple, Dict, Union
+from typing import Any, Callable, List, Optional, Tuple, Dict, Union
 
 from controllers.pagamentos.pagamento_validacao import data_valida, valor_valido, ids_validos
 from controllers.pagamentos.pagamento_repositorio import (
     listar_pagamentos_bd,
+    listar_pagamentos_pagina_bd,
     inserir_pagamento_bd,
     atualizar_pagamento_bd,
     remover_pagamento_bd,
+    exportar_pagamentos_csv_bd,
+    exportar_pagamentos_xlsx_bd,
+    importar_pagamentos_csv_bd,
 )
 
 logger = logging.getLogger(__name__)
@@ -130,34 +133,93 @@ def obter_pagamentos() -> List[Dict]:
     return listar_pagamentos_bd()
 
 
-def exportar_pagamentos_para_csv(nome_arquivo: str = "pagamentos_export.csv") -> bool:
+def obter_pagina_pagamentos(limite: int, apos: Optional[Tuple[Optional[str], int]] = None) -> List[Dict]:
     """
-    Exporta todos os pagamentos para um ficheiro CSV.
+    Retorna uma página de pagamentos, pela ordem de `obter_pagamentos`.
+
+    Args:
+        limite (int): Número máximo de pagamentos (maior que zero).
+        apos (Tuple[Optional[str], int], opcional): Chave (data_pagamento, id)
+            do último pagamento da página anterior. None para a primeira página.
+
+    Returns:
+        List[Dict]: Pagamentos da página (vazia se o limite for inválido).
+    """
+    if limite <= 0:
+        return []
+    return listar_pagamentos_pagina_bd(limite, apos)
+
+
+def exportar_pagamentos_para_csv(nome_arquivo: str = "pagamentos_export.csv",
+                                 progresso: Optional[Callable[[int], None]] = None,
+                                 cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta todos os pagamentos para um ficheiro CSV, em lotes (memória constante).
 
     Args:
         nome_arquivo (str): Nome do ficheiro CSV de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
 
     Returns:
         bool: True se exportado com sucesso, False caso contrário.
     """
-    pagamentos = obter_pagamentos()
-    if not pagamentos:
+    linhas = exportar_pagamentos_csv_bd(nome_arquivo, progresso, cancelado)
+    if linhas == 0:
         logger.warning("Nenhum pagamento encontrado para exportar.")
-        return False
-    try:
-        with open(nome_arquivo, mode='w', newline='', encoding='utf-8') as arquivo:
-            escritor = csv.writer(arquivo)
-            escritor.writerow(["ID Pagamento", "ID Reserva", "ID Forma de Pagamento", "Valor (€)", "Data Pagamento"])
-            for pagamento in pagamentos:
-                escritor.writerow([
-                    pagamento["id"],
-                    pagamento["id_reserva"],
-                    pagamento["id_forma_pagamento"],
-                    pagamento["valor"],
-                    pagamento["data_pagamento"]
-                ])
-        logger.info("Pagamentos exportados com sucesso para %s", nome_arquivo)
-        return True
-    except Exception:
-        logger.exception("Erro ao exportar pagamentos para CSV.")
-        return False
+    return bool(linhas)
+
+
+def exportar_pagamentos_para_xlsx(nome_arquivo: str = "pagamentos_export.xlsx",
+                                  progresso: Optional[Callable[[int], None]] = None,
+                                  cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta todos os pagamentos para um ficheiro Excel, em lotes (memória constante).
+
+    Args:
+        nome_arquivo (str): Nome do ficheiro XLSX de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        bool: True se exportado com sucesso, False caso contrário.
+    """
+    linhas = exportar_pagamentos_xlsx_bd(nome_arquivo, progresso, cancelado)
+    if linhas == 0:
+        logger.warning("Nenhum pagamento encontrado para exportar.")
+    return bool(linhas)
+
+
+def _preparar_pagamento_importacao(linha: Dict[str, str]) -> Tuple[Optional[tuple], str]:
+    """Valida uma linha do CSV de importação com `validar_dados_pagamento`."""
+    valido, msg = validar_dados_pagamento(linha)
+    if not valido:
+        return None, msg
+    return (linha["data_pagamento"], float(linha["valor"]), int(linha["id_forma_pagamento"]),
+            int(linha["id_reserva"])), ""
+
+
+def importar_pagamentos_de_csv(caminho: str, caminho_rejeicoes: Optional[str] = None,
+                               progresso: Optional[Callable[[int], None]] = None,
+                               cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa pagamentos de um ficheiro CSV, em lotes.
+
+    As linhas são validadas como em `adicionar_pagamento`; são também rejeitados
+    os pagamentos de reservas ou formas de pagamento inexistentes.
+
+    Args:
+        caminho (str): Ficheiro CSV (colunas id_reserva, id_forma_pagamento, valor, data_pagamento).
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas e o motivo.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já lidas.
+        cancelado (Callable[[], bool], opcional): Interrompe a importação quando devolve True.
+
+    Returns:
+        Optional[Dict[str, Any]]: Linhas lidas, inseridas e rejeitadas (com os motivos),
+        ou None se o ficheiro não puder ser importado.
+    """
+    resultado = importar_pagamentos_csv_bd(caminho, _preparar_pagamento_importacao, caminho_rejeicoes,
+                                           progresso, cancelado)
+    if resultado is None:
+        logger.warning("Falha ao importar pagamentos de %s", caminho)
+    return resultado
@@ -0,0 +1,144 @@
+"""
+Índice em memória da disponibilidade dos veículos.
+
+Para cada veículo guarda os períodos das reservas ativas
+(Pendente/Confirmada/Reservado) ordenados pela data de início, juntamente com
+a posição da maior (e da segunda maior) data de fim de cada prefixo. Saber se
+um período [inicio, fim] colide com alguma reserva passa a ser uma pesquisa
+binária: entre as reservas que começam até `fim`, há conflito se e só se a
+maior data de fim for >= `inicio`. O resultado é correto mesmo que existam
+reservas antigas sobrepostas entre si.
+
+Os índices são construídos a pedido (um por veículo) e descartados sempre que
+a tabela de reservas muda, seja qual for a conexão ou o processo que a
+alterou (ver `reservas_repositorio.versao_reservas`). A verificação que
+protege as escritas continua a ser feita em SQL, dentro da transação (ver
+`reservas_repositorio.inserir_reserva_bd`); este índice serve as consultas de
+disponibilidade feitas pela interface.
+"""
+
+import logging
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+from controllers.reservas import reservas_repositorio
+
+logger = logging.getLogger(__name__)
+
+
+class IndiceIntervalos:
+    """
+    Conjunto estático de intervalos fechados com pesquisa de sobreposição em O(log n).
+
+    Args:
+        periodos (Sequence[Tuple[int, str, str]]): Tuplos (id, inicio, fim)
+            com datas ISO (comparáveis como texto).
+    """
+
+    def __init__(self, periodos: Sequence[Tuple[int, str, str]]):
+        ordenados = sorted(periodos, key=lambda p: p[1])
+        self.ids: List[int] = [p[0] for p in ordenados]
+        self.inicios: List[str] = [p[1] for p in ordenados]
+        self.fins: List[str] = [p[2] for p in ordenados]
+        # pos_max[i] / pos_segundo[i] = posição da maior / segunda maior data de
+        # fim entre os intervalos 0..i (-1 se não existir)
+        self.pos_max: List[int] = []
+        self.pos_segundo: List[int] = []
+        maximo = segundo = -1
+        for i, fim in enumerate(self.fins):
+            if maximo < 0 or fim > self.fins[maximo]:
+                maximo, segundo = i, maximo
+            elif segundo < 0 or fim > self.fins[segundo]:
+                segundo = i
+            self.pos_max.append(maximo)
+            self.pos_segundo.append(segundo)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def conflito(self, inicio: str, fim: str, excluir_id: Optional[int] = None) -> Optional[int]:
+        """
+        Devolve o ID de um intervalo que se sobreponha a [inicio, fim].
+
+        Args:
+            inicio (str): Início do período.
+            fim (str): Fim do período.
+            excluir_id (int, opcional): Intervalo a ignorar.
+
+        Returns:
+            Optional[int]: ID do intervalo sobreposto, ou None.
+        """
+        j = bisect_right(self.inicios, fim) - 1
+        if j < 0:
+            return None
+        # Os intervalos 0..j começam até `fim`: sobrepõem-se os que acabam em
+        # `inicio` ou depois, e basta olhar para o que acaba mais tarde (ou,
+        # se for o excluído, para o seguinte)
+        k = self.pos_max[j]
+        if self.ids[k] == excluir_id:
+            k = self.pos_segundo[j]
+        return self.ids[k] if k >= 0 and self.fins[k] >= inicio else None
+
+
+_indices: Dict[int, IndiceIntervalos] = {}
+_versao_indices: Optional[tuple] = None
+_trinco = threading.Lock()
+
+
+def invalidar_indices() -> None:
+    """Descarta todos os índices em memória (são reconstruídos no próximo uso)."""
+    global _versao_indices
+    with _trinco:
+        _indices.clear()
+        _versao_indices = None
+
+
+def obter_indice(id_veiculo: int) -> IndiceIntervalos:
+    """
+    Retorna o índice de intervalos de um veículo, construindo-o se necessário.
+
+    Args:
+        id_veiculo (int): ID do veículo.
+
+    Returns:
+        IndiceIntervalos: Índice das reservas ativas do veículo.
+    """
+    global _versao_indices
+    versao = reservas_repositorio.versao_reservas()
+    with _trinco:
+        if _versao_indices != versao:
+            _indices.clear()
+            _versao_indices = versao
+        indice = _indices.get(id_veiculo)
+    if indice is not None:
+        return indice
+
+    indice = IndiceIntervalos(reservas_repositorio.listar_periodos_ativos_veiculo_bd(id_veiculo))
+    if versao is None:
+        return indice
+    with _trinco:
+        # Só guarda se nenhuma escrita aconteceu entretanto
+        if reservas_repositorio.versao_reservas() == versao == _versao_indices:
+            _indices[id_veiculo] = indice
+    return indice
+
+
+def verificar_conflito(id_veiculo: int, data_inicio: str, data_fim: str,
+                       excluir_id: Optional[int] = None, usar_cache: bool = True) -> Optional[int]:
+    """
+    Verifica se um veículo tem uma reserva ativa sobreposta a [data_inicio, data_fim].
+
+    Args:
+        id_veiculo (int): ID do veículo.
+        data_inicio (str): Início do período (AAAA-MM-DD).
+        data_fim (str): Fim do período (AAAA-MM-DD).
+        excluir_id (int, opcional): Reserva a ignorar (a própria, numa atualização).
+        usar_cache (bool): Se False, consulta diretamente a base de dados
+            (consulta indexada) em vez do índice em memória.
+
+    Returns:
+        Optional[int]: ID da reserva em conflito, ou None se o veículo estiver livre.
+    """
+    if not usar_cache:
+        return reservas_repositorio.buscar_conflito_reserva_bd(id_veiculo, data_inicio, data_fim, excluir_id)
+    return obter_indice(id_veiculo).conflito(data_inicio, data_fim, excluir_id)
@@ -0,0 +1,432 @@
+"""
+Matriz de ocupação da frota (veículos × dias) em NumPy.
+
+Cada linha corresponde a um veículo e cada coluna a um dia; a célula guarda
+quantas reservas (não canceladas) ocupam o veículo nesse dia. A matriz é
+construída de uma só vez com somas de diferenças (+1 no dia de início, -1 no
+dia seguinte ao fim, soma acumulada por linha) e mantida atualizada a cada
+reserva inserida, alterada ou removida através da camada de serviço.
+
+A taxa de utilização por veículo, categoria ou mês e a procura de períodos
+livres passam a ser operações sobre a matriz, sem consultas à base de dados.
+
+A matriz partilhada segue as versões de Reservas e Veiculos em
+`alteracoes_tabelas`: escritas de outras conexões ou processos (ou
+importações) levam à sua reconstrução, e o mesmo acontece quando uma
+consulta pede um período que ela não cobre.
+
+Funções principais:
+- obter_matriz: devolve a matriz atual, reconstruindo-a se estiver desatualizada
+  ou não cobrir o período pedido.
+- registar_reserva / remover_reserva: atualizações incrementais.
+- invalidar_matriz: descarta a matriz (ex.: após alterar veículos).
+"""
+
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from controllers.reservas import reservas_repositorio
+from controllers.utils_bd import versao_tabelas
+from controllers.veiculos import veiculos_repositorio
+
+logger = logging.getLogger(__name__)
+
+# Estados que não ocupam o veículo
+ESTADOS_LIVRES = ("Cancelada",)
+# Por omissão a matriz cobre até um ano depois de hoje
+DIAS_FUTURO = 365
+# Limite de células do vetor de diferenças processado de cada vez (int64)
+CELULAS_POR_BLOCO = 8_000_000
+
+
+def _dias(datas: Sequence[str]) -> np.ndarray:
+    """
+    Converte datas AAAA-MM-DD em `datetime64[D]`; datas inválidas ficam NaT.
+
+    Args:
+        datas (Sequence[str]): Datas em texto.
+
+    Returns:
+        np.ndarray: Vetor de dias.
+    """
+    try:
+        return np.array(datas, dtype="datetime64[D]")
+    except ValueError:
+        convertidas = []
+        for valor in datas:
+            try:
+                convertidas.append(np.datetime64(valor, "D"))
+            except ValueError:
+                convertidas.append(np.datetime64("NaT"))
+        return np.array(convertidas, dtype="datetime64[D]")
+
+
+class MatrizOcupacao:
+    """
+    Contagem de reservas por veículo e por dia, num intervalo de datas fixo.
+
+    As contagens são `uint8` (saturam em 255); um dia está ocupado se a
+    contagem for maior que zero. Reservas fora do intervalo são cortadas.
+
+    Args:
+        veiculos (Sequence[Tuple[int, str]]): Tuplos (id, categoria).
+        periodos (Sequence[Tuple[int, int, str, str]]): Tuplos
+            (id_reserva, id_veiculo, data_inicio, data_fim).
+        inicio (str): Primeiro dia da matriz (AAAA-MM-DD).
+        fim (str): Último dia da matriz (AAAA-MM-DD).
+    """
+
+    def __init__(self, veiculos: Sequence[Tuple[int, str]], periodos: Sequence[Tuple[int, int, str, str]],
+                 inicio: str, fim: str):
+        ordenados = sorted(veiculos, key=lambda v: v[0])
+        self.ids_veiculos = np.array([v[0] for v in ordenados], dtype=np.int64)
+        self.categorias = np.array([v[1] or "" for v in ordenados], dtype=object)
+        self.origem = np.datetime64(inicio, "D")
+        self.total_dias = max(0, int((np.datetime64(fim, "D") - self.origem).astype(int)) + 1)
+        self.contagens = np.zeros((len(ordenados), self.total_dias), dtype=np.uint8)
+        # Posição de cada reserva na matriz (linha, primeira e última coluna, já
+        # cortadas ao intervalo): as da construção em vetores ordenados pelo ID,
+        # as registadas depois em `_alteradas` (None = removida)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._posicoes = np.zeros((0, 3), dtype=np.int64)
+        self._alteradas: Dict[int, Optional[Tuple[int, int, int]]] = {}
+        self.versao: Optional[tuple] = None
+
+        if len(periodos):
+            total = len(periodos)
+            self._preencher(np.fromiter((p[0] for p in periodos), np.int64, total),
+                            np.fromiter((p[1] for p in periodos), np.int64, total),
+                            _dias([p[2] for p in periodos]), _dias([p[3] for p in periodos]))
+
+    # -------------------- Construção e atualização --------------------
+
+    def _linhas(self, ids_veiculo: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Devolve as linhas dos veículos e a máscara dos que existem na matriz."""
+        linhas = np.searchsorted(self.ids_veiculos, ids_veiculo)
+        linhas = np.minimum(linhas, max(len(self.ids_veiculos) - 1, 0))
+        existe = (self.ids_veiculos[linhas] == ids_veiculo) if len(self.ids_veiculos) else np.zeros(
+            len(ids_veiculo), dtype=bool)
+        return linhas, existe
+
+    def _colunas(self, inicios: np.ndarray, fins: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Converte períodos em colunas cortadas ao intervalo; devolve também a máscara dos que o intersetam."""
+        validos = ~(np.isnat(inicios) | np.isnat(fins))
+        a = np.where(validos, (inicios - self.origem).astype(np.int64), 0)
+        b = np.where(validos, (fins - self.origem).astype(np.int64), -1)
+        visiveis = validos & (a <= b) & (b >= 0) & (a < self.total_dias)
+        return np.clip(a, 0, self.total_dias - 1), np.clip(b, 0, self.total_dias - 1), visiveis
+
+    def _preencher(self, ids: np.ndarray, ids_veiculo: np.ndarray, inicios: np.ndarray, fins: np.ndarray) -> None:
+        """Soma os períodos à matriz com vetores de diferenças, em blocos de veículos."""
+        linhas, existe = self._linhas(ids_veiculo)
+        a, b, visiveis = self._colunas(inicios, fins)
+        mascara = existe & visiveis
+        ids, linhas, a, b = ids[mascara], linhas[mascara], a[mascara], b[mascara]
+        ordem = np.argsort(ids, kind="stable")
+        self._ids = ids[ordem]
+        self._posicoes = np.column_stack((linhas, a, b))[ordem]
+
+        largura = self.total_dias + 1
+        por_bloco = max(1, CELULAS_POR_BLOCO // largura)
+        for primeira in range(0, len(self.ids_veiculos), por_bloco):
+            ultima = min(primeira + por_bloco, len(self.ids_veiculos))
+            no_bloco = (linhas >= primeira) & (linhas < ultima)
+            if not no_bloco.any():
+                continue
+            base = (linhas[no_bloco] - primeira) * largura
+            celulas = (ultima - primeira) * largura
+            diferencas = (np.bincount(base + a[no_bloco], minlength=celulas)
+                          - np.bincount(base + b[no_bloco] + 1, minlength=celulas))
+            acumulado = np.cumsum(diferencas.reshape(ultima - primeira, largura), axis=1)[:, :-1]
+            np.minimum(acumulado, 255, out=acumulado)
+            self.contagens[primeira:ultima] = acumulado.astype(np.uint8)
+
+    def registar(self, id_reserva: int, id_veiculo: int, data_inicio: str, data_fim: str, estado: str) -> bool:
+        """
+        Regista (ou substitui) o período de uma reserva.
+
+        Args:
+            id_reserva (int): ID da reserva.
+            id_veiculo (int): ID do veículo.
+            data_inicio (str): Início do período.
+            data_fim (str): Fim do período.
+            estado (str): Estado da reserva (canceladas não ocupam o veículo).
+
+        Returns:
+            bool: False se o veículo não existir na matriz (a matriz deve ser reconstruída).
+        """
+        self.remover(id_reserva)
+        if estado in ESTADOS_LIVRES:
+            return True
+        linhas, existe = self._linhas(np.array([int(id_veiculo)], dtype=np.int64))
+        if not existe[0]:
+            return False
+        a, b, visiveis = self._colunas(_dias([data_inicio]), _dias([data_fim]))
+        if visiveis[0]:
+            linha, a, b = int(linhas[0]), int(a[0]), int(b[0])
+            fatia = self.contagens[linha, a:b + 1]
+            fatia[fatia < 255] += 1
+            self._alteradas[id_reserva] = (linha, a, b)
+        return True
+
+    def remover(self, id_reserva: int) -> None:
+        """
+        Retira o período de uma reserva da matriz (se lá estiver).
+
+        Args:
+            id_reserva (int): ID da reserva.
+        """
+        if id_reserva in self._alteradas:
+            posicao = self._alteradas[id_reserva]
+        else:
+            i = int(np.searchsorted(self._ids, id_reserva))
+            encontrada = i < len(self._ids) and self._ids[i] == id_reserva
+            posicao = tuple(self._posicoes[i].tolist()) if encontrada else None
+        self._alteradas[id_reserva] = None
+        if posicao is not None:
+            linha, a, b = posicao
+            fatia = self.contagens[linha, a:b + 1]
+            fatia[fatia > 0] -= 1
+
+    # -------------------- Consultas --------------------
+
+    def cobre(self, inicio: Optional[str] = None, fim: Optional[str] = None) -> bool:
+        """
+        Indica se o período [inicio, fim] está dentro das colunas da matriz.
+
+        Args:
+            inicio (str, opcional): Primeiro dia (AAAA-MM-DD).
+            fim (str, opcional): Último dia (AAAA-MM-DD).
+
+        Returns:
+            bool: False se alguma parte do período ficar fora da matriz.
+        """
+        return ((inicio is None or np.datetime64(inicio, "D") >= self.origem)
+                and (fim is None or np.datetime64(fim, "D") < self.origem + self.total_dias))
+
+    def _janela(self, inicio: Optional[str], fim: Optional[str]) -> slice:
+        """Converte um período em colunas da matriz (por omissão, toda a matriz)."""
+        a = 0 if inicio is None else int((np.datetime64(inicio, "D") - self.origem).astype(int))
+        b = self.total_dias - 1 if fim is None else int((np.datetime64(fim, "D") - self.origem).astype(int))
+        return slice(max(a, 0), max(min(b, self.total_dias - 1) + 1, 0))
+
+    def ocupacao(self, inicio: Optional[str] = None, fim: Optional[str] = None) -> np.ndarray:
+        """
+        Retorna a matriz booleana de dias ocupados num período.
+
+        Args:
+            inicio (str, opcional): Primeiro dia (AAAA-MM-DD).
+            fim (str, opcional): Último dia (AAAA-MM-DD).
+
+        Returns:
+            np.ndarray: Matriz (veículos × dias) de bool.
+        """
+        return self.contagens[:, self._janela(inicio, fim)] > 0
+
+    def utilizacao_por_veiculo(self, inicio: Optional[str] = None, fim: Optional[str] = None) -> Dict[int, float]:
+        """
+        Retorna a fração de dias ocupados de cada veículo no período.
+
+        Returns:
+            Dict[int, float]: ID do veículo -> utilização entre 0 e 1.
+        """
+        ocupados = self.ocupacao(inicio, fim)
+        if ocupados.shape[1] == 0:
+            return {}
+        return dict(zip(self.ids_veiculos.tolist(), ocupados.mean(axis=1).tolist()))
+
+    def utilizacao_por_categoria(self, inicio: Optional[str] = None, fim: Optional[str] = None) -> Dict[str, float]:
+        """
+        Retorna a fração de dias-veículo ocupados por categoria no período.
+
+        Returns:
+            Dict[str, float]: Categoria -> utilização entre 0 e 1.
+        """
+        ocupados = self.ocupacao(inicio, fim)
+        if ocupados.shape[1] == 0 or not len(self.categorias):
+            return {}
+        nomes, grupo = np.unique(self.categorias.astype(str), return_inverse=True)
+        dias_ocupados = np.bincount(grupo, weights=ocupados.sum(axis=1))
+        dias_totais = np.bincount(grupo) * ocupados.shape[1]
+        return dict(zip(nomes.tolist(), (dias_ocupados / dias_totais).tolist()))
+
+    def utilizacao_por_mes(self, inicio: Optional[str] = None, fim: Optional[str] = None) -> Dict[str, float]:
+        """
+        Retorna a fração de dias-veículo ocupados em cada mês do período.
+
+        Returns:
+            Dict[str, float]: "AAAA-MM" -> utilização entre 0 e 1.
+        """
+        janela = self._janela(inicio, fim)
+        ocupados = self.contagens[:, janela] > 0
+        if ocupados.shape[1] == 0 or not len(self.ids_veiculos):
+            return {}
+        dias = self.origem + np.arange(janela.start, janela.stop)
+        meses, grupo = np.unique(dias.astype("datetime64[M]"), return_inverse=True)
+        dias_ocupados = np.bincount(grupo, weights=ocupados.sum(axis=0))
+        dias_totais = np.bincount(grupo) * len(self.ids_veiculos)
+        return dict(zip((str(m) for m in meses), (dias_ocupados / dias_totais).tolist()))
+
+    def veiculos_livres(self, inicio: str, fim: str) -> List[int]:
+        """
+        Retorna os veículos sem nenhum dia ocupado no período.
+
+        Returns:
+            List[int]: IDs dos veículos livres.
+        """
+        livres = ~self.ocupacao(inicio, fim).any(axis=1)
+        return self.ids_veiculos[livres].tolist()
+
+    def periodos_livres(self, dias: int, inicio: Optional[str] = None, fim: Optional[str] = None,
+                        id_veiculo: Optional[int] = None) -> List[Dict]:
+        """
+        Procura, para cada veículo, o primeiro bloco de `dias` dias livres seguidos no período.
+
+        Args:
+            dias (int): Duração pretendida (em dias).
+            inicio (str, opcional): Início da procura.
+            fim (str, opcional): Fim da procura.
+            id_veiculo (int, opcional): Restringe a procura a um veículo.
+
+        Returns:
+            List[Dict]: Dicionários com id_veiculo, data_inicio e data_fim, um por
+            veículo com disponibilidade, ordenados pela data de início.
+        """
+        janela = self._janela(inicio, fim)
+        ocupados = self.contagens[:, janela] > 0
+        ids = self.ids_veiculos
+        if id_veiculo is not None:
+            selecao = ids == int(id_veiculo)
+            ocupados, ids = ocupados[selecao], ids[selecao]
+        if dias < 1 or ocupados.shape[1] < dias or not len(ids):
+            return []
+        # Dias ocupados em cada janela de `dias` colunas, por diferença de somas acumuladas
+        acumulado = np.zeros((len(ids), ocupados.shape[1] + 1), dtype=np.int32)
+        np.cumsum(ocupados, axis=1, out=acumulado[:, 1:])
+        livres = (acumulado[:, dias:] - acumulado[:, :-dias]) == 0
+        tem_livre = livres.any(axis=1)
+        primeiras = livres.argmax(axis=1)[tem_livre] + janela.start
+        ordem = np.argsort(primeiras, kind="stable")
+        resultado = []
+        for veiculo, coluna in zip(ids[tem_livre][ordem].tolist(), primeiras[ordem].tolist()):
+            comeco = self.origem + coluna
+            resultado.append({"id_veiculo": veiculo, "data_inicio": str(comeco),
+                              "data_fim": str(comeco + dias - 1)})
+        return resultado
+
+
+# -------------------- Matriz partilhada --------------------
+
+_matriz: Optional[MatrizOcupacao] = None
+_trinco = threading.Lock()
+
+
+def _versao() -> Optional[tuple]:
+    """Devolve a chave (pool, versão de Reservas, versão de Veiculos) da matriz partilhada."""
+    return versao_tabelas("reservas", "veiculos")
+
+
+def construir_matriz(inicio: Optional[str] = None, fim: Optional[str] = None) -> MatrizOcupacao:
+    """
+    Constrói uma matriz de ocupação a partir da base de dados.
+
+    A matriz cobre sempre todas as reservas e até um ano depois de hoje; o
+    período pedido alarga esse intervalo (os dias sem reservas ficam livres).
+
+    Args:
+        inicio (str, opcional): Primeiro dia a cobrir. Por omissão, o início da reserva mais antiga.
+        fim (str, opcional): Último dia a cobrir. Por omissão, o fim da reserva mais tardia ou
+            um ano depois de hoje, o que for maior.
+
+    Returns:
+        MatrizOcupacao: Matriz construída.
+    """
+    versao = _versao()
+    periodos = reservas_repositorio.listar_periodos_ocupacao_bd()
+    veiculos = [(v["id"], v.get("categoria")) for v in veiculos_repositorio.listar_veiculos_bd()]
+    limite = (date.today() + timedelta(days=DIAS_FUTURO)).isoformat()
+    primeiro = min((p[2] for p in periodos), default=date.today().isoformat())
+    inicio = min(inicio, primeiro) if inicio else primeiro
+    fim = max(fim or "", max((p[3] for p in periodos), default=limite), limite)
+    matriz = MatrizOcupacao(veiculos, periodos, inicio, fim)
+    matriz.versao = versao
+    logger.info("Matriz de ocupação construída: %d veículos × %d dias.", *matriz.contagens.shape)
+    return matriz
+
+
+def obter_matriz(inicio: Optional[str] = None, fim: Optional[str] = None) -> MatrizOcupacao:
+    """
+    Retorna a matriz de ocupação partilhada, reconstruindo-a se Reservas ou
+    Veiculos tiverem mudado desde a sua construção (em qualquer conexão ou
+    processo) sem que a alteração lhe tenha sido aplicada, ou se não cobrir
+    o período pedido.
+
+    Args:
+        inicio (str, opcional): Primeiro dia que a matriz tem de cobrir.
+        fim (str, opcional): Último dia que a matriz tem de cobrir.
+
+    Returns:
+        MatrizOcupacao: Matriz atualizada.
+    """
+    global _matriz
+    with _trinco:
+        versao = _versao()
+        if _matriz is None or versao is None or _matriz.versao != versao or not _matriz.cobre(inicio, fim):
+            _matriz = construir_matriz(inicio, fim)
+        return _matriz
+
+
+def invalidar_matriz() -> None:
+    """Descarta a matriz partilhada (é reconstruída no próximo uso)."""
+    global _matriz
+    with _trinco:
+        _matriz = None
+
+
+def _aplicar(alteracao) -> None:
+    """
+    Aplica uma alteração incremental à matriz partilhada, se ela existir.
+
+    A matriz só é atualizada se esta for a única escrita que lhe falta aplicar;
+    caso contrário (ou se a alteração falhar) é descartada.
+    """
+    global _matriz
+    with _trinco:
+        if _matriz is None:
+            return
+        versao = _versao()
+        if versao is None or _matriz.versao is None:
+            _matriz = None
+            return
+        pool, reservas, veiculos = _matriz.versao
+        # Cada linha escrita em Reservas incrementa a sua versão uma vez
+        if versao != (pool, reservas + 1, veiculos) or alteracao(_matriz) is False:
+            _matriz = None
+            return
+        _matriz.versao = versao
+
+
+def registar_reserva(id_reserva: int, dados: Dict) -> None:
+    """
+    Atualiza a matriz partilhada depois de uma reserva ser inserida ou alterada.
+
+    Args:
+        id_reserva (int): ID da reserva.
+        dados (Dict): Campos id_veiculo, data_inicio, data_fim e estado.
+    """
+    _aplicar(lambda matriz: matriz.registar(id_reserva, dados["id_veiculo"], dados["data_inicio"],
+                                            dados["data_fim"], dados["estado"]))
+
+
+def remover_reserva(id_reserva: int) -> None:
+    """
+    Atualiza a matriz partilhada depois de uma reserva ser removida.
+
+    Args:
+        id_reserva (int): ID da reserva.
+    """
+    _aplicar(lambda matriz: matriz.remover(id_reserva))
@@ -3,14 +3,127 @@ Módulo de acesso à base de dados para reservas.
 
 Fornece funções CRUD para a tabela 'Reservas', incluindo inserção,
 listagem, atualização, remoção e busca por ID.
+
+A inserção e a atualização de reservas ativas (Pendente/Confirmada/Reservado)
+verificam, na mesma transação de escrita, que o veículo não tem outra reserva
+ativa com período sobreposto; havendo conflito, a reserva não é gravada.
 """
 
 import logging
-from typing import List, Dict, Optional
-from controllers.utils_bd import obter_cursor
+import sqlite3
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from controllers.utils_bd import obter_cursor, versao_tabelas
+from controllers.exportacao.exportacao_csv import exportar_consulta_csv
+from controllers.exportacao.exportacao_xlsx import exportar_consulta_xlsx
+from controllers.importacao.importacao_csv import Preparar, importar_csv
 
 logger = logging.getLogger(__name__)
 
+# Estados que ocupam o veículo (os restantes não entram na deteção de conflitos).
+# "Reservado" é o estado com que o formulário de reservas cria novas reservas.
+ESTADOS_ATIVOS = ("Pendente", "Confirmada", "Reservado")
+
+# Os estados são literais (e não parâmetros) para o planeador usar o índice
+# parcial idx_reservas_ativas_veiculo
+SQL_CONFLITO = """
+    SELECT id FROM Reservas
+    WHERE id_veiculo = ? AND estado IN ('Pendente', 'Confirmada', 'Reservado')
+      AND data_inicio <= ? AND data_fim >= ? AND id != ?
+    LIMIT 1
+"""
+
+def versao_reservas() -> Optional[tuple]:
+    """
+    Retorna uma chave que muda sempre que a tabela Reservas é alterada.
+
+    Segue o contador da tabela em `alteracoes_tabelas`, pelo que também muda
+    com escritas de outras conexões e processos (ex.: outro balcão) e com as
+    importações. Usado pelas caches em memória (ex.: índice de disponibilidade)
+    para saber quando devem ser descartadas.
+
+    Returns:
+        Optional[tuple]: Versão atual, ou None se não for possível lê-la.
+    """
+    return versao_tabelas("reservas")
+
+def _conflito(cur: sqlite3.Cursor, id_veiculo: int, data_inicio: str, data_fim: str,
+              excluir_id: Optional[int] = None) -> Optional[int]:
+    """Devolve o ID de uma reserva ativa sobreposta ao período, usando o cursor dado."""
+    cur.execute(SQL_CONFLITO, (int(id_veiculo), data_fim, data_inicio, excluir_id or 0))
+    linha = cur.fetchone()
+    return linha[0] if linha else None
+
+def buscar_conflito_reserva_bd(id_veiculo: int, data_inicio: str, data_fim: str,
+                               excluir_id: Optional[int] = None) -> Optional[int]:
+    """
+    Procura uma reserva ativa do veículo que se sobreponha ao período [data_inicio, data_fim].
+
+    Os períodos são fechados: uma reserva que termina no dia em que outra
+    começa é considerada sobreposta.
+
+    Args:
+        id_veiculo (int): ID do veículo.
+        data_inicio (str): Início do período (AAAA-MM-DD).
+        data_fim (str): Fim do período (AAAA-MM-DD).
+        excluir_id (int, opcional): Reserva a ignorar (a própria, numa atualização).
+
+    Returns:
+        Optional[int]: ID da reserva em conflito, ou None se o veículo estiver livre
+        (ou em caso de erro).
+    """
+    try:
+        with obter_cursor() as cur:
+            return _conflito(cur, id_veiculo, data_inicio, data_fim, excluir_id)
+    except Exception:
+        logger.exception("Erro ao procurar conflitos de reserva.")
+        return None
+
+def listar_periodos_ativos_veiculo_bd(id_veiculo: int) -> List[Tuple[int, str, str]]:
+    """
+    Retorna os períodos das reservas ativas de um veículo, ordenados pelo início.
+
+    Args:
+        id_veiculo (int): ID do veículo.
+
+    Returns:
+        List[Tuple[int, str, str]]: Tuplos (id, data_inicio, data_fim).
+    """
+    sql = """
+        SELECT id, data_inicio, data_fim FROM Reservas
+        WHERE id_veiculo = ? AND estado IN ('Pendente', 'Confirmada', 'Reservado')
+        ORDER BY data_inicio
+    """
+    try:
+        with obter_cursor() as cur:
+            cur.execute(sql, (int(id_veiculo),))
+            return [tuple(linha) for linha in cur.fetchall()]
+    except Exception:
+        logger.exception("Erro ao listar períodos ativos do veículo %s.", id_veiculo)
+        return []
+
+def listar_periodos_ocupacao_bd() -> List[Tuple[int, int, str, str]]:
+    """
+    Retorna os períodos de todas as reservas que ocupam um veículo (todas menos as canceladas).
+
+    Usado para construir a matriz de ocupação da frota.
+
+    Returns:
+        List[Tuple[int, int, str, str]]: Tuplos (id, id_veiculo, data_inicio, data_fim).
+    """
+    sql = """
+        SELECT id, id_veiculo, data_inicio, data_fim FROM Reservas
+        WHERE estado != 'Cancelada' AND id_veiculo IS NOT NULL AND data_inicio <= data_fim
+    """
+    try:
+        with obter_cursor() as cur:
+            # Tuplos simples em vez de sqlite3.Row: são milhões de linhas
+            cur.row_factory = None
+            cur.execute(sql)
+            return cur.fetchall()
+    except Exception:
+        logger.exception("Erro ao listar períodos de ocupação.")
+        return []
+
 def inserir_reserva_bd(dados: Dict) -> Optional[int]:
     """
     Insere uma nova reserva na base de dados.
@@ -25,7 +138,8 @@ def inserir_reserva_bd(dados: Dict) -> Optional[int]:
             - valor_total (float)
 
     Returns:
-        Optional[int]: ID da reserva inserida ou None em caso de erro.
+        Optional[int]: ID da reserva inserida ou None em caso de erro ou de
+        conflito com outra reserva ativa do mesmo veículo.
     """
     sql = """
         INSERT INTO Reservas (data_inicio, data_fim, id_cliente, id_veiculo, estado, valor_total)
@@ -33,6 +147,15 @@ def inserir_reserva_bd(dados: Dict) -> Optional[int]:
     """
     try:
         with obter_cursor(commit=True) as cur:
+            # BEGIN IMMEDIATE obtém já o bloqueio de escrita: nenhuma outra
+            # conexão pode gravar uma reserva entre a verificação e o INSERT
+            cur.execute("BEGIN IMMEDIATE")
+            if dados["estado"] in ESTADOS_ATIVOS:
+                conflito = _conflito(cur, dados["id_veiculo"], dados["data_inicio"], dados["data_fim"])
+                if conflito is not None:
+                    logger.warning("Reserva rejeitada: veículo %s já reservado (reserva %d) entre %s e %s.",
+                                   dados["id_veiculo"], conflito, dados["data_inicio"], dados["data_fim"])
+                    return None
             cur.execute(sql, (
                 dados["data_inicio"],
                 dados["data_fim"],
@@ -69,6 +192,56 @@ def listar_reservas_bd() -> List[Dict]:
         logger.exception("Erro ao listar reservas.")
         return []
 
+def listar_reservas_pagina_bd(limite: int, apos: Optional[Tuple[Optional[str], int]] = None) -> List[Dict]:
+    """
+    Retorna uma página de reservas pela ordem de `listar_reservas_bd` (data_inicio DESC, id DESC).
+
+    Usa paginação por chave (keyset): cada página começa a seguir à chave
+    (data_inicio, id) da última linha da página anterior, pelo que o custo
+    não depende da profundidade da página. As reservas sem data_inicio vêm
+    no fim, tal como em `listar_reservas_bd`.
+
+    Args:
+        limite (int): Número máximo de reservas a devolver.
+        apos (Tuple[Optional[str], int], opcional): Chave (data_inicio, id) da
+            última reserva já mostrada. None para a primeira página.
+
+    Returns:
+        List[Dict]: Reservas da página (lista vazia no fim ou em caso de erro).
+    """
+    try:
+        with obter_cursor() as cur:
+            if apos is None:
+                cur.execute("""
+                    SELECT id, id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total
+                    FROM Reservas WHERE data_inicio IS NOT NULL
+                    ORDER BY data_inicio DESC, id DESC LIMIT ?
+                """, (int(limite),))
+                linhas = cur.fetchall()
+            elif apos[0] is not None:
+                cur.execute("""
+                    SELECT id, id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total
+                    FROM Reservas WHERE (data_inicio, id) < (?, ?)
+                    ORDER BY data_inicio DESC, id DESC LIMIT ?
+                """, (apos[0], int(apos[1]), int(limite)))
+                linhas = cur.fetchall()
+            else:
+                linhas = []
+
+            # A comparação por tuplo exclui os NULL: seguem-se as reservas sem data
+            if len(linhas) < int(limite):
+                id_maximo = apos[1] if apos is not None and apos[0] is None else None
+                cur.execute("""
+                    SELECT id, id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total
+                    FROM Reservas WHERE data_inicio IS NULL AND id < COALESCE(?, 9223372036854775807)
+                    ORDER BY id DESC LIMIT ?
+                """, (id_maximo, int(limite) - len(linhas)))
+                linhas += cur.fetchall()
+            return [dict(linha) for linha in linhas]
+    except Exception:
+        logger.exception("Erro ao listar página de reservas.")
+        return []
+
 def atualizar_reserva_bd(dados: Dict) -> bool:
     """
     Atualiza uma reserva existente na base de dados.
@@ -84,7 +257,8 @@ def atualizar_reserva_bd(dados: Dict) -> bool:
             - valor_total (float)
 
     Returns:
-        bool: True se a atualização ocorreu com sucesso, False caso contrário.
+        bool: True se a atualização ocorreu com sucesso, False caso contrário
+        (incluindo conflito com outra reserva ativa do mesmo veículo).
     """
     sql = """
         UPDATE Reservas
@@ -93,6 +267,14 @@ def atualizar_reserva_bd(dados: Dict) -> bool:
     """
     try:
         with obter_cursor(commit=True) as cur:
+            cur.execute("BEGIN IMMEDIATE")
+            if dados["estado"] in ESTADOS_ATIVOS:
+                conflito = _conflito(cur, dados["id_veiculo"], dados["data_inicio"], dados["data_fim"],
+                                     int(dados["id"]))
+                if conflito is not None:
+                    logger.warning("Atualização da reserva %s rejeitada: conflito com a reserva %d.",
+                                   dados["id"], conflito)
+                    return False
             cur.execute(sql, (
                 dados["data_inicio"],
                 dados["data_fim"],
@@ -102,7 +284,8 @@ def atualizar_reserva_bd(dados: Dict) -> bool:
                 float(dados["valor_total"]),
                 int(dados["id"])
             ))
-            return cur.rowcount > 0
+            alterada = cur.rowcount > 0
+        return alterada
     except Exception:
         logger.exception("Erro ao atualizar reserva.")
         return False
@@ -121,7 +304,8 @@ def remover_reserva_bd(reserva_id: int) -> bool:
     try:
         with obter_cursor(commit=True) as cur:
             cur.execute(sql, (reserva_id,))
-            return cur.rowcount > 0
+            removida = cur.rowcount > 0
+        return removida
     except Exception:
         logger.exception("Erro ao remover reserva.")
         return False
@@ -151,3 +335,118 @@ def buscar_reserva_por_id(reserva_id: int) -> Optional[Dict]:
     except Exception:
         logger.exception("Erro ao buscar reserva por ID.")
         return None
+
+def exportar_reservas_csv_bd(caminho: str, progresso: Optional[Callable[[int], None]] = None,
+                             cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Exporta as reservas, pela ordem de `listar_reservas_bd`, para um ficheiro CSV em lotes.
+
+    Args:
+        caminho (str): Ficheiro CSV de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        Optional[int]: Número de reservas exportadas, ou None em caso de erro ou cancelamento.
+    """
+    sql = """
+        SELECT id, id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total
+        FROM Reservas ORDER BY data_inicio DESC
+    """
+    return exportar_consulta_csv(
+        caminho, sql, cabecalho=["ID", "Cliente", "Veículo", "Data Início", "Data Fim", "Estado", "Valor Total"],
+        progresso=progresso, cancelado=cancelado,
+    )
+
+def exportar_reservas_xlsx_bd(caminho: str, progresso: Optional[Callable[[int], None]] = None,
+                              cancelado: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Exporta as reservas, pela ordem de `listar_reservas_bd`, para um ficheiro Excel em lotes.
+
+    Args:
+        caminho (str): Ficheiro XLSX de destino.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas.
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True.
+
+    Returns:
+        Optional[int]: Número de reservas exportadas, ou None em caso de erro ou cancelamento.
+    """
+    sql = """
+        SELECT id, id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total
+        FROM Reservas ORDER BY data_inicio DESC
+    """
+    return exportar_consulta_xlsx(
+        caminho, sql, cabecalho=["ID", "Cliente", "Veículo", "Data Início", "Data Fim", "Estado", "Valor Total"],
+        tipos=["inteiro", "inteiro", "inteiro", "data", "data", "texto", "moeda"],
+        folha="Reservas", progresso=progresso, cancelado=cancelado,
+    )
+
+def _verificar_reservas_importacao(cur: sqlite3.Cursor, linhas: List[tuple]) -> List[str]:
+    """
+    Verifica um lote de reservas a importar, dentro da transação do lote.
+
+    Rejeita reservas de clientes ou veículos inexistentes e reservas ativas
+    sobrepostas a outra reserva ativa do veículo, já gravada ou numa linha
+    anterior do mesmo lote.
+
+    Args:
+        cur (sqlite3.Cursor): Cursor da importação.
+        linhas (List[tuple]): (data_inicio, data_fim, id_cliente, id_veiculo, estado, valor_total) de cada reserva.
+
+    Returns:
+        List[str]: Motivo da rejeição de cada linha ("" se aceite).
+    """
+    motivos = []
+    # Períodos ativos aceites neste lote, por veículo (ainda não gravados)
+    ativas_lote: Dict[int, List[Tuple[str, str]]] = {}
+    for data_inicio, data_fim, id_cliente, id_veiculo, estado, _ in linhas:
+        cur.execute(
+            "SELECT EXISTS (SELECT 1 FROM Clientes WHERE id = ?), EXISTS (SELECT 1 FROM Veiculos WHERE id = ?)",
+            (id_cliente, id_veiculo),
+        )
+        cliente_existe, veiculo_existe = cur.fetchone()
+        if not cliente_existe:
+            motivos.append(f"Cliente {id_cliente} não existe.")
+            continue
+        if not veiculo_existe:
+            motivos.append(f"Veículo {id_veiculo} não existe.")
+            continue
+        if estado in ESTADOS_ATIVOS:
+            conflito = _conflito(cur, id_veiculo, data_inicio, data_fim)
+            if conflito is not None:
+                motivos.append(f"Veículo {id_veiculo} já reservado no período (reserva {conflito}).")
+                continue
+            if any(inicio <= data_fim and fim >= data_inicio for inicio, fim in ativas_lote.get(id_veiculo, ())):
+                motivos.append(f"Veículo {id_veiculo} já reservado no período por outra linha do ficheiro.")
+                continue
+            ativas_lote.setdefault(id_veiculo, []).append((data_inicio, data_fim))
+        motivos.append("")
+    return motivos
+
+
+def importar_reservas_csv_bd(caminho: str, preparar: Preparar, caminho_rejeicoes: Optional[str] = None,
+                             progresso: Optional[Callable[[int], None]] = None,
+                             cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa reservas de um ficheiro CSV, em lotes de `executemany`.
+
+    Args:
+        caminho (str): Ficheiro CSV com as colunas id_cliente, id_veiculo, data_inicio,
+            data_fim, estado e valor_total.
+        preparar (Preparar): Valida uma linha e devolve
+            (data_inicio, data_fim, id_cliente, id_veiculo, estado, valor_total).
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas.
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já lidas.
+        cancelado (Callable[[], bool], opcional): Interrompe a importação quando devolve True.
+
+    Returns:
+        Optional[Dict[str, Any]]: Resultado de `importacao_csv.importar_csv`, ou None em caso de erro.
+    """
+    return importar_csv(
+        caminho,
+        "INSERT INTO Reservas (data_inicio, data_fim, id_cliente, id_veiculo, estado, valor_total) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ["id_cliente", "id_veiculo", "data_inicio", "data_fim", "estado", "valor_total"], preparar,
+        verificar=_verificar_reservas_importacao, caminho_rejeicoes=caminho_rejeicoes,
+        progresso=progresso, cancelado=cancelado,
+    )
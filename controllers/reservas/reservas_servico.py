@@ -2,17 +2,27 @@
 Camada de serviço para a lógica de negócio das reservas.
 
 Valida os dados antes de interagir com o repositório e fornece funções
-para adicionar, atualizar, remover, listar e exportar reservas.
+para adicionar, atualizar, remover, listar, exportar e importar reservas.
+Reservas ativas (Pendente/Confirmada/Reservado) que se sobreponham a outra
+reserva ativa do mesmo veículo são rejeitadas.
+As taxas de utilização e a procura de períodos livres usam a matriz de
+ocupação em memória (ver reservas_ocupacao), atualizada a cada escrita.
 """
 
 import logging
-import csv
+from typing import Any, Callable, Dict, Optional, Tuple
 from controllers.reservas.reservas_validacoes import validar_periodo, validar_valor, validar_status, validar_ids
+from controllers.reservas.reservas_disponibilidade import verificar_conflito
+from controllers.reservas import reservas_ocupacao
 from controllers.reservas.reservas_repositorio import (
     inserir_reserva_bd,
     atualizar_reserva_bd,
     remover_reserva_bd,
-    listar_reservas_bd
+    listar_reservas_bd,
+    listar_reservas_pagina_bd,
+    exportar_reservas_csv_bd,
+    exportar_reservas_xlsx_bd,
+    importar_reservas_csv_bd
 )
 
 logger = logging.getLogger(__name__)
@@ -32,6 +42,7 @@ def adicionar_reserva_servico(data_inicio: str, data_fim: str, cliente_id: int,
 
     Returns:
         bool: True se a reserva foi adicionada com sucesso, False caso contrário
+        (dados inválidos ou veículo já reservado no período)
     """
     if not (validar_ids(cliente_id, veiculo_id) and validar_periodo(data_inicio, data_fim)
             and validar_status(status) and validar_valor(valor_total)):
@@ -47,7 +58,10 @@ def adicionar_reserva_servico(data_inicio: str, data_fim: str, cliente_id: int,
     }
 
     novo_id = inserir_reserva_bd(dados)
-    return novo_id is not None
+    if novo_id is None:
+        return False
+    reservas_ocupacao.registar_reserva(novo_id, dados)
+    return True
 
 def obter_reservas_servico() -> list[dict]:
     """
@@ -58,6 +72,22 @@ def obter_reservas_servico() -> list[dict]:
     """
     return listar_reservas_bd()
 
+def obter_pagina_reservas_servico(limite: int, apos: Optional[tuple] = None) -> list[dict]:
+    """
+    Retorna uma página de reservas, pela ordem de `obter_reservas_servico`.
+
+    Args:
+        limite (int): Número máximo de reservas (maior que zero).
+        apos (tuple, opcional): Chave (data_inicio, id) da última reserva da
+            página anterior. None para a primeira página.
+
+    Returns:
+        List[Dict]: Reservas da página (vazia se o limite for inválido).
+    """
+    if limite <= 0:
+        return []
+    return listar_reservas_pagina_bd(limite, apos)
+
 def atualizar_reserva_servico(reserva_id: int, data_inicio: str, data_fim: str,
                               cliente_id: int, veiculo_id: int, status: str, valor_total: float) -> bool:
     """
@@ -74,6 +104,7 @@ def atualizar_reserva_servico(reserva_id: int, data_inicio: str, data_fim: str,
 
     Returns:
         bool: True se a atualização ocorreu com sucesso, False caso contrário
+        (dados inválidos ou conflito com outra reserva do veículo)
     """
     if not (validar_ids(reserva_id, cliente_id, veiculo_id) and validar_periodo(data_inicio, data_fim)
             and validar_status(status) and validar_valor(valor_total)):
@@ -89,7 +120,30 @@ def atualizar_reserva_servico(reserva_id: int, data_inicio: str, data_fim: str,
         "valor_total": valor_total
     }
 
-    return atualizar_reserva_bd(dados)
+    if not atualizar_reserva_bd(dados):
+        return False
+    reservas_ocupacao.registar_reserva(reserva_id, dados)
+    return True
+
+def veiculo_disponivel_servico(veiculo_id: int, data_inicio: str, data_fim: str,
+                               reserva_id: Optional[int] = None) -> bool:
+    """
+    Indica se um veículo está livre num período (sem reservas ativas sobrepostas).
+
+    Usa o índice de disponibilidade em memória (pesquisa binária por veículo).
+
+    Args:
+        veiculo_id (int): ID do veículo
+        data_inicio (str): Data de início (formato AAAA-MM-DD)
+        data_fim (str): Data de fim (formato AAAA-MM-DD)
+        reserva_id (int, opcional): Reserva a ignorar, ao verificar a edição de uma reserva existente
+
+    Returns:
+        bool: True se o veículo estiver disponível, False se estiver ocupado ou os dados forem inválidos
+    """
+    if not (validar_ids(veiculo_id) and validar_periodo(data_inicio, data_fim)):
+        return False
+    return verificar_conflito(veiculo_id, data_inicio, data_fim, reserva_id) is None
 
 def excluir_reserva_servico(reserva_id: int) -> bool:
     """
@@ -103,31 +157,139 @@ def excluir_reserva_servico(reserva_id: int) -> bool:
     """
     if not validar_ids(reserva_id):
         return False
-    return remover_reserva_bd(reserva_id)
+    if not remover_reserva_bd(reserva_id):
+        return False
+    reservas_ocupacao.remover_reserva(reserva_id)
+    return True
+
+def utilizacao_frota_servico(data_inicio: str, data_fim: str) -> dict:
+    """
+    Calcula a taxa de utilização da frota num período.
+
+    Um dia conta como ocupado se o veículo tiver nesse dia alguma reserva
+    que não esteja cancelada.
+
+    Args:
+        data_inicio (str): Primeiro dia do período (formato AAAA-MM-DD)
+        data_fim (str): Último dia do período (formato AAAA-MM-DD)
+
+    Returns:
+        dict: Chaves "por_veiculo" (ID -> fração), "por_categoria" (categoria -> fração)
+        e "por_mes" ("AAAA-MM" -> fração); dicionário vazio se o período for inválido
+    """
+    if not validar_periodo(data_inicio, data_fim):
+        return {}
+    matriz = reservas_ocupacao.obter_matriz(data_inicio, data_fim)
+    return {
+        "por_veiculo": matriz.utilizacao_por_veiculo(data_inicio, data_fim),
+        "por_categoria": matriz.utilizacao_por_categoria(data_inicio, data_fim),
+        "por_mes": matriz.utilizacao_por_mes(data_inicio, data_fim),
+    }
+
+def procurar_periodos_livres_servico(dias: int, data_inicio: str, data_fim: str,
+                                     veiculo_id: Optional[int] = None) -> list[dict]:
+    """
+    Procura, por veículo, o primeiro bloco de dias livres seguidos dentro de um período.
+
+    Args:
+        dias (int): Duração pretendida, em dias
+        data_inicio (str): Início da procura (formato AAAA-MM-DD)
+        data_fim (str): Fim da procura (formato AAAA-MM-DD)
+        veiculo_id (int, opcional): Restringe a procura a um veículo
+
+    Returns:
+        list[dict]: Dicionários com id_veiculo, data_inicio e data_fim, ordenados
+        pela data de início (lista vazia se os dados forem inválidos)
+    """
+    if not validar_periodo(data_inicio, data_fim):
+        return []
+    if not (isinstance(dias, int) and dias > 0):
+        logger.error("Número de dias inválido: %s", dias)
+        return []
+    if veiculo_id is not None and not validar_ids(veiculo_id):
+        return []
+    matriz = reservas_ocupacao.obter_matriz(data_inicio, data_fim)
+    return matriz.periodos_livres(int(dias), data_inicio, data_fim, veiculo_id)
 
-def exportar_reservas_para_csv(nome_arquivo: str = "reservas_export.csv") -> bool:
+def exportar_reservas_para_csv(nome_arquivo: str = "reservas_export.csv",
+                               progresso: Optional[Callable[[int], None]] = None,
+                               cancelado: Optional[Callable[[], bool]] = None) -> bool:
     """
-    Exporta todas as reservas para um arquivo CSV.
+    Exporta todas as reservas para um arquivo CSV, em lotes (memória constante).
 
     Args:
         nome_arquivo (str): Nome do arquivo de destino (default: "reservas_export.csv")
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True
 
     Returns:
         bool: True se a exportação foi concluída com sucesso, False caso contrário
     """
-    reservas = listar_reservas_bd()
-    if not reservas:
+    linhas = exportar_reservas_csv_bd(nome_arquivo, progresso, cancelado)
+    if linhas == 0:
         logger.warning("Nenhuma reserva para exportar")
-        return False
+    return bool(linhas)
+
+def exportar_reservas_para_xlsx(nome_arquivo: str = "reservas_export.xlsx",
+                                progresso: Optional[Callable[[int], None]] = None,
+                                cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta todas as reservas para um ficheiro Excel, em lotes (memória constante).
+
+    Args:
+        nome_arquivo (str): Nome do arquivo de destino (default: "reservas_export.xlsx")
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True
+
+    Returns:
+        bool: True se a exportação foi concluída com sucesso, False caso contrário
+    """
+    linhas = exportar_reservas_xlsx_bd(nome_arquivo, progresso, cancelado)
+    if linhas == 0:
+        logger.warning("Nenhuma reserva para exportar")
+    return bool(linhas)
+
+def _preparar_reserva_importacao(linha: Dict[str, str]) -> Tuple[Optional[tuple], str]:
+    """Valida uma linha do CSV de importação com os validadores das reservas."""
     try:
-        with open(nome_arquivo, mode="w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "Cliente", "Veículo", "Data Início", "Data Fim", "Estado", "Valor Total"])
-            for r in reservas:
-                writer.writerow([r["id"], r["id_cliente"], r["id_veiculo"],
-                                 r["data_inicio"], r["data_fim"], r["estado"], r["valor_total"]])
-        logger.info("Exportação concluída para %s", nome_arquivo)
-        return True
-    except Exception:
-        logger.exception("Erro ao exportar reservas.")
-        return False
+        cliente_id, veiculo_id = int(linha.get("id_cliente", "")), int(linha.get("id_veiculo", ""))
+    except ValueError:
+        return None, "IDs de cliente ou veículo inválidos."
+    data_inicio, data_fim = linha.get("data_inicio", "").strip(), linha.get("data_fim", "").strip()
+    status, valor_total = linha.get("estado", ""), linha.get("valor_total", "")
+    if not validar_ids(cliente_id, veiculo_id):
+        return None, "IDs de cliente ou veículo inválidos."
+    if not validar_periodo(data_inicio, data_fim):
+        return None, "Período inválido: datas AAAA-MM-DD e data de fim não anterior à de início."
+    if not validar_status(status):
+        return None, "Estado da reserva em falta."
+    if not validar_valor(valor_total):
+        return None, "Valor total inválido."
+    return (data_inicio, data_fim, cliente_id, veiculo_id, status.strip(), float(valor_total)), ""
+
+def importar_reservas_de_csv(caminho: str, caminho_rejeicoes: Optional[str] = None,
+                             progresso: Optional[Callable[[int], None]] = None,
+                             cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa reservas de um ficheiro CSV, em lotes.
+
+    As linhas são validadas como em `adicionar_reserva_servico`; são também
+    rejeitadas as reservas de clientes ou veículos inexistentes e as reservas
+    ativas sobrepostas a outra do mesmo veículo.
+
+    Args:
+        caminho (str): Ficheiro CSV (colunas id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total)
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas e o motivo
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já lidas
+        cancelado (Callable[[], bool], opcional): Interrompe a importação quando devolve True
+
+    Returns:
+        Optional[Dict[str, Any]]: Linhas lidas, inseridas e rejeitadas (com os motivos),
+        ou None se o ficheiro não puder ser importado
+    """
+    resultado = importar_reservas_csv_bd(caminho, _preparar_reserva_importacao, caminho_rejeicoes,
+                                         progresso, cancelado)
+    # Sem resultado (erro a meio) os lotes anteriores podem ter ficado gravados
+    if resultado is None or resultado["inseridas"]:
+        reservas_ocupacao.invalidar_matriz()
+    return resultado
@@ -6,12 +6,20 @@ Inclui logging de erros para auxiliar na depuração.
 """
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 from math import isfinite
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _ler_data(data_str: str, formato: str = "%Y-%m-%d") -> Optional[datetime]:
+    """Converte a data no formato dado, ou devolve None (com log) se for inválida."""
+    try:
+        return datetime.strptime(data_str, formato)
+    except Exception:
+        logger.error("Data inválida: %s", data_str)
+        return None
+
 def validar_data(data_str: str, formato: str = "%Y-%m-%d") -> bool:
     """
     Verifica se a data fornecida está no formato esperado.
@@ -23,12 +31,7 @@ def validar_data(data_str: str, formato: str = "%Y-%m-%d") -> bool:
     Returns:
         bool: True se a data for válida, False caso contrário
     """
-    try:
-        datetime.strptime(data_str, formato)
-        return True
-    except Exception:
-        logger.error("Data inválida: %s", data_str)
-        return False
+    return _ler_data(data_str, formato) is not None
 
 def validar_valor(valor: Any) -> bool:
     """
@@ -90,9 +93,12 @@ def validar_periodo(data_inicio: str, data_fim: str) -> bool:
     Returns:
         bool: True se o período for válido, False caso contrário
     """
-    if not (validar_data(data_inicio) and validar_data(data_fim)):
+    # Cada data é convertida uma só vez (a validação e a comparação usam o mesmo valor)
+    inicio = _ler_data(data_inicio)
+    fim = _ler_data(data_fim) if inicio is not None else None
+    if inicio is None or fim is None:
         return False
-    if datetime.strptime(data_fim, "%Y-%m-%d") < datetime.strptime(data_inicio, "%Y-%m-%d"):
+    if fim < inicio:
         logger.error("Data fim é anterior à data início.")
         return False
     return True
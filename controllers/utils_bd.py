@@ -1,7 +1,11 @@
 import logging
-from typing import Any, Optional
+import os
+import threading
+from typing import Any, List, Optional
 from contextlib import contextmanager
-from db.conexao import conectar_base_dados
+from db.conexao import PERFIL_PADRAO, PERFIS_CONEXAO, conectar_base_dados, obter_perfil_conexao
+from db.migracoes import aplicar_migracoes
+from controllers import instrumentacao_bd
 import sqlite3
 
 logger = logging.getLogger(__name__)
@@ -11,14 +15,182 @@ if not logger.hasHandlers():
         format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
     )
 
+# Número de conexões inativas mantidas por thread (0 desativa a reutilização)
+TAMANHO_POOL_PADRAO = int(os.environ.get("LUXURY_WHEELS_POOL_TAMANHO", "5"))
+
+
+class PoolConexoes:
+    """
+    Pool de conexões SQLite reutilizáveis e confinadas à thread.
+
+    Cada thread tem a sua própria lista de conexões inativas, pelo que uma
+    conexão nunca é partilhada entre threads (respeita o `check_same_thread`
+    do módulo sqlite3). Ao devolver uma conexão, qualquer transação pendente
+    é desfeita, garantindo que a próxima utilização começa num estado limpo.
+    A primeira conexão aberta pelo pool aplica as migrações pendentes do esquema.
+
+    Args:
+        caminho (str, opcional): Caminho do ficheiro da base de dados.
+            Por defeito usa a base de dados da aplicação.
+        tamanho (int): Número máximo de conexões inativas mantidas por thread.
+            Com tamanho 0 cada conexão é fechada ao ser devolvida.
+        perfil (str, opcional): Perfil de PRAGMAs das novas conexões
+            (ver `db.conexao.PERFIS_CONEXAO`). Por defeito, o perfil ativo.
+        migrar (bool): Se True, aplica as migrações pendentes (`db.migracoes`)
+            ao abrir a primeira conexão. Em perfis só de leitura as migrações
+            são aplicadas numa conexão de escrita à parte, fechada logo a seguir.
+    """
+
+    def __init__(self, caminho: Optional[str] = None, tamanho: int = TAMANHO_POOL_PADRAO,
+                 perfil: Optional[str] = None, migrar: bool = True):
+        self.caminho = caminho
+        self.tamanho = max(0, int(tamanho))
+        self.perfil = perfil
+        self._local = threading.local()
+        self._geracao = 0
+        self._migrada = not migrar
+        self._trinco_migracao = threading.Lock()
+
+    def _livres(self) -> List[sqlite3.Connection]:
+        """Devolve a lista de conexões inativas da thread atual."""
+        livres = getattr(self._local, "livres", None)
+        if livres is None or self._local.geracao != self._geracao:
+            # Conexões de uma geração anterior (pool fechado) são descartadas
+            for conexao in livres or []:
+                conexao.close()
+            livres = self._local.livres = []
+            self._local.geracao = self._geracao
+        return livres
+
+    def obter(self) -> sqlite3.Connection:
+        """
+        Obtém uma conexão da thread atual, reutilizando uma inativa se existir.
+
+        Returns:
+            sqlite3.Connection: Conexão com `row_factory` igual a sqlite3.Row.
+
+        Exceções:
+            ConnectionError: Se não for possível abrir uma nova conexão.
+        """
+        livres = self._livres()
+        if livres:
+            return livres.pop()
+
+        conexao = conectar_base_dados(self.caminho, self.perfil)
+        if conexao is None:
+            logger.error("Não foi possível conectar ao banco de dados.")
+            raise ConnectionError("Falha na conexão com o banco de dados.")
+
+        if not self._migrada:
+            with self._trinco_migracao:
+                if not self._migrada:
+                    try:
+                        self._migrar(conexao)
+                    except Exception:
+                        conexao.close()
+                        raise
+                    self._migrada = True
+
+        # Define o row_factory para devolver dicionários
+        conexao.row_factory = sqlite3.Row
+        return conexao
+
+    def _migrar(self, conexao: sqlite3.Connection) -> None:
+        """Aplica as migrações pendentes, com uma conexão de escrita própria se o perfil bloquear escritas."""
+        if "query_only" not in PERFIS_CONEXAO.get(self.perfil or obter_perfil_conexao(), {}):
+            aplicar_migracoes(conexao)
+            return
+        escrita = conectar_base_dados(self.caminho, PERFIL_PADRAO)
+        try:
+            aplicar_migracoes(escrita)
+        finally:
+            escrita.close()
+
+    def devolver(self, conexao: sqlite3.Connection) -> None:
+        """
+        Devolve uma conexão ao pool depois de a repor num estado limpo.
+
+        Transações por confirmar são desfeitas (tal como aconteceria ao fechar
+        a conexão). Conexões que falhem a reposição ou que excedam o tamanho
+        do pool são fechadas.
+
+        Args:
+            conexao (sqlite3.Connection): Conexão obtida com `obter`.
+        """
+        try:
+            if conexao.in_transaction:
+                conexao.rollback()
+            conexao.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            logger.warning("Conexão descartada após falha ao repor o estado.", exc_info=True)
+            conexao.close()
+            return
+
+        livres = self._livres()
+        if len(livres) < self.tamanho:
+            livres.append(conexao)
+        else:
+            conexao.close()
+
+    def fechar(self) -> None:
+        """
+        Fecha as conexões inativas da thread atual e invalida as das restantes.
+
+        As conexões inativas de outras threads são fechadas pela própria thread
+        na próxima vez que usar o pool.
+        """
+        livres = self._livres()
+        self._geracao += 1
+        for conexao in livres:
+            conexao.close()
+        livres.clear()
+
+
+_pool = PoolConexoes()
+
+
+def configurar_pool(caminho: Optional[str] = None, tamanho: int = TAMANHO_POOL_PADRAO,
+                    perfil: Optional[str] = None, migrar: bool = True) -> PoolConexoes:
+    """
+    Substitui o pool de conexões usado por `obter_cursor`.
+
+    Parâmetros:
+        caminho (str, opcional): Ficheiro da base de dados (padrão: base da aplicação).
+        tamanho (int): Conexões inativas mantidas por thread (0 desativa o pool).
+        perfil (str, opcional): Perfil de PRAGMAs das novas conexões (padrão: perfil ativo).
+        migrar (bool): Se True, aplica as migrações pendentes na primeira conexão.
+
+    Retorna:
+        PoolConexoes: O novo pool ativo.
+    """
+    global _pool
+    _pool.fechar()
+    _pool = PoolConexoes(caminho, tamanho, perfil, migrar)
+    return _pool
+
+
+def obter_pool() -> PoolConexoes:
+    """
+    Retorna o pool de conexões atualmente em uso.
+
+    Retorna:
+        PoolConexoes: Pool usado por `obter_cursor`.
+    """
+    return _pool
+
+
 @contextmanager
 def obter_cursor(commit: bool = False):
     """
     Context manager para obter um cursor da base de dados SQLite.
 
     Este cursor retorna resultados como dicionários (sqlite3.Row).
-    Fecha automaticamente o cursor e a conexão no final do bloco.
-    Faz commit se commit=True, ou rollback em caso de erro.
+    A conexão é obtida do pool de conexões da thread atual e devolvida no
+    final do bloco; o cursor é fechado automaticamente.
+    Faz commit se commit=True, ou rollback em caso de erro. Alterações não
+    confirmadas são sempre desfeitas ao devolver a conexão ao pool.
+    Com a instrumentação ativa (ver `controllers.instrumentacao_bd`), o cursor
+    mede a latência de cada instrução executada.
 
     Parâmetros:
         commit (bool): Se True, aplica commit no final do bloco (padrão=False).
@@ -30,15 +202,12 @@ def obter_cursor(commit: bool = False):
         ConnectionError: Se a conexão ao banco de dados falhar.
         Repropaga qualquer exceção ocorrida durante a execução do bloco.
     """
-    conexao = conectar_base_dados()
-    if conexao is None:
-        logger.error("Não foi possível conectar ao banco de dados.")
-        raise ConnectionError("Falha na conexão com o banco de dados.")
-
-    # Define o row_factory para devolver dicionários
-    conexao.row_factory = sqlite3.Row
+    pool = _pool
+    conexao = pool.obter()
 
     cursor = conexao.cursor()
+    if instrumentacao_bd.ativa:
+        cursor = instrumentacao_bd.CursorInstrumentado(cursor)
     try:
         yield cursor
         if commit:
@@ -48,7 +217,7 @@ def obter_cursor(commit: bool = False):
         raise
     finally:
         cursor.close()
-        conexao.close()
+        pool.devolver(conexao)
 
 
 def executar_query_valor_unico(query: str, parametros: Optional[tuple] = None) -> Any:
@@ -73,3 +242,31 @@ def executar_query_valor_unico(query: str, parametros: Optional[tuple] = None) -
     except Exception:
         logger.exception("Erro ao executar query escalar: %s", query)
         return None
+
+
+def versao_tabelas(*tabelas: str) -> Optional[tuple]:
+    """
+    Retorna uma chave que muda sempre que alguma das tabelas é alterada.
+
+    Lê os contadores de `alteracoes_tabelas` (incrementados por triggers, ver
+    migração 8), pelo que apanha as escritas de qualquer conexão ou processo,
+    incluindo as importações em lote. A chave inclui o pool ativo, para que
+    bases de dados diferentes nunca partilhem a mesma chave. Usada pelas
+    caches em memória para saber quando devem ser descartadas.
+
+    Parâmetros:
+        *tabelas (str): Tabelas monitorizadas (ver `db.migracoes.TABELAS_MONITORIZADAS`).
+
+    Retorna:
+        tuple: (pool, versão de cada tabela pela ordem dada), ou None em caso de
+        erro (quem usa a chave não deve guardar nada em cache).
+    """
+    marcadores = ", ".join("?" * len(tabelas))
+    try:
+        with obter_cursor() as cursor:
+            cursor.execute(f"SELECT tabela, versao FROM alteracoes_tabelas WHERE tabela IN ({marcadores})", tabelas)
+            versoes = dict(cursor.fetchall())
+    except Exception:
+        logger.exception("Erro ao ler a versão das tabelas %s.", ", ".join(tabelas))
+        return None
+    return (_pool,) + tuple(versoes.get(tabela, 0) for tabela in tabelas)
@@ -5,10 +5,12 @@ Inclui funções CRUD, marcação de manutenção e exportação para CSV.
 """
 
 import logging
-import csv
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional
 from db.conexao import conectar_base_dados
 from controllers.utils_bd import obter_cursor
+from controllers.exportacao.exportacao_csv import exportar_consulta_csv
+from controllers.exportacao.exportacao_xlsx import exportar_consulta_xlsx
+from controllers.importacao.importacao_csv import Preparar, importar_csv
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,72 @@ def listar_veiculos_bd() -> List[Dict]:
         logger.exception("Erro ao buscar veículos.")
         return []
 
+def listar_veiculos_disponiveis_bd(data_inicio: str, data_fim: str, categoria: Optional[str] = None,
+                                   transmissao: Optional[str] = None, tipo: Optional[str] = None,
+                                   lugares_min: Optional[int] = None, diaria_min: Optional[float] = None,
+                                   diaria_max: Optional[float] = None, limite: Optional[int] = None) -> List[Dict]:
+    """
+    Retorna os veículos livres num período, com filtros opcionais, ordenados pela diária.
+
+    Um veículo está livre se o seu estado for 'disponível' (não está em
+    manutenção) e não tiver nenhuma reserva ativa (Pendente/Confirmada/Reservado)
+    que se sobreponha a [data_inicio, data_fim]. A verificação de reservas usa o
+    índice parcial das reservas ativas (uma pesquisa por veículo).
+
+    Só são lidas as colunas mostradas na pesquisa ao balcão (sem km e datas de
+    revisão/inspeção), todas guardadas no índice de cobertura
+    idx_veiculos_disponiveis: a tabela de veículos não chega a ser lida.
+
+    Args:
+        data_inicio (str): Início do período (AAAA-MM-DD)
+        data_fim (str): Fim do período (AAAA-MM-DD)
+        categoria (str, opcional): Categoria exata (ex: "SUV")
+        transmissao (str, opcional): Transmissão exata (ex: "Automática")
+        tipo (str, opcional): Tipo/combustível exato (ex: "Diesel")
+        lugares_min (int, opcional): Número mínimo de lugares
+        diaria_min (float, opcional): Diária mínima
+        diaria_max (float, opcional): Diária máxima
+        limite (int, opcional): Número máximo de veículos devolvidos (os mais baratos)
+
+    Returns:
+        List[Dict]: Veículos disponíveis, da diária mais baixa para a mais alta
+    """
+    # Filtros a None não restringem nada. Os estados das reservas são literais para o
+    # planeador usar o índice parcial idx_reservas_ativas_veiculo (os mesmos de
+    # reservas_repositorio.ESTADOS_ATIVOS)
+    sql = """
+        SELECT v.id, v.marca, v.modelo, v.matricula, v.ano, v.categoria, v.transmissao, v.tipo,
+               v.lugares, v.diaria, v.imagem
+        FROM Veiculos v
+        WHERE v.estado = 'disponível'
+          AND (:categoria IS NULL OR v.categoria = :categoria)
+          AND (:transmissao IS NULL OR v.transmissao = :transmissao)
+          AND (:tipo IS NULL OR v.tipo = :tipo)
+          AND (:lugares_min IS NULL OR v.lugares >= :lugares_min)
+          AND (:diaria_min IS NULL OR v.diaria >= :diaria_min)
+          AND (:diaria_max IS NULL OR v.diaria <= :diaria_max)
+          AND NOT EXISTS (
+              SELECT 1 FROM Reservas r
+              WHERE r.id_veiculo = v.id AND r.estado IN ('Pendente', 'Confirmada', 'Reservado')
+                AND r.data_inicio <= :data_fim AND r.data_fim >= :data_inicio
+          )
+        ORDER BY v.diaria, v.id
+        LIMIT COALESCE(:limite, -1)
+    """
+    parametros = {
+        "data_inicio": data_inicio, "data_fim": data_fim, "categoria": categoria,
+        "transmissao": transmissao, "tipo": tipo, "lugares_min": lugares_min,
+        "diaria_min": diaria_min, "diaria_max": diaria_max, "limite": limite,
+    }
+    try:
+        with obter_cursor() as cursor:
+            cursor.execute(sql, parametros)
+            colunas = [desc[0] for desc in cursor.description]
+            return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+    except Exception:
+        logger.exception("Erro ao procurar veículos disponíveis.")
+        return []
+
 def buscar_veiculo_por_id(veiculo_id: int) -> Optional[Dict]:
     """
     Busca um veículo pelo ID.
@@ -196,25 +264,85 @@ def marcar_veiculo_manutencao_bd(veiculo_id: int) -> bool:
         logger.exception("Erro ao marcar manutenção para veículo ID %s.", veiculo_id)
         return False
 
-def exportar_veiculos_para_csv(caminho: str = "veiculos_export.csv") -> bool:
+def exportar_veiculos_para_csv(caminho: str = "veiculos_export.csv",
+                               progresso: Optional[Callable[[int], None]] = None,
+                               cancelado: Optional[Callable[[], bool]] = None) -> bool:
     """
-    Exporta todos os veículos para um ficheiro CSV.
+    Exporta todos os veículos para um ficheiro CSV, em lotes (memória constante).
 
     Args:
         caminho (str): Caminho do ficheiro CSV
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True
 
     Returns:
         bool: True se exportado com sucesso, False caso contrário
     """
-    lista = listar_veiculos_bd()
-    if not lista:
-        return False
-    try:
-        with open(caminho, "w", newline="", encoding="utf-8") as f:
-            escritor = csv.DictWriter(f, fieldnames=lista[0].keys())
-            escritor.writeheader()
-            escritor.writerows(lista)
-        return True
-    except Exception:
-        logger.exception("Erro ao exportar veículos.")
-        return False
+    linhas = exportar_consulta_csv(caminho, "SELECT * FROM Veiculos ORDER BY id",
+                                   progresso=progresso, cancelado=cancelado)
+    return bool(linhas)
+
+def exportar_veiculos_para_xlsx(caminho: str = "veiculos_export.xlsx",
+                                progresso: Optional[Callable[[int], None]] = None,
+                                cancelado: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Exporta todos os veículos para um ficheiro Excel, em lotes (memória constante).
+
+    Args:
+        caminho (str): Caminho do ficheiro XLSX
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True
+
+    Returns:
+        bool: True se exportado com sucesso, False caso contrário
+    """
+    sql = """
+        SELECT id, marca, modelo, matricula, ano, km_atual, categoria, transmissao, tipo, lugares,
+               diaria, estado, data_ultima_revisao, data_proxima_revisao,
+               data_ultima_inspecao, data_proxima_inspecao, imagem
+        FROM Veiculos ORDER BY id
+    """
+    linhas = exportar_consulta_xlsx(
+        caminho, sql,
+        cabecalho=["ID", "Marca", "Modelo", "Matrícula", "Ano", "Km", "Categoria", "Transmissão", "Tipo",
+                   "Lugares", "Diária", "Estado", "Última Revisão", "Próxima Revisão",
+                   "Última Inspeção", "Próxima Inspeção", "Imagem"],
+        tipos=["inteiro", "texto", "texto", "texto", "inteiro", "inteiro", "texto", "texto", "texto",
+               "inteiro", "moeda", "texto", "data", "data", "data", "data", "texto"],
+        folha="Veículos", progresso=progresso, cancelado=cancelado,
+    )
+    return bool(linhas)
+
+
+def importar_veiculos_csv_bd(caminho: str, preparar: Preparar, caminho_rejeicoes: Optional[str] = None,
+                             progresso: Optional[Callable[[int], None]] = None,
+                             cancelado: Optional[Callable[[], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Importa veículos de um ficheiro CSV, em lotes de `executemany`.
+
+    Matrículas já existentes (ou repetidas no ficheiro) são rejeitadas pela
+    base de dados e ficam no relatório de rejeições.
+
+    Args:
+        caminho (str): Ficheiro CSV com as colunas dos veículos (km_atual é opcional)
+        preparar (Preparar): Valida uma linha e devolve os valores pela ordem do INSERT
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já lidas
+        cancelado (Callable[[], bool], opcional): Interrompe a importação quando devolve True
+
+    Returns:
+        Optional[Dict[str, Any]]: Resultado de `importacao_csv.importar_csv`, ou None em caso de erro
+    """
+    sql = """
+    INSERT INTO Veiculos (marca, modelo, matricula, ano, km_atual,
+                          data_ultima_revisao, data_proxima_revisao, categoria,
+                          transmissao, tipo, lugares, imagem, diaria,
+                          data_ultima_inspecao, data_proxima_inspecao, estado)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    return importar_csv(
+        caminho, sql,
+        ["marca", "modelo", "matricula", "ano", "data_ultima_revisao", "data_proxima_revisao", "categoria",
+         "transmissao", "tipo", "lugares", "imagem", "diaria", "data_ultima_inspecao", "data_proxima_inspecao"],
+        preparar, caminho_rejeicoes=caminho_rejeicoes, progresso=progresso, cancelado=cancelado,
+    )
@@ -5,7 +5,9 @@ Valida os dados e interage com o repositório.
 """
 
 import logging
+from collections.abc import Callable
 from controllers.veiculos import veiculos_validacoes, veiculos_repositorio
+from controllers.reservas import reservas_ocupacao
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,73 @@ def obter_veiculos_servico() -> list:
     return veiculos_repositorio.listar_veiculos_bd()
 
 
+def obter_veiculo_por_id_servico(veiculo_id: int) -> dict | None:
+    """
+    Retorna um veículo pelo ID (uma consulta pela chave primária).
+
+    Args:
+        veiculo_id (int): ID do veículo
+
+    Returns:
+        dict | None: Dados do veículo ou None se o ID for inválido ou não existir
+    """
+    try:
+        veiculo_id = int(veiculo_id)
+    except (TypeError, ValueError):
+        return None
+    return veiculos_repositorio.buscar_veiculo_por_id(veiculo_id)
+
+
+def procurar_veiculos_disponiveis_servico(data_inicio: str, data_fim: str, categoria: str | None = None,
+                                          transmissao: str | None = None, tipo: str | None = None,
+                                          lugares_min: int | None = None, diaria_min: float | None = None,
+                                          diaria_max: float | None = None, limite: int | None = None) -> list:
+    """
+    Procura os veículos livres num período, ordenados pela diária.
+
+    Filtros de texto vazios são ignorados.
+
+    Args:
+        data_inicio (str): Data de início (AAAA-MM-DD)
+        data_fim (str): Data de fim (AAAA-MM-DD), igual ou posterior ao início
+        categoria (str, opcional): Categoria do veículo
+        transmissao (str, opcional): Tipo de transmissão
+        tipo (str, opcional): Tipo de combustível
+        lugares_min (int, opcional): Número mínimo de lugares
+        diaria_min (float, opcional): Diária mínima
+        diaria_max (float, opcional): Diária máxima
+        limite (int, opcional): Número máximo de veículos (ex.: os 50 mais baratos, para o balcão)
+
+    Returns:
+        list: Lista de dicionários com os veículos disponíveis (vazia se os dados forem inválidos)
+    """
+    if not (veiculos_validacoes.validar_data(data_inicio) and veiculos_validacoes.validar_data(data_fim)) \
+            or data_fim < data_inicio:
+        logger.error("Período inválido na pesquisa de disponibilidade: %s a %s", data_inicio, data_fim)
+        return []
+    if lugares_min is not None and not veiculos_validacoes.validar_inteiro(lugares_min, 1):
+        logger.error("Número mínimo de lugares inválido: %s", lugares_min)
+        return []
+    if limite is not None and not veiculos_validacoes.validar_inteiro(limite, 1):
+        logger.error("Limite inválido na pesquisa de disponibilidade: %s", limite)
+        return []
+    for diaria in (diaria_min, diaria_max):
+        if diaria is not None and not veiculos_validacoes.validar_decimal(diaria, 0):
+            logger.error("Diária inválida na pesquisa de disponibilidade: %s", diaria)
+            return []
+
+    textos = {nome: (valor.strip() or None) if isinstance(valor, str) else valor
+              for nome, valor in (("categoria", categoria), ("transmissao", transmissao), ("tipo", tipo))}
+    return veiculos_repositorio.listar_veiculos_disponiveis_bd(
+        data_inicio, data_fim,
+        lugares_min=None if lugares_min is None else int(lugares_min),
+        diaria_min=None if diaria_min is None else float(diaria_min),
+        diaria_max=None if diaria_max is None else float(diaria_max),
+        limite=None if limite is None else int(limite),
+        **textos
+    )
+
+
 def adicionar_veiculo_servico(**dados) -> int | None:
     """
     Valida e insere um veículo na base de dados.
@@ -41,6 +110,8 @@ def adicionar_veiculo_servico(**dados) -> int | None:
     dados.setdefault("estado", "disponível")
     veiculo_id = veiculos_repositorio.inserir_veiculo_bd(dados)
     logger.info("Veículo inserido com ID %s", veiculo_id)
+    # A matriz de ocupação tem uma linha por veículo
+    reservas_ocupacao.invalidar_matriz()
     return veiculo_id
 
 
@@ -68,7 +139,11 @@ def atualizar_veiculo_servico(veiculo_id: int, **dados) -> bool:
         logger.error("Falha na validação dos dados para atualização: %s", dados_atualizados)
         return False
 
-    return veiculos_repositorio.atualizar_veiculo_bd(dados_atualizados)
+    atualizado = veiculos_repositorio.atualizar_veiculo_bd(dados_atualizados)
+    if atualizado:
+        # A categoria pode ter mudado (utilização por categoria)
+        reservas_ocupacao.invalidar_matriz()
+    return atualizado
 
 
 def remover_veiculo_servico(veiculo_id: int) -> bool:
@@ -83,7 +158,10 @@ def remover_veiculo_servico(veiculo_id: int) -> bool:
     """
     if not veiculos_validacoes.validar_inteiro(veiculo_id, 1):
         return False
-    return veiculos_repositorio.remover_veiculo_bd(veiculo_id)
+    removido = veiculos_repositorio.remover_veiculo_bd(veiculo_id)
+    if removido:
+        reservas_ocupacao.invalidar_matriz()
+    return removido
 
 
 def marcar_veiculo_manutencao_servico(veiculo_id: int) -> bool:
@@ -101,17 +179,66 @@ def marcar_veiculo_manutencao_servico(veiculo_id: int) -> bool:
     return veiculos_repositorio.marcar_veiculo_manutencao_bd(veiculo_id)
 
 
-def exportar_veiculos_servico(caminho: str = "veiculos_export.csv") -> bool:
+def exportar_veiculos_servico(caminho: str = "veiculos_export.csv",
+                              progresso: Callable[[int], None] | None = None,
+                              cancelado: Callable[[], bool] | None = None) -> bool:
     """
     Exporta todos os veículos para um ficheiro CSV.
 
     Args:
         caminho (str): Caminho do ficheiro CSV
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True
 
     Returns:
         bool: True se exportado com sucesso
     """
-    return veiculos_repositorio.exportar_veiculos_para_csv(caminho)
+    return veiculos_repositorio.exportar_veiculos_para_csv(caminho, progresso, cancelado)
+
+
+def exportar_veiculos_xlsx_servico(caminho: str = "veiculos_export.xlsx",
+                                   progresso: Callable[[int], None] | None = None,
+                                   cancelado: Callable[[], bool] | None = None) -> bool:
+    """
+    Exporta todos os veículos para um ficheiro Excel.
+
+    Args:
+        caminho (str): Caminho do ficheiro XLSX
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já escritas
+        cancelado (Callable[[], bool], opcional): Interrompe a exportação quando devolve True
+
+    Returns:
+        bool: True se exportado com sucesso
+    """
+    return veiculos_repositorio.exportar_veiculos_para_xlsx(caminho, progresso, cancelado)
+
+
+def importar_veiculos_servico(caminho: str, caminho_rejeicoes: str | None = None,
+                              progresso: Callable[[int], None] | None = None,
+                              cancelado: Callable[[], bool] | None = None) -> dict | None:
+    """
+    Importa veículos de um ficheiro CSV (ex.: a frota de outro sistema).
+
+    Cada linha é validada como no formulário; km_atual é opcional (0 por defeito)
+    e os veículos importados ficam disponíveis.
+
+    Args:
+        caminho (str): Ficheiro CSV a importar
+        caminho_rejeicoes (str, opcional): CSV onde escrever as linhas rejeitadas e o motivo
+        progresso (Callable[[int], None], opcional): Recebe o número de linhas já lidas
+        cancelado (Callable[[], bool], opcional): Interrompe a importação quando devolve True
+
+    Returns:
+        dict | None: Linhas lidas, inseridas e rejeitadas (com os motivos), ou None em caso de erro
+    """
+    resultado = veiculos_repositorio.importar_veiculos_csv_bd(
+        caminho, _preparar_veiculo_importacao, caminho_rejeicoes, progresso, cancelado)
+    if resultado is None:
+        logger.error("Falha ao importar veículos de %s", caminho)
+    # Sem resultado (erro a meio) os lotes anteriores podem ter ficado gravados
+    if resultado is None or resultado["inseridas"]:
+        reservas_ocupacao.invalidar_matriz()
+    return resultado
 
 
 # -------------------- Métodos Auxiliares --------------------
@@ -149,6 +276,18 @@ def _validar_veiculo(d: dict, incluir_id=False) -> bool:
     return all(validacoes)
 
 
+def _preparar_veiculo_importacao(linha: dict) -> tuple[tuple | None, str]:
+    """Valida uma linha do CSV de importação com as mesmas regras do formulário."""
+    dados = dict(linha)
+    km_atual = (dados.get("km_atual") or "0").strip()
+    if not veiculos_validacoes.validar_inteiro(km_atual, 0):
+        return None, "Quilometragem inválida."
+    dados["km_atual"] = int(km_atual)
+    if not _validar_veiculo(dados):
+        return None, "Campos do veículo em falta ou inválidos."
+    return _preparar_valores_para_insercao(dados), ""
+
+
 def _preparar_valores_para_insercao(d: dict) -> tuple:
     """Prepara os valores do veículo para inserção no banco de dados."""
     return (
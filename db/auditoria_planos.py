@@ -0,0 +1,242 @@
+"""
+Auditoria de planos de execução (EXPLAIN QUERY PLAN) do SQL da aplicação.
+
+Recolhe todas as instruções SQL literais dos repositórios
+(`controllers/*/*_repositorio.py`) e de `utils/alerta.py`, executa cada uma
+com `EXPLAIN QUERY PLAN` sobre uma base de dados temporária com volume
+realista e assinala:
+    - SCAN: leitura completa de uma tabela sem índice;
+    - TEMP B-TREE: ordenação/agrupamento feito numa árvore temporária;
+    - AUTOMATIC INDEX: índice criado em tempo de execução pelo SQLite.
+
+Os achados já conhecidos e aceites ficam em `auditoria_planos_base.json`;
+só os achados novos fazem a auditoria falhar (ver tests/test_auditoria_planos.py).
+
+Uso (a partir da raiz do projeto):
+    python -m db.auditoria_planos [--reservas 200000] [--atualizar-base]
+"""
+
+import ast
+import glob
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from db.dados_sinteticos import gerar_dados_sinteticos
+from db.migracoes import aplicar_migracoes
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CAMINHO_BASE_ACHADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "auditoria_planos_base.json")
+
+PADROES_FICHEIROS = (
+    "controllers/*/*_repositorio.py",
+    "utils/alerta.py",
+)
+INICIO_SQL = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+METODOS_LOG = {"debug", "info", "warning", "error", "exception", "critical"}
+
+
+# -------------------- Recolha do SQL --------------------
+
+def recolher_sql(diretorio: str = DIRETORIO_PROJETO) -> List[Dict[str, str]]:
+    """
+    Recolhe as instruções SQL literais dos ficheiros auditados.
+
+    Cada literal de texto que começa por SELECT/INSERT/UPDATE/DELETE/WITH
+    é associado à função onde aparece. Mensagens passadas ao logger são ignoradas.
+
+    Args:
+        diretorio (str): Raiz do projeto.
+
+    Returns:
+        List[Dict[str, str]]: Entradas com as chaves ficheiro, funcao e sql.
+    """
+    instrucoes = []
+    for padrao in PADROES_FICHEIROS:
+        for caminho in sorted(glob.glob(os.path.join(diretorio, padrao))):
+            relativo = os.path.relpath(caminho, diretorio).replace(os.sep, "/")
+            with open(caminho, encoding="utf-8") as f:
+                arvore = ast.parse(f.read())
+            mensagens_log = {
+                id(argumento)
+                for no in ast.walk(arvore)
+                if isinstance(no, ast.Call) and isinstance(no.func, ast.Attribute) and no.func.attr in METODOS_LOG
+                for argumento in no.args
+            }
+            for funcao in ast.walk(arvore):
+                if not isinstance(funcao, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                for no in ast.walk(funcao):
+                    if (isinstance(no, ast.Constant) and isinstance(no.value, str) and id(no) not in mensagens_log
+                            and no.value.strip().upper().startswith(INICIO_SQL)):
+                        instrucoes.append({"ficheiro": relativo, "funcao": funcao.name, "sql": no.value.strip()})
+    return instrucoes
+
+
+# -------------------- Base de dados de auditoria --------------------
+
+def criar_base_auditoria(caminho: str, total_reservas: int) -> sqlite3.Connection:
+    """
+    Cria uma base de dados com o esquema atual e volume realista.
+
+    Args:
+        caminho (str): Ficheiro a criar.
+        total_reservas (int): Número de reservas a gerar (as restantes tabelas
+            são dimensionadas em proporção).
+
+    Returns:
+        sqlite3.Connection: Conexão aberta para a base criada (com ANALYZE feito).
+    """
+    conexao = sqlite3.connect(caminho)
+    aplicar_migracoes(conexao)
+    gerar_dados_sinteticos(
+        conexao, clientes=max(50, total_reservas // 40), veiculos=max(20, total_reservas // 1000),
+        reservas=total_reservas, pagamentos=total_reservas * 3 // 2, manutencoes=max(10, total_reservas // 20),
+        semente=7, data_referencia=date(2025, 1, 1),
+    )
+    conexao.execute("ANALYZE")
+    conexao.commit()
+    return conexao
+
+
+# -------------------- Auditoria --------------------
+
+def _classificar(detalhe: str) -> Optional[str]:
+    """Classifica uma linha do plano de execução, ou devolve None se não for problema."""
+    if "AUTOMATIC" in detalhe and "INDEX" in detalhe:
+        return "AUTOMATIC INDEX"
+    if "USE TEMP B-TREE" in detalhe:
+        return "TEMP B-TREE"
+    # "SCAN CONSTANT ROW" é o SELECT sem FROM que envolve subconsultas escalares
+    if detalhe.startswith("SCAN ") and " USING " not in detalhe and detalhe != "SCAN CONSTANT ROW":
+        return "SCAN"
+    return None
+
+
+def chave_achado(achado: Dict[str, str]) -> str:
+    """
+    Devolve a chave estável de um achado (usada na base de achados aceites).
+
+    Args:
+        achado (Dict[str, str]): Achado devolvido por `auditar`.
+
+    Returns:
+        str: "ficheiro::funcao::tipo::detalhe".
+    """
+    return "::".join((achado["ficheiro"], achado["funcao"], achado["tipo"], achado["detalhe"]))
+
+
+def auditar(conexao: sqlite3.Connection, instrucoes: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+    """
+    Executa EXPLAIN QUERY PLAN para cada instrução e devolve os achados.
+
+    Args:
+        conexao (sqlite3.Connection): Base de dados de auditoria.
+        instrucoes (List[Dict[str, str]], opcional): Instruções a auditar.
+            Por defeito, as recolhidas por `recolher_sql`.
+
+    Returns:
+        List[Dict[str, str]]: Achados com as chaves ficheiro, funcao, tipo,
+        detalhe e sql. Os parâmetros (`?` ou `:nome`) são ligados a NULL.
+        Instruções que não compilam geram um achado do tipo ERRO.
+    """
+    achados = []
+    for instrucao in instrucoes if instrucoes is not None else recolher_sql():
+        sql = instrucao["sql"]
+        nomes = re.findall(r"(?<!:):([A-Za-z_]\w*)", sql)
+        parametros = dict.fromkeys(nomes) if nomes else (None,) * sql.count("?")
+        try:
+            plano = conexao.execute("EXPLAIN QUERY PLAN " + sql, parametros).fetchall()
+        except sqlite3.Error as erro:
+            plano = [(0, 0, 0, f"ERRO: {erro}")]
+        for linha in plano:
+            detalhe = linha[3]
+            tipo = "ERRO" if detalhe.startswith("ERRO") else _classificar(detalhe)
+            if tipo:
+                achados.append({
+                    "ficheiro": instrucao["ficheiro"], "funcao": instrucao["funcao"],
+                    "tipo": tipo, "detalhe": detalhe, "sql": sql,
+                })
+    return achados
+
+
+def carregar_base_achados(caminho: str = CAMINHO_BASE_ACHADOS) -> List[str]:
+    """
+    Lê as chaves dos achados aceites.
+
+    Args:
+        caminho (str): Ficheiro JSON da base de achados.
+
+    Returns:
+        List[str]: Chaves aceites (lista vazia se o ficheiro não existir).
+    """
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def achados_novos(achados: List[Dict[str, str]], aceites: List[str]) -> List[Dict[str, str]]:
+    """
+    Filtra os achados que não constam da base de achados aceites.
+
+    Args:
+        achados (List[Dict[str, str]]): Achados devolvidos por `auditar`.
+        aceites (List[str]): Chaves aceites.
+
+    Returns:
+        List[Dict[str, str]]: Achados novos.
+    """
+    aceites = set(aceites)
+    return [achado for achado in achados if chave_achado(achado) not in aceites]
+
+
+def executar_auditoria(total_reservas: int) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Cria a base de auditoria temporária, audita o SQL e remove a base.
+
+    Args:
+        total_reservas (int): Volume de reservas da base de auditoria.
+
+    Returns:
+        Tuple[List, List]: Todos os achados e os achados novos.
+    """
+    diretorio = tempfile.mkdtemp(prefix="luxury_wheels_auditoria_")
+    try:
+        conexao = criar_base_auditoria(os.path.join(diretorio, "auditoria.db"), total_reservas)
+        achados = auditar(conexao)
+        conexao.close()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return achados, achados_novos(achados, carregar_base_achados())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservas", type=int, default=200_000, help="Reservas na base de auditoria.")
+    parser.add_argument("--atualizar-base", action="store_true",
+                        help="Grava os achados atuais como aceites.")
+    args = parser.parse_args()
+
+    todos, novos = executar_auditoria(args.reservas)
+    chaves_novas = {chave_achado(achado) for achado in novos}
+    for achado in todos:
+        marca = "NOVO " if chave_achado(achado) in chaves_novas else "     "
+        print(f"{marca}{achado['tipo']:<16}{achado['ficheiro']}::{achado['funcao']}  {achado['detalhe']}")
+    print(f"\n{len(todos)} achado(s), {len(novos)} novo(s).")
+
+    if args.atualizar_base:
+        with open(CAMINHO_BASE_ACHADOS, "w", encoding="utf-8") as f:
+            json.dump(sorted({chave_achado(achado) for achado in todos}), f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Base de achados atualizada: {CAMINHO_BASE_ACHADOS}")
+    elif novos:
+        sys.exit(1)
@@ -1,19 +1,120 @@
 import sqlite3
 import os
+from typing import Dict, Optional, Union
 
-def conectar_base_dados() -> sqlite3.Connection:
+DIRETORIO_BASE = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_BASE_DADOS = os.path.join(DIRETORIO_BASE, "luxury_wheels.db")
+
+# -------------------- Perfis de conexão --------------------
+# Cada perfil define os PRAGMAs aplicados a todas as conexões abertas.
+# - durable: WAL com synchronous=FULL, nenhuma transação confirmada se perde.
+# - fast: WAL com synchronous=NORMAL, cache maior, mmap e temporários em memória.
+# - readonly-analytics: igual ao fast com cache/mmap maiores e escrita bloqueada.
+PERFIS_CONEXAO: Dict[str, Dict[str, Union[str, int]]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,  # valores negativos são em KiB (~16 MB)
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "readonly-analytics": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -256000,
+        "mmap_size": 1073741824,  # 1 GB
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+        "query_only": "ON",
+    },
+}
+
+PERFIL_PADRAO = "durable"
+_perfil_ativo = os.environ.get("LUXURY_WHEELS_PERFIL_BD", PERFIL_PADRAO)
+
+
+def definir_perfil_conexao(nome: str) -> None:
+    """
+    Define o perfil de PRAGMAs aplicado às novas conexões.
+
+    O perfil inicial é lido da variável de ambiente `LUXURY_WHEELS_PERFIL_BD`
+    (padrão: "durable"). Conexões já abertas mantêm o perfil anterior.
+
+    Args:
+        nome (str): Nome de um perfil existente em `PERFIS_CONEXAO`.
+
+    Exceções:
+        ValueError: Se o perfil não existir.
+    """
+    global _perfil_ativo
+    if nome not in PERFIS_CONEXAO:
+        raise ValueError(f"Perfil de conexão desconhecido: {nome}")
+    _perfil_ativo = nome
+
+
+def obter_perfil_conexao() -> str:
+    """
+    Retorna o nome do perfil de conexão ativo.
+
+    Returns:
+        str: Nome do perfil.
+    """
+    return _perfil_ativo
+
+
+def aplicar_perfil(conexao: sqlite3.Connection, nome: Optional[str] = None) -> None:
+    """
+    Aplica os PRAGMAs de um perfil a uma conexão aberta.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão a configurar.
+        nome (str, opcional): Perfil a aplicar. Por defeito, o perfil ativo.
+
+    Exceções:
+        ValueError: Se o perfil não existir.
+    """
+    nome = nome or _perfil_ativo
+    perfil = PERFIS_CONEXAO.get(nome)
+    if perfil is None:
+        raise ValueError(f"Perfil de conexão desconhecido: {nome}")
+    # journal_mode tem de ser aplicado antes de query_only bloquear escritas
+    for pragma, valor in perfil.items():
+        conexao.execute(f"PRAGMA {pragma} = {valor}")
+
+
+def conectar_base_dados(caminho: Optional[str] = None, perfil: Optional[str] = None) -> sqlite3.Connection:
     """
     Estabelece uma conexão com a base de dados SQLite.
 
-    A base de dados é localizada no mesmo diretório deste script e
-    o ficheiro deve ser chamado 'luxury_wheels.db'.
+    Por defeito a base de dados é localizada no mesmo diretório deste script e
+    o ficheiro deve ser chamado 'luxury_wheels.db'. A conexão é configurada
+    com os PRAGMAs do perfil de conexão ativo (ver `PERFIS_CONEXAO`).
+
+    Args:
+        caminho (str, opcional): Caminho alternativo para o ficheiro da base de dados
+            (usado, por exemplo, em testes e benchmarks).
+        perfil (str, opcional): Perfil a aplicar em vez do perfil ativo.
 
     Returns:
         sqlite3.Connection: Objeto de conexão com a base de dados.
 
     Exceções:
         sqlite3.Error: Lança exceção se houver erro ao tentar conectar.
+        ValueError: Se o perfil não existir.
     """
-    diretorio_base = os.path.dirname(os.path.abspath(__file__))
-    caminho_base_dados = os.path.join(diretorio_base, "luxury_wheels.db")
-    return sqlite3.connect(caminho_base_dados)
+    conexao = sqlite3.connect(caminho or CAMINHO_BASE_DADOS)
+    try:
+        aplicar_perfil(conexao, perfil)
+    except Exception:
+        conexao.close()
+        raise
+    return conexao
@@ -0,0 +1,340 @@
+"""
+Gerador determinístico de dados sintéticos em grande volume.
+
+Gera clientes, veículos, reservas, pagamentos e manutenções realistas para
+testar e medir a aplicação com volumes de produção (ex.: 2 milhões de
+reservas). A mesma semente, escala e data de referência produzem sempre os
+mesmos dados.
+
+Características dos dados:
+    - As reservas de cada veículo nunca se sobrepõem: são colocadas em
+      sequência, com pelo menos um dia livre entre reservas.
+    - O estado de cada reserva é coerente com a data de referência
+      (passadas: Concluída/Cancelada; em curso: Confirmada; futuras:
+      Pendente/Confirmada) e o valor_total é diária x dias.
+    - Os pagamentos são distribuídos pelas reservas (sinal e restante), com
+      data igual ou anterior ao início da reserva e valores que somam o
+      valor_total.
+
+As linhas são inseridas com `executemany` em lotes, numa transação por
+tabela e com os triggers da tabela suspensos (ver `_inserir`). Este módulo
+não abre conexões: recebe uma conexão com o esquema já criado (ver
+`db.migracoes`).
+
+Uso (a partir de `db/`):
+    python inserir_dados.py --sintetico --caminho grande.db --reservas 2000000
+"""
+
+import logging
+import random
+import sqlite3
+import time
+from array import array
+from datetime import date, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+try:
+    from db.migracoes import repor_triggers, suspender_triggers
+except ImportError:  # executado a partir de db/ (ver inserir_dados.py)
+    from migracoes import repor_triggers, suspender_triggers
+
+logger = logging.getLogger(__name__)
+
+ESCALA_PADRAO: Dict[str, int] = {
+    "clientes": 50_000,
+    "veiculos": 2_000,
+    "reservas": 2_000_000,
+    "pagamentos": 3_000_000,
+    "manutencoes": 100_000,
+}
+
+TAMANHO_LOTE_PADRAO = 20_000
+# Cache de páginas usada durante a carga (KiB); a reconstrução dos índices é muito sensível a este valor
+CACHE_CARGA_KIB = 256_000
+
+# Reservas futuras são geradas até este número de dias após a data de referência
+HORIZONTE_FUTURO_DIAS = 90
+DURACAO_MAXIMA_DIAS = 21
+INTERVALO_MAXIMO_DIAS = 30
+
+NOMES = ("João", "Maria", "Carlos", "Ana", "Pedro", "Sofia", "Miguel", "Inês", "Tiago", "Beatriz",
+         "Rui", "Catarina", "André", "Marta", "Luís", "Rita", "Nuno", "Joana", "Ricardo", "Filipa")
+APELIDOS = ("Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Rodrigues", "Martins",
+            "Sousa", "Fernandes", "Gonçalves", "Gomes", "Lopes", "Marques", "Alves", "Almeida")
+
+# (marca, modelo, categoria, tipo, lugares, diária base)
+CATALOGO_VEICULOS = (
+    ("Mitsubishi", "Pajero Sport", "SUV", "Diesel", 7, 95.0),
+    ("Mitsubishi", "Outlander", "SUV", "Diesel", 5, 70.0),
+    ("BMW", "Série 5", "Sedan", "Diesel", 5, 120.0),
+    ("Mercedes-Benz", "Classe E", "Sedan", "Híbrido", 5, 130.0),
+    ("Audi", "Q7", "SUV", "Diesel", 7, 150.0),
+    ("Porsche", "911 Carrera", "Desportivo", "Gasolina", 2, 350.0),
+    ("Tesla", "Model S", "Sedan", "Elétrico", 5, 160.0),
+    ("Range Rover", "Sport", "SUV", "Híbrido", 5, 180.0),
+    ("Ferrari", "Roma", "Desportivo", "Gasolina", 4, 450.0),
+    ("Volvo", "XC90", "SUV", "Híbrido", 7, 140.0),
+)
+TRANSMISSOES = ("Automática", "Automática", "Manual")
+DESCRICOES_MANUTENCAO = (
+    ("Mudança de óleo e filtros", 120.0), ("Revisão geral", 200.0), ("Substituição de pneus", 400.0),
+    ("Substituição de travões", 250.0), ("Inspeção periódica", 60.0), ("Reparação de carroçaria", 650.0),
+)
+
+
+def _lotes(linhas: Iterable[tuple], tamanho: int) -> Iterator[list]:
+    """Divide um iterável de linhas em listas de no máximo `tamanho` elementos."""
+    iterador = iter(linhas)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def _inserir(conexao: sqlite3.Connection, sql: str, linhas: Iterable[tuple], tamanho_lote: int) -> int:
+    """
+    Insere as linhas em lotes numa única transação.
+
+    Os índices secundários da tabela são removidos antes da carga e recriados
+    no fim, dentro da mesma transação: construir um índice de uma vez é muito
+    mais rápido do que mantê-lo linha a linha com chaves fora de ordem. Os
+    triggers também são suspensos: os contadores, os agregados mensais e as
+    versões das tabelas são atualizados uma vez no fim, para todas as linhas
+    (ver `db.migracoes.repor_triggers`). As linhas não entram no registo de
+    alterações: os consumidores da exportação incremental da tabela recebem
+    uma exportação completa na vez seguinte.
+
+    Returns:
+        int: Id da última linha inserida (as linhas recebem ids consecutivos).
+    """
+    tabela = sql.split()[2]
+    conexao.execute("BEGIN")
+    try:
+        anterior = conexao.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]
+        triggers = suspender_triggers(conexao, tabela)
+        indices = conexao.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (tabela,),
+        ).fetchall()
+        for nome, _ in indices:
+            conexao.execute(f'DROP INDEX "{nome}"')
+        for lote in _lotes(linhas, tamanho_lote):
+            conexao.executemany(sql, lote)
+        for _, criar in indices:
+            conexao.execute(criar)
+        ultimo = conexao.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]
+        repor_triggers(conexao, tabela, triggers, anterior + 1, ultimo, registar=False)
+        conexao.commit()
+    except Exception:
+        conexao.rollback()
+        raise
+    return ultimo
+
+
+def _datas(inicio: date, dias: int) -> Sequence[str]:
+    """Pré-calcula as datas ISO de `inicio` a `inicio + dias` (evita isoformat por linha)."""
+    return [(inicio + timedelta(days=d)).isoformat() for d in range(dias + 1)]
+
+
+def gerar_dados_sinteticos(conexao: sqlite3.Connection, clientes: int = ESCALA_PADRAO["clientes"],
+                           veiculos: int = ESCALA_PADRAO["veiculos"], reservas: int = ESCALA_PADRAO["reservas"],
+                           pagamentos: int = ESCALA_PADRAO["pagamentos"],
+                           manutencoes: int = ESCALA_PADRAO["manutencoes"], semente: int = 42,
+                           data_referencia: Optional[date] = None,
+                           tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> Dict[str, int]:
+    """
+    Gera e insere dados sintéticos na base de dados.
+
+    Os dados são acrescentados aos já existentes. As formas de pagamento
+    existentes são reutilizadas (são criadas as habituais se não houver nenhuma).
+
+    Args:
+        conexao (sqlite3.Connection): Conexão com o esquema criado e sem transação pendente.
+        clientes (int): Número de clientes.
+        veiculos (int): Número de veículos (pelo menos 1 se houver reservas).
+        reservas (int): Número de reservas, distribuídas pelos veículos.
+        pagamentos (int): Número de pagamentos, distribuídos pelas reservas.
+        manutencoes (int): Número de manutenções.
+        semente (int): Semente do gerador aleatório.
+        data_referencia (date, opcional): "Hoje" dos dados gerados. Por defeito, a data atual.
+        tamanho_lote (int): Linhas por chamada a `executemany`.
+
+    Returns:
+        Dict[str, int]: Linhas inseridas por tabela e o total de segundos ("segundos").
+
+    Exceções:
+        ValueError: Se houver reservas sem veículos/clientes ou pagamentos sem reservas.
+        sqlite3.Error: Repropaga erros da base de dados (a tabela em curso é desfeita).
+    """
+    if reservas and (not veiculos or not clientes):
+        raise ValueError("São necessários veículos e clientes para gerar reservas.")
+    if pagamentos and not reservas:
+        raise ValueError("São necessárias reservas para gerar pagamentos.")
+    if manutencoes and not veiculos:
+        raise ValueError("São necessários veículos para gerar manutenções.")
+
+    cache_original = conexao.execute("PRAGMA cache_size").fetchone()[0]
+    conexao.execute(f"PRAGMA cache_size = -{CACHE_CARGA_KIB}")
+    try:
+        return _gerar(conexao, clientes, veiculos, reservas, pagamentos, manutencoes,
+                      semente, data_referencia or date.today(), tamanho_lote)
+    finally:
+        conexao.execute(f"PRAGMA cache_size = {cache_original}")
+
+
+def _gerar(conexao: sqlite3.Connection, clientes: int, veiculos: int, reservas: int, pagamentos: int,
+           manutencoes: int, semente: int, referencia: date, tamanho_lote: int) -> Dict[str, int]:
+    """Corpo de `gerar_dados_sinteticos` (parâmetros já validados)."""
+    aleatorio = random.Random(semente)
+    inicio_total = time.perf_counter()
+
+    # Janela temporal: as reservas de cada veículo recuam a partir do horizonte futuro.
+    # Os dias são índices em `datas`; o histórico cobre o pior caso de duração + intervalo.
+    reservas_por_veiculo = -(-reservas // veiculos) if veiculos else 0
+    dias_historico = max(3 * 365, reservas_por_veiculo * (DURACAO_MAXIMA_DIAS + INTERVALO_MAXIMO_DIAS + 2))
+    dias_tipicos = max(3 * 365, reservas_por_veiculo * 12)
+    datas = _datas(referencia - timedelta(days=dias_historico), dias_historico + 2 * 365)
+    dia_referencia = dias_historico
+
+    # -------------------- Clientes --------------------
+    offset = conexao.execute("SELECT COALESCE(MAX(id), 0) FROM clientes").fetchone()[0]
+
+    def linhas_clientes():
+        for i in range(offset + 1, offset + clientes + 1):
+            nome, apelido = aleatorio.choice(NOMES), aleatorio.choice(APELIDOS)
+            yield (f"{nome} {apelido}", f"cliente{i}.s{semente}@exemplo.pt",
+                   f"9{aleatorio.randrange(10_000_000, 99_999_999)}", f"{200_000_000 + i}",
+                   f"{datas[dia_referencia - aleatorio.randrange(dias_tipicos)]} 10:00:00")
+
+    ultimo_cliente = _inserir(
+        conexao, "INSERT INTO clientes (nome, email, telefone, nif, data_registo) VALUES (?, ?, ?, ?, ?)",
+        linhas_clientes(), tamanho_lote,
+    )
+    primeiro_cliente = ultimo_cliente - clientes + 1
+
+    # -------------------- Veículos --------------------
+    offset = conexao.execute("SELECT COALESCE(MAX(id), 0) FROM veiculos").fetchone()[0]
+    diarias = array("d")
+    letras = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+    def linhas_veiculos():
+        for i in range(offset, offset + veiculos):
+            marca, modelo, categoria, tipo, lugares, diaria = aleatorio.choice(CATALOGO_VEICULOS)
+            diaria = round(diaria * aleatorio.uniform(0.9, 1.2), 2)
+            diarias.append(diaria)
+            ano = referencia.year - aleatorio.randint(0, 8)
+            ultima_revisao = dia_referencia - aleatorio.randint(0, 180)
+            ultima_inspecao = dia_referencia - aleatorio.randint(0, 365)
+            matricula = (f"Z{letras[i // 67600 % 26]}-{i % 100:02d}-"
+                         f"{letras[i // 2600 % 26]}{letras[i // 100 % 26]}")
+            estado = "Manutenção" if aleatorio.random() < 0.05 else "disponível"
+            yield (marca, modelo, matricula, ano, aleatorio.randint(1_000, 150_000),
+                   datas[ultima_revisao], datas[ultima_revisao + 182], categoria,
+                   aleatorio.choice(TRANSMISSOES), tipo, lugares, None, diaria,
+                   datas[ultima_inspecao], datas[ultima_inspecao + 365], estado)
+
+    ultimo_veiculo = _inserir(
+        conexao,
+        "INSERT INTO veiculos (marca, modelo, matricula, ano, km_atual, data_ultima_revisao, "
+        "data_proxima_revisao, categoria, transmissao, tipo, lugares, imagem, diaria, "
+        "data_ultima_inspecao, data_proxima_inspecao, estado) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        linhas_veiculos(), tamanho_lote,
+    )
+    primeiro_veiculo = ultimo_veiculo - veiculos + 1
+
+    # -------------------- Formas de pagamento --------------------
+    formas = [linha[0] for linha in conexao.execute("SELECT id FROM formaspagamento ORDER BY id")]
+    if not formas and pagamentos:
+        conexao.executemany("INSERT INTO formaspagamento (metodo) VALUES (?)",
+                            [("Cartão de Crédito",), ("Multibanco",), ("Paypal",), ("Dinheiro",)])
+        conexao.commit()
+        formas = [linha[0] for linha in conexao.execute("SELECT id FROM formaspagamento ORDER BY id")]
+
+    # -------------------- Reservas --------------------
+    # Guardados por reserva para gerar os pagamentos (arrays compactos, não listas)
+    inicios = array("i")
+    valores = array("d")
+
+    def linhas_reservas():
+        for indice_veiculo in range(veiculos):
+            quantidade = reservas // veiculos + (1 if indice_veiculo < reservas % veiculos else 0)
+            id_veiculo = primeiro_veiculo + indice_veiculo
+            diaria = diarias[indice_veiculo]
+            # Coloca as reservas do fim para o início, sem sobreposição
+            fim = dia_referencia + aleatorio.randint(0, HORIZONTE_FUTURO_DIAS)
+            periodos = []
+            for _ in range(quantidade):
+                duracao = min(int(aleatorio.expovariate(1 / 4)) + 1, DURACAO_MAXIMA_DIAS)
+                inicio = fim - duracao + 1
+                periodos.append((inicio, fim))
+                fim = inicio - 2 - min(int(aleatorio.expovariate(1 / 6)), INTERVALO_MAXIMO_DIAS)
+            for inicio, fim in reversed(periodos):
+                if fim < dia_referencia:
+                    estado = "Cancelada" if aleatorio.random() < 0.08 else "Concluída"
+                elif inicio <= dia_referencia:
+                    estado = "Confirmada"
+                else:
+                    estado = "Pendente" if aleatorio.random() < 0.4 else "Confirmada"
+                valor = round(diaria * (fim - inicio + 1), 2)
+                inicios.append(inicio)
+                valores.append(valor)
+                yield (primeiro_cliente + aleatorio.randrange(clientes), id_veiculo,
+                       datas[inicio], datas[fim], estado, valor)
+
+    ultima_reserva = _inserir(
+        conexao,
+        "INSERT INTO reservas (id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        linhas_reservas(), tamanho_lote,
+    ) if reservas else 0
+    primeira_reserva = ultima_reserva - reservas + 1
+
+    # -------------------- Pagamentos --------------------
+    def linhas_pagamentos():
+        # Reserva r recebe os pagamentos k com k * reservas // pagamentos == r
+        for r in range(reservas):
+            quantidade = -(-(r + 1) * pagamentos // reservas) - -(-r * pagamentos // reservas)
+            if not quantidade:
+                continue
+            inicio = inicios[r]
+            parcela = round(valores[r] / quantidade, 2)
+            # O último pagamento leva o resto exato, para a soma dar o valor_total
+            ultima = round(valores[r] - parcela * (quantidade - 1), 2)
+            for k in range(quantidade):
+                dia = max(inicio - (quantidade - 1 - k) * aleatorio.randint(1, 15), 0)
+                valor = ultima if k == quantidade - 1 else parcela
+                yield (primeira_reserva + r, aleatorio.choice(formas), valor, datas[dia])
+
+    if pagamentos:
+        _inserir(
+            conexao,
+            "INSERT INTO pagamentos (id_reserva, id_forma_pagamento, valor, data_pagamento) VALUES (?, ?, ?, ?)",
+            linhas_pagamentos(), tamanho_lote,
+        )
+
+    # -------------------- Manutenções --------------------
+    def linhas_manutencoes():
+        for _ in range(manutencoes):
+            descricao, custo = aleatorio.choice(DESCRICOES_MANUTENCAO)
+            yield (primeiro_veiculo + aleatorio.randrange(veiculos), descricao,
+                   datas[dia_referencia - aleatorio.randrange(dias_tipicos)], round(custo * aleatorio.uniform(0.8, 1.5), 2))
+
+    if manutencoes:
+        _inserir(
+            conexao,
+            "INSERT INTO manutencoes (id_veiculo, descricao, data_manutencao, custo) VALUES (?, ?, ?, ?)",
+            linhas_manutencoes(), tamanho_lote,
+        )
+
+    segundos = time.perf_counter() - inicio_total
+    resultado = {"clientes": clientes, "veiculos": veiculos, "reservas": reservas,
+                 "pagamentos": pagamentos, "manutencoes": manutencoes}
+    total = sum(resultado.values())
+    logger.info("Dados sintéticos: %d linhas em %.1f s (%.0f linhas/s).",
+                total, segundos, total / segundos if segundos else 0)
+    resultado["segundos"] = segundos
+    return resultado
+
@@ -1,4 +1,9 @@
+from datetime import date
+from typing import Dict, Optional
+
 from conexao import conectar_base_dados
+from dados_sinteticos import ESCALA_PADRAO, gerar_dados_sinteticos
+from migracoes import aplicar_migracoes
 
 def inserir_dados_ficticios() -> None:
     """
@@ -96,5 +101,55 @@ def inserir_dados_ficticios() -> None:
     print("Dados fictícios inseridos com sucesso.")
 
 
+def inserir_dados_sinteticos(caminho: Optional[str] = None, semente: int = 42,
+                             data_referencia: Optional[date] = None, **escala: int) -> Dict[str, int]:
+    """
+    Preenche uma base de dados com dados sintéticos em grande volume.
+
+    A conexão usa o perfil "fast" e as migrações são aplicadas antes da
+    carga. Ver `dados_sinteticos.gerar_dados_sinteticos`.
+
+    Args:
+        caminho (str, opcional): Ficheiro da base de dados (padrão: base da aplicação).
+        semente (int): Semente do gerador aleatório.
+        data_referencia (date, opcional): "Hoje" dos dados gerados (padrão: data atual).
+        **escala (int): Quantidades por tabela (clientes, veiculos, reservas,
+            pagamentos, manutencoes). Omitidas usam `ESCALA_PADRAO`.
+
+    Returns:
+        Dict[str, int]: Linhas inseridas por tabela e tempo total em segundos.
+    """
+    conn = conectar_base_dados(caminho, "fast")
+    try:
+        aplicar_migracoes(conn)
+        resumo = gerar_dados_sinteticos(conn, semente=semente, data_referencia=data_referencia,
+                                        **{**ESCALA_PADRAO, **escala})
+    finally:
+        conn.close()
+    total = sum(v for k, v in resumo.items() if k != "segundos")
+    print(f"{total} linhas sintéticas inseridas em {resumo['segundos']:.1f} s "
+          f"({total / resumo['segundos']:.0f} linhas/s).")
+    return resumo
+
+
 if __name__ == "__main__":
-    inserir_dados_ficticios()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Insere dados de exemplo na base de dados.")
+    parser.add_argument("--sintetico", action="store_true",
+                        help="Gera dados sintéticos em grande volume em vez dos dados de exemplo.")
+    parser.add_argument("--caminho", help="Ficheiro da base de dados (apenas com --sintetico).")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--data-referencia", type=date.fromisoformat, default=None,
+                        help="Data 'atual' dos dados sintéticos (AAAA-MM-DD). Padrão: hoje.")
+    for tabela, quantidade in ESCALA_PADRAO.items():
+        parser.add_argument(f"--{tabela}", type=int, default=quantidade)
+    args = parser.parse_args()
+
+    if args.sintetico:
+        inserir_dados_sinteticos(
+            args.caminho, args.semente, args.data_referencia,
+            **{tabela: getattr(args, tabela) for tabela in ESCALA_PADRAO},
+        )
+    else:
+        inserir_dados_ficticios()
@@ -0,0 +1,757 @@
+"""
+Migrações versionadas do esquema da base de dados Luxury Wheels.
+
+Cada migração tem um número de versão, uma descrição e uma sequência de
+passos (instruções SQL ou funções que recebem a conexão). As versões já
+aplicadas ficam registadas na tabela `schema_version` e cada migração é
+aplicada numa única transação: uma falha não deixa o esquema a meio.
+
+Funções principais:
+- versao_atual: devolve a versão de esquema de uma base de dados.
+- aplicar_migracoes: aplica, por ordem, as migrações ainda pendentes.
+- suspender_triggers / repor_triggers: cargas em massa sem triggers por linha.
+
+Este módulo não abre conexões: recebe sempre uma conexão já aberta, para
+poder ser usado tanto pelo pool de conexões como pelos scripts em `db/`.
+
+Uso (a partir da raiz do projeto):
+    python -m db.migracoes [--caminho ficheiro.db]
+"""
+
+import logging
+import sqlite3
+from typing import Callable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Passo = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+# -------------------- Passos em Python --------------------
+
+def _garantir_coluna_valor_total(conexao: sqlite3.Connection) -> None:
+    """Acrescenta `reservas.valor_total` a bases criadas antes desta coluna existir."""
+    colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(reservas)")}
+    if "valor_total" not in colunas:
+        conexao.execute("ALTER TABLE reservas ADD COLUMN valor_total REAL DEFAULT 0.0")
+
+
+# Tabelas cujas escritas incrementam o contador em `alteracoes_tabelas`
+TABELAS_MONITORIZADAS = ("clientes", "veiculos", "reservas", "pagamentos", "formaspagamento", "manutencoes")
+
+
+def _criar_triggers_alteracoes(conexao: sqlite3.Connection) -> None:
+    """Cria, por tabela monitorizada, os triggers que incrementam a sua versão em `alteracoes_tabelas`."""
+    for tabela in TABELAS_MONITORIZADAS:
+        conexao.execute(
+            "INSERT OR IGNORE INTO alteracoes_tabelas (tabela, versao) VALUES (?, 0)", (tabela,)
+        )
+        for operacao in ("INSERT", "UPDATE", "DELETE"):
+            conexao.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_alteracoes_{tabela}_{operacao.lower()}
+                AFTER {operacao} ON {tabela} BEGIN
+                    UPDATE alteracoes_tabelas SET versao = versao + 1 WHERE tabela = '{tabela}';
+                END
+            """)
+
+
+# Unicidade dos clientes: (índice, tabela, expressão indexada, coluna usada nos triggers de guarda)
+UNICIDADE_CLIENTES = (
+    ("idx_clientes_nif", "clientes", "nif", "nif"),
+    ("idx_clientes_email_normalizado", "clientes", "lower(email)", "email"),
+)
+
+
+def _criar_indices_unicos_clientes(conexao: sqlite3.Connection) -> None:
+    """
+    Cria os índices únicos de NIF e de email sem distinção de maiúsculas.
+
+    Se a base já tiver valores repetidos (ex.: clientes de teste antigos), o
+    índice único não pode ser criado: nesse caso é criado um índice normal
+    com o mesmo nome e dois triggers que rejeitam novas repetições, para que
+    as escritas continuem a depender da base de dados e não de uma verificação
+    prévia na aplicação. Os grupos repetidos (valor e ids) ficam no log, para
+    serem corrigidos; editar um cliente sem mudar o valor repetido é permitido.
+    """
+    for indice, tabela, expressao, coluna in UNICIDADE_CLIENTES:
+        repetidos = conexao.execute(
+            f"SELECT {expressao}, GROUP_CONCAT(id) FROM {tabela} WHERE {expressao} IS NOT NULL "
+            f"GROUP BY {expressao} HAVING COUNT(*) > 1"
+        ).fetchall()
+        if not repetidos:
+            conexao.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {indice} ON {tabela}({expressao})")
+            continue
+
+        logger.warning("Valores repetidos em %s.%s (unicidade garantida por triggers até serem corrigidos): %s",
+                       tabela, coluna, "; ".join(f"{valor!r} nos ids {ids}" for valor, ids in repetidos))
+        conexao.execute(f"CREATE INDEX IF NOT EXISTS {indice} ON {tabela}({expressao})")
+        novo, antigo = expressao.replace(coluna, f"NEW.{coluna}"), expressao.replace(coluna, f"OLD.{coluna}")
+        for operacao, condicao in (("INSERT", ""), (f"UPDATE OF {coluna}", f"{antigo} IS NOT {novo} AND ")):
+            condicao_id = " AND id <> NEW.id" if condicao else ""
+            conexao.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{indice}_{operacao.split()[0].lower()}
+                BEFORE {operacao} ON {tabela}
+                WHEN {condicao}EXISTS (SELECT 1 FROM {tabela} WHERE {expressao} = {novo}{condicao_id})
+                BEGIN
+                    SELECT RAISE(ABORT, 'UNIQUE constraint failed: {tabela}.{coluna}');
+                END
+            """)
+
+
+# Tabelas com exportação incremental: as escritas ficam em `registo_alteracoes`
+TABELAS_INCREMENTAIS = ("clientes", "reservas", "pagamentos")
+
+
+def _criar_triggers_registo_alteracoes(conexao: sqlite3.Connection) -> None:
+    """
+    Cria, por tabela incremental, os triggers que registam cada escrita em `registo_alteracoes`.
+
+    Uma alteração do id é registada como a remoção do id antigo e a escrita do novo.
+    Só se regista enquanto a tabela tiver algum consumidor em `marcas_exportacao`:
+    sem consumidores o registo não cresce.
+    """
+    for tabela in TABELAS_INCREMENTAIS:
+        for operacao, registos in (
+            ("INSERT", (("NEW", "'I'", ""),)),
+            ("UPDATE", (("OLD", "'D'", " WHERE OLD.id IS NOT NEW.id"), ("NEW", "'U'", ""))),
+            ("DELETE", (("OLD", "'D'", ""),)),
+        ):
+            corpo = "\n".join(
+                f"INSERT INTO registo_alteracoes (tabela, id_linha, operacao) "
+                f"SELECT '{tabela}', {linha}.id, {codigo}{condicao};"
+                for linha, codigo, condicao in registos
+            )
+            conexao.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_registo_{tabela}_{operacao.lower()}
+                AFTER {operacao} ON {tabela}
+                WHEN EXISTS (SELECT 1 FROM marcas_exportacao WHERE tabela = '{tabela}')
+                BEGIN
+                    {corpo}
+                END
+            """)
+
+
+# -------------------- Migrações --------------------
+
+MIGRACOES: List[Tuple[int, str, Tuple[Passo, ...]]] = [
+    (1, "esquema base", (
+        """
+        CREATE TABLE IF NOT EXISTS utilizadores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            senha TEXT NOT NULL,
+            perfil TEXT DEFAULT 'gestor'  -- Pode ser 'admin' ou 'gestor'
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS clientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            email TEXT UNIQUE,
+            telefone TEXT,
+            nif TEXT,
+            data_registo TEXT DEFAULT (datetime('now'))
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS veiculos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            marca TEXT,
+            modelo TEXT,
+            matricula TEXT UNIQUE,
+            ano INTEGER,
+            km_atual INTEGER,
+            data_ultima_revisao TEXT,
+            data_proxima_revisao TEXT,
+            categoria TEXT,
+            transmissao TEXT,
+            tipo TEXT,
+            lugares INTEGER,
+            imagem TEXT,
+            diaria REAL,
+            data_ultima_inspecao TEXT,
+            data_proxima_inspecao TEXT,
+            estado TEXT DEFAULT 'disponível'  -- Ex: disponível, alugado, em manutenção
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS formaspagamento (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            metodo TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS reservas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_cliente INTEGER,
+            id_veiculo INTEGER,
+            data_inicio TEXT,
+            data_fim TEXT,
+            estado TEXT DEFAULT 'Pendente',  -- Confirmada, Concluída, Pendente, Cancelada
+            valor_total REAL DEFAULT 0.0,
+            FOREIGN KEY (id_cliente) REFERENCES clientes(id),
+            FOREIGN KEY (id_veiculo) REFERENCES veiculos(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pagamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_reserva INTEGER,
+            id_forma_pagamento INTEGER,
+            valor REAL,
+            data_pagamento TEXT DEFAULT (datetime('now')),
+            FOREIGN KEY (id_reserva) REFERENCES reservas(id),
+            FOREIGN KEY (id_forma_pagamento) REFERENCES formaspagamento(id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS manutencoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_veiculo INTEGER,
+            descricao TEXT,
+            data_manutencao TEXT,
+            custo REAL,
+            FOREIGN KEY (id_veiculo) REFERENCES veiculos(id)
+        )
+        """,
+    )),
+    (2, "coluna valor_total em reservas", (
+        _garantir_coluna_valor_total,
+    )),
+    (3, "índices para as consultas dos repositórios", (
+        # Alerta de revisões: estado = ? AND data_proxima_revisao BETWEEN ? AND ? ORDER BY data_proxima_revisao
+        # (também serve a contagem de veículos por estado do dashboard)
+        "CREATE INDEX IF NOT EXISTS idx_veiculos_estado_revisao "
+        "ON veiculos (estado, data_proxima_revisao, marca, modelo)",
+        # Reservas de um veículo num período (verificação de sobreposição e disponibilidade)
+        "CREATE INDEX IF NOT EXISTS idx_reservas_veiculo_periodo "
+        "ON reservas (id_veiculo, data_inicio, data_fim, estado)",
+        # Listagem ORDER BY data_inicio DESC e agrupamento por mês
+        "CREATE INDEX IF NOT EXISTS idx_reservas_data_inicio ON reservas (data_inicio)",
+        # Contagem de reservas ativas (estado IN (...))
+        "CREATE INDEX IF NOT EXISTS idx_reservas_estado ON reservas (estado)",
+        # Pagamentos de uma reserva e listagem ORDER BY data_pagamento DESC
+        "CREATE INDEX IF NOT EXISTS idx_pagamentos_reserva ON pagamentos (id_reserva)",
+        "CREATE INDEX IF NOT EXISTS idx_pagamentos_data ON pagamentos (data_pagamento)",
+        "CREATE INDEX IF NOT EXISTS idx_manutencoes_veiculo ON manutencoes (id_veiculo)",
+    )),
+    (4, "índice parcial das reservas ativas por veículo", (
+        # Deteção de conflitos: só reservas Pendente/Confirmada/Reservado bloqueiam um veículo,
+        # pelo que o índice guarda apenas essas (poucas por veículo)
+        "CREATE INDEX IF NOT EXISTS idx_reservas_ativas_veiculo "
+        "ON reservas (id_veiculo, data_inicio, data_fim) "
+        "WHERE estado IN ('Pendente', 'Confirmada', 'Reservado')",
+        # Sem estatísticas o planeador prefere idx_reservas_veiculo_periodo (que
+        # percorre todo o histórico do veículo); com elas escolhe o índice parcial
+        "ANALYZE reservas",
+    )),
+    (5, "índice de cobertura da pesquisa de veículos disponíveis", (
+        # Pesquisa de veículos disponíveis: estado = 'disponível' ORDER BY diaria, id; a
+        # pesquisa lê todas as colunas que devolve do índice, sem ler a tabela por veículo
+        "CREATE INDEX IF NOT EXISTS idx_veiculos_disponiveis "
+        "ON veiculos (estado, diaria, id, marca, modelo, matricula, ano, categoria, transmissao, tipo, "
+        "lugares, imagem)",
+        "ANALYZE veiculos",
+    )),
+    (6, "contadores dos indicadores do dashboard mantidos por triggers", (
+        # Uma linha por indicador; os triggers mantêm os valores a cada escrita
+        # e dashboard_repositorio.verificar_contadores_kpi recalcula-os de raiz
+        """
+        CREATE TABLE IF NOT EXISTS kpi_counters (
+            chave TEXT PRIMARY KEY,
+            valor REAL NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        INSERT OR REPLACE INTO kpi_counters (chave, valor)
+        SELECT 'total_clientes', COUNT(*) FROM clientes
+        UNION ALL SELECT 'total_veiculos_disponiveis', COUNT(*) FROM veiculos WHERE estado = 'disponível'
+        UNION ALL SELECT 'total_reservas_ativas', COUNT(*) FROM reservas WHERE estado IN ('Confirmada', 'Pendente')
+        UNION ALL SELECT 'receita_total', COALESCE(SUM(valor), 0.0) FROM pagamentos
+        """,
+        # Clientes
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_clientes_insert AFTER INSERT ON clientes BEGIN
+            UPDATE kpi_counters SET valor = valor + 1 WHERE chave = 'total_clientes';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_clientes_delete AFTER DELETE ON clientes BEGIN
+            UPDATE kpi_counters SET valor = valor - 1 WHERE chave = 'total_clientes';
+        END
+        """,
+        # Veículos: só conta o estado 'disponível' (IS devolve 0/1 mesmo com NULL)
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_veiculos_insert AFTER INSERT ON veiculos
+        WHEN NEW.estado IS 'disponível' BEGIN
+            UPDATE kpi_counters SET valor = valor + 1 WHERE chave = 'total_veiculos_disponiveis';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_veiculos_delete AFTER DELETE ON veiculos
+        WHEN OLD.estado IS 'disponível' BEGIN
+            UPDATE kpi_counters SET valor = valor - 1 WHERE chave = 'total_veiculos_disponiveis';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_veiculos_estado AFTER UPDATE OF estado ON veiculos
+        WHEN (OLD.estado IS 'disponível') != (NEW.estado IS 'disponível') BEGIN
+            UPDATE kpi_counters SET valor = valor + (NEW.estado IS 'disponível') - (OLD.estado IS 'disponível')
+            WHERE chave = 'total_veiculos_disponiveis';
+        END
+        """,
+        # Reservas: ativas = Confirmada ou Pendente (como no dashboard)
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_reservas_insert AFTER INSERT ON reservas
+        WHEN NEW.estado IN ('Confirmada', 'Pendente') BEGIN
+            UPDATE kpi_counters SET valor = valor + 1 WHERE chave = 'total_reservas_ativas';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_reservas_delete AFTER DELETE ON reservas
+        WHEN OLD.estado IN ('Confirmada', 'Pendente') BEGIN
+            UPDATE kpi_counters SET valor = valor - 1 WHERE chave = 'total_reservas_ativas';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_reservas_estado AFTER UPDATE OF estado ON reservas
+        WHEN COALESCE(OLD.estado IN ('Confirmada', 'Pendente'), 0) != COALESCE(NEW.estado IN ('Confirmada', 'Pendente'), 0)
+        BEGIN
+            UPDATE kpi_counters
+            SET valor = valor + COALESCE(NEW.estado IN ('Confirmada', 'Pendente'), 0)
+                              - COALESCE(OLD.estado IN ('Confirmada', 'Pendente'), 0)
+            WHERE chave = 'total_reservas_ativas';
+        END
+        """,
+        # Pagamentos
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_pagamentos_insert AFTER INSERT ON pagamentos BEGIN
+            UPDATE kpi_counters SET valor = valor + COALESCE(NEW.valor, 0) WHERE chave = 'receita_total';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_pagamentos_delete AFTER DELETE ON pagamentos BEGIN
+            UPDATE kpi_counters SET valor = valor - COALESCE(OLD.valor, 0) WHERE chave = 'receita_total';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_kpi_pagamentos_valor AFTER UPDATE OF valor ON pagamentos BEGIN
+            UPDATE kpi_counters SET valor = valor + COALESCE(NEW.valor, 0) - COALESCE(OLD.valor, 0)
+            WHERE chave = 'receita_total';
+        END
+        """,
+    )),
+    (7, "agregados mensais de reservas e receita mantidos por triggers", (
+        # Uma linha por (mês, categoria do veículo, estado) e por (mês, forma de pagamento).
+        # Chaves em falta (datas inválidas, veículo inexistente) ficam como ''.
+        """
+        CREATE TABLE IF NOT EXISTS reservas_por_mes (
+            mes TEXT NOT NULL,
+            categoria TEXT NOT NULL,
+            estado TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            valor_total REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (mes, categoria, estado)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS receita_por_mes (
+            mes TEXT NOT NULL,
+            id_forma_pagamento INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            valor REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (mes, id_forma_pagamento)
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT INTO reservas_por_mes (mes, categoria, estado, total, valor_total)
+        SELECT COALESCE(strftime('%Y-%m', r.data_inicio), ''), COALESCE(v.categoria, ''), COALESCE(r.estado, ''),
+               COUNT(*), COALESCE(SUM(r.valor_total), 0)
+        FROM reservas r LEFT JOIN veiculos v ON v.id = r.id_veiculo
+        GROUP BY 1, 2, 3
+        """,
+        """
+        INSERT INTO receita_por_mes (mes, id_forma_pagamento, total, valor)
+        SELECT COALESCE(strftime('%Y-%m', data_pagamento), ''), COALESCE(id_forma_pagamento, 0),
+               COUNT(*), COALESCE(SUM(valor), 0)
+        FROM pagamentos
+        GROUP BY 1, 2
+        """,
+        # Reservas: soma a linha nova e subtrai a antiga (as linhas a zero são apagadas)
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_mes_reservas_insert AFTER INSERT ON reservas BEGIN
+            INSERT INTO reservas_por_mes (mes, categoria, estado, total, valor_total)
+            VALUES (COALESCE(strftime('%Y-%m', NEW.data_inicio), ''),
+                    COALESCE((SELECT categoria FROM veiculos WHERE id = NEW.id_veiculo), ''),
+                    COALESCE(NEW.estado, ''), 1, COALESCE(NEW.valor_total, 0))
+            ON CONFLICT (mes, categoria, estado) DO UPDATE
+            SET total = total + 1, valor_total = valor_total + excluded.valor_total;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_mes_reservas_delete AFTER DELETE ON reservas BEGIN
+            UPDATE reservas_por_mes
+            SET total = total - 1, valor_total = valor_total - COALESCE(OLD.valor_total, 0)
+            WHERE mes = COALESCE(strftime('%Y-%m', OLD.data_inicio), '')
+              AND categoria = COALESCE((SELECT categoria FROM veiculos WHERE id = OLD.id_veiculo), '')
+              AND estado = COALESCE(OLD.estado, '');
+            DELETE FROM reservas_por_mes WHERE total <= 0
+              AND mes = COALESCE(strftime('%Y-%m', OLD.data_inicio), '');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_mes_reservas_update
+        AFTER UPDATE OF data_inicio, id_veiculo, estado, valor_total ON reservas BEGIN
+            UPDATE reservas_por_mes
+            SET total = total - 1, valor_total = valor_total - COALESCE(OLD.valor_total, 0)
+            WHERE mes = COALESCE(strftime('%Y-%m', OLD.data_inicio), '')
+              AND categoria = COALESCE((SELECT categoria FROM veiculos WHERE id = OLD.id_veiculo), '')
+              AND estado = COALESCE(OLD.estado, '');
+            INSERT INTO reservas_por_mes (mes, categoria, estado, total, valor_total)
+            VALUES (COALESCE(strftime('%Y-%m', NEW.data_inicio), ''),
+                    COALESCE((SELECT categoria FROM veiculos WHERE id = NEW.id_veiculo), ''),
+                    COALESCE(NEW.estado, ''), 1, COALESCE(NEW.valor_total, 0))
+            ON CONFLICT (mes, categoria, estado) DO UPDATE
+            SET total = total + 1, valor_total = valor_total + excluded.valor_total;
+            DELETE FROM reservas_por_mes WHERE total <= 0
+              AND mes = COALESCE(strftime('%Y-%m', OLD.data_inicio), '');
+        END
+        """,
+        # Mudar a categoria de um veículo move as suas reservas para a nova categoria
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_mes_veiculos_categoria AFTER UPDATE OF categoria ON veiculos
+        WHEN OLD.categoria IS NOT NEW.categoria BEGIN
+            UPDATE reservas_por_mes
+            SET total = total - t.quantidade, valor_total = valor_total - t.soma
+            FROM (
+                SELECT COALESCE(strftime('%Y-%m', data_inicio), '') AS mes, COALESCE(estado, '') AS estado,
+                       COUNT(*) AS quantidade, COALESCE(SUM(valor_total), 0) AS soma
+                FROM reservas WHERE id_veiculo = NEW.id GROUP BY 1, 2
+            ) AS t
+            WHERE reservas_por_mes.mes = t.mes AND reservas_por_mes.estado = t.estado
+              AND reservas_por_mes.categoria = COALESCE(OLD.categoria, '');
+            INSERT INTO reservas_por_mes (mes, categoria, estado, total, valor_total)
+            SELECT COALESCE(strftime('%Y-%m', data_inicio), ''), COALESCE(NEW.categoria, ''), COALESCE(estado, ''),
+                   COUNT(*), COALESCE(SUM(valor_total), 0)
+            FROM reservas WHERE id_veiculo = NEW.id GROUP BY 1, 3
+            ON CONFLICT (mes, categoria, estado) DO UPDATE
+            SET total = total + excluded.total, valor_total = valor_total + excluded.valor_total;
+            DELETE FROM reservas_por_mes WHERE total <= 0 AND categoria = COALESCE(OLD.categoria, '');
+        END
+        """,
+        # Pagamentos
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_mes_pagamentos_insert AFTER INSERT ON pagamentos BEGIN
+            INSERT INTO receita_por_mes (mes, id_forma_pagamento, total, valor)
+            VALUES (COALESCE(strftime('%Y-%m', NEW.data_pagamento), ''), COALESCE(NEW.id_forma_pagamento, 0),
+                    1, COALESCE(NEW.valor, 0))
+            ON CONFLICT (mes, id_forma_pagamento) DO UPDATE
+            SET total = total + 1, valor = valor + excluded.valor;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_mes_pagamentos_delete AFTER DELETE ON pagamentos BEGIN
+            UPDATE receita_por_mes SET total = total - 1, valor = valor - COALESCE(OLD.valor, 0)
+            WHERE mes = COALESCE(strftime('%Y-%m', OLD.data_pagamento), '')
+              AND id_forma_pagamento = COALESCE(OLD.id_forma_pagamento, 0);
+            DELETE FROM receita_por_mes WHERE total <= 0
+              AND mes = COALESCE(strftime('%Y-%m', OLD.data_pagamento), '');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_mes_pagamentos_update
+        AFTER UPDATE OF valor, data_pagamento, id_forma_pagamento ON pagamentos BEGIN
+            UPDATE receita_por_mes SET total = total - 1, valor = valor - COALESCE(OLD.valor, 0)
+            WHERE mes = COALESCE(strftime('%Y-%m', OLD.data_pagamento), '')
+              AND id_forma_pagamento = COALESCE(OLD.id_forma_pagamento, 0);
+            INSERT INTO receita_por_mes (mes, id_forma_pagamento, total, valor)
+            VALUES (COALESCE(strftime('%Y-%m', NEW.data_pagamento), ''), COALESCE(NEW.id_forma_pagamento, 0),
+                    1, COALESCE(NEW.valor, 0))
+            ON CONFLICT (mes, id_forma_pagamento) DO UPDATE
+            SET total = total + 1, valor = valor + excluded.valor;
+            DELETE FROM receita_por_mes WHERE total <= 0
+              AND mes = COALESCE(strftime('%Y-%m', OLD.data_pagamento), '');
+        END
+        """,
+    )),
+    (8, "contadores de alterações por tabela para notificar as janelas", (
+        # Lido pelo controllers.monitor_alteracoes quando PRAGMA data_version muda
+        """
+        CREATE TABLE IF NOT EXISTS alteracoes_tabelas (
+            tabela TEXT PRIMARY KEY,
+            versao INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """,
+        _criar_triggers_alteracoes,
+    )),
+    (9, "NIF e email (sem distinção de maiúsculas) únicos nos clientes", (
+        _criar_indices_unicos_clientes,
+    )),
+    (10, "registo de alterações e marcas para exportações incrementais", (
+        # Uma linha por escrita (I/U/D) nas tabelas incrementais; `seq` só cresce
+        # (AUTOINCREMENT não reutiliza valores apagados) e serve de marca de água
+        """
+        CREATE TABLE IF NOT EXISTS registo_alteracoes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            id_linha INTEGER NOT NULL,
+            operacao TEXT NOT NULL CHECK (operacao IN ('I', 'U', 'D')),
+            alterado_em TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+        """,
+        # Alterações de uma tabela depois de uma marca: intervalo no índice
+        "CREATE INDEX IF NOT EXISTS idx_registo_alteracoes_tabela ON registo_alteracoes (tabela, seq)",
+        # Última alteração exportada, por consumidor e tabela
+        """
+        CREATE TABLE IF NOT EXISTS marcas_exportacao (
+            consumidor TEXT NOT NULL,
+            tabela TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            exportado_em TEXT NOT NULL DEFAULT (datetime('now')),
+            PRIMARY KEY (consumidor, tabela)
+        ) WITHOUT ROWID
+        """,
+        _criar_triggers_registo_alteracoes,
+    )),
+]
+
+
+# -------------------- Execução --------------------
+
+def _criar_tabela_versoes(conexao: sqlite3.Connection) -> None:
+    """Cria a tabela `schema_version` se ainda não existir."""
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INTEGER PRIMARY KEY,
+            descricao TEXT NOT NULL,
+            aplicada_em TEXT DEFAULT (datetime('now'))
+        )
+    """)
+    conexao.commit()
+
+
+def versao_atual(conexao: sqlite3.Connection) -> int:
+    """
+    Devolve a versão de esquema registada na base de dados.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão aberta.
+
+    Returns:
+        int: Maior versão aplicada, ou 0 se nenhuma migração foi aplicada.
+    """
+    existe = conexao.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not existe:
+        return 0
+    return conexao.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()[0]
+
+
+def aplicar_migracoes(conexao: sqlite3.Connection, ate: Optional[int] = None) -> List[int]:
+    """
+    Aplica por ordem as migrações pendentes.
+
+    Cada migração corre dentro de `BEGIN IMMEDIATE ... COMMIT`. A versão é
+    verificada de novo já com o bloqueio de escrita obtido, pelo que dois
+    processos a migrar em simultâneo não aplicam a mesma migração duas vezes.
+    Numa base de dados já atualizada o custo é uma única consulta.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão aberta (sem transação pendente).
+        ate (int, opcional): Última versão a aplicar. Por defeito, todas.
+
+    Returns:
+        List[int]: Versões aplicadas nesta chamada (vazia se já estava atualizada).
+
+    Exceções:
+        sqlite3.Error: Repropaga o erro da migração que falhou, após rollback.
+    """
+    ultima = MIGRACOES[-1][0] if ate is None else ate
+    if versao_atual(conexao) >= ultima:
+        return []
+
+    _criar_tabela_versoes(conexao)
+    aplicadas = []
+    for versao, descricao, passos in MIGRACOES:
+        if versao > ultima:
+            break
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            if versao_atual(conexao) >= versao:
+                conexao.rollback()
+                continue
+            for passo in passos:
+                if callable(passo):
+                    passo(conexao)
+                else:
+                    conexao.execute(passo)
+            conexao.execute(
+                "INSERT INTO schema_version (versao, descricao) VALUES (?, ?)", (versao, descricao)
+            )
+            conexao.commit()
+        except Exception:
+            conexao.rollback()
+            logger.exception("Erro ao aplicar a migração %d (%s).", versao, descricao)
+            raise
+        logger.info("Migração %d aplicada: %s.", versao, descricao)
+        aplicadas.append(versao)
+
+    if aplicadas:
+        # Atualiza as estatísticas do planeador para os novos índices
+        conexao.execute("PRAGMA optimize")
+    return aplicadas
+
+
+# -------------------- Cargas em massa --------------------
+
+# Efeito de uma inserção (ids :de a :ate) em cada tabela derivada, por família de triggers
+# e tabela: o que os triggers trg_<família>_<tabela>_* teriam feito linha a linha. Os
+# agregados mensais são somados com ON CONFLICT, sem GROUP BY: evita ordenar todas as
+# linhas inseridas numa B-tree temporária (a tabela de destino é pequena e fica em cache)
+SQL_EFEITO_INSERCAO = {
+    ("kpi", "clientes"): (
+        "UPDATE kpi_counters SET valor = valor + (SELECT COUNT(*) FROM clientes WHERE id BETWEEN :de AND :ate) "
+        "WHERE chave = 'total_clientes'",
+    ),
+    ("kpi", "veiculos"): (
+        "UPDATE kpi_counters SET valor = valor + (SELECT COUNT(*) FROM veiculos "
+        "WHERE id BETWEEN :de AND :ate AND estado IS 'disponível') WHERE chave = 'total_veiculos_disponiveis'",
+    ),
+    ("kpi", "reservas"): (
+        "UPDATE kpi_counters SET valor = valor + (SELECT COUNT(*) FROM reservas "
+        "WHERE id BETWEEN :de AND :ate AND estado IN ('Confirmada', 'Pendente')) WHERE chave = 'total_reservas_ativas'",
+    ),
+    ("kpi", "pagamentos"): (
+        "UPDATE kpi_counters SET valor = valor + (SELECT COALESCE(SUM(valor), 0) FROM pagamentos "
+        "WHERE id BETWEEN :de AND :ate) WHERE chave = 'receita_total'",
+    ),
+    ("mes", "reservas"): (
+        """
+        INSERT INTO reservas_por_mes (mes, categoria, estado, total, valor_total)
+        SELECT COALESCE(strftime('%Y-%m', r.data_inicio), ''), COALESCE(v.categoria, ''), COALESCE(r.estado, ''),
+               1, COALESCE(r.valor_total, 0)
+        FROM reservas r LEFT JOIN veiculos v ON v.id = r.id_veiculo
+        WHERE r.id BETWEEN :de AND :ate
+        ON CONFLICT (mes, categoria, estado) DO UPDATE
+        SET total = total + excluded.total, valor_total = valor_total + excluded.valor_total
+        """,
+    ),
+    ("mes", "pagamentos"): (
+        """
+        INSERT INTO receita_por_mes (mes, id_forma_pagamento, total, valor)
+        SELECT COALESCE(strftime('%Y-%m', data_pagamento), ''), COALESCE(id_forma_pagamento, 0),
+               1, COALESCE(valor, 0)
+        FROM pagamentos
+        WHERE id BETWEEN :de AND :ate
+        ON CONFLICT (mes, id_forma_pagamento) DO UPDATE
+        SET total = total + excluded.total, valor = valor + excluded.valor
+        """,
+    ),
+    **{("alteracoes", tabela): (
+        f"UPDATE alteracoes_tabelas SET versao = versao + 1 WHERE tabela = '{tabela}'",
+    ) for tabela in TABELAS_MONITORIZADAS},
+}
+
+
+def suspender_triggers(conexao: sqlite3.Connection, tabela: str, manter: Tuple[str, ...] = ()) -> List[Tuple[str, str]]:
+    """
+    Remove os triggers de uma tabela antes de uma carga em massa.
+
+    Deve ser chamada dentro da transação da carga e seguida de `repor_triggers`
+    na mesma transação: as outras conexões nunca veem a tabela sem triggers.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão (ou cursor) com uma transação de escrita aberta.
+        tabela (str): Tabela a carregar.
+        manter (Tuple[str, ...]): Prefixos dos nomes dos triggers que não são removidos
+            (ex.: "trg_idx_", para as guardas de unicidade continuarem a rejeitar linhas).
+
+    Returns:
+        List[Tuple[str, str]]: Nome e SQL de cada trigger removido.
+    """
+    triggers = [
+        (nome, sql) for nome, sql in conexao.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (tabela,)
+        ).fetchall()
+        if not nome.startswith(manter)
+    ]
+    for nome, _ in triggers:
+        conexao.execute(f'DROP TRIGGER "{nome}"')
+    return triggers
+
+
+def repor_triggers(conexao: sqlite3.Connection, tabela: str, triggers: List[Tuple[str, str]],
+                   primeiro_id: int, ultimo_id: int, registar: bool = True) -> None:
+    """
+    Recria os triggers removidos por `suspender_triggers` e aplica o seu efeito às linhas inseridas.
+
+    Em vez de uma atualização por linha, cada tabela derivada (contadores do
+    dashboard, agregados mensais, versões em `alteracoes_tabelas`) recebe uma
+    única instrução sobre o intervalo de ids inseridos. As guardas de
+    unicidade dos clientes (ver `_criar_indices_unicos_clientes`) são
+    verificadas no fim, pelos índices.
+
+    Se a tabela tiver consumidores de exportação incremental, as linhas
+    inseridas entram no registo de alterações numa só instrução; com
+    `registar=False` (ex.: dados sintéticos) as marcas desses consumidores são
+    apagadas, e a exportação seguinte de cada um é completa.
+
+    Args:
+        conexao (sqlite3.Connection): Conexão (ou cursor) com a transação da carga aberta.
+        tabela (str): Tabela carregada.
+        triggers (List[Tuple[str, str]]): Valor devolvido por `suspender_triggers`.
+        primeiro_id (int): Primeiro id inserido (os ids inseridos são consecutivos).
+        ultimo_id (int): Último id inserido (menor que `primeiro_id` se nada foi inserido).
+        registar (bool): Se False, não regista as linhas e reinicia os consumidores da tabela.
+
+    Exceções:
+        sqlite3.IntegrityError: Se uma linha inserida repetir um valor guardado por triggers.
+    """
+    nomes = [nome for nome, _ in triggers]
+    for _, criar in triggers:
+        conexao.execute(criar)
+    if ultimo_id < primeiro_id:
+        return
+    intervalo = {"de": primeiro_id, "ate": ultimo_id}
+    for familia in ("kpi", "mes", "alteracoes"):
+        if any(nome.startswith(f"trg_{familia}_{tabela}_") for nome in nomes):
+            for sql in SQL_EFEITO_INSERCAO.get((familia, tabela), ()):
+                conexao.execute(sql, intervalo)
+    if any(nome.startswith(f"trg_registo_{tabela}_") for nome in nomes):
+        if registar:
+            conexao.execute(
+                f"INSERT INTO registo_alteracoes (tabela, id_linha, operacao) "
+                f"SELECT '{tabela}', id, 'I' FROM {tabela} WHERE id BETWEEN :de AND :ate "
+                f"AND EXISTS (SELECT 1 FROM marcas_exportacao WHERE tabela = '{tabela}')",
+                intervalo,
+            )
+        else:
+            conexao.execute("DELETE FROM marcas_exportacao WHERE tabela = ?", (tabela,))
+            conexao.execute("DELETE FROM registo_alteracoes WHERE tabela = ?", (tabela,))
+    for indice, tabela_indice, expressao, coluna in UNICIDADE_CLIENTES:
+        if tabela_indice != tabela or f"trg_{indice}_insert" not in nomes:
+            continue
+        repetido = conexao.execute(
+            f"SELECT 1 FROM {tabela} n WHERE n.id BETWEEN :de AND :ate AND n.{coluna} IS NOT NULL "
+            f"AND EXISTS (SELECT 1 FROM {tabela} WHERE {expressao} = {expressao.replace(coluna, f'n.{coluna}')} "
+            f"AND id <> n.id) LIMIT 1",
+            intervalo,
+        ).fetchone()
+        if repetido:
+            raise sqlite3.IntegrityError(f"UNIQUE constraint failed: {tabela}.{coluna}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from db.conexao import conectar_base_dados
+
+    parser = argparse.ArgumentParser(description="Aplica as migrações pendentes.")
+    parser.add_argument("--caminho", help="Ficheiro da base de dados (padrão: base da aplicação).")
+    args = parser.parse_args()
+
+    conn = conectar_base_dados(args.caminho)
+    versoes = aplicar_migracoes(conn)
+    print(f"Versão do esquema: {versao_atual(conn)} (aplicadas agora: {versoes or 'nenhuma'})")
+    conn.close()
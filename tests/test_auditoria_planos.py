@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from db import auditoria_planos
+
+
+class TestAuditoriaPlanos(unittest.TestCase):
+    """
+    Auditoria dos planos de execução do SQL dos repositórios.
+    Falha quando aparece uma leitura completa, árvore temporária ou índice
+    automático que não conste de db/auditoria_planos_base.json.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Executa uma vez antes dos testes:
+        - Cria uma base de auditoria temporária com volume suficiente para
+          o planeador escolher os mesmos índices que em produção.
+        """
+        cls.diretorio = tempfile.mkdtemp()
+        cls.conexao = auditoria_planos.criar_base_auditoria(
+            os.path.join(cls.diretorio, "auditoria.db"), total_reservas=20_000
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Executa uma vez depois dos testes:
+        - Fecha e remove a base de auditoria.
+        """
+        cls.conexao.close()
+        shutil.rmtree(cls.diretorio, ignore_errors=True)
+
+    def test_recolhe_sql_dos_repositorios(self):
+        """
+        Testa que o SQL dos repositórios e do alerta é recolhido.
+        """
+        funcoes = {(i["ficheiro"], i["funcao"]) for i in auditoria_planos.recolher_sql()}
+        self.assertIn(("controllers/reservas/reservas_repositorio.py", "listar_reservas_bd"), funcoes)
+        self.assertIn(("utils/alerta.py", "alertar_revisoes_proximas"), funcoes)
+
+    def test_deteta_leitura_completa(self):
+        """
+        Testa que uma consulta sem índice é assinalada como SCAN e TEMP B-TREE.
+        """
+        instrucao = {"ficheiro": "x.py", "funcao": "f", "sql": "SELECT * FROM Reservas WHERE valor_total > ? ORDER BY valor_total"}
+        tipos = {achado["tipo"] for achado in auditoria_planos.auditar(self.conexao, [instrucao])}
+        self.assertEqual(tipos, {"SCAN", "TEMP B-TREE"})
+
+    def test_sem_achados_novos(self):
+        """
+        Testa que o SQL atual não tem achados fora da base de achados aceites.
+        """
+        achados = auditoria_planos.auditar(self.conexao)
+        novos = auditoria_planos.achados_novos(achados, auditoria_planos.carregar_base_achados())
+        self.assertEqual(
+            [auditoria_planos.chave_achado(achado) for achado in novos], [],
+            "Novos problemas de plano de execução (corrigir ou correr "
+            "`python -m db.auditoria_planos --atualizar-base`)"
+        )
@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+import unittest
+from benchmarks import bench_servicos
+
+
+class TestBenchServicos(unittest.TestCase):
+    """
+    Testes unitários para a suite de benchmark dos serviços.
+    Usa a escala 1k numa base de dados temporária.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Executa uma vez antes dos testes:
+        - Gera a base de dados da escala 1k num diretório temporário.
+        """
+        cls.diretorio = tempfile.mkdtemp()
+        cls.caminho = bench_servicos.preparar_base("1k", cls.diretorio)
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Executa uma vez depois dos testes:
+        - Remove o diretório temporário.
+        """
+        shutil.rmtree(cls.diretorio, ignore_errors=True)
+
+    def test_todas_as_funcoes_publicas_tem_caso(self):
+        """
+        Testa que cada função pública dos serviços tem um caso de benchmark.
+        """
+        casos = bench_servicos.casos_por_modulo(self.caminho, self.diretorio, 1)
+        self.assertEqual(bench_servicos.casos_em_falta(casos), [])
+
+    def test_executar_escala(self):
+        """
+        Testa que a medição de uma escala devolve métricas para todos os casos.
+        """
+        resultados = bench_servicos.executar_escala(self.caminho, 2, 1.0)
+        self.assertIn("reservas_servico.obter_reservas_servico", resultados)
+        self.assertTrue(all(m["iteracoes"] >= 1 for m in resultados.values()))
+
+    def test_comparar_com_base(self):
+        """
+        Testa que só aumentos acima do limiar relativo e da diferença mínima são regressões.
+        """
+        base = {"1k": {"a": {"mediana_us": 1000.0}, "b": {"mediana_us": 10.0}, "c": {"mediana_us": 1000.0}}}
+        atual = {"1k": {"a": {"mediana_us": 1500.0}, "b": {"mediana_us": 30.0}, "c": {"mediana_us": 1100.0},
+                        "nova": {"mediana_us": 5.0}}}
+        regressoes = bench_servicos.comparar_com_base(atual, base, limiar=0.25, diferenca_minima_us=100)
+        self.assertEqual([r["funcao"] for r in regressoes], ["a"])
+        self.assertAlmostEqual(regressoes[0]["variacao"], 0.5)
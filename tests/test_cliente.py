@@ -12,7 +12,7 @@ class TestCliente(unittest.TestCase):
     def setUp(self):
         """
         Executa antes de cada teste:
-        - Gera um cliente de teste com email único.
+        - Gera um cliente de teste com email e NIF únicos.
         - Remove cliente existente com mesmo email (precaução).
         - Adiciona o cliente na base de dados para uso nos testes.
         """
@@ -20,7 +20,7 @@ class TestCliente(unittest.TestCase):
         sufixo = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
         self.email = f"teste_{sufixo}@exemplo.com"
         self.telefone = "912345678"
-        self.nif = "123456789"
+        self.nif = str(random.randrange(100_000_000, 1_000_000_000))
 
         # Remove cliente existente com mesmo email
         existente = cliente_repositorio.buscar_cliente_por_email(self.email)
@@ -85,3 +85,30 @@ class TestCliente(unittest.TestCase):
             99999, "Invalido", "inv@email.com", "999999999", "000000000"
         )
         self.assertFalse(resultado, "Deve falhar ao atualizar cliente inexistente")
+
+    def test_verificar_duplicados(self):
+        """
+        Testa a verificação de email/NIF repetidos:
+        - Deteta o email (sem distinção de maiúsculas) e o NIF do cliente de teste.
+        - Ignora o próprio cliente quando o seu ID é indicado.
+        """
+        duplicados = cliente_repositorio.verificar_duplicados(self.email.upper(), self.nif)
+        self.assertEqual(duplicados, {"email": True, "nif": True})
+
+        duplicados = cliente_repositorio.verificar_duplicados(self.email, self.nif, self.cliente_id)
+        self.assertEqual(duplicados, {"email": False, "nif": False})
+
+        duplicados = cliente_repositorio.verificar_duplicados("nao_existe@exemplo.com", self.nif)
+        self.assertEqual(duplicados, {"email": False, "nif": True})
+
+    def test_inserir_duplicado_rejeitado_pela_base(self):
+        """
+        Testa que a base de dados rejeita um segundo cliente com o mesmo NIF ou email:
+        - Mesmo NIF com outro email.
+        - Mesmo email em maiúsculas com outro NIF.
+        """
+        sufixo = ''.join(random.choices(string.ascii_lowercase, k=6))
+        self.assertFalse(cliente_repositorio.adicionar_cliente(
+            self.nome, f"outro_{sufixo}@exemplo.com", self.telefone, self.nif))
+        self.assertFalse(cliente_repositorio.adicionar_cliente(
+            self.nome, self.email.upper(), self.telefone, "000000001"))
@@ -0,0 +1,56 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from db.conexao import conectar_base_dados, definir_perfil_conexao, obter_perfil_conexao
+
+
+class TestPerfisConexao(unittest.TestCase):
+    """
+    Testes unitários para os perfis de PRAGMAs aplicados às conexões.
+    Usa uma base de dados temporária para não alterar a base da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria um diretório temporário para a base de dados de teste.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.diretorio, "teste.db")
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Remove o diretório temporário.
+        """
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def test_perfil_fast_usa_wal(self):
+        """
+        Testa que o perfil "fast" ativa WAL, synchronous=NORMAL e busy_timeout.
+        """
+        conexao = conectar_base_dados(self.caminho, "fast")
+        self.assertEqual(conexao.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conexao.execute("PRAGMA synchronous").fetchone()[0], 1)
+        self.assertEqual(conexao.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        conexao.close()
+
+    def test_perfil_readonly_bloqueia_escrita(self):
+        """
+        Testa que o perfil "readonly-analytics" não permite escrever.
+        """
+        conexao = conectar_base_dados(self.caminho, "readonly-analytics")
+        with self.assertRaises(sqlite3.OperationalError):
+            conexao.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY)")
+        conexao.close()
+
+    def test_perfil_desconhecido(self):
+        """
+        Testa que perfis inexistentes são rejeitados sem alterar o perfil ativo.
+        """
+        ativo = obter_perfil_conexao()
+        with self.assertRaises(ValueError):
+            definir_perfil_conexao("inexistente")
+        self.assertEqual(obter_perfil_conexao(), ativo)
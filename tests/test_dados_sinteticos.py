@@ -0,0 +1,150 @@
+import sqlite3
+import unittest
+from datetime import date
+from db.dados_sinteticos import gerar_dados_sinteticos
+from db.migracoes import aplicar_migracoes
+
+ESCALA = {"clientes": 200, "veiculos": 20, "reservas": 3000, "pagamentos": 4500, "manutencoes": 100}
+
+
+def _nova_base():
+    """Cria uma base em memória com o esquema atual."""
+    conexao = sqlite3.connect(":memory:")
+    aplicar_migracoes(conexao)
+    return conexao
+
+
+class TestDadosSinteticos(unittest.TestCase):
+    """
+    Testes unitários para o gerador de dados sintéticos.
+    Usa bases de dados em memória para não alterar a base da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Gera uma base pequena com data de referência fixa.
+        """
+        self.conexao = _nova_base()
+        self.resumo = gerar_dados_sinteticos(self.conexao, semente=1, data_referencia=date(2025, 1, 1), **ESCALA)
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Fecha a conexão.
+        """
+        self.conexao.close()
+
+    def test_quantidades(self):
+        """
+        Testa que cada tabela recebe exatamente as linhas pedidas.
+        """
+        for tabela, quantidade in ESCALA.items():
+            total = self.conexao.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+            self.assertEqual(total, quantidade, tabela)
+            self.assertEqual(self.resumo[tabela], quantidade)
+
+    def test_reservas_sem_sobreposicao(self):
+        """
+        Testa que nenhum veículo tem duas reservas com períodos sobrepostos.
+        """
+        sobrepostas = self.conexao.execute("""
+            SELECT COUNT(*) FROM reservas a JOIN reservas b
+              ON a.id_veiculo = b.id_veiculo AND a.id < b.id
+             AND a.data_inicio <= b.data_fim AND b.data_inicio <= a.data_fim
+        """).fetchone()[0]
+        self.assertEqual(sobrepostas, 0)
+
+    def test_estados_coerentes_com_referencia(self):
+        """
+        Testa que reservas futuras não estão concluídas e passadas não estão pendentes.
+        """
+        incoerentes = self.conexao.execute("""
+            SELECT COUNT(*) FROM reservas
+             WHERE (data_inicio > '2025-01-01' AND estado IN ('Concluída', 'Cancelada'))
+                OR (data_fim < '2025-01-01' AND estado IN ('Pendente', 'Confirmada'))
+        """).fetchone()[0]
+        self.assertEqual(incoerentes, 0)
+
+    def test_pagamentos_somam_valor_total(self):
+        """
+        Testa que os pagamentos de cada reserva somam exatamente o seu valor_total (ao cêntimo).
+        """
+        diferenca = self.conexao.execute("""
+            SELECT MAX(ABS(r.valor_total - p.soma)) FROM reservas r
+              JOIN (SELECT id_reserva, SUM(valor) AS soma FROM pagamentos GROUP BY id_reserva) p
+                ON p.id_reserva = r.id
+        """).fetchone()[0]
+        self.assertLess(diferenca, 0.005)
+
+    def test_deterministico(self):
+        """
+        Testa que a mesma semente e data de referência geram os mesmos dados.
+        """
+        outra = _nova_base()
+        gerar_dados_sinteticos(outra, semente=1, data_referencia=date(2025, 1, 1), **ESCALA)
+        consulta = "SELECT id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total FROM reservas ORDER BY id"
+        self.assertEqual(self.conexao.execute(consulta).fetchall(), outra.execute(consulta).fetchall())
+        outra.close()
+
+    def test_indices_recriados(self):
+        """
+        Testa que os índices removidos durante a carga são recriados.
+        """
+        indices = {linha[0] for linha in self.conexao.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_reservas_veiculo_periodo", indices)
+        self.assertIn("idx_pagamentos_reserva", indices)
+
+    def test_tabelas_derivadas_sem_triggers(self):
+        """
+        Testa a carga com os triggers suspensos.
+        - Os triggers são recriados no fim.
+        - Os contadores do dashboard e os agregados mensais coincidem com um recálculo de raiz.
+        - As versões de cada tabela carregada sobem uma vez.
+        """
+        triggers = self.conexao.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'reservas'"
+        ).fetchone()[0]
+        self.assertGreater(triggers, 0)
+
+        contadores = dict(self.conexao.execute("SELECT chave, valor FROM kpi_counters"))
+        self.assertEqual(contadores["total_clientes"], ESCALA["clientes"])
+        ativas = self.conexao.execute(
+            "SELECT COUNT(*) FROM reservas WHERE estado IN ('Confirmada', 'Pendente')"
+        ).fetchone()[0]
+        self.assertEqual(contadores["total_reservas_ativas"], ativas)
+        receita = self.conexao.execute("SELECT SUM(valor) FROM pagamentos").fetchone()[0]
+        self.assertAlmostEqual(contadores["receita_total"], receita, places=2)
+
+        por_mes = self.conexao.execute(
+            "SELECT mes, SUM(total) FROM reservas_por_mes GROUP BY mes ORDER BY mes"
+        ).fetchall()
+        esperado = self.conexao.execute(
+            "SELECT strftime('%Y-%m', data_inicio), COUNT(*) FROM reservas GROUP BY 1 ORDER BY 1"
+        ).fetchall()
+        self.assertEqual(por_mes, esperado)
+        self.assertEqual(self.conexao.execute("SELECT SUM(total) FROM receita_por_mes").fetchone()[0],
+                         ESCALA["pagamentos"])
+        versoes = dict(self.conexao.execute("SELECT tabela, versao FROM alteracoes_tabelas"))
+        self.assertEqual(versoes["reservas"], 1)
+
+    def test_sem_registo_de_alteracoes(self):
+        """
+        Testa que a carga não escreve no registo de alterações.
+        - Os consumidores das tabelas carregadas perdem a marca (a exportação seguinte é completa).
+        """
+        self.assertEqual(self.conexao.execute("SELECT COUNT(*) FROM registo_alteracoes").fetchone()[0], 0)
+        self.conexao.executemany("INSERT INTO marcas_exportacao (consumidor, tabela, seq) VALUES ('teste', ?, 0)",
+                                 [("clientes",), ("pagamentos",)])
+        self.conexao.commit()
+        gerar_dados_sinteticos(self.conexao, clientes=10, veiculos=0, reservas=0, pagamentos=0, manutencoes=0)
+        self.assertEqual(self.conexao.execute("SELECT COUNT(*) FROM registo_alteracoes").fetchone()[0], 0)
+        marcas = self.conexao.execute("SELECT tabela FROM marcas_exportacao").fetchall()
+        self.assertEqual(marcas, [("pagamentos",)])
+
+    def test_reservas_sem_veiculos(self):
+        """
+        Testa que pedir reservas sem veículos gera ValueError.
+        """
+        with self.assertRaises(ValueError):
+            gerar_dados_sinteticos(self.conexao, clientes=1, veiculos=0, reservas=1, pagamentos=0, manutencoes=0)
@@ -1,5 +1,6 @@
 import unittest
 from controllers.dashboard import dashboard_servico
+from controllers.utils_bd import obter_cursor
 
 class TestDashboard(unittest.TestCase):
     """
@@ -73,3 +74,233 @@ class TestDashboard(unittest.TestCase):
                 self.assertIsInstance(item["mes"], str, "O campo 'mes' deve ser string (YYYY-MM)")
                 self.assertIsInstance(item["total"], int, "O campo 'total' deve ser inteiro")
                 self.assertGreaterEqual(item["total"], 0, "O total de reservas por mês não pode ser negativo")
+
+    def test_obter_indicadores_dashboard(self):
+        """
+        Testa a função que devolve todos os indicadores numa única consulta.
+        - Verifica que contém as quatro chaves.
+        - Confirma que cada valor coincide com o da função individual correspondente.
+        """
+        indicadores = dashboard_servico.obter_indicadores_dashboard()
+        self.assertEqual(indicadores["total_clientes"], dashboard_servico.obter_total_clientes())
+        self.assertEqual(indicadores["total_veiculos_disponiveis"],
+                         dashboard_servico.obter_total_veiculos_disponiveis())
+        self.assertEqual(indicadores["total_reservas_ativas"], dashboard_servico.obter_total_reservas_ativas())
+        self.assertAlmostEqual(indicadores["receita_total"], dashboard_servico.calcular_receita_total_pagamentos())
+
+
+class TestContadoresKpi(unittest.TestCase):
+    """
+    Testes dos contadores do dashboard mantidos por triggers (tabela kpi_counters).
+    Cada teste desfaz as alterações que faz na base de dados.
+    """
+
+    def test_contadores_coincidem_com_recalculo(self):
+        """
+        Testa que os contadores mantidos pelos triggers não têm desvios.
+        """
+        self.assertEqual(dashboard_servico.verificar_indicadores_dashboard(), {})
+
+    def test_triggers_acompanham_escritas(self):
+        """
+        Testa que inserir, alterar e remover linhas atualiza os contadores.
+        - Insere um cliente, um veículo disponível, uma reserva pendente e um pagamento.
+        - Passa o veículo a manutenção, a reserva a cancelada e altera o valor do pagamento.
+        - Remove tudo e confirma que os indicadores voltam aos valores iniciais.
+        """
+        inicio = dashboard_servico.obter_indicadores_dashboard()
+        with obter_cursor(commit=True) as cur:
+            cur.execute("INSERT INTO Clientes (nome, email) VALUES ('KPI', 'kpi.teste@exemplo.pt')")
+            id_cliente = cur.lastrowid
+            cur.execute("INSERT INTO Veiculos (matricula, estado) VALUES ('KP-00-00', 'disponível')")
+            id_veiculo = cur.lastrowid
+            cur.execute("INSERT INTO Reservas (id_cliente, id_veiculo, data_inicio, data_fim, estado) "
+                        "VALUES (?, ?, '2040-01-01', '2040-01-02', 'Pendente')", (id_cliente, id_veiculo))
+            id_reserva = cur.lastrowid
+            cur.execute("INSERT INTO Pagamentos (id_reserva, valor) VALUES (?, 100.5)", (id_reserva,))
+            id_pagamento = cur.lastrowid
+        try:
+            depois = dashboard_servico.obter_indicadores_dashboard()
+            self.assertEqual(depois["total_clientes"], inicio["total_clientes"] + 1)
+            self.assertEqual(depois["total_veiculos_disponiveis"], inicio["total_veiculos_disponiveis"] + 1)
+            self.assertEqual(depois["total_reservas_ativas"], inicio["total_reservas_ativas"] + 1)
+            self.assertAlmostEqual(depois["receita_total"], inicio["receita_total"] + 100.5)
+
+            with obter_cursor(commit=True) as cur:
+                cur.execute("UPDATE Veiculos SET estado = 'Manutenção' WHERE id = ?", (id_veiculo,))
+                cur.execute("UPDATE Reservas SET estado = 'Cancelada' WHERE id = ?", (id_reserva,))
+                cur.execute("UPDATE Pagamentos SET valor = 20 WHERE id = ?", (id_pagamento,))
+            alterado = dashboard_servico.obter_indicadores_dashboard()
+            self.assertEqual(alterado["total_veiculos_disponiveis"], inicio["total_veiculos_disponiveis"])
+            self.assertEqual(alterado["total_reservas_ativas"], inicio["total_reservas_ativas"])
+            self.assertAlmostEqual(alterado["receita_total"], inicio["receita_total"] + 20)
+        finally:
+            with obter_cursor(commit=True) as cur:
+                cur.execute("DELETE FROM Pagamentos WHERE id = ?", (id_pagamento,))
+                cur.execute("DELETE FROM Reservas WHERE id = ?", (id_reserva,))
+                cur.execute("DELETE FROM Veiculos WHERE id = ?", (id_veiculo,))
+                cur.execute("DELETE FROM Clientes WHERE id = ?", (id_cliente,))
+        self.assertEqual(dashboard_servico.obter_indicadores_dashboard(), inicio)
+        self.assertEqual(dashboard_servico.verificar_indicadores_dashboard(), {})
+
+    def test_verificacao_deteta_e_corrige_desvio(self):
+        """
+        Testa que um contador adulterado é reportado e corrigido.
+        - Soma 5 ao contador de clientes.
+        - Verifica sem corrigir (desvio reportado e mantido).
+        - Verifica a corrigir e confirma que o desvio desaparece.
+        """
+        with obter_cursor(commit=True) as cur:
+            cur.execute("UPDATE kpi_counters SET valor = valor + 5 WHERE chave = 'total_clientes'")
+        try:
+            desvios = dashboard_servico.verificar_indicadores_dashboard()
+            self.assertEqual(list(desvios), ["total_clientes"])
+            self.assertEqual(desvios["total_clientes"]["contador"] - desvios["total_clientes"]["real"], 5)
+            self.assertIn("total_clientes", dashboard_servico.verificar_indicadores_dashboard())
+        finally:
+            self.assertIn("total_clientes", dashboard_servico.verificar_indicadores_dashboard(corrigir=True))
+        self.assertEqual(dashboard_servico.verificar_indicadores_dashboard(), {})
+
+
+class TestAgregadosMensais(unittest.TestCase):
+    """
+    Testes dos agregados mensais mantidos por triggers (reservas_por_mes e receita_por_mes).
+    Compara os agregados com o agrupamento feito diretamente sobre as tabelas.
+    """
+
+    def _reservas_diretas(self):
+        """Agrupa as reservas por mês, categoria e estado diretamente na tabela."""
+        with obter_cursor() as cur:
+            cur.execute("""
+                SELECT COALESCE(strftime('%Y-%m', r.data_inicio), ''), COALESCE(v.categoria, ''),
+                       COALESCE(r.estado, ''), COUNT(*), ROUND(SUM(r.valor_total), 2)
+                FROM Reservas r LEFT JOIN Veiculos v ON v.id = r.id_veiculo
+                GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+            """)
+            return [tuple(linha) for linha in cur.fetchall()]
+
+    def _reservas_agregadas(self):
+        """Lê o agregado no mesmo formato de `_reservas_diretas`."""
+        return [(r["mes"], r["categoria"], r["estado"], r["total"], r["valor_total"])
+                for r in dashboard_servico.obter_reservas_por_mes_detalhadas()]
+
+    def _receita_direta(self):
+        """Agrupa os pagamentos por mês e forma de pagamento diretamente na tabela."""
+        with obter_cursor() as cur:
+            cur.execute("""
+                SELECT COALESCE(strftime('%Y-%m', data_pagamento), ''), COALESCE(id_forma_pagamento, 0),
+                       COUNT(*), ROUND(SUM(valor), 2)
+                FROM Pagamentos GROUP BY 1, 2 ORDER BY 1, 2
+            """)
+            return [tuple(linha) for linha in cur.fetchall()]
+
+    def _receita_agregada(self):
+        """Lê o agregado no mesmo formato de `_receita_direta`."""
+        return [(r["mes"], r["id_forma_pagamento"], r["total"], r["valor"])
+                for r in dashboard_servico.obter_receita_por_mes()]
+
+    def test_agregados_coincidem_com_tabelas(self):
+        """
+        Testa que os agregados e o gráfico por mês coincidem com o agrupamento direto.
+        """
+        self.assertEqual(self._reservas_agregadas(), self._reservas_diretas())
+        self.assertEqual(self._receita_agregada(), self._receita_direta())
+        por_mes = {}
+        for mes, _, _, total, _ in self._reservas_diretas():
+            por_mes[mes or None] = por_mes.get(mes or None, 0) + total
+        self.assertEqual(dashboard_servico.obter_reservas_agrupadas_por_mes(),
+                         [{"mes": mes, "total": total} for mes, total in sorted(por_mes.items())])
+
+    def test_triggers_acompanham_escritas(self):
+        """
+        Testa que os agregados acompanham inserções, alterações e remoções.
+        - Insere uma reserva e um pagamento num mês novo.
+        - Muda o mês, o estado e o valor da reserva, a categoria do veículo e a data do pagamento.
+        - Remove ambos; em cada passo os agregados coincidem com o agrupamento direto.
+        """
+        with obter_cursor() as cur:
+            cur.execute("SELECT id, categoria FROM Veiculos ORDER BY id LIMIT 1")
+            id_veiculo, categoria = cur.fetchone()
+        with obter_cursor(commit=True) as cur:
+            cur.execute("INSERT INTO Reservas (id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total) "
+                        "VALUES (1, ?, '2041-03-10', '2041-03-12', 'Pendente', 300)", (id_veiculo,))
+            id_reserva = cur.lastrowid
+            cur.execute("INSERT INTO Pagamentos (id_reserva, id_forma_pagamento, valor, data_pagamento) "
+                        "VALUES (?, 1, 150.25, '2041-03-10')", (id_reserva,))
+            id_pagamento = cur.lastrowid
+        try:
+            self.assertEqual(self._reservas_agregadas(), self._reservas_diretas())
+            self.assertEqual(self._receita_agregada(), self._receita_direta())
+            with obter_cursor(commit=True) as cur:
+                cur.execute("UPDATE Reservas SET data_inicio = '2041-04-01', estado = 'Confirmada', "
+                            "valor_total = 350 WHERE id = ?", (id_reserva,))
+                cur.execute("UPDATE Veiculos SET categoria = 'Categoria KPI' WHERE id = ?", (id_veiculo,))
+                cur.execute("UPDATE Pagamentos SET data_pagamento = '2041-05-02', valor = 99 WHERE id = ?",
+                            (id_pagamento,))
+            self.assertEqual(self._reservas_agregadas(), self._reservas_diretas())
+            self.assertEqual(self._receita_agregada(), self._receita_direta())
+            self.assertEqual(
+                [r["categoria"] for r in dashboard_servico.obter_reservas_por_mes_detalhadas("2041-04", "2041-04")],
+                ["Categoria KPI"])
+        finally:
+            with obter_cursor(commit=True) as cur:
+                cur.execute("UPDATE Veiculos SET categoria = ? WHERE id = ?", (categoria, id_veiculo))
+                cur.execute("DELETE FROM Pagamentos WHERE id = ?", (id_pagamento,))
+                cur.execute("DELETE FROM Reservas WHERE id = ?", (id_reserva,))
+        self.assertEqual(self._reservas_agregadas(), self._reservas_diretas())
+        self.assertEqual(self._receita_agregada(), self._receita_direta())
+        self.assertEqual(dashboard_servico.obter_reservas_por_mes_detalhadas("2041-01", "2041-12"), [])
+
+    def test_recalculo_parcial_e_total(self):
+        """
+        Testa o recálculo de um intervalo de meses e o recálculo total.
+        - Adultera dois meses do agregado.
+        - Recalcula só um deles e confirma que o outro continua adulterado.
+        - Recalcula tudo e confirma que os agregados voltam a coincidir.
+        """
+        meses = sorted({linha[0] for linha in self._reservas_diretas() if linha[0]})
+        primeiro, ultimo = meses[0], meses[-1]
+        with obter_cursor(commit=True) as cur:
+            cur.execute("UPDATE reservas_por_mes SET total = total + 7 WHERE mes IN (?, ?)", (primeiro, ultimo))
+        try:
+            self.assertTrue(dashboard_servico.reconstruir_agregados_mensais(primeiro, primeiro))
+            agregados = {(r[0], r[1], r[2]): r[3] for r in self._reservas_agregadas()}
+            diretos = {(r[0], r[1], r[2]): r[3] for r in self._reservas_diretas()}
+            self.assertTrue(all(agregados[k] == diretos[k] for k in diretos if k[0] == primeiro))
+            self.assertTrue(all(agregados[k] == diretos[k] + 7 for k in diretos if k[0] == ultimo))
+        finally:
+            self.assertTrue(dashboard_servico.reconstruir_agregados_mensais())
+        self.assertEqual(self._reservas_agregadas(), self._reservas_diretas())
+        self.assertEqual(self._receita_agregada(), self._receita_direta())
+
+    def test_recalculo_parcial_mantem_datas_invalidas(self):
+        """
+        Testa que um recálculo só com o mês final não perde o mês '' (datas inválidas).
+        - Insere uma reserva e um pagamento sem data válida.
+        - Recalcula até um mês e confirma que os agregados continuam a coincidir.
+        """
+        with obter_cursor(commit=True) as cur:
+            cur.execute("INSERT INTO Reservas (id_cliente, id_veiculo, data_inicio, data_fim, estado, valor_total) "
+                        "VALUES (1, 1, '1/2/2024', '3/2/2024', 'Concluída', 80)")
+            id_reserva = cur.lastrowid
+            cur.execute("INSERT INTO Pagamentos (id_reserva, id_forma_pagamento, valor, data_pagamento) "
+                        "VALUES (?, 1, 80, 'sem data')", (id_reserva,))
+            id_pagamento = cur.lastrowid
+        try:
+            self.assertTrue(dashboard_servico.reconstruir_agregados_mensais(None, "2024-12"))
+            self.assertEqual(self._reservas_agregadas(), self._reservas_diretas())
+            self.assertEqual(self._receita_agregada(), self._receita_direta())
+            self.assertIn(None, [r["mes"] for r in dashboard_servico.obter_reservas_agrupadas_por_mes()])
+        finally:
+            with obter_cursor(commit=True) as cur:
+                cur.execute("DELETE FROM Pagamentos WHERE id = ?", (id_pagamento,))
+                cur.execute("DELETE FROM Reservas WHERE id = ?", (id_reserva,))
+        self.assertEqual(self._reservas_agregadas(), self._reservas_diretas())
+
+    def test_intervalo_invalido(self):
+        """
+        Testa que meses mal formatados ou intervalos invertidos são rejeitados.
+        """
+        self.assertEqual(dashboard_servico.obter_reservas_por_mes_detalhadas("2025-1"), [])
+        self.assertEqual(dashboard_servico.obter_receita_por_mes("2025-03", "2025-01"), [])
+        self.assertFalse(dashboard_servico.reconstruir_agregados_mensais("2025-13"))
@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+from utils.executor_tarefas import ExecutorTarefas
+
+
+class WidgetFalso:
+    """Imita `after` e `bind` de um widget Tkinter; os callbacks correm quando o teste processa os eventos."""
+
+    def __init__(self):
+        self.agendados = []
+        self.ligacoes = []
+
+    def after(self, _ms, funcao):
+        self.agendados.append(funcao)
+        return len(self.agendados)
+
+    def bind(self, _evento, funcao, add=None):
+        self.ligacoes.append(funcao)
+
+    def processar(self, limite_s=5.0):
+        """Corre os callbacks agendados até não haver mais (como o ciclo de eventos do Tk)."""
+        fim = time.monotonic() + limite_s
+        while self.agendados and time.monotonic() < fim:
+            funcao = self.agendados.pop(0)
+            funcao()
+            time.sleep(0.005)
+
+
+class EventoFalso:
+    def __init__(self, widget):
+        self.widget = widget
+
+
+class TestExecutorTarefas(unittest.TestCase):
+    """
+    Testes unitários para o executor de tarefas em segundo plano (sem ecrã).
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria um widget falso e um executor com um indicador que regista os estados.
+        """
+        self.widget = WidgetFalso()
+        self.estados = []
+        self.executor = ExecutorTarefas(self.widget, indicador=self.estados.append)
+
+    def test_resultado_entregue_na_thread_do_tk(self):
+        """
+        Testa que a função corre noutra thread e o resultado é entregue na thread que processa os eventos.
+        """
+        threads = {}
+
+        def tarefa(x, y=0):
+            threads["trabalho"] = threading.get_ident()
+            return x + y
+
+        resultados = []
+        self.executor.executar(tarefa, 2, y=3, ao_concluir=lambda r: resultados.append((r, threading.get_ident())))
+        self.assertTrue(self.executor.ocupado)
+        self.widget.processar()
+
+        self.assertEqual(resultados, [(5, threading.get_ident())])
+        self.assertNotEqual(threads["trabalho"], threading.get_ident())
+        self.assertEqual(self.estados, [True, False])
+        self.assertFalse(self.executor.ocupado)
+
+    def test_erro_entregue_ao_falhar(self):
+        """
+        Testa que uma exceção na tarefa é entregue ao callback de erro.
+        """
+        erros = []
+
+        def falhar():
+            raise ValueError("falhou")
+
+        self.executor.executar(falhar, ao_concluir=self.fail, ao_falhar=erros.append)
+        self.widget.processar()
+        self.assertIsInstance(erros[0], ValueError)
+
+    def test_pedido_novo_com_mesma_chave_descarta_anterior(self):
+        """
+        Testa que, com a mesma chave, só o resultado do pedido mais recente é entregue.
+        """
+        liberar = threading.Event()
+        resultados = []
+
+        def lenta():
+            liberar.wait(5)
+            return "antigo"
+
+        self.executor.executar(lenta, ao_concluir=resultados.append, chave="lista")
+        self.executor.executar(lambda: "novo", ao_concluir=resultados.append, chave="lista")
+        liberar.set()
+        self.widget.processar()
+        time.sleep(0.05)
+        self.widget.processar()
+        self.assertEqual(resultados, ["novo"])
+        self.assertEqual(self.estados[-1], False)
+
+    def test_destruir_widget_cancela_tarefas(self):
+        """
+        Testa que, ao destruir o widget, os resultados pendentes são descartados.
+        """
+        liberar = threading.Event()
+        resultados = []
+        self.executor.executar(lambda: liberar.wait(5), ao_concluir=resultados.append)
+        for ligacao in self.widget.ligacoes:
+            ligacao(EventoFalso(self.widget))
+        liberar.set()
+        self.widget.processar()
+        self.assertEqual(resultados, [])
+        self.assertEqual(self.estados, [True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
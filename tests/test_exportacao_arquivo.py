@@ -0,0 +1,111 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from controllers.exportacao.exportacao_arquivo import TABELAS_ARQUIVO, NOME_MANIFESTO, exportar_arquivo
+from controllers.utils_bd import configurar_pool, obter_cursor
+from db.conexao import CAMINHO_BASE_DADOS
+
+
+class TestExportacaoArquivo(unittest.TestCase):
+    """
+    Testes unitários para a exportação de várias tabelas para um arquivo comprimido.
+    Usa uma cópia temporária da base de dados da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Copia a base de dados para um diretório temporário e aponta o pool para a cópia.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.base = os.path.join(self.diretorio, "luxury_wheels.db")
+        shutil.copyfile(CAMINHO_BASE_DADOS, self.base)
+        configurar_pool(self.base)
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Repõe o pool da aplicação e remove os ficheiros temporários.
+        """
+        configurar_pool()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def _contar(self, tabela):
+        """Conta as linhas de uma tabela da cópia."""
+        conexao = sqlite3.connect(self.base)
+        try:
+            return conexao.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+        finally:
+            conexao.close()
+
+    def _verificar(self, manifesto, ler):
+        """Confirma o manifesto gravado, as contagens e os resumos de cada CSV."""
+        self.assertEqual(json.loads(ler(NOME_MANIFESTO)), manifesto)
+        for tabela, entrada in manifesto["tabelas"].items():
+            dados = ler(entrada["ficheiro"])
+            self.assertEqual(entrada["sha256"], hashlib.sha256(dados).hexdigest())
+            self.assertEqual(entrada["bytes"], len(dados))
+            linhas = list(csv.reader(io.StringIO(dados.decode("utf-8"), newline="")))
+            self.assertEqual(len(linhas) - 1, entrada["linhas"])
+            self.assertEqual(entrada["linhas"], self._contar(tabela))
+
+    def test_zip_com_manifesto(self):
+        """
+        Testa o arquivo zip: um CSV por tabela e o manifesto com contagens e SHA-256 corretos.
+        """
+        destino = os.path.join(self.diretorio, "entrega.zip")
+        manifesto = exportar_arquivo(destino)
+        self.assertEqual(list(manifesto["tabelas"]), list(TABELAS_ARQUIVO))
+        with zipfile.ZipFile(destino) as arquivo:
+            self.assertEqual(sorted(arquivo.namelist()),
+                             sorted([NOME_MANIFESTO] + [f"{t}.csv" for t in TABELAS_ARQUIVO]))
+            self._verificar(manifesto, arquivo.read)
+
+    def test_tar_gz_pela_extensao(self):
+        """
+        Testa que a extensão .tar.gz escolhe o formato tar comprimido com gzip.
+        """
+        destino = os.path.join(self.diretorio, "entrega.tar.gz")
+        manifesto = exportar_arquivo(destino, tabelas=["clientes", "formaspagamento"], max_threads=2)
+        with tarfile.open(destino, "r:gz") as arquivo:
+            self._verificar(manifesto, lambda nome: arquivo.extractfile(nome).read())
+
+    def test_instantaneo_consistente(self):
+        """
+        Testa que as escritas feitas durante a exportação não entram no arquivo.
+        - Insere uma forma de pagamento quando a primeira tabela termina.
+        """
+        antes = self._contar("formaspagamento")
+
+        def inserir(_tabela, _linhas):
+            with obter_cursor(commit=True) as cur:
+                cur.execute("INSERT INTO FormasPagamento (metodo) VALUES ('Durante a exportação')")
+
+        manifesto = exportar_arquivo(os.path.join(self.diretorio, "entrega.zip"),
+                                     tabelas=["clientes", "formaspagamento"], progresso=inserir)
+        self.assertEqual(manifesto["tabelas"]["formaspagamento"]["linhas"], antes)
+        self.assertEqual(self._contar("formaspagamento"), antes + 2)
+
+    def test_cancelar_e_parametros_invalidos(self):
+        """
+        Testa que cancelar não cria o arquivo e que tabelas ou formatos desconhecidos são rejeitados.
+        """
+        destino = os.path.join(self.diretorio, "entrega.zip")
+        self.assertIsNone(exportar_arquivo(destino, cancelado=lambda: True))
+        self.assertFalse(os.path.exists(destino))
+        with self.assertRaises(ValueError):
+            exportar_arquivo(destino, tabelas=["utilizadores"])
+        with self.assertRaises(ValueError):
+            exportar_arquivo(destino, formato="rar")
+
+
+if __name__ == "__main__":
+    unittest.main()
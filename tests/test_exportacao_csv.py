@@ -0,0 +1,94 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from controllers.exportacao.exportacao_csv import exportar_consulta_csv
+from controllers.reservas import reservas_servico
+from controllers.reservas.reservas_repositorio import listar_reservas_bd
+
+# Gera as linhas 1..n sem depender de nenhuma tabela
+SQL_SEQUENCIA = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+    SELECT i AS numero, 'linha ' || i AS texto FROM n
+"""
+
+
+class TestExportacaoCsv(unittest.TestCase):
+    """
+    Testes unitários para o motor de exportação CSV em lotes.
+    Escreve os ficheiros num diretório temporário.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria um diretório temporário para os ficheiros exportados.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.diretorio, "saida.csv")
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Remove o diretório temporário.
+        """
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def _ler(self):
+        """Lê o CSV exportado como lista de linhas."""
+        with open(self.caminho, newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_exporta_em_lotes_com_progresso(self):
+        """
+        Testa que todas as linhas são escritas, lote a lote, com o progresso de cada lote.
+        - O cabeçalho por defeito são os nomes das colunas.
+        """
+        progresso = []
+        linhas = exportar_consulta_csv(self.caminho, SQL_SEQUENCIA, (25,), tamanho_lote=10,
+                                       progresso=progresso.append)
+        self.assertEqual(linhas, 25)
+        self.assertEqual(progresso, [10, 20, 25])
+        conteudo = self._ler()
+        self.assertEqual(conteudo[0], ["numero", "texto"])
+        self.assertEqual(conteudo[1:], [[str(i), f"linha {i}"] for i in range(1, 26)])
+        self.assertEqual(os.listdir(self.diretorio), ["saida.csv"])
+
+    def test_cancelar_mantem_destino(self):
+        """
+        Testa que cancelar a meio devolve None e não altera um ficheiro já existente.
+        """
+        with open(self.caminho, "w", encoding="utf-8") as f:
+            f.write("anterior\n")
+        progresso = []
+        linhas = exportar_consulta_csv(self.caminho, SQL_SEQUENCIA, (100,), tamanho_lote=10,
+                                       progresso=progresso.append, cancelado=lambda: len(progresso) >= 2)
+        self.assertIsNone(linhas)
+        self.assertEqual(progresso, [10, 20])
+        self.assertEqual(self._ler(), [["anterior"]])
+        self.assertEqual(os.listdir(self.diretorio), ["saida.csv"])
+
+    def test_sem_linhas_ou_erro_nao_cria_ficheiro(self):
+        """
+        Testa que uma consulta vazia devolve 0 e uma consulta inválida devolve None, sem criar ficheiros.
+        """
+        self.assertEqual(exportar_consulta_csv(self.caminho, "SELECT 1 WHERE 0", cabecalho=["x"]), 0)
+        self.assertIsNone(exportar_consulta_csv(self.caminho, "SELECT * FROM tabela_inexistente"))
+        self.assertEqual(os.listdir(self.diretorio), [])
+        with self.assertRaises(ValueError):
+            exportar_consulta_csv(self.caminho, SQL_SEQUENCIA, (1,), tamanho_lote=0)
+
+    def test_exportar_reservas_igual_a_listagem(self):
+        """
+        Testa que a exportação de reservas tem o cabeçalho e as linhas da listagem, pela mesma ordem.
+        """
+        self.assertTrue(reservas_servico.exportar_reservas_para_csv(self.caminho))
+        conteudo = self._ler()
+        self.assertEqual(conteudo[0], ["ID", "Cliente", "Veículo", "Data Início", "Data Fim", "Estado", "Valor Total"])
+        reservas = listar_reservas_bd()
+        self.assertEqual([int(linha[0]) for linha in conteudo[1:]], [r["id"] for r in reservas])
+
+
+if __name__ == "__main__":
+    unittest.main()
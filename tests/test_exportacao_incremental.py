@@ -0,0 +1,149 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from controllers.exportacao.exportacao_incremental import exportar_alteracoes, obter_marcas
+from controllers.utils_bd import configurar_pool, obter_cursor
+from db.conexao import CAMINHO_BASE_DADOS
+
+SQL_REGISTO_CLIENTES = "SELECT COUNT(*) FROM registo_alteracoes WHERE tabela = 'clientes'"
+
+
+class TestExportacaoIncremental(unittest.TestCase):
+    """
+    Testes unitários para a exportação incremental por marcas de água.
+    Usa uma cópia temporária da base de dados da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Copia a base de dados para um diretório temporário e aponta o pool para a cópia.
+        - Cria o diretório dos ficheiros exportados.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.saida = os.path.join(self.diretorio, "saida")
+        os.mkdir(self.saida)
+        self.base = os.path.join(self.diretorio, "luxury_wheels.db")
+        shutil.copyfile(CAMINHO_BASE_DADOS, self.base)
+        configurar_pool(self.base)
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Repõe o pool da aplicação e remove os ficheiros temporários.
+        """
+        configurar_pool()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def _ler(self, ficheiro):
+        """Lê um CSV exportado como lista de dicionários."""
+        with open(os.path.join(self.saida, ficheiro), newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def _executar(self, sql, parametros=()):
+        """Executa e confirma uma escrita na cópia; devolve o id inserido."""
+        with obter_cursor(commit=True) as cur:
+            cur.execute(sql, parametros)
+            return cur.lastrowid
+
+    def test_primeira_exportacao_completa(self):
+        """
+        Testa que, sem marca, cada tabela é exportada por inteiro e as marcas ficam na posição atual.
+        """
+        with obter_cursor() as cur:
+            total = cur.execute("SELECT COUNT(*) FROM reservas").fetchone()[0]
+        resultado = exportar_alteracoes(self.saida)
+        entrada = resultado["tabelas"]["reservas"]
+        self.assertIsNone(entrada["de"])
+        self.assertEqual(entrada["linhas"], total)
+        linhas = self._ler(entrada["ficheiro"])
+        self.assertEqual(len(linhas), total)
+        self.assertEqual({linha["operacao"] for linha in linhas}, {"I"})
+        self.assertEqual(obter_marcas(), {t: resultado["ate"] for t in resultado["tabelas"]})
+
+    def test_registo_so_com_consumidores(self):
+        """
+        Testa que o registo só cresce depois de a tabela ter um consumidor.
+        - As escritas feitas durante a primeira exportação entram na exportação seguinte.
+        - Uma primeira exportação cancelada não deixa o consumidor registado.
+        """
+        self._executar("UPDATE clientes SET telefone = '930000000' WHERE id = (SELECT MIN(id) FROM clientes)")
+        with obter_cursor() as cur:
+            self.assertEqual(cur.execute("SELECT COUNT(*) FROM registo_alteracoes").fetchone()[0], 0)
+
+        self.assertIsNone(exportar_alteracoes(self.saida, tabelas=["clientes"], cancelado=lambda: True))
+        with obter_cursor() as cur:
+            self.assertEqual(cur.execute("SELECT COUNT(*) FROM marcas_exportacao").fetchone()[0], 0)
+
+        novos = []
+
+        def escrever_durante(tabela, _linhas):
+            novos.append(self._executar("INSERT INTO clientes (nome, email, nif) VALUES (?, ?, ?)",
+                                        ("Durante", "durante@exemplo.pt", "918273600")))
+
+        exportar_alteracoes(self.saida, tabelas=["clientes"], progresso=escrever_durante)
+        seguinte = exportar_alteracoes(self.saida, tabelas=["clientes"])
+        clientes = self._ler(seguinte["tabelas"]["clientes"]["ficheiro"])
+        self.assertEqual([(c["operacao"], int(c["id"])) for c in clientes], [("I", novos[0])])
+
+    def test_delta_com_tombstones(self):
+        """
+        Testa que a exportação seguinte só tem as linhas criadas, alteradas e removidas.
+        - Várias alterações da mesma linha saem como uma só, com o estado final.
+        - As remoções saem como tombstone (só id e seq).
+        - Sem novas alterações não há ficheiros e o registo já exportado é apagado.
+        """
+        exportar_alteracoes(self.saida)
+        id_cliente = self._executar("INSERT INTO clientes (nome, email, nif) VALUES (?, ?, ?)",
+                                    ("Delta", "delta@exemplo.pt", "918273645"))
+        self._executar("UPDATE clientes SET telefone = '910000000' WHERE id = ?", (id_cliente,))
+        with obter_cursor() as cur:
+            id_reserva = cur.execute("SELECT MIN(id) FROM reservas").fetchone()[0]
+            id_pagamento = cur.execute("SELECT MAX(id) FROM pagamentos").fetchone()[0]
+        self._executar("UPDATE reservas SET estado = 'Concluída' WHERE id = ?", (id_reserva,))
+        self._executar("DELETE FROM pagamentos WHERE id = ?", (id_pagamento,))
+
+        resultado = exportar_alteracoes(self.saida)
+        clientes = self._ler(resultado["tabelas"]["clientes"]["ficheiro"])
+        self.assertEqual([(c["operacao"], int(c["id"]), c["telefone"]) for c in clientes],
+                         [("I", id_cliente, "910000000")])
+        reservas = self._ler(resultado["tabelas"]["reservas"]["ficheiro"])
+        self.assertEqual([(r["operacao"], int(r["id"]), r["estado"]) for r in reservas],
+                         [("U", id_reserva, "Concluída")])
+        pagamentos = self._ler(resultado["tabelas"]["pagamentos"]["ficheiro"])
+        self.assertEqual([(p["operacao"], int(p["id"]), p["valor"]) for p in pagamentos],
+                         [("D", id_pagamento, "")])
+
+        ficheiros = sorted(os.listdir(self.saida))
+        seguinte = exportar_alteracoes(self.saida)
+        self.assertEqual({e["linhas"] for e in seguinte["tabelas"].values()}, {0})
+        self.assertEqual(sorted(os.listdir(self.saida)), ficheiros)
+        with obter_cursor() as cur:
+            self.assertEqual(cur.execute("SELECT COUNT(*) FROM registo_alteracoes").fetchone()[0], 0)
+
+    def test_consumidores_e_cancelamento(self):
+        """
+        Testa que cada consumidor tem a sua marca e que cancelar não avança a marca.
+        - O registo só é apagado depois de todos os consumidores o receberem.
+        """
+        exportar_alteracoes(self.saida, "contabilidade", ["clientes"])
+        exportar_alteracoes(self.saida, "auditoria", ["clientes"])
+        self._executar("UPDATE clientes SET telefone = '920000000' WHERE id = (SELECT MIN(id) FROM clientes)")
+        marcas = obter_marcas("contabilidade")
+
+        self.assertIsNone(exportar_alteracoes(self.saida, "contabilidade", ["clientes"], cancelado=lambda: True))
+        self.assertEqual(obter_marcas("contabilidade"), marcas)
+        self.assertEqual(exportar_alteracoes(self.saida, "contabilidade", ["clientes"])["tabelas"]["clientes"]["linhas"], 1)
+        with obter_cursor() as cur:
+            self.assertEqual(cur.execute(SQL_REGISTO_CLIENTES).fetchone()[0], 1)
+        self.assertEqual(exportar_alteracoes(self.saida, "auditoria", ["clientes"])["tabelas"]["clientes"]["linhas"], 1)
+        with obter_cursor() as cur:
+            self.assertEqual(cur.execute(SQL_REGISTO_CLIENTES).fetchone()[0], 0)
+        with self.assertRaises(ValueError):
+            exportar_alteracoes(self.saida, tabelas=["veiculos"])
+
+
+if __name__ == "__main__":
+    unittest.main()
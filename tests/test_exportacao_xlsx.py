@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from openpyxl import load_workbook
+from controllers.exportacao.exportacao_xlsx import TIPOS, exportar_consulta_xlsx
+from controllers.pagamentos import pagamento_servico
+from controllers.pagamentos.pagamento_repositorio import listar_pagamentos_bd
+
+# Gera as linhas 1..n, com uma data, uma data/hora e um valor, sem depender de nenhuma tabela
+SQL_SEQUENCIA = """
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+    SELECT i AS numero, 'linha ' || i AS texto, date('2025-01-01', '+' || i || ' days') AS dia,
+           '2025-01-01 10:30:00' AS registo, i * 1.5 AS valor
+    FROM n
+"""
+TIPOS_SEQUENCIA = ["inteiro", "texto", "data", "data_hora", "moeda"]
+
+
+class TestExportacaoXlsx(unittest.TestCase):
+    """
+    Testes unitários para a exportação XLSX em lotes (modo write-only do openpyxl).
+    Escreve os ficheiros num diretório temporário.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria um diretório temporário para os ficheiros exportados.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.diretorio, "saida.xlsx")
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Remove o diretório temporário.
+        """
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def test_tipos_e_formatos(self):
+        """
+        Testa que datas e valores são gravados como datas e números do Excel, com o formato do tipo.
+        - O cabeçalho fica na primeira linha e a folha tem o painel fixo por baixo dele.
+        """
+        progresso = []
+        linhas = exportar_consulta_xlsx(self.caminho, SQL_SEQUENCIA, (25,), tipos=TIPOS_SEQUENCIA,
+                                        folha="Sequência", tamanho_lote=10, progresso=progresso.append)
+        self.assertEqual(linhas, 25)
+        self.assertEqual(progresso, [10, 20, 25])
+
+        livro = load_workbook(self.caminho)
+        self.assertEqual(livro.sheetnames, ["Sequência"])
+        folha = livro["Sequência"]
+        self.assertEqual(folha.freeze_panes, "A2")
+        self.assertEqual([c.value for c in folha[1]], ["numero", "texto", "dia", "registo", "valor"])
+        self.assertTrue(folha["A1"].font.bold)
+        self.assertEqual(folha.max_row, 26)
+
+        numero, texto, dia, registo, valor = folha[3]
+        self.assertEqual((numero.value, texto.value), (2, "linha 2"))
+        self.assertEqual(dia.value, datetime(2025, 1, 3))
+        self.assertEqual(dia.number_format, TIPOS["data"])
+        self.assertEqual(registo.value, datetime(2025, 1, 1, 10, 30))
+        self.assertEqual(registo.number_format, TIPOS["data_hora"])
+        self.assertEqual(valor.value, 3.0)
+        self.assertEqual(valor.number_format, TIPOS["moeda"])
+
+    def test_divide_em_folhas(self):
+        """
+        Testa que as linhas acima do limite por folha continuam numa folha nova, com cabeçalho.
+        """
+        linhas = exportar_consulta_xlsx(self.caminho, SQL_SEQUENCIA, (25,), cabecalho=["N", "T", "D", "R", "V"],
+                                        tipos=TIPOS_SEQUENCIA, folha="Dados", tamanho_lote=7, linhas_por_folha=10)
+        self.assertEqual(linhas, 25)
+        livro = load_workbook(self.caminho)
+        self.assertEqual(livro.sheetnames, ["Dados", "Dados (2)", "Dados (3)"])
+        numeros = []
+        for folha in livro.worksheets:
+            linhas_folha = list(folha.values)
+            self.assertEqual(linhas_folha[0], ("N", "T", "D", "R", "V"))
+            numeros += [linha[0] for linha in linhas_folha[1:]]
+        self.assertEqual(numeros, list(range(1, 26)))
+
+    def test_cancelar_e_parametros_invalidos(self):
+        """
+        Testa que cancelar, uma consulta vazia ou inválida não criam o ficheiro.
+        - Tipos desconhecidos são rejeitados e um número de tipos errado devolve None.
+        """
+        self.assertIsNone(exportar_consulta_xlsx(self.caminho, SQL_SEQUENCIA, (100,), tamanho_lote=10,
+                                                 cancelado=lambda: True))
+        self.assertEqual(exportar_consulta_xlsx(self.caminho, "SELECT 1 WHERE 0"), 0)
+        self.assertIsNone(exportar_consulta_xlsx(self.caminho, "SELECT * FROM tabela_inexistente"))
+        self.assertIsNone(exportar_consulta_xlsx(self.caminho, SQL_SEQUENCIA, (1,), tipos=["texto"]))
+        self.assertEqual(os.listdir(self.diretorio), [])
+        with self.assertRaises(ValueError):
+            exportar_consulta_xlsx(self.caminho, SQL_SEQUENCIA, (1,), tipos=["texto"] * 4 + ["percentagem"])
+
+    def test_exportar_pagamentos_igual_a_listagem(self):
+        """
+        Testa que a exportação de pagamentos tem as linhas da listagem, pela mesma ordem, com valores numéricos.
+        """
+        self.assertTrue(pagamento_servico.exportar_pagamentos_para_xlsx(self.caminho))
+        folha = load_workbook(self.caminho, read_only=True)["Pagamentos"]
+        linhas = list(folha.values)
+        self.assertEqual(linhas[0][0], "ID Pagamento")
+        pagamentos = listar_pagamentos_bd()
+        self.assertEqual([linha[0] for linha in linhas[1:]], [p["id"] for p in pagamentos])
+        for linha, pagamento in zip(linhas[1:], pagamentos):
+            self.assertAlmostEqual(linha[3], float(pagamento["valor"]))
+            if isinstance(linha[4], datetime):
+                self.assertEqual(linha[4].date(), date.fromisoformat(pagamento["data_pagamento"][:10]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,232 @@
+import csv
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from controllers.cliente.cliente_servico import importar_clientes_csv
+from controllers.dashboard.dashboard_repositorio import verificar_contadores_kpi
+from controllers.importacao.importacao_csv import TAMANHO_LOTE, importar_csv
+from controllers.pagamentos.pagamento_servico import importar_pagamentos_de_csv
+from controllers.reservas.reservas_repositorio import importar_reservas_csv_bd, versao_reservas
+from controllers.reservas.reservas_servico import importar_reservas_de_csv
+from controllers.utils_bd import configurar_pool, obter_cursor
+from controllers.veiculos.veiculos_servico import importar_veiculos_servico
+from db.conexao import CAMINHO_BASE_DADOS
+
+VEICULO = {
+    "marca": "Importada", "modelo": "Modelo", "matricula": "IM-00-01", "ano": "2022", "categoria": "SUV",
+    "transmissao": "Automática", "tipo": "Diesel", "lugares": "5", "imagem": "importada.jpg", "diaria": "99.0",
+    "data_ultima_revisao": "2024-01-01", "data_proxima_revisao": "2024-07-01",
+    "data_ultima_inspecao": "2024-01-01", "data_proxima_inspecao": "2025-01-01",
+}
+
+
+class TestImportacaoCsv(unittest.TestCase):
+    """
+    Testes unitários para a importação de ficheiros CSV em lotes, com relatório de rejeições.
+    Usa uma cópia temporária da base de dados da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Copia a base de dados para um diretório temporário e aponta o pool para a cópia.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.base = os.path.join(self.diretorio, "luxury_wheels.db")
+        shutil.copyfile(CAMINHO_BASE_DADOS, self.base)
+        configurar_pool(self.base)
+        self.rejeicoes = os.path.join(self.diretorio, "rejeicoes.csv")
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Repõe o pool da aplicação e remove os ficheiros temporários.
+        """
+        configurar_pool()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def _csv(self, linhas, nome="importar.csv"):
+        """Escreve um CSV no diretório temporário (a primeira linha é o cabeçalho) e devolve o caminho."""
+        caminho = os.path.join(self.diretorio, nome)
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(linhas)
+        return caminho
+
+    def _consultar(self, sql, parametros=()):
+        """Executa uma consulta na cópia e devolve todas as linhas."""
+        conexao = sqlite3.connect(self.base)
+        try:
+            return conexao.execute(sql, parametros).fetchall()
+        finally:
+            conexao.close()
+
+    def _relatorio(self):
+        """Lê o relatório de rejeições: {número da linha: motivo}."""
+        with open(self.rejeicoes, newline="", encoding="utf-8") as f:
+            return {int(linha["linha"]): linha["motivo"] for linha in csv.DictReader(f)}
+
+    def test_clientes_validos_e_rejeitados(self):
+        """
+        Testa a importação de clientes com linhas inválidas e repetidas.
+        - As linhas válidas são inseridas; as inválidas e as de email/NIF existente vão para o relatório.
+        """
+        caminho = self._csv([
+            ["Nome", "Email", "Telefone", "NIF"],
+            ["Ana Importada", "ana.importada@exemplo.pt", "912345678", "300000001"],
+            ["Rui Importado", "email-invalido", "912345678", "300000002"],
+            ["Eva Importada", "joao.silva@gmail.com", "912345678", "300000003"],
+            ["Luis Importado", "luis.importado@exemplo.pt", "912345678", "300000001"],
+            ["Rita Importada", "rita.importada@exemplo.pt", "912345678", "300000004"],
+        ])
+        resultado = importar_clientes_csv(caminho, self.rejeicoes)
+        self.assertEqual((resultado["lidas"], resultado["inseridas"], resultado["rejeitadas"]), (5, 2, 3))
+        self.assertFalse(resultado["cancelada"])
+
+        relatorio = self._relatorio()
+        self.assertEqual(sorted(relatorio), [3, 4, 5])
+        self.assertEqual(relatorio[3], "Email inválido.")
+        self.assertIn("base de dados", relatorio[4])
+        self.assertEqual([r["linha"] for r in resultado["rejeicoes"]], [3, 4, 5])
+        self.assertEqual(self._consultar("SELECT nome FROM Clientes WHERE nif LIKE '30000000_' ORDER BY nif"),
+                         [("Ana Importada",), ("Rita Importada",)])
+
+        # Repetir o ficheiro não insere nada (todas as linhas já existem ou são inválidas)
+        self.assertEqual(importar_clientes_csv(caminho)["inseridas"], 0)
+
+    def test_reservas_referencias_e_conflitos(self):
+        """
+        Testa que as reservas de clientes/veículos inexistentes ou sobrepostas são rejeitadas.
+        - Sobreposição com uma reserva gravada (reserva 1 do veículo 1) e entre linhas do ficheiro.
+        - Reservas não ativas (Cancelada) não ocupam o veículo.
+        """
+        caminho = self._csv([
+            ["id_cliente", "id_veiculo", "data_inicio", "data_fim", "estado", "valor_total"],
+            ["1", "1", "2040-01-01", "2040-01-05", "Pendente", "400"],
+            ["999999", "1", "2040-02-01", "2040-02-05", "Pendente", "400"],
+            ["1", "999999", "2040-02-01", "2040-02-05", "Pendente", "400"],
+            ["2", "1", "2024-07-05", "2024-07-06", "Confirmada", "200"],
+            ["2", "1", "2040-01-04", "2040-01-08", "Confirmada", "400"],
+            ["2", "1", "2040-01-04", "2040-01-08", "Cancelada", "400"],
+            ["1", "1", "2040-03-05", "2040-03-01", "Pendente", "400"],
+        ])
+        resultado = importar_reservas_de_csv(caminho, self.rejeicoes)
+        self.assertEqual((resultado["lidas"], resultado["inseridas"], resultado["rejeitadas"]), (7, 2, 5))
+
+        relatorio = self._relatorio()
+        self.assertEqual(sorted(relatorio), [3, 4, 5, 6, 8])
+        self.assertIn("Cliente 999999", relatorio[3])
+        self.assertIn("Veículo 999999", relatorio[4])
+        self.assertIn("reserva 1", relatorio[5])
+        self.assertIn("outra linha do ficheiro", relatorio[6])
+        self.assertIn("Período inválido", relatorio[8])
+        self.assertEqual(self._consultar("SELECT estado FROM Reservas WHERE data_inicio >= '2040-01-01' ORDER BY id"),
+                         [("Pendente",), ("Cancelada",)])
+
+    def test_veiculos_e_pagamentos(self):
+        """
+        Testa a importação de veículos (matrícula repetida rejeitada) e de pagamentos (reserva inexistente).
+        """
+        repetido = dict(VEICULO, modelo="Repetido")
+        sem_revisao = dict(VEICULO, matricula="IM-00-02", data_ultima_revisao="")
+        caminho = self._csv([list(VEICULO)] + [list(v.values()) for v in (VEICULO, repetido, sem_revisao)],
+                            "veiculos.csv")
+        resultado = importar_veiculos_servico(caminho, self.rejeicoes)
+        self.assertEqual((resultado["inseridas"], resultado["rejeitadas"]), (1, 2))
+        self.assertEqual(self._consultar("SELECT modelo, km_atual, estado FROM Veiculos WHERE matricula = 'IM-00-01'"),
+                         [("Modelo", 0, "disponível")])
+
+        caminho = self._csv([
+            ["id_reserva", "id_forma_pagamento", "valor", "data_pagamento"],
+            ["1", "1", "50.0", "2024-06-01"],
+            ["999999", "1", "50.0", "2024-06-01"],
+            ["1", "1", "-5", "2024-06-01"],
+        ], "pagamentos.csv")
+        resultado = importar_pagamentos_de_csv(caminho)
+        self.assertEqual((resultado["inseridas"], resultado["rejeitadas"]), (1, 2))
+        self.assertEqual(sorted(r["linha"] for r in resultado["rejeicoes"]), [3, 4])
+
+    def test_tabelas_derivadas_por_lote(self):
+        """
+        Testa que os lotes gravados com os triggers suspensos deixam as tabelas derivadas corretas.
+        - Os contadores do dashboard coincidem com um recálculo de raiz.
+        - As linhas inseridas entram no registo de alterações de uma tabela com consumidor.
+        - Os triggers são recriados.
+        """
+        with obter_cursor(commit=True) as cur:
+            cur.execute("INSERT INTO marcas_exportacao (consumidor, tabela, seq) VALUES ('teste', 'clientes', 0)")
+        triggers = self._consultar("SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name")
+
+        caminho = self._csv([["Nome", "Email", "Telefone", "NIF"]] + [
+            ["Cliente Lote", f"lote{n}@exemplo.pt", "912345678", f"30000{n:04d}"] for n in range(7)
+        ])
+        self.assertEqual(importar_clientes_csv(caminho)["inseridas"], 7)
+        caminho = self._csv([["id_reserva", "id_forma_pagamento", "valor", "data_pagamento"],
+                             ["1", "1", "50.0", "2024-06-01"], ["1", "2", "25.5", "2024-06-02"]], "pagamentos.csv")
+        self.assertEqual(importar_pagamentos_de_csv(caminho)["inseridas"], 2)
+
+        self.assertEqual(verificar_contadores_kpi(), {})
+        self.assertEqual(self._consultar("SELECT COUNT(*) FROM registo_alteracoes WHERE tabela = 'clientes' "
+                                         "AND operacao = 'I'"), [(7,)])
+        self.assertEqual(self._consultar("SELECT SUM(total) FROM receita_por_mes"),
+                         self._consultar("SELECT COUNT(*) FROM Pagamentos"))
+        self.assertEqual(self._consultar("SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name"),
+                         triggers)
+
+    def test_erro_a_meio_invalida_caches(self):
+        """
+        Testa que um erro a meio da importação de reservas invalida as caches.
+        - O primeiro lote fica gravado e a versão das reservas muda, apesar de não haver resultado.
+        """
+        linhas = [["id_cliente", "id_veiculo", "data_inicio", "data_fim", "estado", "valor_total"]]
+        linhas += [["1", "1", "2041-01-01", "2041-01-02", "Cancelada", "0"]] * (TAMANHO_LOTE + 1)
+        caminho = self._csv(linhas)
+
+        def preparar(linha):
+            if preparar.chamadas == TAMANHO_LOTE:
+                raise RuntimeError("falha inesperada")
+            preparar.chamadas += 1
+            return (linha["data_inicio"], linha["data_fim"], 1, 1, linha["estado"], 0.0), ""
+        preparar.chamadas = 0
+
+        versao = versao_reservas()
+        self.assertIsNone(importar_reservas_csv_bd(caminho, preparar))
+        self.assertNotEqual(versao_reservas(), versao)
+        self.assertEqual(self._consultar("SELECT COUNT(*) FROM Reservas WHERE data_inicio = '2041-01-01'"),
+                         [(TAMANHO_LOTE,)])
+
+    def test_lotes_e_cancelamento(self):
+        """
+        Testa a gravação em lotes com progresso e o cancelamento entre lotes.
+        - Os lotes anteriores ao cancelamento ficam gravados.
+        """
+        caminho = self._csv([["metodo"]] + [[f"Importado {n}"] for n in range(7)])
+        sql = "INSERT INTO FormasPagamento (metodo) VALUES (?)"
+
+        def preparar(linha):
+            return (linha["metodo"],), ""
+
+        progresso = []
+        resultado = importar_csv(caminho, sql, ["metodo"], preparar, tamanho_lote=3, progresso=progresso.append,
+                                 cancelado=lambda: len(progresso) == 2)
+        self.assertEqual(progresso, [3, 6])
+        self.assertTrue(resultado["cancelada"])
+        self.assertEqual((resultado["lidas"], resultado["inseridas"]), (6, 6))
+        self.assertEqual(len(self._consultar("SELECT id FROM FormasPagamento WHERE metodo LIKE 'Importado %'")), 6)
+
+    def test_cabecalho_em_falta(self):
+        """
+        Testa que um ficheiro sem as colunas obrigatórias ou inexistente devolve None, sem gravar nada.
+        """
+        caminho = self._csv([["nome", "email"], ["Ana Importada", "ana.importada@exemplo.pt"]])
+        self.assertIsNone(importar_clientes_csv(caminho, self.rejeicoes))
+        self.assertIsNone(importar_clientes_csv(os.path.join(self.diretorio, "inexistente.csv")))
+        self.assertFalse(os.path.exists(self.rejeicoes))
+        with self.assertRaises(ValueError):
+            importar_csv(caminho, "INSERT INTO FormasPagamento (metodo) VALUES (?)", ["metodo"],
+                         lambda linha: ((linha["metodo"],), ""), tamanho_lote=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
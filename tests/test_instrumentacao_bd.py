@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+from controllers import instrumentacao_bd
+from controllers.utils_bd import configurar_pool, obter_cursor, executar_query_valor_unico
+
+
+class TestInstrumentacaoBD(unittest.TestCase):
+    """
+    Testes unitários para a medição de latência das consultas.
+    Usa uma base de dados temporária para não alterar a base da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Aponta o pool para uma base de dados temporária.
+        - Ativa a instrumentação com métricas limpas.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        configurar_pool(os.path.join(self.diretorio, "teste.db"))
+        instrumentacao_bd.limpar_metricas()
+        instrumentacao_bd.configurar_instrumentacao(True, limiar_ms=10_000)
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Desativa a instrumentação e repõe o pool da aplicação.
+        """
+        instrumentacao_bd.configurar_instrumentacao(False, limiar_ms=100)
+        instrumentacao_bd.limpar_metricas()
+        configurar_pool()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def test_normalizar_sql(self):
+        """
+        Testa que literais e listas de parâmetros são normalizados.
+        """
+        sql = "SELECT *  FROM Reservas\n WHERE id = 5 AND estado IN ('Pendente', 'Confirmada');"
+        self.assertEqual(
+            instrumentacao_bd.normalizar_sql(sql),
+            "SELECT * FROM Reservas WHERE id = ? AND estado IN (?...)"
+        )
+
+    def test_histograma_percentis(self):
+        """
+        Testa que os percentis do histograma ficam dentro do erro de 10%.
+        """
+        histograma = instrumentacao_bd.HistogramaLatencia()
+        for ms in range(1, 101):
+            histograma.registar(ms / 1000)
+        self.assertAlmostEqual(histograma.percentil(50), 0.050, delta=0.005)
+        self.assertAlmostEqual(histograma.percentil(99), 0.099, delta=0.010)
+        self.assertEqual(histograma.percentil(100), 0.100)
+
+    def test_obter_cursor_regista_latencias(self):
+        """
+        Testa que as consultas feitas via obter_cursor e
+        executar_query_valor_unico ficam no relatório.
+        """
+        with obter_cursor() as cursor:
+            cursor.execute("SELECT id FROM Clientes WHERE id = ?", (1,))
+            cursor.fetchall()
+        executar_query_valor_unico("SELECT COUNT(*) FROM Clientes")
+        executar_query_valor_unico("SELECT COUNT(*) FROM Clientes")
+
+        relatorio = {item["sql"]: item for item in instrumentacao_bd.relatorio_latencias()}
+        self.assertEqual(relatorio["SELECT id FROM Clientes WHERE id = ?"]["chamadas"], 1)
+        self.assertEqual(relatorio["SELECT COUNT(*) FROM Clientes"]["chamadas"], 2)
+        self.assertIn("p95", instrumentacao_bd.formatar_relatorio_latencias())
+
+    def test_consulta_lenta_regista_plano(self):
+        """
+        Testa que consultas acima do limiar vão para o log com o plano de execução.
+        """
+        instrumentacao_bd.configurar_instrumentacao(True, limiar_ms=0)
+        with self.assertLogs(instrumentacao_bd.logger_lentas, level="WARNING") as registo:
+            executar_query_valor_unico("SELECT COUNT(*) FROM Reservas WHERE estado = ?", ("Pendente",))
+        self.assertIn("idx_reservas_estado", registo.output[0])
+        self.assertIn("Pendente", registo.output[0])
+
+    def test_executemany_em_iterador_e_row_factory(self):
+        """
+        Testa o cursor instrumentado com cargas em massa e tuplos simples.
+        - Um gerador é passado ao executemany e medido como uma só instrução.
+        - `row_factory` é atribuído no cursor original.
+        """
+        consumidos = []
+
+        def linhas():
+            for n in range(3):
+                consumidos.append(n)
+                yield (f"metodo {n}",)
+
+        with obter_cursor(commit=True) as cursor:
+            self.assertIsInstance(cursor, instrumentacao_bd.CursorInstrumentado)
+            cursor.executemany("INSERT INTO formaspagamento (metodo) VALUES (?)", linhas())
+            self.assertEqual(consumidos, [0, 1, 2])
+            cursor.row_factory = None
+            cursor.execute("SELECT metodo FROM formaspagamento WHERE metodo LIKE 'metodo %' ORDER BY id")
+            self.assertEqual(cursor.fetchall(), [("metodo 0",), ("metodo 1",), ("metodo 2",)])
+        relatorio = {item["sql"]: item for item in instrumentacao_bd.relatorio_latencias()}
+        self.assertEqual(relatorio["INSERT INTO formaspagamento (metodo) VALUES (?)"]["chamadas"], 1)
@@ -0,0 +1,124 @@
+import random
+import unittest
+from utils.ligador_treeview import LigadorTreeview, calcular_diferencas
+
+
+class ArvoreFalsa:
+    """Imita as operações da ttk.Treeview usadas pelo ligador, sem precisar de ecrã."""
+
+    def __init__(self):
+        self.ordem = []
+        self.itens = {}
+        self.operacoes = 0
+
+    def yview(self):
+        return (0.0, 1.0)
+
+    def yview_moveto(self, _):
+        pass
+
+    def get_children(self):
+        return tuple(self.ordem)
+
+    def _indice(self, indice):
+        return len(self.ordem) if indice == "end" else indice
+
+    def insert(self, _pai, indice, iid, values, tags):
+        self.operacoes += 1
+        self.ordem.insert(self._indice(indice), iid)
+        self.itens[iid] = (tuple(values), tuple(tags))
+
+    def item(self, iid, values, tags):
+        self.operacoes += 1
+        self.itens[iid] = (tuple(values), tuple(tags))
+
+    def move(self, iid, _pai, indice):
+        self.operacoes += 1
+        self.ordem.remove(iid)
+        self.ordem.insert(self._indice(indice), iid)
+
+    def delete(self, *iids):
+        self.operacoes += len(iids)
+        for iid in iids:
+            self.ordem.remove(iid)
+            del self.itens[iid]
+
+
+class TestLigadorTreeview(unittest.TestCase):
+    """
+    Testes unitários para o cálculo de diferenças e a ligação incremental à Treeview.
+    """
+
+    def _linhas(self, ids, sufixo=""):
+        """Cria linhas (chave, valores, etiquetas) para os IDs dados."""
+        return [(i, (i, f"nome{i}{sufixo}"), ()) for i in ids]
+
+    def _conferir(self, arvore, linhas):
+        """Confirma que a árvore mostra exatamente as linhas, pela ordem."""
+        self.assertEqual(arvore.ordem, [str(chave) for chave, _, _ in linhas])
+        for chave, valores, etiquetas in linhas:
+            self.assertEqual(arvore.itens[str(chave)], (tuple(valores), tuple(etiquetas)))
+
+    def test_diferencas_minimas(self):
+        """
+        Testa que só as linhas alteradas geram operações.
+        - Remove a 2, altera a 3, acrescenta a 6 no fim e a 0 no início.
+        """
+        anteriores = {str(i): ((i, f"nome{i}"), ()) for i in range(1, 6)}
+        novas = [("0", (0, "nome0"), ())] + [
+            (str(i), (i, "outro" if i == 3 else f"nome{i}"), ()) for i in (1, 3, 4, 5, 6)]
+
+        diferencas = calcular_diferencas([str(i) for i in range(1, 6)], anteriores, novas)
+        self.assertEqual(diferencas["remover"], ["2"])
+        self.assertEqual(diferencas["atualizar"], [("3", (3, "outro"), ())])
+        self.assertEqual(diferencas["posicionar"], [(0, "0", (0, "nome0"), ()), ("end", "6", (6, "nome6"), ())])
+
+    def test_chaves_repetidas(self):
+        """
+        Testa que chaves repetidas são rejeitadas.
+        """
+        with self.assertRaises(ValueError):
+            calcular_diferencas([], {}, [("1", (), ()), ("1", (), ())])
+
+    def test_sem_alteracoes_nao_toca_na_arvore(self):
+        """
+        Testa que atualizar com as mesmas linhas não faz nenhuma operação na árvore.
+        """
+        arvore = ArvoreFalsa()
+        ligador = LigadorTreeview(arvore)
+        ligador.atualizar(self._linhas(range(1000)))
+        arvore.operacoes = 0
+        ligador.atualizar(self._linhas(range(1000)))
+        self.assertEqual(arvore.operacoes, 0)
+
+        ligador.atualizar(self._linhas(range(1001)))
+        self.assertEqual(arvore.operacoes, 1)
+
+    def test_alteracoes_aleatorias_coincidem_com_reconstrucao(self):
+        """
+        Testa, com sequências aleatórias de inserções, alterações, remoções e
+        reordenações, que a árvore fica igual à lista pedida.
+        """
+        aleatorio = random.Random(42)
+        arvore = ArvoreFalsa()
+        ligador = LigadorTreeview(arvore)
+        ids = list(range(50))
+        for ronda in range(200):
+            ids = [i for i in ids if aleatorio.random() > 0.1]
+            ids += aleatorio.sample(range(50, 200), 5)
+            ids = list(dict.fromkeys(ids))
+            if ronda % 7 == 0:
+                aleatorio.shuffle(ids)
+            elif ronda % 5 == 0:
+                ids.sort()
+            linhas = [(i, (i, f"nome{i}-{aleatorio.randint(0, 9)}"), ("par" if n % 2 else "impar",))
+                      for n, i in enumerate(ids)]
+            ligador.atualizar(linhas)
+            self._conferir(arvore, linhas)
+
+        ligador.limpar()
+        self.assertEqual(arvore.ordem, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from controllers.pagamentos import pagamento_servico
+from controllers.reservas import reservas_servico
+from utils.lista_paginada import ModeloPaginado
+
+
+class TestModeloPaginado(unittest.TestCase):
+    """
+    Testes unitários para o modelo paginado por chave (sem ecrã).
+    Usa uma lista em memória ordenada por (data, id) descendente como fonte.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria 95 linhas com datas repetidas e uma função de busca por chave que conta as chamadas.
+        """
+        self.linhas = sorted(
+            ({"id": i, "data": f"2025-01-{i % 28 + 1:02d}"} for i in range(1, 96)),
+            key=lambda l: (l["data"], l["id"]), reverse=True)
+        self.chamadas = []
+
+    def _buscar(self, limite, apos):
+        """Devolve até `limite` linhas a seguir à chave (data, id)."""
+        self.chamadas.append(apos)
+        candidatas = self.linhas if apos is None else [l for l in self.linhas if (l["data"], l["id"]) < apos]
+        return candidatas[:limite]
+
+    def _modelo(self, max_paginas=3):
+        """Cria um modelo com páginas de 10 linhas."""
+        return ModeloPaginado(self._buscar, lambda l: (l["data"], l["id"]), tamanho_pagina=10,
+                              max_paginas=max_paginas)
+
+    def test_paginas_cobrem_a_lista_pela_ordem(self):
+        """
+        Testa que percorrer as páginas devolve todas as linhas, pela ordem, sem repetições.
+        """
+        modelo = self._modelo()
+        obtidas = []
+        numero = 0
+        while modelo.tem_pagina(numero):
+            obtidas.extend(modelo.pagina(numero))
+            numero += 1
+        self.assertEqual(numero, 10)
+        self.assertEqual(obtidas, self.linhas)
+        self.assertEqual(modelo.pagina(50), [])
+
+    def test_cache_lru_limitada(self):
+        """
+        Testa que só as páginas mais recentes ficam em memória e que voltar a uma página em cache não lê a fonte.
+        """
+        modelo = self._modelo(max_paginas=3)
+        for numero in range(6):
+            modelo.pagina(numero)
+        self.assertEqual(modelo.paginas_em_memoria(), [3, 4, 5])
+
+        chamadas = len(self.chamadas)
+        modelo.pagina(4)
+        self.assertEqual(len(self.chamadas), chamadas)
+        self.assertEqual(modelo.paginas_em_memoria(), [3, 5, 4])
+
+        # Página fora da cache: uma leitura direta a partir da chave guardada
+        self.assertEqual(modelo.pagina(1), self.linhas[10:20])
+        self.assertEqual(len(self.chamadas), chamadas + 1)
+
+    def test_salto_para_pagina_nao_visitada(self):
+        """
+        Testa que pedir uma página distante lê as anteriores uma vez para descobrir a chave de início.
+        """
+        modelo = self._modelo()
+        self.assertEqual(modelo.pagina(4), self.linhas[40:50])
+        self.assertEqual(len(self.chamadas), 5)
+
+    def test_invalidar_apos_escrita(self):
+        """
+        Testa que, depois de invalidar, as páginas refletem inserções e remoções na fonte.
+        """
+        modelo = self._modelo()
+        modelo.pagina(0)
+        modelo.pagina(1)
+        self.linhas.insert(0, {"id": 999, "data": "2099-01-01"})
+        del self.linhas[15]
+        modelo.invalidar()
+        obtidas = [linha for numero in range(11) for linha in modelo.pagina(numero)]
+        self.assertEqual(obtidas, self.linhas)
+
+    def test_parametros_invalidos(self):
+        """
+        Testa que tamanhos de página ou de cache não positivos são rejeitados.
+        """
+        with self.assertRaises(ValueError):
+            ModeloPaginado(self._buscar, lambda l: l["id"], tamanho_pagina=0)
+
+
+class TestPaginasBaseDados(unittest.TestCase):
+    """
+    Testes da paginação por chave dos repositórios (usa a base de dados da aplicação).
+    """
+
+    def _percorrer(self, buscar, chave):
+        """Percorre todas as páginas de 7 linhas e devolve os IDs pela ordem."""
+        ids, apos = [], None
+        while True:
+            pagina = buscar(7, apos)
+            ids.extend(linha["id"] for linha in pagina)
+            if len(pagina) < 7:
+                return ids
+            apos = chave(pagina[-1])
+
+    def test_reservas_pela_ordem_da_listagem(self):
+        """
+        Testa que as páginas de reservas percorrem todas as reservas por data de início e ID descendentes.
+        """
+        ids = self._percorrer(reservas_servico.obter_pagina_reservas_servico,
+                              lambda r: (r["data_inicio"], r["id"]))
+        reservas = reservas_servico.obter_reservas_servico()
+        esperado = [r["id"] for r in sorted(
+            reservas, key=lambda r: (r["data_inicio"] is not None, r["data_inicio"] or "", r["id"]), reverse=True)]
+        self.assertEqual(ids, esperado)
+        self.assertEqual(reservas_servico.obter_pagina_reservas_servico(0), [])
+
+    def test_pagamentos_pela_ordem_da_listagem(self):
+        """
+        Testa que as páginas de pagamentos percorrem todos os pagamentos por data e ID descendentes.
+        """
+        ids = self._percorrer(pagamento_servico.obter_pagina_pagamentos,
+                              lambda p: (p["data_pagamento"], p["id"]))
+        pagamentos = pagamento_servico.obter_pagamentos()
+        esperado = [p["id"] for p in sorted(
+            pagamentos, key=lambda p: (p["data_pagamento"] is not None, p["data_pagamento"] or "", p["id"]),
+            reverse=True)]
+        self.assertEqual(ids, esperado)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from db.migracoes import MIGRACOES, aplicar_migracoes, versao_atual
+
+
+class TestMigracoes(unittest.TestCase):
+    """
+    Testes unitários para o executor de migrações versionadas.
+    Usa bases de dados temporárias para não alterar a base da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Abre uma conexão para uma base de dados temporária vazia.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.conexao = sqlite3.connect(os.path.join(self.diretorio, "teste.db"))
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Fecha a conexão e remove a base de dados temporária.
+        """
+        self.conexao.close()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def _indices(self):
+        """Devolve o conjunto de nomes de índices criados explicitamente."""
+        return {
+            linha[0] for linha in self.conexao.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+            )
+        }
+
+    def test_base_vazia_fica_na_ultima_versao(self):
+        """
+        Testa que uma base vazia recebe todas as migrações, tabelas e índices.
+        """
+        aplicadas = aplicar_migracoes(self.conexao)
+        self.assertEqual(aplicadas, [versao for versao, _, _ in MIGRACOES])
+        self.assertEqual(versao_atual(self.conexao), MIGRACOES[-1][0])
+        self.assertIn("idx_reservas_veiculo_periodo", self._indices())
+        self.assertIn("idx_pagamentos_reserva", self._indices())
+
+    def test_migracoes_idempotentes(self):
+        """
+        Testa que voltar a aplicar as migrações não altera nada.
+        """
+        aplicar_migracoes(self.conexao)
+        self.assertEqual(aplicar_migracoes(self.conexao), [])
+        total = self.conexao.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+        self.assertEqual(total, len(MIGRACOES))
+
+    def test_base_antiga_recebe_valor_total(self):
+        """
+        Testa que uma base criada sem `reservas.valor_total` é atualizada
+        sem perder as reservas existentes.
+        """
+        self.conexao.execute(
+            "CREATE TABLE reservas (id INTEGER PRIMARY KEY AUTOINCREMENT, id_cliente INTEGER, "
+            "id_veiculo INTEGER, data_inicio TEXT, data_fim TEXT, estado TEXT DEFAULT 'Pendente')"
+        )
+        self.conexao.execute(
+            "INSERT INTO reservas (id_cliente, id_veiculo, data_inicio, data_fim) "
+            "VALUES (1, 1, '2024-07-01', '2024-07-10')"
+        )
+        self.conexao.commit()
+
+        aplicar_migracoes(self.conexao)
+        linha = self.conexao.execute("SELECT data_inicio, valor_total FROM reservas").fetchone()
+        self.assertEqual(linha, ("2024-07-01", 0.0))
+
+    def test_clientes_repetidos_unicidade_por_triggers(self):
+        """
+        Testa que uma base com NIFs repetidos é migrada e passa a rejeitar novas repetições.
+        - Sem repetições os índices são únicos.
+        - Com repetições, triggers rejeitam novos NIFs repetidos mas permitem editar os existentes.
+        """
+        aplicar_migracoes(self.conexao, ate=8)
+        self.conexao.executemany(
+            "INSERT INTO clientes (nome, email, nif) VALUES (?, ?, ?)",
+            [("Ana", "ana@exemplo.pt", "123456789"), ("Rui", "rui@exemplo.pt", "123456789")],
+        )
+        self.conexao.commit()
+        aplicar_migracoes(self.conexao)
+
+        unicos = {
+            linha[1]: linha[2] for linha in self.conexao.execute("PRAGMA index_list(clientes)")
+        }
+        self.assertEqual(unicos["idx_clientes_nif"], 0)
+        self.assertEqual(unicos["idx_clientes_email_normalizado"], 1)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conexao.execute("INSERT INTO clientes (nome, email, nif) VALUES ('Eva', 'eva@exemplo.pt', '123456789')")
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conexao.execute("INSERT INTO clientes (nome, email, nif) VALUES ('Eva', 'ANA@exemplo.pt', '987654321')")
+        self.conexao.execute("UPDATE clientes SET nome = 'Ana Maria' WHERE email = 'ana@exemplo.pt'")
+        # Como em atualizar_cliente: todas as colunas são gravadas, com o NIF repetido inalterado
+        self.conexao.execute(
+            "UPDATE clientes SET nome = ?, email = ?, telefone = ?, nif = ? WHERE email = 'ana@exemplo.pt'",
+            ("Ana Maria", "Ana@Exemplo.pt", "912345678", "123456789"),
+        )
+        self.conexao.execute("UPDATE clientes SET nif = '111111111' WHERE email = 'rui@exemplo.pt'")
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conexao.execute("UPDATE clientes SET nif = '123456789' WHERE email = 'rui@exemplo.pt'")
+
+    def test_registo_alteracoes_por_triggers(self):
+        """
+        Testa que as escritas nas tabelas incrementais ficam no registo de alterações, por ordem.
+        - Só as tabelas com algum consumidor (marca de exportação) são registadas.
+        - Mudar o id de uma linha regista a remoção do id antigo.
+        """
+        aplicar_migracoes(self.conexao)
+        self.conexao.execute("INSERT INTO clientes (nome, email, nif) VALUES ('Ana', 'ana@exemplo.pt', '111111111')")
+        self.conexao.execute("INSERT INTO marcas_exportacao (consumidor, tabela, seq) VALUES ('teste', 'reservas', 0)")
+        self.conexao.execute("INSERT INTO reservas (id, id_cliente, id_veiculo) VALUES (1, 1, 1)")
+        self.conexao.execute("UPDATE reservas SET estado = 'Confirmada' WHERE id = 1")
+        self.conexao.execute("UPDATE reservas SET id = 2 WHERE id = 1")
+        self.conexao.execute("DELETE FROM reservas WHERE id = 2")
+        self.conexao.execute("INSERT INTO formaspagamento (metodo) VALUES ('MB Way')")
+
+        registo = self.conexao.execute(
+            "SELECT seq, tabela, id_linha, operacao FROM registo_alteracoes ORDER BY seq"
+        ).fetchall()
+        self.assertEqual(registo, [
+            (1, "reservas", 1, "I"), (2, "reservas", 1, "U"), (3, "reservas", 1, "D"),
+            (4, "reservas", 2, "U"), (5, "reservas", 2, "D"),
+        ])
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from PIL import Image
+from utils.miniaturas import CacheMiniaturas
+
+
+class TestCacheMiniaturas(unittest.TestCase):
+    """
+    Testes unitários para a cache de miniaturas (disco + LRU em memória).
+    Usa imagens e um diretório de cache temporários.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria uma imagem JPEG de 1200x800 e um diretório de cache vazio.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.origem = os.path.join(self.diretorio, "carro.jpg")
+        Image.new("RGB", (1200, 800), "red").save(self.origem)
+        self.cache_dir = os.path.join(self.diretorio, "cache")
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Remove os ficheiros temporários.
+        """
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def test_niveis_da_cache(self):
+        """
+        Testa que a miniatura é gerada uma vez, servida da memória e, noutra instância, do disco.
+        - Confirma as dimensões nos modos com e sem proporção.
+        """
+        cache = CacheMiniaturas(self.cache_dir)
+        miniatura = cache.obter(self.origem, (400, 280))
+        self.assertEqual(miniatura.size, (400, 267))
+        self.assertIs(cache.obter(self.origem, (400, 280)), miniatura)
+        self.assertEqual(cache.estatisticas, {"memoria": 1, "disco": 0, "geradas": 1})
+
+        self.assertEqual(cache.obter(self.origem, (200, 150), manter_proporcao=False).size, (200, 150))
+
+        outra = CacheMiniaturas(self.cache_dir)
+        self.assertEqual(outra.obter(self.origem, (400, 280)).size, (400, 267))
+        self.assertEqual(outra.estatisticas, {"memoria": 0, "disco": 1, "geradas": 0})
+
+    def test_origem_alterada_gera_nova_miniatura(self):
+        """
+        Testa que alterar a imagem de origem (data e tamanho) invalida a miniatura.
+        """
+        cache = CacheMiniaturas(self.cache_dir)
+        cache.obter(self.origem, (100, 100))
+        time.sleep(0.01)
+        Image.new("RGB", (300, 900), "blue").save(self.origem)
+        self.assertEqual(cache.obter(self.origem, (100, 100)).size, (33, 100))
+        self.assertEqual(cache.estatisticas["geradas"], 2)
+
+    def test_lru_limitado_e_conversor(self):
+        """
+        Testa que a memória guarda no máximo `max_memoria` miniaturas já convertidas.
+        """
+        convertidas = []
+
+        def converter(imagem):
+            convertidas.append(imagem.size)
+            return ("foto", imagem.size)
+
+        cache = CacheMiniaturas(self.cache_dir, max_memoria=2, converter=converter)
+        for lado in (50, 60, 70):
+            self.assertEqual(cache.obter(self.origem, (lado, lado))[0], "foto")
+        self.assertEqual(len(cache._memoria), 2)
+        cache.obter(self.origem, (70, 70))
+        self.assertEqual(len(convertidas), 3)
+
+    def test_imagem_inexistente_ou_invalida(self):
+        """
+        Testa que ficheiros inexistentes ou que não são imagens devolvem None.
+        """
+        cache = CacheMiniaturas(self.cache_dir)
+        self.assertIsNone(cache.obter(os.path.join(self.diretorio, "nada.jpg"), (10, 10)))
+        invalido = os.path.join(self.diretorio, "invalido.jpg")
+        with open(invalido, "w") as f:
+            f.write("não é uma imagem")
+        self.assertIsNone(cache.obter(invalido, (10, 10)))
+
+
+if __name__ == "__main__":
+    unittest.main()
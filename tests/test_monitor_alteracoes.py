@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+from controllers.monitor_alteracoes import MonitorAlteracoes
+from db.conexao import conectar_base_dados
+from db.migracoes import aplicar_migracoes
+
+
+class TestMonitorAlteracoes(unittest.TestCase):
+    """
+    Testes unitários para o monitor de alterações (PRAGMA data_version + contadores por tabela).
+    Usa uma base de dados temporária e uma segunda conexão para simular outra janela/processo.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria uma base de dados temporária com o esquema atual.
+        - Cria um monitor sobre essa base e regista as versões iniciais.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.diretorio, "teste.db")
+        self.escritor = conectar_base_dados(self.caminho)
+        aplicar_migracoes(self.escritor)
+        self.monitor = MonitorAlteracoes(self.caminho)
+        self.recebidas = []
+        self.monitor.subscrever(["Clientes", "reservas"], self.recebidas.append)
+        self.assertEqual(self.monitor.verificar(), {})
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Fecha as conexões e remove a base de dados temporária.
+        """
+        self.monitor.fechar()
+        self.escritor.close()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def _inserir_cliente(self, nif):
+        """Insere e confirma um cliente pela conexão de escrita."""
+        self.escritor.execute("INSERT INTO clientes (nome, nif) VALUES (?, ?)", ("Teste", nif))
+        self.escritor.commit()
+
+    def test_publica_tabelas_alteradas(self):
+        """
+        Testa que uma escrita confirmada noutra conexão é publicada aos subscritores da tabela.
+        - Insere dois clientes numa transação e confirma que a versão avança 2.
+        - Confirma que uma segunda verificação sem escritas não publica nada.
+        """
+        self.escritor.execute("INSERT INTO clientes (nome, nif) VALUES ('A', '1')")
+        self.escritor.execute("INSERT INTO clientes (nome, nif) VALUES ('B', '2')")
+        self.escritor.commit()
+
+        alteracoes = self.monitor.verificar()
+        self.assertEqual(alteracoes, {"clientes": (0, 2)})
+        self.assertEqual(self.recebidas, [{"clientes": (0, 2)}])
+        self.assertEqual(self.monitor.versao("clientes"), 2)
+
+        self.assertEqual(self.monitor.verificar(), {})
+        self.assertEqual(len(self.recebidas), 1)
+
+    def test_filtra_tabelas_e_cancela(self):
+        """
+        Testa que cada subscritor só recebe as tabelas que acompanha.
+        - Altera apenas formas de pagamento: nenhum aviso para o subscritor de clientes/reservas.
+        - Cancela a subscrição e confirma que deixa de receber avisos.
+        """
+        formas = []
+        identificador = self.monitor.subscrever(["formaspagamento"], formas.append)
+        self.escritor.execute("INSERT INTO formaspagamento (metodo) VALUES ('Teste')")
+        self.escritor.commit()
+        self.monitor.verificar()
+        self.assertEqual(formas, [{"formaspagamento": (0, 1)}])
+        self.assertEqual(self.recebidas, [])
+
+        self.monitor.cancelar(identificador)
+        self.escritor.execute("UPDATE formaspagamento SET metodo = 'Outra'")
+        self.escritor.commit()
+        self.assertEqual(self.monitor.verificar(), {"formaspagamento": (1, 2)})
+        self.assertEqual(len(formas), 1)
+
+    def test_ignora_transacoes_desfeitas(self):
+        """
+        Testa que escritas desfeitas (rollback) não geram avisos.
+        """
+        self.escritor.execute("INSERT INTO clientes (nome, nif) VALUES ('A', '1')")
+        self.escritor.rollback()
+        self.assertEqual(self.monitor.verificar(), {})
+        self._inserir_cliente("3")
+        self.assertEqual(self.monitor.verificar(), {"clientes": (0, 1)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,9 +24,10 @@ class TestReservasBD(unittest.TestCase):
         sucesso = reservas_servico.adicionar_reserva_servico(**self.reserva_dados)
         self.assertTrue(sucesso, "Falha ao criar reserva no setUp")
 
-        # Buscar o ID da reserva recém-criada
+        # Buscar o ID da reserva recém-criada (a listagem é ordenada por data de início,
+        # não por ID, pelo que a reserva nova é a de maior ID)
         reservas = reservas_servico.obter_reservas_servico()
-        self.reserva_id = reservas[0]["id"]
+        self.reserva_id = max(r["id"] for r in reservas)
 
     def tearDown(self):
         """
@@ -45,7 +46,7 @@ class TestReservasBD(unittest.TestCase):
         reservas = reservas_servico.obter_reservas_servico()
         self.assertIsInstance(reservas, list)
         self.assertGreater(len(reservas), 0)
-        self.assertEqual(reservas[0]["id"], self.reserva_id)
+        self.assertIn(self.reserva_id, [r["id"] for r in reservas])
 
     def test_atualizar_reserva(self):
         """
@@ -73,9 +74,30 @@ class TestReservasBD(unittest.TestCase):
             "2025-02-01", "2025-02-05", 1, 1, "Confirmada", 400.0
         )
         reservas = reservas_servico.obter_reservas_servico()
-        nova_id = reservas[0]["id"] if reservas[0]["id"] != self.reserva_id else reservas[1]["id"]
+        nova_id = max(r["id"] for r in reservas)
 
         resultado = reservas_servico.excluir_reserva_servico(nova_id)
         self.assertTrue(resultado)
         reserva_excluida = reservas_repositorio.buscar_reserva_por_id(nova_id)
         self.assertIsNone(reserva_excluida)
+
+    def test_reserva_sobreposta_rejeitada(self):
+        """
+        Testa a deteção de conflitos de reservas.
+        - Uma reserva ativa sobreposta à do setUp no mesmo veículo é rejeitada.
+        - A mesma reserva noutro veículo ou com estado Cancelada é aceite.
+        - Atualizar a própria reserva para um período que só se sobrepõe a si mesma é aceite.
+        """
+        self.assertFalse(reservas_servico.veiculo_disponivel_servico(1, "2025-01-05", "2025-01-07"))
+        self.assertFalse(reservas_servico.adicionar_reserva_servico(
+            "2025-01-05", "2025-01-07", 1, 1, "Pendente", 100.0))
+
+        self.assertTrue(reservas_servico.veiculo_disponivel_servico(1, "2025-01-06", "2025-01-07"))
+        self.assertTrue(reservas_servico.veiculo_disponivel_servico(
+            1, "2025-01-02", "2025-01-03", reserva_id=self.reserva_id))
+        self.assertTrue(reservas_servico.atualizar_reserva_servico(
+            self.reserva_id, "2025-01-02", "2025-01-06", 1, 1, "Confirmada", 350.0))
+
+        self.assertTrue(reservas_servico.adicionar_reserva_servico(
+            "2025-01-05", "2025-01-07", 1, 1, "Cancelada", 100.0))
+        reservas_repositorio.remover_reserva_bd(max(r["id"] for r in reservas_servico.obter_reservas_servico()))
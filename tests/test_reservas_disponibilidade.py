@@ -0,0 +1,130 @@
+import random
+import sqlite3
+import unittest
+from db.conexao import CAMINHO_BASE_DADOS
+from controllers.reservas import reservas_disponibilidade, reservas_repositorio
+from controllers.reservas.reservas_disponibilidade import IndiceIntervalos
+
+
+class TestIndiceIntervalos(unittest.TestCase):
+    """
+    Testes unitários para o índice de intervalos em memória.
+    Compara o resultado da pesquisa binária com uma verificação exaustiva.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria um índice com intervalos, incluindo um longo que cobre outros (dados antigos sobrepostos).
+        """
+        self.periodos = [
+            (1, "2025-01-01", "2025-01-05"),
+            (2, "2025-01-10", "2025-03-01"),
+            (3, "2025-01-20", "2025-01-22"),
+            (4, "2025-04-01", "2025-04-03"),
+        ]
+        self.indice = IndiceIntervalos(self.periodos)
+
+    def _exaustivo(self, inicio, fim, excluir_id=None):
+        """Devolve os IDs sobrepostos por verificação linear."""
+        return {i for i, a, b in self.periodos if a <= fim and b >= inicio and i != excluir_id}
+
+    def test_coincide_com_verificacao_exaustiva(self):
+        """
+        Testa vários períodos e confirma que o índice encontra conflito sse a verificação linear o encontra.
+        """
+        consultas = [
+            ("2024-12-01", "2024-12-31"), ("2024-12-31", "2025-01-01"), ("2025-01-05", "2025-01-06"),
+            ("2025-01-06", "2025-01-09"), ("2025-02-01", "2025-02-02"), ("2025-03-02", "2025-03-31"),
+            ("2025-03-01", "2025-03-01"), ("2025-04-03", "2025-05-01"), ("2025-05-01", "2025-06-01"),
+        ]
+        for inicio, fim in consultas:
+            esperado = self._exaustivo(inicio, fim)
+            conflito = self.indice.conflito(inicio, fim)
+            if esperado:
+                self.assertIn(conflito, esperado, (inicio, fim))
+            else:
+                self.assertIsNone(conflito, (inicio, fim))
+
+    def test_excluir_id(self):
+        """
+        Testa que o intervalo excluído não conta como conflito, mas os restantes sim.
+        """
+        self.assertIsNone(self.indice.conflito("2025-04-02", "2025-04-02", excluir_id=4))
+        self.assertEqual(self.indice.conflito("2025-01-21", "2025-01-21", excluir_id=3), 2)
+
+    def test_aleatorio_com_exclusao(self):
+        """
+        Testa períodos aleatórios, com e sem exclusão, contra a verificação exaustiva.
+        - Inclui um intervalo longo seguido de muitos curtos (o excluído pode ser o que acaba mais tarde).
+        """
+        aleatorio = random.Random(3)
+        self.periodos = [(0, "2025-01-01", "2025-12-31")]
+        for i in range(1, 300):
+            dia = aleatorio.randint(1, 360)
+            self.periodos.append((i, f"2025-{dia // 30 + 1:02d}-{dia % 28 + 1:02d}",
+                                  f"2025-{dia // 30 + 1:02d}-{min(dia % 28 + 3, 28):02d}"))
+        self.periodos.append((300, "2026-02-01", "2026-02-05"))
+        self.indice = IndiceIntervalos(self.periodos)
+        for _ in range(500):
+            mes, dia = aleatorio.randint(1, 14), aleatorio.randint(1, 28)
+            inicio = f"{2025 + (mes > 12)}-{(mes - 1) % 12 + 1:02d}-{dia:02d}"
+            excluir_id = aleatorio.choice([None, 0, 300, aleatorio.randrange(300)])
+            esperado = self._exaustivo(inicio, inicio, excluir_id)
+            conflito = self.indice.conflito(inicio, inicio, excluir_id)
+            if esperado:
+                self.assertIn(conflito, esperado, (inicio, excluir_id))
+            else:
+                self.assertIsNone(conflito, (inicio, excluir_id))
+
+    def test_indice_vazio(self):
+        """
+        Testa que um veículo sem reservas ativas nunca tem conflitos.
+        """
+        self.assertIsNone(IndiceIntervalos([]).conflito("2025-01-01", "2025-12-31"))
+
+
+class TestCacheDisponibilidade(unittest.TestCase):
+    """
+    Testes da cache de índices por veículo (usa a base de dados da aplicação).
+    """
+
+    def test_cache_invalidada_apos_escrita(self):
+        """
+        Testa que o índice em cache é descartado quando o repositório grava uma reserva.
+        - Consulta o veículo (índice guardado em cache).
+        - Insere uma reserva e confirma que a consulta seguinte já a vê.
+        """
+        reservas_disponibilidade.invalidar_indices()
+        self.assertIsNone(reservas_disponibilidade.verificar_conflito(5, "2039-01-01", "2039-01-03"))
+        novo_id = reservas_repositorio.inserir_reserva_bd({
+            "data_inicio": "2039-01-02", "data_fim": "2039-01-04", "id_cliente": 1,
+            "id_veiculo": 5, "estado": "Pendente", "valor_total": 10.0,
+        })
+        try:
+            self.assertEqual(reservas_disponibilidade.verificar_conflito(5, "2039-01-01", "2039-01-03"), novo_id)
+            self.assertEqual(
+                reservas_disponibilidade.verificar_conflito(5, "2039-01-01", "2039-01-03", usar_cache=False), novo_id
+            )
+        finally:
+            reservas_repositorio.remover_reserva_bd(novo_id)
+        self.assertIsNone(reservas_disponibilidade.verificar_conflito(5, "2039-01-01", "2039-01-03"))
+
+    def test_cache_ve_escritas_de_outra_conexao(self):
+        """
+        Testa que uma reserva gravada por outra conexão (ex.: outro processo) invalida o índice em cache.
+        """
+        self.assertIsNone(reservas_disponibilidade.verificar_conflito(5, "2039-02-01", "2039-02-05"))
+        conexao = sqlite3.connect(CAMINHO_BASE_DADOS)
+        try:
+            novo_id = conexao.execute(
+                "INSERT INTO Reservas (data_inicio, data_fim, id_cliente, id_veiculo, estado, valor_total) "
+                "VALUES ('2039-02-03', '2039-02-04', 1, 5, 'Confirmada', 10.0)"
+            ).lastrowid
+            conexao.commit()
+            self.assertEqual(reservas_disponibilidade.verificar_conflito(5, "2039-02-01", "2039-02-05"), novo_id)
+            conexao.execute("DELETE FROM Reservas WHERE id = ?", (novo_id,))
+            conexao.commit()
+        finally:
+            conexao.close()
+        self.assertIsNone(reservas_disponibilidade.verificar_conflito(5, "2039-02-01", "2039-02-05"))
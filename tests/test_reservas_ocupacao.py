@@ -0,0 +1,188 @@
+import sqlite3
+import unittest
+from datetime import date, timedelta
+from db.conexao import CAMINHO_BASE_DADOS
+from controllers.reservas import reservas_ocupacao, reservas_repositorio, reservas_servico
+from controllers.reservas.reservas_ocupacao import MatrizOcupacao
+
+
+class TestMatrizOcupacao(unittest.TestCase):
+    """
+    Testes unitários para a matriz de ocupação em NumPy.
+    Compara os resultados vetorizados com contas feitas dia a dia.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria uma matriz de janeiro a março de 2025 com três veículos e reservas
+          sobrepostas, cortadas nos limites e de um veículo desconhecido.
+        """
+        self.veiculos = [(10, "SUV"), (20, "SUV"), (30, "Sedan")]
+        self.periodos = [
+            (1, 10, "2025-01-01", "2025-01-10"),
+            (2, 10, "2025-01-05", "2025-01-06"),
+            (3, 20, "2024-12-20", "2025-01-03"),
+            (4, 20, "2025-03-25", "2025-04-10"),
+            (5, 30, "2025-02-01", "2025-02-28"),
+            (6, 99, "2025-01-01", "2025-03-31"),
+        ]
+        self.matriz = MatrizOcupacao(self.veiculos, self.periodos, "2025-01-01", "2025-03-31")
+
+    def _ocupado(self, periodos, id_veiculo, dia):
+        """Indica, por verificação linear, se o veículo está ocupado no dia."""
+        texto = dia.isoformat()
+        return any(v == id_veiculo and a <= texto <= b for _, v, a, b in periodos)
+
+    def _dias(self, inicio, fim):
+        """Devolve os dias do período [inicio, fim]."""
+        dia, ultimo = date.fromisoformat(inicio), date.fromisoformat(fim)
+        while dia <= ultimo:
+            yield dia
+            dia += timedelta(days=1)
+
+    def test_contagens(self):
+        """
+        Testa que as reservas sobrepostas somam e que os limites da matriz cortam os períodos.
+        """
+        self.assertEqual(self.matriz.contagens.shape, (3, 90))
+        self.assertEqual(self.matriz.contagens[0, :10].tolist(), [1, 1, 1, 1, 2, 2, 1, 1, 1, 1])
+        self.assertEqual(self.matriz.contagens[0, 10:].sum(), 0)
+        self.assertEqual(self.matriz.contagens[1].sum(), 3 + 7)
+
+    def test_utilizacao_coincide_com_contas_diarias(self):
+        """
+        Testa a utilização por veículo, categoria e mês contra a contagem dia a dia.
+        """
+        inicio, fim = "2025-01-01", "2025-02-15"
+        dias = list(self._dias(inicio, fim))
+        esperado = {v: sum(self._ocupado(self.periodos, v, d) for d in dias) / len(dias) for v, _ in self.veiculos}
+        for id_veiculo, valor in self.matriz.utilizacao_por_veiculo(inicio, fim).items():
+            self.assertAlmostEqual(valor, esperado[id_veiculo])
+
+        por_categoria = self.matriz.utilizacao_por_categoria(inicio, fim)
+        self.assertAlmostEqual(por_categoria["SUV"], (esperado[10] + esperado[20]) / 2)
+        self.assertAlmostEqual(por_categoria["Sedan"], esperado[30])
+
+        por_mes = self.matriz.utilizacao_por_mes()
+        self.assertEqual(list(por_mes), ["2025-01", "2025-02", "2025-03"])
+        self.assertAlmostEqual(por_mes["2025-02"], 28 / (28 * 3))
+        self.assertAlmostEqual(por_mes["2025-01"], (10 + 3) / (31 * 3))
+
+    def test_periodos_livres(self):
+        """
+        Testa a procura do primeiro bloco de dias livres seguidos por veículo.
+        """
+        livres = {p["id_veiculo"]: p for p in self.matriz.periodos_livres(5, "2025-01-01", "2025-03-31")}
+        self.assertEqual(livres[10]["data_inicio"], "2025-01-11")
+        self.assertEqual(livres[10]["data_fim"], "2025-01-15")
+        self.assertEqual(livres[20]["data_inicio"], "2025-01-04")
+        self.assertEqual(livres[30]["data_inicio"], "2025-01-01")
+        self.assertEqual(self.matriz.periodos_livres(30, "2025-02-01", "2025-03-02", id_veiculo=30), [])
+        self.assertEqual(self.matriz.veiculos_livres("2025-01-04", "2025-01-31"), [20, 30])
+
+    def test_atualizacao_incremental_igual_a_reconstrucao(self):
+        """
+        Testa que inserir, alterar e remover reservas na matriz dá o mesmo resultado que reconstruí-la.
+        - Altera a reserva 1, cancela a 5, remove a 3 e acrescenta a 7.
+        - Compara com uma matriz construída de raiz com os períodos finais.
+        """
+        self.assertTrue(self.matriz.registar(1, 30, "2025-03-01", "2025-03-05", "Confirmada"))
+        self.assertTrue(self.matriz.registar(5, 30, "2025-02-01", "2025-02-28", "Cancelada"))
+        self.matriz.remover(3)
+        self.assertTrue(self.matriz.registar(7, 10, "2025-03-30", "2025-05-01", "Pendente"))
+        self.assertFalse(self.matriz.registar(8, 99, "2025-01-01", "2025-01-02", "Pendente"))
+
+        finais = [
+            (1, 30, "2025-03-01", "2025-03-05"), (2, 10, "2025-01-05", "2025-01-06"),
+            (4, 20, "2025-03-25", "2025-04-10"), (7, 10, "2025-03-30", "2025-05-01"),
+        ]
+        reconstruida = MatrizOcupacao(self.veiculos, finais, "2025-01-01", "2025-03-31")
+        self.assertTrue((self.matriz.contagens == reconstruida.contagens).all())
+
+
+class TestMatrizPartilhada(unittest.TestCase):
+    """
+    Testes da matriz partilhada mantida pela camada de serviço (usa a base de dados da aplicação).
+    """
+
+    def test_escritas_atualizam_matriz_sem_reconstrucao(self):
+        """
+        Testa que as escritas feitas pelo serviço atualizam a mesma matriz.
+        - Constrói a matriz e insere uma reserva pelo serviço.
+        - Confirma que a matriz é a mesma (não foi reconstruída) e já reflete a reserva.
+        - Remove a reserva e confirma que o período volta a estar livre.
+        """
+        reservas_ocupacao.invalidar_matriz()
+        matriz = reservas_ocupacao.obter_matriz()
+        antes = reservas_servico.utilizacao_frota_servico("2026-11-01", "2026-11-10")["por_veiculo"][5]
+
+        self.assertTrue(reservas_servico.adicionar_reserva_servico(
+            "2026-11-01", "2026-11-05", 1, 5, "Pendente", 10.0))
+        novo_id = max(r["id"] for r in reservas_repositorio.listar_reservas_bd())
+        try:
+            self.assertIs(reservas_ocupacao.obter_matriz(), matriz)
+            depois = reservas_servico.utilizacao_frota_servico("2026-11-01", "2026-11-10")["por_veiculo"][5]
+            self.assertAlmostEqual(depois - antes, 0.5)
+            livres = reservas_servico.procurar_periodos_livres_servico(3, "2026-11-01", "2026-11-10", 5)
+            self.assertEqual(livres[0]["data_inicio"], "2026-11-06")
+        finally:
+            self.assertTrue(reservas_servico.excluir_reserva_servico(novo_id))
+        self.assertIs(reservas_ocupacao.obter_matriz(), matriz)
+        self.assertEqual(
+            reservas_servico.procurar_periodos_livres_servico(3, "2026-11-01", "2026-11-10", 5)[0]["data_inicio"],
+            "2026-11-01")
+
+    def test_periodo_alem_do_horizonte(self):
+        """
+        Testa períodos depois do fim da matriz (um ano depois de hoje).
+        - A matriz é alargada e os dias sem reservas contam como livres.
+        - Um período que atravessa o fim da matriz usa todos os seus dias.
+        """
+        reservas_ocupacao.invalidar_matriz()
+        matriz = reservas_ocupacao.obter_matriz()
+        veiculos = matriz.ids_veiculos.tolist()
+        fim = str(matriz.origem + matriz.total_dias - 1)
+        utilizacao = reservas_servico.utilizacao_frota_servico("2031-01-01", "2031-01-05")
+        self.assertEqual(utilizacao["por_veiculo"], {v: 0.0 for v in veiculos})
+        self.assertEqual(utilizacao["por_mes"], {"2031-01": 0.0})
+        livres = reservas_servico.procurar_periodos_livres_servico(3, "2031-01-01", "2031-01-10")
+        self.assertEqual(sorted(p["id_veiculo"] for p in livres), sorted(veiculos))
+        self.assertEqual({p["data_inicio"] for p in livres}, {"2031-01-01"})
+
+        depois = (date.fromisoformat(fim) + timedelta(days=9)).isoformat()
+        por_mes = reservas_servico.utilizacao_frota_servico(fim, depois)["por_mes"]
+        dias = reservas_ocupacao.obter_matriz().ocupacao(fim, depois).shape[1]
+        self.assertEqual(dias, 10)
+        self.assertTrue(por_mes)
+
+    def test_escritas_de_outra_conexao(self):
+        """
+        Testa que uma reserva gravada por outra conexão (ex.: outro processo) entra na matriz.
+        """
+        reservas_ocupacao.obter_matriz()
+        conexao = sqlite3.connect(CAMINHO_BASE_DADOS)
+        try:
+            novo_id = conexao.execute(
+                "INSERT INTO Reservas (data_inicio, data_fim, id_cliente, id_veiculo, estado, valor_total) "
+                "VALUES ('2026-12-01', '2026-12-10', 1, 5, 'Confirmada', 10.0)"
+            ).lastrowid
+            conexao.commit()
+            utilizacao = reservas_servico.utilizacao_frota_servico("2026-12-01", "2026-12-10")
+            self.assertEqual(utilizacao["por_veiculo"][5], 1.0)
+            conexao.execute("DELETE FROM Reservas WHERE id = ?", (novo_id,))
+            conexao.commit()
+        finally:
+            conexao.close()
+        self.assertEqual(reservas_servico.utilizacao_frota_servico("2026-12-01", "2026-12-10")["por_veiculo"][5], 0.0)
+
+    def test_dados_invalidos(self):
+        """
+        Testa que períodos ou durações inválidos devolvem resultados vazios.
+        """
+        self.assertEqual(reservas_servico.utilizacao_frota_servico("2025-02-01", "2025-01-01"), {})
+        self.assertEqual(reservas_servico.procurar_periodos_livres_servico(0, "2025-01-01", "2025-01-31"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from controllers.utils_bd import PoolConexoes
+
+
+class TestPoolConexoes(unittest.TestCase):
+    """
+    Testes unitários para o pool de conexões usado por `obter_cursor`.
+    Usa uma base de dados temporária para não alterar a base da aplicação.
+    """
+
+    def setUp(self):
+        """
+        Executa antes de cada teste:
+        - Cria uma base de dados temporária com uma tabela de teste.
+        - Cria um pool apontado para essa base de dados.
+        """
+        self.diretorio = tempfile.mkdtemp()
+        self.caminho = os.path.join(self.diretorio, "teste.db")
+        self.pool = PoolConexoes(self.caminho, tamanho=2)
+        conexao = self.pool.obter()
+        conexao.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY, nome TEXT)")
+        conexao.commit()
+        self.pool.devolver(conexao)
+
+    def tearDown(self):
+        """
+        Executa depois de cada teste:
+        - Fecha o pool e remove a base de dados temporária.
+        """
+        self.pool.fechar()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def test_reutiliza_conexao_na_mesma_thread(self):
+        """
+        Testa que uma conexão devolvida é reutilizada pela mesma thread.
+        """
+        primeira = self.pool.obter()
+        self.pool.devolver(primeira)
+        segunda = self.pool.obter()
+        self.assertIs(primeira, segunda)
+        self.pool.devolver(segunda)
+
+    def test_conexoes_confinadas_a_thread(self):
+        """
+        Testa que outra thread nunca recebe a conexão inativa desta thread.
+        """
+        local = self.pool.obter()
+        self.pool.devolver(local)
+
+        resultado = {}
+
+        def trabalhador():
+            conexao = self.pool.obter()
+            resultado["mesma"] = conexao is local
+            conexao.execute("SELECT 1").fetchone()
+            self.pool.devolver(conexao)
+
+        thread = threading.Thread(target=trabalhador)
+        thread.start()
+        thread.join()
+        self.assertFalse(resultado["mesma"])
+
+    def test_devolver_desfaz_transacao_pendente(self):
+        """
+        Testa que alterações não confirmadas são desfeitas ao devolver a conexão.
+        """
+        conexao = self.pool.obter()
+        conexao.execute("INSERT INTO itens (nome) VALUES ('pendente')")
+        self.assertTrue(conexao.in_transaction)
+        self.pool.devolver(conexao)
+
+        conexao = self.pool.obter()
+        self.assertFalse(conexao.in_transaction)
+        total = conexao.execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+        self.assertEqual(total, 0)
+        self.pool.devolver(conexao)
+
+    def test_tamanho_zero_nao_reutiliza(self):
+        """
+        Testa que com tamanho 0 cada conexão é fechada ao ser devolvida.
+        """
+        pool = PoolConexoes(self.caminho, tamanho=0)
+        primeira = pool.obter()
+        pool.devolver(primeira)
+        segunda = pool.obter()
+        self.assertIsNot(primeira, segunda)
+        pool.devolver(segunda)
+
+    def test_perfil_so_leitura_migra_a_parte(self):
+        """
+        Testa que um pool só de leitura aplica as migrações pendentes numa conexão de escrita à parte.
+        - As conexões do pool continuam a rejeitar escritas.
+        """
+        pool = PoolConexoes(os.path.join(self.diretorio, "leitura.db"), perfil="readonly-analytics")
+        conexao = pool.obter()
+        self.assertEqual(conexao.execute("SELECT COUNT(*) FROM veiculos").fetchone()[0], 0)
+        with self.assertRaises(sqlite3.OperationalError):
+            conexao.execute("INSERT INTO formaspagamento (metodo) VALUES ('MB Way')")
+        pool.devolver(conexao)
+        pool.fechar()
@@ -62,6 +62,18 @@ class TestVeiculo(unittest.TestCase):
         self.assertIsInstance(veiculos, list)
         self.assertGreater(len(veiculos), 0)
 
+    def test_obter_veiculo_por_id(self):
+        """
+        Testa a leitura de um veículo pelo ID.
+        - Devolve os dados do veículo criado no setUp.
+        - Devolve None para IDs inexistentes ou inválidos.
+        """
+        veiculo = veiculos_servico.obter_veiculo_por_id_servico(self.veiculo_id)
+        self.assertEqual(veiculo["matricula"], self.dados_base["matricula"])
+        self.assertEqual(veiculos_servico.obter_veiculo_por_id_servico(str(self.veiculo_id))["id"], self.veiculo_id)
+        self.assertIsNone(veiculos_servico.obter_veiculo_por_id_servico(99999))
+        self.assertIsNone(veiculos_servico.obter_veiculo_por_id_servico("abc"))
+
     def test_adicionar_veiculo(self):
         """
         Testa a adição de um novo veículo.
@@ -0,0 +1,61 @@
+import unittest
+from controllers.veiculos import veiculos_servico
+
+
+class TestVeiculosDisponiveis(unittest.TestCase):
+    """
+    Testes unitários para a pesquisa de veículos disponíveis num período.
+    Usa os dados de exemplo (veículo 2 com reserva Pendente de 2024-07-05 a 2024-07-12).
+    """
+
+    def _ids(self, *args, **kwargs):
+        """Devolve os IDs dos veículos devolvidos pela pesquisa."""
+        return [v["id"] for v in veiculos_servico.procurar_veiculos_disponiveis_servico(*args, **kwargs)]
+
+    def test_reserva_ativa_ocupa_veiculo(self):
+        """
+        Testa que um veículo com reserva ativa sobreposta não aparece, mas aparece fora do período.
+        """
+        self.assertNotIn(2, self._ids("2024-07-06", "2024-07-07"))
+        self.assertNotIn(2, self._ids("2024-07-12", "2024-07-20"))
+        self.assertIn(2, self._ids("2024-08-01", "2024-08-05"))
+
+    def test_veiculo_em_manutencao_excluido(self):
+        """
+        Testa que veículos em manutenção nunca são devolvidos.
+        """
+        ids = self._ids("2030-01-01", "2030-01-02")
+        self.assertGreater(len(ids), 0)
+        estados = {veiculos_servico.obter_veiculo_por_id_servico(id_veiculo)["estado"] for id_veiculo in ids}
+        self.assertEqual(estados, {"disponível"})
+
+    def test_filtros_e_ordenacao(self):
+        """
+        Testa os filtros de categoria, lugares e diária e a ordenação pela diária.
+        """
+        veiculos = veiculos_servico.procurar_veiculos_disponiveis_servico(
+            "2030-01-01", "2030-01-05", categoria="SUV", lugares_min=5, diaria_min=80, diaria_max=150
+        )
+        self.assertGreater(len(veiculos), 0)
+        for v in veiculos:
+            self.assertEqual(v["categoria"], "SUV")
+            self.assertGreaterEqual(v["lugares"], 5)
+            self.assertTrue(80 <= v["diaria"] <= 150)
+        diarias = [v["diaria"] for v in veiculos]
+        self.assertEqual(diarias, sorted(diarias))
+
+    def test_limite(self):
+        """
+        Testa que o limite devolve só os veículos mais baratos, pela mesma ordem da pesquisa completa.
+        - Limites menores que 1 devolvem lista vazia.
+        """
+        todos = self._ids("2030-01-01", "2030-01-05")
+        self.assertEqual(self._ids("2030-01-01", "2030-01-05", limite=2), todos[:2])
+        self.assertEqual(self._ids("2030-01-01", "2030-01-05", limite=0), [])
+
+    def test_periodo_invalido(self):
+        """
+        Testa que períodos invertidos ou datas inválidas devolvem lista vazia.
+        """
+        self.assertEqual(veiculos_servico.procurar_veiculos_disponiveis_servico("2030-01-05", "2030-01-01"), [])
+        self.assertEqual(veiculos_servico.procurar_veiculos_disponiveis_servico("ontem", "2030-01-01"), [])
@@ -1,15 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from utils.tooltip import DicaFerramenta
+from utils.ligador_treeview import LigadorTreeview
+from utils.executor_tarefas import ExecutorTarefas
+from utils.importacao_ui import importar_csv_com_dialogo
 
 from controllers.cliente.cliente_servico import (
     criar_cliente,
     listar_clientes,
     editar_cliente,
     excluir_cliente,
-    procurar_cliente_por_email,
-    salvar_clientes_csv
+    verificar_duplicados_cliente,
+    salvar_clientes_csv,
+    salvar_clientes_xlsx,
+    importar_clientes_csv
 )
+from controllers.monitor_alteracoes import obter_monitor
 
 
 class AplicacaoClientes(tk.Frame):
@@ -21,7 +27,7 @@ class AplicacaoClientes(tk.Frame):
         - Atualizar clientes existentes
         - Remover clientes
         - Listar clientes
-        - Exportar clientes para CSV
+        - Exportar clientes para CSV e Excel
     """
 
     def __init__(self, master=None):
@@ -37,11 +43,14 @@ class AplicacaoClientes(tk.Frame):
         self.master.geometry("780x550")
         self.master.resizable(True, True)
         self.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.tarefas = ExecutorTarefas(self)
 
         self._construir_formulario()
         self._construir_botoes()
         self._construir_lista()
         self._atualizar_lista()
+        # Recarrega quando outra janela ou processo altera os clientes
+        obter_monitor().acompanhar(self, ["clientes"], lambda _alteracoes: self._atualizar_lista())
 
     def _construir_formulario(self):
         """Constrói os campos de entrada do cliente no formulário."""
@@ -65,7 +74,7 @@ class AplicacaoClientes(tk.Frame):
             self.campos_texto[etiqueta.lower().replace(" ", "_")] = campo
 
     def _construir_botoes(self):
-        """Constrói os botões de ação: adicionar, atualizar, remover, limpar e exportar CSV."""
+        """Constrói os botões de ação: adicionar, atualizar, remover, limpar e exportar CSV/Excel e importar CSV."""
         quadro_botoes = ttk.Frame(self)
         quadro_botoes.pack(fill=tk.X, pady=5)
 
@@ -73,7 +82,10 @@ class AplicacaoClientes(tk.Frame):
         ttk.Button(quadro_botoes, text="Atualizar", command=self.atualizar_cliente).pack(side=tk.LEFT, padx=5)
         ttk.Button(quadro_botoes, text="Remover", command=self.remover_cliente).pack(side=tk.LEFT, padx=5)
         ttk.Button(quadro_botoes, text="Limpar", command=self.limpar_campos).pack(side=tk.LEFT, padx=5)
+        ttk.Button(quadro_botoes, text="Exportar Excel",
+                   command=self.exportar_clientes_xlsx).pack(side=tk.RIGHT, padx=5)
         ttk.Button(quadro_botoes, text="Exportar CSV", command=self.exportar_clientes).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(quadro_botoes, text="Importar CSV", command=self.importar_clientes).pack(side=tk.RIGHT, padx=5)
 
     def _construir_lista(self):
         """Constrói a Treeview para exibir a lista de clientes cadastrados."""
@@ -82,6 +94,7 @@ class AplicacaoClientes(tk.Frame):
 
         colunas = ("id", "nome", "email", "telefone", "nif", "data_registo")
         self.arvore = ttk.Treeview(quadro_lista, columns=colunas, show="headings", selectmode="browse")
+        self.ligador = LigadorTreeview(self.arvore)
 
         for coluna in colunas:
             cabecalho = coluna.replace("_", " ").capitalize()
@@ -148,17 +161,15 @@ class AplicacaoClientes(tk.Frame):
             messagebox.showerror("Erro", "Todos os campos devem ser preenchidos.")
             return False
 
-        existente = procurar_cliente_por_email(email)
-        if existente:
-            if modo == "insercao" or (modo == "atualizacao" and str(existente["id"]) != id_atual):
-                messagebox.showerror("Erro", "Email já está associado a outro cliente.")
-                return False
-
-        for cliente in listar_clientes():
-            if cliente["nif"] == nif:
-                if modo == "insercao" or (modo == "atualizacao" and str(cliente["id"]) != id_atual):
-                    messagebox.showerror("Erro", "NIF já existe na base de dados.")
-                    return False
+        # Uma consulta indexada; a unicidade é garantida de novo pelos índices ao gravar
+        id_excluir = int(id_atual) if modo == "atualizacao" and id_atual.isdigit() else None
+        duplicados = verificar_duplicados_cliente(email, nif, id_excluir)
+        if duplicados.get("email"):
+            messagebox.showerror("Erro", "Email já está associado a outro cliente.")
+            return False
+        if duplicados.get("nif"):
+            messagebox.showerror("Erro", "NIF já existe na base de dados.")
+            return False
 
         return True
 
@@ -171,13 +182,7 @@ class AplicacaoClientes(tk.Frame):
         telefone = self._obter_valor_campo("telefone")
         nif = self._obter_valor_campo("nif")
 
-        sucesso, msg = criar_cliente(nome, email, telefone, nif)
-        if sucesso:
-            messagebox.showinfo("Sucesso", msg)
-            self.limpar_campos()
-            self._atualizar_lista()
-        else:
-            messagebox.showerror("Erro", msg)
+        self.tarefas.executar(criar_cliente, nome, email, telefone, nif, ao_concluir=self._apos_gravar)
 
     def atualizar_cliente(self):
         """Atualiza os dados do cliente selecionado."""
@@ -193,13 +198,8 @@ class AplicacaoClientes(tk.Frame):
         telefone = self._obter_valor_campo("telefone")
         nif = self._obter_valor_campo("nif")
 
-        sucesso, msg = editar_cliente(int(id_str), nome, email, telefone, nif)
-        if sucesso:
-            messagebox.showinfo("Sucesso", msg)
-            self.limpar_campos()
-            self._atualizar_lista()
-        else:
-            messagebox.showerror("Erro", msg)
+        self.tarefas.executar(editar_cliente, int(id_str), nome, email, telefone, nif,
+                              ao_concluir=self._apos_gravar)
 
     def remover_cliente(self):
         """Remove o cliente selecionado da base de dados."""
@@ -209,13 +209,17 @@ class AplicacaoClientes(tk.Frame):
             return
 
         if messagebox.askyesno("Confirmação", "Remover cliente?"):
-            sucesso, msg = excluir_cliente(int(id_str))
-            if sucesso:
-                messagebox.showinfo("Sucesso", msg)
-                self.limpar_campos()
-                self._atualizar_lista()
-            else:
-                messagebox.showerror("Erro", msg)
+            self.tarefas.executar(excluir_cliente, int(id_str), ao_concluir=self._apos_gravar)
+
+    def _apos_gravar(self, resultado):
+        """Mostra o resultado de uma inserção, atualização ou remoção e atualiza a lista."""
+        sucesso, msg = resultado
+        if sucesso:
+            messagebox.showinfo("Sucesso", msg)
+            self.limpar_campos()
+            self._atualizar_lista()
+        else:
+            messagebox.showerror("Erro", msg)
 
     def _ao_selecionar(self, event):
         """Popula os campos do formulário ao selecionar um cliente na lista."""
@@ -229,19 +233,22 @@ class AplicacaoClientes(tk.Frame):
             self._definir_valor_campo(campo, valor)
 
     def _atualizar_lista(self):
-        """Atualiza a Treeview exibindo a lista atual de clientes."""
-        self.arvore.delete(*self.arvore.get_children())
-        clientes = listar_clientes()
+        """Atualiza a Treeview exibindo a lista atual de clientes (lida em segundo plano)."""
+        self.tarefas.executar(listar_clientes, ao_concluir=self._mostrar_clientes, chave="lista")
 
-        for cliente in clientes:
-            self.arvore.insert("", tk.END, values=(
+    def _mostrar_clientes(self, clientes):
+        """Mostra os clientes na Treeview, aplicando só as diferenças."""
+        self.ligador.atualizar(
+            (cliente.get("id"), (
                 str(cliente.get("id", "")),
                 str(cliente.get("nome", "")),
                 str(cliente.get("email", "")),
                 str(cliente.get("telefone", "")),
                 str(cliente.get("nif", "")),
                 str(cliente.get("data_registo", ""))
-            ))
+            ), ())
+            for cliente in clientes
+        )
 
     def limpar_campos(self):
         """Limpa todos os campos do formulário."""
@@ -250,11 +257,27 @@ class AplicacaoClientes(tk.Frame):
 
     def exportar_clientes(self):
         """Exporta todos os clientes para um arquivo CSV."""
-        sucesso = salvar_clientes_csv()
-        if sucesso:
-            messagebox.showinfo("Sucesso", "Exportado para clientes_export.csv")
-        else:
-            messagebox.showerror("Erro", "Falha ao exportar.")
+        def _concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Exportado para clientes_export.csv")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar.")
+
+        self.tarefas.executar(salvar_clientes_csv, ao_concluir=_concluir, chave="exportar")
+
+    def exportar_clientes_xlsx(self):
+        """Exporta todos os clientes para um ficheiro Excel."""
+        def _concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Exportado para clientes_export.xlsx")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar.")
+
+        self.tarefas.executar(salvar_clientes_xlsx, ao_concluir=_concluir, chave="exportar")
+
+    def importar_clientes(self):
+        """Importa clientes de um ficheiro CSV escolhido pelo utilizador (a lista atualiza-se pelo monitor)."""
+        importar_csv_com_dialogo(self.tarefas, importar_clientes_csv, "clientes")
 
 
 if __name__ == "__main__":
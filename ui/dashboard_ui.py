@@ -3,11 +3,9 @@ from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from controllers.cliente.cliente_servico import listar_clientes
-from controllers.veiculos.veiculos_servico import obter_veiculos_servico
-from controllers.reservas.reservas_servico import obter_reservas_servico
-from controllers.pagamentos.pagamento_servico import obter_pagamentos
-from controllers.dashboard.dashboard_servico import obter_reservas_agrupadas_por_mes
+from controllers.dashboard.dashboard_servico import obter_indicadores_dashboard, obter_reservas_agrupadas_por_mes
+from controllers.monitor_alteracoes import obter_monitor
+from utils.executor_tarefas import ExecutorTarefas
 
 
 class AplicacaoDashboard(ttk.Frame):
@@ -36,11 +34,17 @@ class AplicacaoDashboard(ttk.Frame):
         mestre.rowconfigure(1, weight=1)
 
         self._etiqueta_erro: ttk.Label | None = None
+        # Enquanto há uma atualização em curso, o botão fica desativado
+        self.tarefas = ExecutorTarefas(self, indicador=self._indicar_ocupado)
 
         self._criar_widgets()
         self._dispor_widgets()
         self._inicializar_grafico()
         self.atualizar()
+        # Recarrega quando outra janela ou processo altera os dados dos indicadores
+        obter_monitor().acompanhar(
+            self, ["clientes", "veiculos", "reservas", "pagamentos"], lambda _alteracoes: self.atualizar()
+        )
 
     def _criar_widgets(self) -> None:
         """Cria widgets do dashboard: indicadores, botão de atualização e gráfico."""
@@ -91,9 +95,18 @@ class AplicacaoDashboard(ttk.Frame):
         self.eixo.set_ylabel("Total de Reservas")
         self.eixo.tick_params(axis="x", rotation=45)
 
-    def _atualizar_grafico(self) -> None:
-        """Atualiza o gráfico de barras com os dados de reservas agrupadas por mês."""
-        dados = obter_reservas_agrupadas_por_mes()
+    def _indicar_ocupado(self, ocupado: bool) -> None:
+        """Desativa o botão de atualização e mostra o cursor de espera durante a leitura."""
+        self.btn_atualizar.state(["disabled"] if ocupado else ["!disabled"])
+        self.winfo_toplevel().configure(cursor="watch" if ocupado else "")
+
+    def _atualizar_grafico(self, dados: list) -> None:
+        """
+        Atualiza o gráfico de barras com os dados de reservas agrupadas por mês.
+
+        Args:
+            dados (list): Resultado de `obter_reservas_agrupadas_por_mes`.
+        """
         if dados:
             meses = [str(d["mes"]) for d in dados]
             totais = [d["total"] for d in dados]
@@ -109,44 +122,58 @@ class AplicacaoDashboard(ttk.Frame):
         """
         Atualiza todos os indicadores do dashboard e o gráfico.
 
-        Captura possíveis exceções e exibe mensagem de erro na interface.
+        Os dados são lidos em segundo plano; um pedido novo descarta o anterior.
+        Possíveis exceções são exibidas como mensagem de erro na interface.
+        """
+        self.tarefas.executar(self._ler_dados, ao_concluir=self._mostrar_dados, ao_falhar=self._mostrar_erro,
+                              chave="atualizar")
+
+    @staticmethod
+    def _ler_dados() -> tuple:
+        """Lê os indicadores (numa única consulta) e as reservas por mês. Corre numa thread de trabalho."""
+        return obter_indicadores_dashboard(), obter_reservas_agrupadas_por_mes()
+
+    def _mostrar_dados(self, resultado: tuple) -> None:
+        """
+        Mostra os indicadores e o gráfico lidos por `_ler_dados`.
+
+        Args:
+            resultado (tuple): Indicadores e reservas agrupadas por mês.
         """
         if self._etiqueta_erro:
             self._etiqueta_erro.destroy()
             self._etiqueta_erro = None
 
         try:
-            # Total de clientes
-            total_clientes = len(listar_clientes())
-
-            # Total de veículos disponíveis
-            veiculos = obter_veiculos_servico()
-            total_veiculos = len([v for v in veiculos if v.get("estado") == "disponível"])
-
-            # Total de reservas ativas
-            reservas = obter_reservas_servico()
-            total_reservas = len([r for r in reservas if r.get("estado") in ("Confirmada", "Pendente")])
-
-            # Receita total
-            pagamentos = obter_pagamentos()
-            receita_total = sum(float(p.get("valor", 0.0)) for p in pagamentos) if pagamentos else 0.0
+            indicadores, por_mes = resultado
 
             # Atualizar labels
-            self.etq_clientes.config(text=f"Clientes: {total_clientes}")
-            self.etq_veiculos.config(text=f"Veículos Disp.: {total_veiculos}")
-            self.etq_reservas.config(text=f"Reservas Ativas: {total_reservas}")
-            self.etq_receita.config(text=f"Receita Total: € {receita_total:,.2f}")
+            self.etq_clientes.config(text=f"Clientes: {indicadores['total_clientes']}")
+            self.etq_veiculos.config(text=f"Veículos Disp.: {indicadores['total_veiculos_disponiveis']}")
+            self.etq_reservas.config(text=f"Reservas Ativas: {indicadores['total_reservas_ativas']}")
+            self.etq_receita.config(text=f"Receita Total: € {indicadores['receita_total']:,.2f}")
 
             # Atualizar gráfico
-            self._atualizar_grafico()
+            self._atualizar_grafico(por_mes)
 
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            self._etiqueta_erro = ttk.Label(
-                self, text=f"Erro ao atualizar dashboard: {e}", foreground="red"
-            )
-            self._etiqueta_erro.grid(row=2, column=0, pady=10)
+            self._mostrar_erro(e)
+
+    def _mostrar_erro(self, erro: BaseException) -> None:
+        """
+        Exibe na interface o erro ocorrido ao atualizar o dashboard.
+
+        Args:
+            erro (BaseException): Exceção lançada pela leitura ou pela apresentação.
+        """
+        import traceback
+        traceback.print_exception(erro)
+        if self._etiqueta_erro:
+            self._etiqueta_erro.destroy()
+        self._etiqueta_erro = ttk.Label(
+            self, text=f"Erro ao atualizar dashboard: {erro}", foreground="red"
+        )
+        self._etiqueta_erro.grid(row=2, column=0, pady=10)
 
 
 if __name__ == "__main__":
@@ -2,13 +2,16 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Optional
 from utils.tooltip import DicaFerramenta
+from utils.executor_tarefas import ExecutorTarefas
 from controllers.formas_pagamento.formas_pag_servico import (
     adicionar_forma_pagamento,
     editar_forma_pagamento,
     excluir_forma_pagamento,
     exportar_formas_pagamento_para_csv,
+    exportar_formas_pagamento_para_xlsx,
     obter_formas_pagamento
 )
+from controllers.monitor_alteracoes import obter_monitor
 
 
 class AplicacaoFormasPagamento(ttk.Frame):
@@ -34,10 +37,13 @@ class AplicacaoFormasPagamento(ttk.Frame):
             mestre.resizable(True, True)
 
         self.pack(fill=tk.BOTH, expand=True)
+        self.tarefas = ExecutorTarefas(self)
         self._construir_formulario()
         self._construir_botoes()
         self._construir_lista()
         self._carregar_lista()
+        # Recarrega quando outra janela ou processo altera as formas de pagamento
+        obter_monitor().acompanhar(self, ["formaspagamento"], lambda _alteracoes: self._carregar_lista())
 
     def _construir_formulario(self) -> None:
         """
@@ -64,7 +70,7 @@ class AplicacaoFormasPagamento(ttk.Frame):
 
     def _construir_botoes(self) -> None:
         """
-        Cria os botões de ação da aplicação: Adicionar, Atualizar, Remover, Limpar e Exportar CSV.
+        Cria os botões de ação da aplicação: Adicionar, Atualizar, Remover, Limpar e Exportar CSV/Excel.
         """
         quadro_botoes = ttk.Frame(self)
         quadro_botoes.pack(fill=tk.X, pady=5)
@@ -73,6 +79,7 @@ class AplicacaoFormasPagamento(ttk.Frame):
         ttk.Button(quadro_botoes, text="Atualizar", command=self.atualizar).pack(side=tk.LEFT, padx=5)
         ttk.Button(quadro_botoes, text="Remover", command=self.remover).pack(side=tk.LEFT, padx=5)
         ttk.Button(quadro_botoes, text="Limpar", command=self.limpar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(quadro_botoes, text="Exportar Excel", command=self.exportar_xlsx).pack(side=tk.RIGHT, padx=5)
         ttk.Button(quadro_botoes, text="Exportar CSV", command=self.exportar).pack(side=tk.RIGHT, padx=5)
 
     def _construir_lista(self) -> None:
@@ -164,12 +171,8 @@ class AplicacaoFormasPagamento(ttk.Frame):
         if not self._validar():
             return
         nome = self._obter_valor("nome")
-        if adicionar_forma_pagamento(nome):
-            messagebox.showinfo("Sucesso", "Forma de pagamento adicionada.")
-            self.limpar()
-            self._carregar_lista()
-        else:
-            messagebox.showerror("Erro", "Erro ao adicionar. Verifique o nome informado.")
+        self.tarefas.executar(adicionar_forma_pagamento, nome, ao_concluir=self._resultado(
+            "Forma de pagamento adicionada.", "Erro ao adicionar. Verifique o nome informado."))
 
     def atualizar(self) -> None:
         """
@@ -183,12 +186,8 @@ class AplicacaoFormasPagamento(ttk.Frame):
             messagebox.showerror("Erro", "Selecione uma forma para atualizar.")
             return
         nome = self._obter_valor("nome")
-        if editar_forma_pagamento(int(id_str), nome):
-            messagebox.showinfo("Sucesso", "Forma de pagamento atualizada.")
-            self.limpar()
-            self._carregar_lista()
-        else:
-            messagebox.showerror("Erro", "Erro ao atualizar. Verifique o nome informado.")
+        self.tarefas.executar(editar_forma_pagamento, int(id_str), nome, ao_concluir=self._resultado(
+            "Forma de pagamento atualizada.", "Erro ao atualizar. Verifique o nome informado."))
 
     def remover(self) -> None:
         """
@@ -199,12 +198,25 @@ class AplicacaoFormasPagamento(ttk.Frame):
             messagebox.showerror("Erro", "Selecione uma forma para remover.")
             return
         if messagebox.askyesno("Confirmar", "Remover esta forma de pagamento?"):
-            if excluir_forma_pagamento(int(id_str)):
-                messagebox.showinfo("Sucesso", "Forma de pagamento removida.")
+            self.tarefas.executar(excluir_forma_pagamento, int(id_str), ao_concluir=self._resultado(
+                "Forma de pagamento removida.", "Falha ao remover forma de pagamento."))
+
+    def _resultado(self, mensagem_sucesso: str, mensagem_erro: str):
+        """
+        Devolve o callback que mostra o resultado de uma operação e atualiza a lista.
+
+        Args:
+            mensagem_sucesso (str): Mensagem mostrada se a operação correr bem.
+            mensagem_erro (str): Mensagem mostrada se a operação falhar.
+        """
+        def _ao_concluir(sucesso) -> None:
+            if sucesso:
+                messagebox.showinfo("Sucesso", mensagem_sucesso)
                 self.limpar()
                 self._carregar_lista()
             else:
-                messagebox.showerror("Erro", "Falha ao remover forma de pagamento.")
+                messagebox.showerror("Erro", mensagem_erro)
+        return _ao_concluir
 
     # ------------------------ Seleção e Listagem ------------------------
     def _ao_selecionar(self, _evento: tk.Event) -> None:
@@ -222,11 +234,20 @@ class AplicacaoFormasPagamento(ttk.Frame):
 
     def _carregar_lista(self) -> None:
         """
-        Atualiza a Treeview com todas as formas de pagamento registradas.
+        Atualiza a Treeview com todas as formas de pagamento registradas (lidas em segundo plano).
+        """
+        self.tarefas.executar(obter_formas_pagamento, ao_concluir=self._mostrar_lista, chave="lista")
+
+    def _mostrar_lista(self, formas) -> None:
+        """
+        Mostra as formas de pagamento na Treeview.
+
+        Args:
+            formas (list): Formas de pagamento devolvidas pelo serviço.
         """
         for item in self.arvore.get_children():
             self.arvore.delete(item)
-        for linha in obter_formas_pagamento():
+        for linha in formas:
             if isinstance(linha, dict):
                 self.arvore.insert("", tk.END, values=(linha["id"], linha["metodo"]))
             else:
@@ -245,10 +266,26 @@ class AplicacaoFormasPagamento(ttk.Frame):
         Exporta as formas de pagamento para CSV.
         Exibe mensagem de sucesso ou erro.
         """
-        if exportar_formas_pagamento_para_csv():
-            messagebox.showinfo("Sucesso", "Exportado para CSV com sucesso.")
-        else:
-            messagebox.showerror("Erro", "Falha ao exportar CSV.")
+        def _concluir(sucesso) -> None:
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Exportado para CSV com sucesso.")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar CSV.")
+
+        self.tarefas.executar(exportar_formas_pagamento_para_csv, ao_concluir=_concluir, chave="exportar")
+
+    def exportar_xlsx(self) -> None:
+        """
+        Exporta as formas de pagamento para Excel.
+        Exibe mensagem de sucesso ou erro.
+        """
+        def _concluir(sucesso) -> None:
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Exportado para Excel com sucesso.")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar Excel.")
+
+        self.tarefas.executar(exportar_formas_pagamento_para_xlsx, ao_concluir=_concluir, chave="exportar")
 
 
 if __name__ == "__main__":
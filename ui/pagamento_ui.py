@@ -1,13 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from utils.tooltip import DicaFerramenta
+from utils.lista_paginada import ListaVirtual, ModeloPaginado
+from utils.executor_tarefas import ExecutorTarefas
+from utils.importacao_ui import importar_csv_com_dialogo
 from controllers.pagamentos.pagamento_servico import (
     adicionar_pagamento,
     editar_pagamento,
     excluir_pagamento,
     exportar_pagamentos_para_csv,
-    obter_pagamentos
+    exportar_pagamentos_para_xlsx,
+    importar_pagamentos_de_csv,
+    obter_pagina_pagamentos
 )
+from controllers.monitor_alteracoes import obter_monitor
 
 class AplicacaoPagamentos(ttk.Frame):
     """
@@ -29,6 +35,7 @@ class AplicacaoPagamentos(ttk.Frame):
         master.geometry("700x560")
         master.resizable(True, True)
         self.pack(fill=tk.BOTH, expand=True)
+        self.tarefas = ExecutorTarefas(self)
 
         self.campos_entrada = {}
         self._definir_estilo()
@@ -37,6 +44,8 @@ class AplicacaoPagamentos(ttk.Frame):
         self._construir_botoes()
         self._construir_lista()
         self._carregar_lista()
+        # Recarrega quando outra janela ou processo altera os pagamentos
+        obter_monitor().acompanhar(self, ["pagamentos"], lambda _alteracoes: self._carregar_lista())
 
     def _definir_estilo(self):
         """
@@ -82,7 +91,7 @@ class AplicacaoPagamentos(ttk.Frame):
 
     def _construir_botoes(self):
         """
-        Cria os botões de ação: Adicionar, Atualizar, Remover, Limpar e Exportar CSV.
+        Cria os botões de ação: Adicionar, Atualizar, Remover, Limpar, Exportar CSV/Excel e Importar CSV.
         """
         botoes = ttk.Frame(self)
         botoes.pack(fill=tk.X, pady=5)
@@ -91,7 +100,9 @@ class AplicacaoPagamentos(ttk.Frame):
         ttk.Button(botoes, text="Atualizar", command=self._acao_atualizar).pack(side=tk.LEFT, padx=5)
         ttk.Button(botoes, text="Remover", command=self._acao_remover).pack(side=tk.LEFT, padx=5)
         ttk.Button(botoes, text="Limpar", command=self._limpar_formulario).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botoes, text="Exportar Excel", command=self._acao_exportar_xlsx).pack(side=tk.RIGHT, padx=5)
         ttk.Button(botoes, text="Exportar CSV", command=self._acao_exportar_csv).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(botoes, text="Importar CSV", command=self._acao_importar_csv).pack(side=tk.RIGHT, padx=5)
 
     def _construir_lista(self):
         """
@@ -119,7 +130,9 @@ class AplicacaoPagamentos(ttk.Frame):
         self.arvore.tag_configure("linha_impar", background="#ffffff")
 
         scroll = ttk.Scrollbar(frame_lista, orient="vertical", command=self.arvore.yview)
-        self.arvore.configure(yscroll=scroll.set)
+        # Lista virtual: só as páginas visíveis são lidas (paginação por data e ID)
+        modelo = ModeloPaginado(obter_pagina_pagamentos, lambda p: (p["data_pagamento"], p["id"]))
+        self.lista_virtual = ListaVirtual(self.arvore, modelo, self._linha_pagamento, barra=scroll.set)
 
         self.arvore.grid(row=0, column=0, sticky="nsew")
         scroll.grid(row=0, column=1, sticky="ns")
@@ -169,13 +182,7 @@ class AplicacaoPagamentos(ttk.Frame):
         Exibe mensagens de sucesso ou erro.
         """
         dados = self._obter_dados_formulario()
-        sucesso, msg = adicionar_pagamento(dados)
-        if sucesso:
-            messagebox.showinfo("Sucesso", msg)
-            self._limpar_formulario()
-            self._carregar_lista()
-        else:
-            messagebox.showerror("Erro", msg)
+        self.tarefas.executar(adicionar_pagamento, dados, ao_concluir=self._apos_gravar)
 
     def _acao_atualizar(self):
         """
@@ -183,13 +190,7 @@ class AplicacaoPagamentos(ttk.Frame):
         Exibe mensagens de sucesso ou erro.
         """
         dados = self._obter_dados_formulario()
-        sucesso, msg = editar_pagamento(dados)
-        if sucesso:
-            messagebox.showinfo("Sucesso", msg)
-            self._limpar_formulario()
-            self._carregar_lista()
-        else:
-            messagebox.showerror("Erro", msg)
+        self.tarefas.executar(editar_pagamento, dados, ao_concluir=self._apos_gravar)
 
     def _acao_remover(self):
         """
@@ -200,28 +201,41 @@ class AplicacaoPagamentos(ttk.Frame):
             messagebox.showerror("Erro", "Selecione um ID válido para remover.")
             return
         if messagebox.askyesno("Confirmar", "Deseja realmente remover este pagamento?"):
-            if excluir_pagamento(int(id_pagamento)):
-                messagebox.showinfo("Sucesso", "Pagamento removido com sucesso.")
-                self._limpar_formulario()
-                self._carregar_lista()
-            else:
-                messagebox.showerror("Erro", "Erro ao remover pagamento.")
+            self.tarefas.executar(
+                excluir_pagamento, int(id_pagamento),
+                ao_concluir=lambda sucesso: self._apos_gravar(
+                    (sucesso, "Pagamento removido com sucesso." if sucesso else "Erro ao remover pagamento.")))
+
+    def _apos_gravar(self, resultado):
+        """
+        Mostra o resultado (sucesso, mensagem) de uma operação e atualiza a lista.
+        """
+        sucesso, msg = resultado
+        if sucesso:
+            messagebox.showinfo("Sucesso", msg)
+            self._limpar_formulario()
+            self._carregar_lista()
+        else:
+            messagebox.showerror("Erro", msg)
 
     def _carregar_lista(self):
         """
         Carrega a lista de pagamentos na Treeview.
         """
-        self.arvore.delete(*self.arvore.get_children())
-        for i, pagamento in enumerate(obter_pagamentos()):
-            valores = (
-                pagamento["id"],
-                pagamento["id_reserva"],
-                pagamento["id_forma_pagamento"],
-                pagamento["valor"],
-                pagamento["data_pagamento"],
-            )
-            tag = "linha_par" if i % 2 == 0 else "linha_impar"
-            self.arvore.insert("", tk.END, values=valores, tags=(tag,))
+        self.lista_virtual.recarregar()
+
+    @staticmethod
+    def _linha_pagamento(posicao, pagamento):
+        """
+        Converte um pagamento numa linha da Treeview, alternando a cor pela posição.
+        """
+        return pagamento["id"], (
+            pagamento["id"],
+            pagamento["id_reserva"],
+            pagamento["id_forma_pagamento"],
+            pagamento["valor"],
+            pagamento["data_pagamento"],
+        ), ("linha_par" if posicao % 2 == 0 else "linha_impar",)
 
     def _limpar_formulario(self):
         """
@@ -237,10 +251,31 @@ class AplicacaoPagamentos(ttk.Frame):
         """
         Exporta os pagamentos para um arquivo CSV e exibe mensagem de sucesso ou erro.
         """
-        if exportar_pagamentos_para_csv():
-            messagebox.showinfo("Sucesso", "Pagamentos exportados com sucesso.")
-        else:
-            messagebox.showerror("Erro", "Falha ao exportar pagamentos.")
+        def _concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Pagamentos exportados com sucesso.")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar pagamentos.")
+
+        self.tarefas.executar(exportar_pagamentos_para_csv, ao_concluir=_concluir, chave="exportar")
+
+    def _acao_exportar_xlsx(self):
+        """
+        Exporta os pagamentos para um ficheiro Excel e exibe mensagem de sucesso ou erro.
+        """
+        def _concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Pagamentos exportados com sucesso.")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar pagamentos.")
+
+        self.tarefas.executar(exportar_pagamentos_para_xlsx, ao_concluir=_concluir, chave="exportar")
+
+    def _acao_importar_csv(self):
+        """
+        Importa pagamentos de um ficheiro CSV e exibe o resumo (a lista atualiza-se pelo monitor).
+        """
+        importar_csv_com_dialogo(self.tarefas, importar_pagamentos_de_csv, "pagamentos")
 
 
 if __name__ == "__main__":
@@ -1,14 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from utils.tooltip import DicaFerramenta
+from utils.lista_paginada import ListaVirtual, ModeloPaginado
+from utils.executor_tarefas import ExecutorTarefas
+from utils.importacao_ui import importar_csv_com_dialogo
 from controllers.reservas.reservas_servico import (
     adicionar_reserva_servico,
     atualizar_reserva_servico,
     excluir_reserva_servico,
     exportar_reservas_para_csv,
-    obter_reservas_servico
+    exportar_reservas_para_xlsx,
+    importar_reservas_de_csv,
+    obter_pagina_reservas_servico,
+    veiculo_disponivel_servico
 )
 from controllers.reservas.reservas_validacoes import validar_periodo, validar_ids
+from controllers.monitor_alteracoes import obter_monitor
 
 FORMATO_DATA = "%Y-%m-%d"
 
@@ -22,7 +29,7 @@ class AplicacaoReserva(ttk.Frame):
         - Atualizar reservas existentes
         - Remover reservas
         - Listar reservas
-        - Exportar reservas para CSV
+        - Exportar reservas para CSV e Excel
     """
 
     def __init__(self, mestre: tk.Tk):
@@ -37,11 +44,14 @@ class AplicacaoReserva(ttk.Frame):
         mestre.geometry("650x500")
         mestre.resizable(True, True)
         self.pack(fill=tk.BOTH, expand=True)
+        self.tarefas = ExecutorTarefas(self)
 
         self._construir_formulario()
         self._construir_botoes()
         self._construir_lista()
         self._carregar_lista()
+        # Recarrega quando outra janela ou processo altera as reservas
+        obter_monitor().acompanhar(self, ["reservas"], lambda _alteracoes: self._carregar_lista())
 
     def _construir_formulario(self):
         """Cria os campos de entrada para dados da reserva."""
@@ -74,7 +84,10 @@ class AplicacaoReserva(ttk.Frame):
         ttk.Button(quadro_botoes, text="Atualizar", command=self.atualizar_reserva).pack(side=tk.LEFT, padx=5)
         ttk.Button(quadro_botoes, text="Remover", command=self.remover_reserva).pack(side=tk.LEFT, padx=5)
         ttk.Button(quadro_botoes, text="Limpar", command=self.limpar_formulario).pack(side=tk.LEFT, padx=5)
+        ttk.Button(quadro_botoes, text="Exportar Excel",
+                   command=self.exportar_reservas_xlsx).pack(side=tk.RIGHT, padx=5)
         ttk.Button(quadro_botoes, text="Exportar CSV", command=self.exportar_reservas).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(quadro_botoes, text="Importar CSV", command=self.importar_reservas).pack(side=tk.RIGHT, padx=5)
 
     def _construir_lista(self):
         """Cria a Treeview para exibir a lista de reservas cadastradas."""
@@ -87,7 +100,9 @@ class AplicacaoReserva(ttk.Frame):
             self.lista.column(coluna, width=100, anchor=tk.CENTER)
 
         scroll = ttk.Scrollbar(quadro_lista, orient="vertical", command=self.lista.yview)
-        self.lista.configure(yscroll=scroll.set)
+        # Lista virtual: só as páginas visíveis são lidas (paginação por data de início e ID)
+        modelo = ModeloPaginado(obter_pagina_reservas_servico, lambda r: (r["data_inicio"], r["id"]))
+        self.lista_virtual = ListaVirtual(self.lista, modelo, self._linha_reserva, barra=scroll.set)
         self.lista.grid(row=0, column=0, sticky="nsew")
         scroll.grid(row=0, column=1, sticky="ns")
 
@@ -95,18 +110,20 @@ class AplicacaoReserva(ttk.Frame):
         quadro_lista.columnconfigure(0, weight=1)
         self.lista.bind("<<TreeviewSelect>>", self._selecionar_reserva)
 
+    @staticmethod
+    def _linha_reserva(_posicao, reserva):
+        """Converte uma reserva numa linha da Treeview."""
+        return reserva["id"], (
+            reserva["id"],
+            reserva["id_cliente"],
+            reserva["id_veiculo"],
+            reserva["data_inicio"],
+            reserva["data_fim"]
+        ), ()
+
     def _carregar_lista(self):
-        """Atualiza a Treeview exibindo todas as reservas."""
-        self.lista.delete(*self.lista.get_children())
-        for reserva in obter_reservas_servico():
-            valores = (
-                reserva["id"],
-                reserva["id_cliente"],
-                reserva["id_veiculo"],
-                reserva["data_inicio"],
-                reserva["data_fim"]
-            )
-            self.lista.insert("", tk.END, values=valores)
+        """Atualiza a Treeview, relendo as páginas de reservas visíveis."""
+        self.lista_virtual.recarregar()
 
     def _selecionar_reserva(self, _):
         """Popula os campos do formulário ao selecionar uma reserva na lista."""
@@ -167,6 +184,10 @@ class AplicacaoReserva(ttk.Frame):
             messagebox.showerror("Erro", "IDs devem ser inteiros positivos.")
             return None
 
+        if not veiculo_disponivel_servico(veiculo_id, data_inicio, data_fim, reserva_id):
+            messagebox.showerror("Erro", "O veículo já tem uma reserva ativa nesse período.")
+            return None
+
         return {
             "reserva_id": reserva_id,
             "data_inicio": data_inicio,
@@ -183,47 +204,33 @@ class AplicacaoReserva(ttk.Frame):
         if not dados:
             return
 
-        reservas = obter_reservas_servico()
-        ids_existentes = [r["id"] for r in reservas if r.get("id")]
-        novo_id = 1
-        while novo_id in ids_existentes:
-            novo_id += 1
-        dados["reserva_id"] = novo_id
-
-        if adicionar_reserva_servico(
+        self.tarefas.executar(
+            adicionar_reserva_servico,
             cliente_id=dados["cliente_id"],
             veiculo_id=dados["veiculo_id"],
             data_inicio=dados["data_inicio"],
             data_fim=dados["data_fim"],
             status=dados["status"],
-            valor_total=dados["valor_total"]
-        ):
-            messagebox.showinfo("Sucesso", f"Reserva adicionada com sucesso (ID {novo_id}).")
-            self.limpar_formulario()
-            self._carregar_lista()
-        else:
-            messagebox.showerror("Erro", "Falha ao adicionar a reserva.")
+            valor_total=dados["valor_total"],
+            ao_concluir=self._resultado("Reserva adicionada com sucesso.", "Falha ao adicionar a reserva.")
+        )
 
     def atualizar_reserva(self):
         """Atualiza uma reserva existente."""
         dados = self._validar_campos_reserva(incluir_id=True)
         if not dados:
             return
-        sucesso = atualizar_reserva_servico(
+        self.tarefas.executar(
+            atualizar_reserva_servico,
             reserva_id=dados["reserva_id"],
             data_inicio=dados["data_inicio"],
             data_fim=dados["data_fim"],
             cliente_id=dados["cliente_id"],
             veiculo_id=dados["veiculo_id"],
             status=dados["status"],
-            valor_total=dados["valor_total"]
+            valor_total=dados["valor_total"],
+            ao_concluir=self._resultado("Reserva atualizada com sucesso.", "Falha ao atualizar a reserva.")
         )
-        if sucesso:
-            messagebox.showinfo("Sucesso", "Reserva atualizada com sucesso.")
-            self.limpar_formulario()
-            self._carregar_lista()
-        else:
-            messagebox.showerror("Erro", "Falha ao atualizar a reserva.")
 
     def remover_reserva(self):
         """Remove a reserva selecionada da base de dados."""
@@ -232,19 +239,44 @@ class AplicacaoReserva(ttk.Frame):
             messagebox.showerror("Erro", "Selecione uma reserva válida para remover.")
             return
         if messagebox.askyesno("Confirmar", "Deseja realmente remover esta reserva?"):
-            if excluir_reserva_servico(int(id_reserva)):
-                messagebox.showinfo("Sucesso", "Reserva removida com sucesso.")
+            self.tarefas.executar(
+                excluir_reserva_servico, int(id_reserva),
+                ao_concluir=self._resultado("Reserva removida com sucesso.", "Falha ao remover a reserva."))
+
+    def _resultado(self, mensagem_sucesso, mensagem_erro):
+        """Devolve o callback que mostra o resultado de uma operação e atualiza a lista."""
+        def _ao_concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", mensagem_sucesso)
                 self.limpar_formulario()
                 self._carregar_lista()
             else:
-                messagebox.showerror("Erro", "Falha ao remover a reserva.")
+                messagebox.showerror("Erro", mensagem_erro)
+        return _ao_concluir
 
     def exportar_reservas(self):
         """Exporta todas as reservas para um arquivo CSV."""
-        if exportar_reservas_para_csv():
-            messagebox.showinfo("Sucesso", "Reservas exportadas com sucesso.")
-        else:
-            messagebox.showerror("Erro", "Falha ao exportar as reservas.")
+        def _concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Reservas exportadas com sucesso.")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar as reservas.")
+
+        self.tarefas.executar(exportar_reservas_para_csv, ao_concluir=_concluir, chave="exportar")
+
+    def exportar_reservas_xlsx(self):
+        """Exporta todas as reservas para um ficheiro Excel."""
+        def _concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", "Reservas exportadas com sucesso.")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar as reservas.")
+
+        self.tarefas.executar(exportar_reservas_para_xlsx, ao_concluir=_concluir, chave="exportar")
+
+    def importar_reservas(self):
+        """Importa reservas de um ficheiro CSV (a lista atualiza-se pelo monitor de alterações)."""
+        importar_csv_com_dialogo(self.tarefas, importar_reservas_de_csv, "reservas")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,21 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import os
 from tkinter import ttk, messagebox, filedialog
 from controllers.veiculos import veiculos_servico
+from utils.ligador_treeview import LigadorTreeview
+from utils.executor_tarefas import ExecutorTarefas
+from utils.importacao_ui import importar_csv_com_dialogo
+from utils.miniaturas import CacheMiniaturas
+from controllers.monitor_alteracoes import obter_monitor
 
 # Caminho absoluto e robusto para a pasta photo_cars (assumindo que este ficheiro está em ui/)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PHOTO_DIR = os.path.join(BASE_DIR, "photo_cars")
 
+# Miniaturas já convertidas em PhotoImage, partilhadas pela lista e pelo formulário
+_miniaturas = CacheMiniaturas(converter=ImageTk.PhotoImage)
+
 
 class AplicacaoVeiculo(ttk.Frame):
     """
@@ -17,7 +25,7 @@ class AplicacaoVeiculo(ttk.Frame):
         - Listar veículos
         - Adicionar/editar/remover veículos
         - Marcar manutenção
-        - Exportar lista de veículos para CSV
+        - Exportar lista de veículos para CSV e Excel
         - Visualizar imagem do veículo selecionado
     """
 
@@ -32,9 +40,12 @@ class AplicacaoVeiculo(ttk.Frame):
         mestre.title("Gestão de Veículos")
         mestre.geometry("1100x600")
         self.pack(fill=tk.BOTH, expand=True)
+        self.tarefas = ExecutorTarefas(self)
 
         self.id_selecionado = None
         self.img_atual = None  # manter referência da imagem
+        # Veículos da última carga da lista, por ID (evita reler a tabela a cada seleção)
+        self._veiculos = {}
 
         # Frame da lista de veículos
         self.frame_lista = ttk.Frame(self)
@@ -48,6 +59,7 @@ class AplicacaoVeiculo(ttk.Frame):
             ("diaria", "Diária"), ("estado", "Estado")
         ]
         self.tree = ttk.Treeview(self.frame_lista, columns=[c[0] for c in self.colunas], show='headings')
+        self.ligador = LigadorTreeview(self.tree)
         for chave, titulo in self.colunas:
             self.tree.heading(chave, text=titulo)
             self.tree.column(chave, width=100, anchor=tk.CENTER)
@@ -62,6 +74,8 @@ class AplicacaoVeiculo(ttk.Frame):
         ttk.Button(btn_frame, text="Remover", command=self.remover_veiculo).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Marcar Manutenção", command=self.marcar_manutencao).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Exportar CSV", command=self.exportar_csv).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Exportar Excel", command=self.exportar_xlsx).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Importar CSV", command=self.importar_csv).pack(side=tk.LEFT, padx=5)
 
         # Área para mostrar imagem do veículo selecionado
         self.label_imagem = tk.Label(self)
@@ -69,15 +83,33 @@ class AplicacaoVeiculo(ttk.Frame):
 
         self.formulario = None
         self.carregar_veiculos()
+        # Recarrega quando outra janela ou processo altera os veículos
+        obter_monitor().acompanhar(self, ["veiculos"], lambda _alteracoes: self.carregar_veiculos())
 
     def carregar_veiculos(self):
-        """Carrega e exibe todos os veículos na Treeview."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        lista = veiculos_servico.obter_veiculos_servico() or []
-        for veiculo in lista:
-            valores = [veiculo.get(chave, "") for chave, _ in self.colunas]
-            self.tree.insert("", tk.END, values=valores)
+        """Carrega (em segundo plano) e exibe todos os veículos na Treeview."""
+        self.tarefas.executar(veiculos_servico.obter_veiculos_servico, ao_concluir=self._mostrar_veiculos,
+                              chave="lista")
+
+    def _mostrar_veiculos(self, lista):
+        """Mostra os veículos na Treeview, aplicando só as diferenças."""
+        self._veiculos = {veiculo.get("id"): veiculo for veiculo in lista or []}
+        self.ligador.atualizar(
+            (veiculo.get("id"), [veiculo.get(chave, "") for chave, _ in self.colunas], ())
+            for veiculo in lista or []
+        )
+
+    def _resultado(self, mensagem_sucesso, mensagem_erro, fechar_formulario=False):
+        """Devolve o callback que mostra o resultado de uma operação e atualiza a lista."""
+        def _ao_concluir(sucesso):
+            if sucesso:
+                messagebox.showinfo("Sucesso", mensagem_sucesso)
+                if fechar_formulario and self.formulario:
+                    self.formulario.destroy()
+                self.carregar_veiculos()
+            else:
+                messagebox.showerror("Erro", mensagem_erro)
+        return _ao_concluir
 
     def on_selecionar_veiculo(self, event):
         """Exibe os detalhes e a imagem do veículo selecionado."""
@@ -90,8 +122,7 @@ class AplicacaoVeiculo(ttk.Frame):
         except (ValueError, TypeError):
             self.id_selecionado = valores[0]
 
-        veiculos = veiculos_servico.obter_veiculos_servico() or []
-        veiculo = next((v for v in veiculos if v.get("id") == self.id_selecionado or str(v.get("id")) == str(self.id_selecionado)), None)
+        veiculo = self._obter_veiculo(self.id_selecionado)
 
         if veiculo and veiculo.get("imagem"):
             self.mostrar_imagem_lista(veiculo["imagem"])
@@ -99,6 +130,19 @@ class AplicacaoVeiculo(ttk.Frame):
             self.label_imagem.config(text="Sem imagem", image="")
             self.img_atual = None
 
+    def _obter_veiculo(self, veiculo_id):
+        """Devolve o veículo da cache da lista ou, se não estiver lá, lê-o pelo ID."""
+        try:
+            veiculo_id = int(veiculo_id)
+        except (ValueError, TypeError):
+            return None
+        veiculo = self._veiculos.get(veiculo_id)
+        if veiculo is None:
+            veiculo = veiculos_servico.obter_veiculo_por_id_servico(veiculo_id)
+            if veiculo is not None:
+                self._veiculos[veiculo_id] = veiculo
+        return veiculo
+
     def _resolver_caminho_imagem(self, nome_arquivo: str) -> str:
         """Retorna o caminho absoluto para uma imagem, se existir."""
         if not nome_arquivo:
@@ -116,10 +160,8 @@ class AplicacaoVeiculo(ttk.Frame):
     def mostrar_imagem_lista(self, nome_arquivo):
         """Mostra a imagem do veículo selecionado na interface."""
         caminho = self._resolver_caminho_imagem(nome_arquivo)
-        if caminho:
-            img = Image.open(caminho)
-            img.thumbnail((400, 280), Image.Resampling.LANCZOS)
-            self.img_atual = ImageTk.PhotoImage(img)
+        self.img_atual = _miniaturas.obter(caminho, (400, 280)) if caminho else None
+        if self.img_atual is not None:
             self.label_imagem.config(image=self.img_atual, text="")
         else:
             self.label_imagem.config(text=f"Imagem não encontrada: {nome_arquivo}", image="")
@@ -137,8 +179,7 @@ class AplicacaoVeiculo(ttk.Frame):
         if not self.id_selecionado:
             messagebox.showwarning("Aviso", "Selecione um veículo para editar.")
             return
-        veiculos = veiculos_servico.obter_veiculos_servico() or []
-        veiculo = next((v for v in veiculos if v.get("id") == self.id_selecionado or str(v.get("id")) == str(self.id_selecionado)), None)
+        veiculo = self._obter_veiculo(self.id_selecionado)
         if veiculo is None:
             messagebox.showerror("Erro", "Veículo não encontrado.")
             return
@@ -149,24 +190,16 @@ class AplicacaoVeiculo(ttk.Frame):
 
     def adicionar_veiculo(self, dados):
         """Adiciona um veículo usando o serviço correspondente."""
-        sucesso = veiculos_servico.adicionar_veiculo_servico(**dados)
-        if sucesso:
-            messagebox.showinfo("Sucesso", "Veículo adicionado com sucesso.")
-            self.formulario.destroy()
-            self.carregar_veiculos()
-        else:
-            messagebox.showerror("Erro", "Falha ao adicionar veículo.")
+        self.tarefas.executar(veiculos_servico.adicionar_veiculo_servico, **dados, ao_concluir=self._resultado(
+            "Veículo adicionado com sucesso.", "Falha ao adicionar veículo.", fechar_formulario=True))
 
     def atualizar_veiculo(self, dados):
         """Atualiza um veículo usando o serviço correspondente."""
         veiculo_id = dados.pop("veiculo_id")
-        sucesso = veiculos_servico.atualizar_veiculo_servico(veiculo_id=int(veiculo_id), **dados)
-        if sucesso:
-            messagebox.showinfo("Sucesso", "Veículo atualizado com sucesso.")
-            self.formulario.destroy()
-            self.carregar_veiculos()
-        else:
-            messagebox.showerror("Erro", "Falha ao atualizar veículo.")
+        self.tarefas.executar(
+            veiculos_servico.atualizar_veiculo_servico, veiculo_id=int(veiculo_id), **dados,
+            ao_concluir=self._resultado("Veículo atualizado com sucesso.", "Falha ao atualizar veículo.",
+                                        fechar_formulario=True))
 
     def remover_veiculo(self):
         """Remove o veículo selecionado da base de dados."""
@@ -174,24 +207,17 @@ class AplicacaoVeiculo(ttk.Frame):
             messagebox.showwarning("Aviso", "Selecione um veículo para remover.")
             return
         if messagebox.askyesno("Confirmação", "Deseja remover o veículo selecionado?"):
-            sucesso = veiculos_servico.remover_veiculo_servico(self.id_selecionado)
-            if sucesso:
-                messagebox.showinfo("Sucesso", "Veículo removido.")
-                self.carregar_veiculos()
-            else:
-                messagebox.showerror("Erro", "Falha ao remover veículo.")
+            self.tarefas.executar(veiculos_servico.remover_veiculo_servico, self.id_selecionado,
+                                  ao_concluir=self._resultado("Veículo removido.", "Falha ao remover veículo."))
 
     def marcar_manutencao(self):
         """Marca o veículo selecionado como em manutenção."""
         if not self.id_selecionado:
             messagebox.showwarning("Aviso", "Selecione um veículo para marcar manutenção.")
             return
-        sucesso = veiculos_servico.marcar_veiculo_manutencao_servico(self.id_selecionado)
-        if sucesso:
-            messagebox.showinfo("Sucesso", "Veículo marcado em manutenção.")
-            self.carregar_veiculos()
-        else:
-            messagebox.showerror("Erro", "Falha ao marcar manutenção.")
+        self.tarefas.executar(
+            veiculos_servico.marcar_veiculo_manutencao_servico, self.id_selecionado,
+            ao_concluir=self._resultado("Veículo marcado em manutenção.", "Falha ao marcar manutenção."))
 
     def exportar_csv(self):
         """Exporta a lista de veículos para arquivo CSV."""
@@ -200,11 +226,34 @@ class AplicacaoVeiculo(ttk.Frame):
             filetypes=[("CSV files", "*.csv"), ("Todos os ficheiros", "*.*")]
         )
         if caminho:
-            sucesso = veiculos_servico.exportar_veiculos_servico(caminho)
-            if sucesso:
-                messagebox.showinfo("Exportação", f"Exportado para {caminho}")
-            else:
-                messagebox.showerror("Erro", "Falha ao exportar CSV.")
+            def _concluir(sucesso):
+                if sucesso:
+                    messagebox.showinfo("Exportação", f"Exportado para {caminho}")
+                else:
+                    messagebox.showerror("Erro", "Falha ao exportar CSV.")
+
+            self.tarefas.executar(veiculos_servico.exportar_veiculos_servico, caminho, ao_concluir=_concluir,
+                                  chave="exportar")
+
+    def exportar_xlsx(self):
+        """Exporta a lista de veículos para ficheiro Excel."""
+        caminho = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("Todos os ficheiros", "*.*")]
+        )
+        if caminho:
+            def _concluir(sucesso):
+                if sucesso:
+                    messagebox.showinfo("Exportação", f"Exportado para {caminho}")
+                else:
+                    messagebox.showerror("Erro", "Falha ao exportar Excel.")
+
+            self.tarefas.executar(veiculos_servico.exportar_veiculos_xlsx_servico, caminho, ao_concluir=_concluir,
+                                  chave="exportar")
+
+    def importar_csv(self):
+        """Importa veículos de um ficheiro CSV (a lista atualiza-se pelo monitor de alterações)."""
+        importar_csv_com_dialogo(self.tarefas, veiculos_servico.importar_veiculos_servico, "veículos")
 
 
 class FormularioVeiculo(ttk.Frame):
@@ -274,10 +323,8 @@ class FormularioVeiculo(ttk.Frame):
                     caminho = os.path.join(pasta, ficheiro)
                     break
 
-        if os.path.exists(caminho):
-            img = Image.open(caminho)
-            img = img.resize((200, 150))
-            self.img_atual = ImageTk.PhotoImage(img)
+        self.img_atual = _miniaturas.obter(caminho, (200, 150), manter_proporcao=False)
+        if self.img_atual is not None:
             self.label_preview.config(image=self.img_atual, text="")
         else:
             self.label_preview.config(text="Imagem não encontrada", image="")
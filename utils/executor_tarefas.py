@@ -0,0 +1,181 @@
+"""
+Execução de chamadas aos serviços fora da thread do Tkinter.
+
+O Tkinter não pode ser usado a partir de outras threads, pelo que as janelas
+chamavam os serviços diretamente nos handlers dos botões, bloqueando toda a
+aplicação durante exportações ou cargas de listas grandes.
+
+`ExecutorTarefas` corre as chamadas num pool de threads partilhado e entrega
+o resultado (ou a exceção) de volta à thread do Tkinter: as threads de
+trabalho só escrevem numa fila, que a janela esvazia com `after()` enquanto
+houver tarefas pendentes. Cada janela tem o seu executor, com:
+    - chaves de tarefa: um novo pedido com a mesma chave torna o anterior
+      obsoleto (não chega a correr se ainda estiver na fila e o seu
+      resultado é descartado);
+    - indicador de ocupado: por defeito o cursor da janela passa a "watch"
+      enquanto houver tarefas pendentes;
+    - cancelamento de todas as tarefas quando a janela é destruída.
+
+As conexões à base de dados são confinadas à thread (ver utils_bd.PoolConexoes),
+por isso os serviços podem ser chamados a partir das threads de trabalho.
+"""
+
+import logging
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import count
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Threads de trabalho partilhadas por todas as janelas
+MAX_THREADS = 4
+# Intervalo com que a janela recolhe os resultados enquanto há tarefas pendentes
+INTERVALO_RECOLHA_MS = 30
+
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _obter_pool() -> ThreadPoolExecutor:
+    """Cria (na primeira utilização) e devolve o pool de threads partilhado."""
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="luxury_wheels_tarefa")
+    return _pool
+
+
+class ExecutorTarefas:
+    """
+    Corre funções numa thread de trabalho e entrega o resultado na thread do Tkinter.
+
+    Args:
+        widget: Widget dono das tarefas (normalmente a janela). As tarefas são
+            canceladas quando é destruído.
+        indicador (Callable[[bool], None], opcional): Chamado com True quando
+            começa a haver tarefas pendentes e com False quando terminam.
+            Por defeito muda o cursor da janela de topo.
+    """
+
+    def __init__(self, widget, indicador: Optional[Callable[[bool], None]] = None):
+        self.widget = widget
+        self.indicador = indicador or self._cursor_ocupado
+        self._ids = count(1)
+        self._resultados: "queue.Queue" = queue.Queue()
+        # {id: (future, chave, ao_concluir, ao_falhar)}
+        self._pendentes: Dict[int, tuple] = {}
+        self._atuais: Dict[Any, int] = {}
+        self._recolha = None
+        self._ativo = True
+
+        def _ao_destruir(evento):
+            if evento.widget is widget:
+                self.cancelar_todas()
+                self._ativo = False
+
+        widget.bind("<Destroy>", _ao_destruir, add="+")
+
+    def _cursor_ocupado(self, ocupado: bool) -> None:
+        """Indicador por defeito: cursor de espera na janela de topo."""
+        try:
+            self.widget.winfo_toplevel().configure(cursor="watch" if ocupado else "")
+        except Exception:
+            pass
+
+    @property
+    def ocupado(self) -> bool:
+        """True enquanto houver tarefas pendentes."""
+        return bool(self._pendentes)
+
+    def executar(self, funcao: Callable[..., Any], *args, ao_concluir: Optional[Callable[[Any], None]] = None,
+                 ao_falhar: Optional[Callable[[BaseException], None]] = None, chave: Any = None, **kwargs) -> int:
+        """
+        Agenda `funcao(*args, **kwargs)` numa thread de trabalho.
+
+        Args:
+            funcao (Callable): Função a executar (normalmente um serviço).
+            *args: Argumentos posicionais da função.
+            ao_concluir (Callable, opcional): Recebe o resultado, na thread do Tkinter.
+            ao_falhar (Callable, opcional): Recebe a exceção, na thread do Tkinter.
+                Sem ele, a exceção é apenas registada no log.
+            chave (opcional): Identifica pedidos equivalentes (ex.: "lista"); um
+                novo pedido com a mesma chave cancela o anterior.
+            **kwargs: Argumentos nomeados da função.
+
+        Returns:
+            int: Identificador da tarefa (para `cancelar`).
+        """
+        if chave is not None and chave in self._atuais:
+            self.cancelar(self._atuais[chave])
+
+        identificador = next(self._ids)
+        estava_livre = not self._pendentes
+        futuro = _obter_pool().submit(funcao, *args, **kwargs)
+        self._pendentes[identificador] = (futuro, chave, ao_concluir, ao_falhar)
+        if chave is not None:
+            self._atuais[chave] = identificador
+        futuro.add_done_callback(lambda f, i=identificador: self._resultados.put((i, f)))
+
+        if estava_livre:
+            self.indicador(True)
+        if self._recolha is None:
+            self._recolha = self.widget.after(INTERVALO_RECOLHA_MS, self._recolher)
+        return identificador
+
+    def cancelar(self, identificador: int) -> None:
+        """
+        Cancela uma tarefa: se ainda não começou não chega a correr; se já
+        começou, o seu resultado é descartado.
+
+        Args:
+            identificador (int): Valor devolvido por `executar`.
+        """
+        pendente = self._pendentes.pop(identificador, None)
+        if pendente is None:
+            return
+        futuro, chave, _, _ = pendente
+        futuro.cancel()
+        if chave is not None and self._atuais.get(chave) == identificador:
+            del self._atuais[chave]
+        if not self._pendentes:
+            self.indicador(False)
+
+    def cancelar_todas(self) -> None:
+        """Cancela todas as tarefas pendentes desta janela."""
+        for identificador in list(self._pendentes):
+            self.cancelar(identificador)
+
+    def _recolher(self) -> None:
+        """Entrega, na thread do Tkinter, os resultados das tarefas concluídas."""
+        self._recolha = None
+        while True:
+            try:
+                identificador, futuro = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._entregar(identificador, futuro)
+
+        if self._pendentes and self._ativo:
+            self._recolha = self.widget.after(INTERVALO_RECOLHA_MS, self._recolher)
+
+    def _entregar(self, identificador: int, futuro: Future) -> None:
+        """Chama o callback de uma tarefa concluída (ignora as canceladas ou obsoletas)."""
+        pendente = self._pendentes.pop(identificador, None)
+        if pendente is None or futuro.cancelled():
+            return
+        _, chave, ao_concluir, ao_falhar = pendente
+        if chave is not None and self._atuais.get(chave) == identificador:
+            del self._atuais[chave]
+        if not self._pendentes:
+            self.indicador(False)
+
+        erro = futuro.exception()
+        try:
+            if erro is not None:
+                if ao_falhar is not None:
+                    ao_falhar(erro)
+                else:
+                    logger.error("Erro numa tarefa em segundo plano.", exc_info=erro)
+            elif ao_concluir is not None:
+                ao_concluir(futuro.result())
+        except Exception:
+            logger.exception("Erro ao entregar o resultado de uma tarefa.")
@@ -0,0 +1,69 @@
+"""
+Diálogo comum dos botões "Importar CSV" das janelas de gestão.
+
+Pede o ficheiro, corre a importação numa thread de trabalho (via
+`ExecutorTarefas`) e mostra um resumo com as linhas inseridas e rejeitadas.
+As linhas rejeitadas ficam em `<ficheiro>_rejeicoes.csv`, ao lado do
+ficheiro importado, com o número da linha e o motivo.
+
+Uso:
+    importar_csv_com_dialogo(self.tarefas, clientes_servico.importar_clientes_csv, "clientes")
+"""
+
+import os
+from tkinter import filedialog, messagebox
+from typing import Any, Callable, Dict, Optional
+
+from utils.executor_tarefas import ExecutorTarefas
+
+# Motivos mostrados no resumo (os restantes ficam no relatório)
+MAX_MOTIVOS_RESUMO = 5
+
+
+def caminho_rejeicoes(caminho: str) -> str:
+    """Devolve o caminho do relatório de rejeições de um ficheiro importado."""
+    base, _ = os.path.splitext(caminho)
+    return f"{base}_rejeicoes.csv"
+
+
+def _resumo(resultado: Dict[str, Any], relatorio: str) -> str:
+    """Texto do resumo de uma importação concluída ou cancelada."""
+    linhas = [f"Linhas lidas: {resultado['lidas']}",
+              f"Inseridas: {resultado['inseridas']}",
+              f"Rejeitadas: {resultado['rejeitadas']}"]
+    if resultado["cancelada"]:
+        linhas.insert(0, "Importação cancelada (os lotes já gravados ficam gravados).")
+    if resultado["rejeitadas"]:
+        linhas.append("")
+        linhas += [f"Linha {r['linha']}: {r['motivo']}" for r in resultado["rejeicoes"][:MAX_MOTIVOS_RESUMO]]
+        linhas.append(f"\nRelatório completo: {relatorio}")
+    return "\n".join(linhas)
+
+
+def importar_csv_com_dialogo(tarefas: ExecutorTarefas,
+                             importar: Callable[..., Optional[Dict[str, Any]]], entidade: str) -> None:
+    """
+    Pede um ficheiro CSV e importa-o em segundo plano, mostrando o resumo no fim.
+
+    Args:
+        tarefas (ExecutorTarefas): Executor da janela que pede a importação.
+        importar (Callable): Serviço de importação (caminho, caminho_rejeicoes).
+        entidade (str): Nome da entidade no plural, para os títulos (ex.: "clientes").
+    """
+    caminho = filedialog.askopenfilename(
+        title=f"Importar {entidade}",
+        filetypes=[("CSV files", "*.csv"), ("Todos os ficheiros", "*.*")]
+    )
+    if not caminho:
+        return
+    relatorio = caminho_rejeicoes(caminho)
+
+    def _concluir(resultado):
+        if resultado is None:
+            messagebox.showerror("Erro", f"Falha ao importar {entidade}: verifique o cabeçalho do ficheiro.")
+        elif resultado["rejeitadas"]:
+            messagebox.showwarning("Importação", _resumo(resultado, relatorio))
+        else:
+            messagebox.showinfo("Importação", _resumo(resultado, relatorio))
+
+    tarefas.executar(importar, caminho, relatorio, ao_concluir=_concluir, chave="importar")
@@ -0,0 +1,128 @@
+"""
+Ligação incremental entre uma lista de linhas e uma Treeview do Tkinter.
+
+Em vez de apagar e reinserir todas as linhas a cada atualização, o
+`LigadorTreeview` compara o resultado anterior com o novo (por chave da
+linha, normalmente o ID) e aplica apenas as diferenças: remove as linhas que
+desapareceram, atualiza as que mudaram e insere as novas. As linhas que se
+mantêm não são tocadas, pelo que a seleção e a posição de deslocamento da
+Treeview são preservadas.
+
+O cálculo das diferenças (`calcular_diferencas`) é uma função pura, testável
+sem ecrã; o ligador só traduz o resultado em chamadas à Treeview.
+"""
+
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+# (chave, valores, etiquetas)
+Linha = Tuple[Any, Sequence[Any], Sequence[str]]
+
+
+def calcular_diferencas(ordem_anterior: Sequence[str], linhas_anteriores: Dict[str, Tuple[tuple, tuple]],
+                        novas: Sequence[Tuple[str, tuple, tuple]]) -> Dict[str, list]:
+    """
+    Calcula as operações que transformam as linhas anteriores nas novas.
+
+    Args:
+        ordem_anterior (Sequence[str]): Chaves das linhas atualmente mostradas, pela ordem.
+        linhas_anteriores (Dict[str, Tuple[tuple, tuple]]): Por chave, (valores, etiquetas) mostrados.
+        novas (Sequence[Tuple[str, tuple, tuple]]): Linhas a mostrar, pela ordem: (chave, valores, etiquetas).
+
+    Returns:
+        Dict[str, list]: Operações a aplicar por esta ordem:
+            - "remover": chaves a apagar;
+            - "atualizar": (chave, valores, etiquetas) das linhas mantidas que mudaram;
+            - "posicionar": (indice, chave, valores, etiquetas) por índice final crescente,
+              com valores None para linhas mantidas que só mudam de posição. O índice
+              é "end" quando a linha fica depois de todas as linhas mantidas.
+
+    Exceções:
+        ValueError: Se houver chaves repetidas nas novas linhas.
+    """
+    chaves_novas = {chave for chave, _, _ in novas}
+    if len(chaves_novas) != len(novas):
+        raise ValueError("As linhas têm chaves repetidas.")
+
+    remover = [chave for chave in ordem_anterior if chave not in chaves_novas]
+    mantidas = [chave for chave in ordem_anterior if chave in chaves_novas]
+    mantidas_nova_ordem = [chave for chave, _, _ in novas if chave in linhas_anteriores]
+    reordenar = mantidas != mantidas_nova_ordem
+
+    # Índice final da última linha mantida: inserções depois dela são acrescentos no fim
+    ultima_mantida = -1
+    for indice, (chave, _, _) in enumerate(novas):
+        if chave in linhas_anteriores:
+            ultima_mantida = indice
+
+    atualizar, posicionar = [], []
+    for indice, (chave, valores, etiquetas) in enumerate(novas):
+        anterior = linhas_anteriores.get(chave)
+        if anterior is None:
+            posicionar.append(("end" if indice > ultima_mantida else indice, chave, valores, etiquetas))
+            continue
+        if anterior != (valores, etiquetas):
+            atualizar.append((chave, valores, etiquetas))
+        if reordenar:
+            posicionar.append((indice, chave, None, None))
+
+    return {"remover": remover, "atualizar": atualizar, "posicionar": posicionar}
+
+
+class LigadorTreeview:
+    """
+    Mantém uma Treeview sincronizada com uma lista de linhas, aplicando só as diferenças.
+
+    Os itens da Treeview usam a chave da linha como `iid`, pelo que
+    `arvore.item(iid, "values")` e `arvore.selection()` continuam a funcionar
+    como antes.
+
+    Args:
+        arvore (ttk.Treeview): Treeview a manter.
+    """
+
+    def __init__(self, arvore):
+        self.arvore = arvore
+        self._ordem: List[str] = []
+        self._linhas: Dict[str, Tuple[tuple, tuple]] = {}
+
+    def atualizar(self, linhas: Iterable[Linha]) -> Dict[str, list]:
+        """
+        Mostra as linhas dadas, inserindo, alterando ou apagando apenas o que mudou.
+
+        Preserva a seleção das linhas que se mantêm e a posição de deslocamento.
+
+        Args:
+            linhas (Iterable[Linha]): Linhas a mostrar, pela ordem: (chave, valores, etiquetas).
+
+        Returns:
+            Dict[str, list]: Operações aplicadas (ver `calcular_diferencas`).
+        """
+        novas = [(str(chave), tuple(valores), tuple(etiquetas)) for chave, valores, etiquetas in linhas]
+        diferencas = calcular_diferencas(self._ordem, self._linhas, novas)
+
+        arvore = self.arvore
+        deslocamento = arvore.yview()[0]
+        if diferencas["remover"]:
+            arvore.delete(*diferencas["remover"])
+        for chave, valores, etiquetas in diferencas["atualizar"]:
+            arvore.item(chave, values=valores, tags=etiquetas)
+        for indice, chave, valores, etiquetas in diferencas["posicionar"]:
+            if valores is None:
+                arvore.move(chave, "", indice)
+            else:
+                arvore.insert("", indice, iid=chave, values=valores, tags=etiquetas)
+        arvore.yview_moveto(deslocamento)
+
+        self._ordem = [chave for chave, _, _ in novas]
+        self._linhas = {chave: (valores, etiquetas) for chave, valores, etiquetas in novas}
+        return diferencas
+
+    def __len__(self) -> int:
+        """Número de linhas mostradas."""
+        return len(self._ordem)
+
+    def limpar(self) -> None:
+        """Apaga todas as linhas da Treeview e esquece o estado anterior."""
+        self.arvore.delete(*self.arvore.get_children())
+        self._ordem = []
+        self._linhas = {}
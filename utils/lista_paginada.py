@@ -0,0 +1,230 @@
+"""
+Listas virtuais para Treeviews com muitas linhas.
+
+`ModeloPaginado` obtém as linhas em páginas com paginação por chave (keyset):
+cada página começa a seguir à chave da última linha da página anterior, pelo
+que carregar a página 5000 custa o mesmo que carregar a primeira. Só as
+páginas usadas recentemente ficam em memória (LRU com tamanho fixo); das
+restantes guarda-se apenas a chave onde começam.
+
+`ListaVirtual` liga um modelo a uma Treeview: mostra uma janela de poucas
+páginas seguidas e desliza-a quando o utilizador se aproxima do fim ou do
+início da lista, aplicando as diferenças com o `LigadorTreeview`. A memória
+e o tempo da primeira apresentação não dependem do tamanho da tabela.
+
+O modelo não depende do Tkinter e pode ser testado sem ecrã.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from utils.ligador_treeview import LigadorTreeview, Linha
+
+TAMANHO_PAGINA_PADRAO = 200
+MAX_PAGINAS_PADRAO = 8
+
+
+class ModeloPaginado:
+    """
+    Fonte de dados paginada por chave com uma cache LRU de páginas.
+
+    Args:
+        buscar (Callable[[int, Optional[Any]], List[Dict]]): Função que devolve
+            até `limite` linhas a seguir à chave dada (None para a primeira página),
+            ex.: `reservas_servico.obter_pagina_reservas_servico`.
+        chave (Callable[[Dict], Any]): Extrai de uma linha a chave usada por `buscar`.
+        tamanho_pagina (int): Linhas por página.
+        max_paginas (int): Páginas mantidas em memória.
+    """
+
+    def __init__(self, buscar: Callable[[int, Optional[Any]], List[Dict]], chave: Callable[[Dict], Any],
+                 tamanho_pagina: int = TAMANHO_PAGINA_PADRAO, max_paginas: int = MAX_PAGINAS_PADRAO):
+        if tamanho_pagina <= 0 or max_paginas <= 0:
+            raise ValueError("O tamanho da página e o número de páginas têm de ser positivos.")
+        self.buscar = buscar
+        self.chave = chave
+        self.tamanho_pagina = tamanho_pagina
+        self.max_paginas = max_paginas
+        self._paginas: "OrderedDict[int, List[Dict]]" = OrderedDict()
+        # _inicios[n] é a chave a seguir à qual começa a página n (conhecida até à última página visitada)
+        self._inicios: List[Optional[Any]] = [None]
+        self._ultima: Optional[int] = None
+
+    def _carregar(self, numero: int) -> List[Dict]:
+        """Lê a página da base de dados, atualiza a chave da seguinte e guarda-a na cache."""
+        linhas = self.buscar(self.tamanho_pagina, self._inicios[numero])
+        if len(linhas) < self.tamanho_pagina:
+            self._ultima = numero
+            del self._inicios[numero + 1:]
+            for outra in [n for n in self._paginas if n > numero]:
+                del self._paginas[outra]
+        else:
+            if numero == self._ultima:
+                self._ultima = None
+            seguinte = self.chave(linhas[-1])
+            if len(self._inicios) == numero + 1:
+                self._inicios.append(seguinte)
+            elif self._inicios[numero + 1] != seguinte:
+                # A página mudou (inserções ou remoções): as seguintes deixam de ser válidas
+                del self._inicios[numero + 2:]
+                self._inicios[numero + 1] = seguinte
+                for outra in [n for n in self._paginas if n > numero]:
+                    del self._paginas[outra]
+
+        self._paginas[numero] = linhas
+        self._paginas.move_to_end(numero)
+        while len(self._paginas) > self.max_paginas:
+            self._paginas.popitem(last=False)
+        return linhas
+
+    def pagina(self, numero: int) -> List[Dict]:
+        """
+        Retorna as linhas de uma página, lendo-a (e às anteriores ainda não visitadas) se preciso.
+
+        Args:
+            numero (int): Índice da página (0 é a primeira).
+
+        Returns:
+            List[Dict]: Linhas da página (vazia depois do fim da lista).
+        """
+        if numero < 0:
+            return []
+        if numero in self._paginas:
+            self._paginas.move_to_end(numero)
+            return self._paginas[numero]
+        # Percorre as páginas cuja chave de início ainda não é conhecida
+        while len(self._inicios) <= numero:
+            if self._ultima is not None and self._ultima < len(self._inicios):
+                return []
+            self._carregar(len(self._inicios) - 1)
+        if self._ultima is not None and numero > self._ultima:
+            return []
+        return self._carregar(numero)
+
+    def tem_pagina(self, numero: int) -> bool:
+        """
+        Indica se a página existe (tem pelo menos uma linha), lendo-a se preciso.
+
+        Args:
+            numero (int): Índice da página.
+
+        Returns:
+            bool: True se a página tem linhas.
+        """
+        return bool(self.pagina(numero))
+
+    def paginas_em_memoria(self) -> List[int]:
+        """
+        Retorna os índices das páginas em cache, da menos para a mais recente.
+
+        Returns:
+            List[int]: Índices das páginas carregadas.
+        """
+        return list(self._paginas)
+
+    def invalidar(self) -> None:
+        """
+        Descarta as páginas em cache (ex.: depois de uma escrita).
+
+        As chaves de início já conhecidas mantêm-se, pelo que a posição na
+        lista não se perde; são corrigidas à medida que as páginas são relidas.
+        """
+        self._paginas.clear()
+        self._ultima = None
+
+
+class ListaVirtual:
+    """
+    Mostra um `ModeloPaginado` numa Treeview, carregando páginas à medida que se desloca.
+
+    Args:
+        arvore (ttk.Treeview): Treeview onde mostrar as linhas.
+        modelo (ModeloPaginado): Fonte das linhas.
+        converter (Callable[[int, Dict], Linha]): Recebe a posição absoluta e a
+            linha e devolve (chave, valores, etiquetas) para o `LigadorTreeview`.
+        barra (Callable, opcional): Função de atualização da barra de
+            deslocamento (normalmente `Scrollbar.set`).
+        paginas_visiveis (int): Páginas mostradas ao mesmo tempo na Treeview.
+    """
+
+    # Fração da lista a partir da qual se carrega a página seguinte/anterior
+    MARGEM = 0.02
+
+    def __init__(self, arvore, modelo: ModeloPaginado, converter: Callable[[int, Dict], Linha],
+                 barra: Optional[Callable[[str, str], Any]] = None, paginas_visiveis: int = 3):
+        self.arvore = arvore
+        self.modelo = modelo
+        self.converter = converter
+        self.barra = barra
+        self.paginas_visiveis = paginas_visiveis
+        self.ligador = LigadorTreeview(arvore)
+        self.primeira = 0
+        self._pendente = None
+        arvore.configure(yscrollcommand=self._ao_deslocar)
+
+    def _janela(self) -> Sequence[Linha]:
+        """Converte as linhas das páginas visíveis para o formato do ligador."""
+        linhas = []
+        tamanho = self.modelo.tamanho_pagina
+        for numero in range(self.primeira, self.primeira + self.paginas_visiveis):
+            pagina = self.modelo.pagina(numero)
+            linhas.extend(self.converter(numero * tamanho + i, linha) for i, linha in enumerate(pagina))
+            if len(pagina) < tamanho:
+                break
+        return linhas
+
+    def mostrar(self) -> None:
+        """Mostra as páginas visíveis a partir de `primeira`."""
+        self.ligador.atualizar(self._janela())
+
+    def recarregar(self) -> None:
+        """Relê as páginas visíveis (ex.: depois de uma escrita), mantendo a posição."""
+        self.modelo.invalidar()
+        if self.primeira > 0 and not self.modelo.tem_pagina(self.primeira):
+            self.primeira = 0
+        self.mostrar()
+
+    def deslizar(self, paginas: int) -> bool:
+        """
+        Desloca a janela visível um número de páginas, mantendo as linhas no ecrã.
+
+        Args:
+            paginas (int): Páginas a avançar (positivo) ou recuar (negativo).
+
+        Returns:
+            bool: True se a janela mudou.
+        """
+        destino = max(0, self.primeira + paginas)
+        if destino == self.primeira:
+            return False
+        if paginas > 0 and not self.modelo.tem_pagina(destino + self.paginas_visiveis - 1):
+            return False
+
+        total_antes = len(self.ligador) or 1
+        inicio = float(self.arvore.yview()[0])
+        linhas_deslocadas = (destino - self.primeira) * self.modelo.tamanho_pagina
+        self.primeira = destino
+        self.mostrar()
+        total_depois = len(self.ligador) or 1
+        self.arvore.yview_moveto(max(0.0, (inicio * total_antes - linhas_deslocadas) / total_depois))
+        return True
+
+    def _ao_deslocar(self, inicio: str, fim: str) -> None:
+        """Atualiza a barra e agenda o deslize da janela perto dos extremos."""
+        if self.barra is not None:
+            self.barra(inicio, fim)
+        if self._pendente is not None:
+            return
+        if float(fim) >= 1.0 - self.MARGEM:
+            passo = 1
+        elif float(inicio) <= self.MARGEM and self.primeira > 0:
+            passo = -1
+        else:
+            return
+
+        def _deslizar():
+            self._pendente = None
+            self.deslizar(passo)
+
+        # Fora do callback da barra, para não reentrar no Tk durante o deslocamento
+        self._pendente = self.arvore.after_idle(_deslizar)
@@ -0,0 +1,172 @@
+"""
+Cache de miniaturas das imagens dos veículos.
+
+Abrir o JPEG original e redimensioná-lo (LANCZOS) a cada seleção custa
+dezenas de milissegundos. `CacheMiniaturas` guarda as miniaturas em dois
+níveis:
+    - disco: uma imagem já redimensionada por (ficheiro de origem, data de
+      modificação, tamanho do ficheiro, dimensões pedidas, modo), num
+      diretório de cache; alterar a imagem de origem muda a chave, pelo que
+      nunca é servida uma miniatura desatualizada. As miniaturas são gravadas
+      em PPM (bitmap sem compressão, lido nativamente pelo Tk), cuja leitura
+      é mais rápida do que descodificar PNG ou JPEG;
+    - memória: um LRU com as últimas miniaturas já descodificadas (ou já
+      convertidas, ex.: em `ImageTk.PhotoImage`), pelo que repetir uma
+      seleção custa um `os.stat` e uma consulta a um dicionário.
+
+Uso:
+    cache = CacheMiniaturas(converter=ImageTk.PhotoImage)
+    foto = cache.obter(caminho, (400, 280))
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_CACHE_PADRAO = os.environ.get(
+    "LUXURY_WHEELS_CACHE_MINIATURAS", os.path.join(DIRETORIO_PROJETO, ".cache", "miniaturas")
+)
+# Miniaturas mantidas em memória
+MAX_MEMORIA_PADRAO = 64
+
+
+class CacheMiniaturas:
+    """
+    Miniaturas em cache no disco e em memória (LRU).
+
+    Args:
+        diretorio (str, opcional): Diretório da cache em disco (criado se não existir).
+        max_memoria (int): Número de miniaturas mantidas em memória.
+        converter (Callable, opcional): Aplicado a cada miniatura antes de a guardar
+            em memória (ex.: `ImageTk.PhotoImage`). Por defeito guarda a `PIL.Image`.
+    """
+
+    def __init__(self, diretorio: Optional[str] = None, max_memoria: int = MAX_MEMORIA_PADRAO,
+                 converter: Optional[Callable[[Image.Image], Any]] = None):
+        self.diretorio = diretorio or DIRETORIO_CACHE_PADRAO
+        self.max_memoria = max_memoria
+        self.converter = converter
+        self._memoria: "OrderedDict[str, Any]" = OrderedDict()
+        # Contadores para diagnóstico e testes
+        self.estatisticas = {"memoria": 0, "disco": 0, "geradas": 0}
+
+    @staticmethod
+    def chave(caminho: str, tamanho: Tuple[int, int], manter_proporcao: bool = True) -> Optional[str]:
+        """
+        Calcula a chave de uma miniatura a partir do ficheiro de origem.
+
+        Args:
+            caminho (str): Imagem de origem.
+            tamanho (Tuple[int, int]): Largura e altura pretendidas.
+            manter_proporcao (bool): True para caber em `tamanho` mantendo a
+                proporção (como `Image.thumbnail`); False para esticar até `tamanho`.
+
+        Returns:
+            Optional[str]: Chave (hash hexadecimal) ou None se o ficheiro não existir.
+        """
+        try:
+            estado = os.stat(caminho)
+        except OSError:
+            return None
+        modo = "ajustar" if manter_proporcao else "esticar"
+        texto = (f"{os.path.abspath(caminho)}|{estado.st_mtime_ns}|{estado.st_size}"
+                 f"|{tamanho[0]}x{tamanho[1]}|{modo}")
+        return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+    def obter(self, caminho: str, tamanho: Tuple[int, int], manter_proporcao: bool = True) -> Optional[Any]:
+        """
+        Retorna a miniatura de uma imagem, gerando-a apenas se não estiver em cache.
+
+        Args:
+            caminho (str): Imagem de origem.
+            tamanho (Tuple[int, int]): Largura e altura pretendidas.
+            manter_proporcao (bool): Ver `chave`.
+
+        Returns:
+            Optional[Any]: Miniatura (`PIL.Image` ou o resultado de `converter`),
+            ou None se a imagem não existir ou não puder ser lida.
+        """
+        chave = self.chave(caminho, tamanho, manter_proporcao)
+        if chave is None:
+            return None
+
+        miniatura = self._memoria.get(chave)
+        if miniatura is not None:
+            self._memoria.move_to_end(chave)
+            self.estatisticas["memoria"] += 1
+            return miniatura
+
+        try:
+            imagem = self._ler_disco(chave)
+            if imagem is None:
+                imagem = self._gerar(caminho, tamanho, manter_proporcao)
+                self._gravar_disco(chave, imagem)
+        except OSError:
+            logger.exception("Erro ao criar a miniatura de %s.", caminho)
+            return None
+
+        miniatura = self.converter(imagem) if self.converter else imagem
+        self._memoria[chave] = miniatura
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+        return miniatura
+
+    def _ficheiro(self, chave: str) -> str:
+        """Caminho da miniatura em disco."""
+        return os.path.join(self.diretorio, chave[:2], chave + ".ppm")
+
+    def _ler_disco(self, chave: str) -> Optional[Image.Image]:
+        """Lê a miniatura do disco, se existir."""
+        ficheiro = self._ficheiro(chave)
+        if not os.path.exists(ficheiro):
+            return None
+        try:
+            with Image.open(ficheiro) as imagem:
+                imagem.load()
+                self.estatisticas["disco"] += 1
+                return imagem.copy()
+        except OSError:
+            # Ficheiro corrompido: é gerado de novo
+            logger.warning("Miniatura em cache ilegível, a gerar de novo: %s", ficheiro)
+            return None
+
+    def _gerar(self, caminho: str, tamanho: Tuple[int, int], manter_proporcao: bool) -> Image.Image:
+        """Abre a imagem de origem e redimensiona-a."""
+        with Image.open(caminho) as original:
+            if manter_proporcao:
+                # draft deixa o descodificador JPEG reduzir logo a imagem (muito mais rápido)
+                original.draft("RGB", tamanho)
+                imagem = original.convert("RGB")
+                imagem.thumbnail(tamanho, Image.Resampling.LANCZOS)
+            else:
+                imagem = original.convert("RGB").resize(tamanho)
+        self.estatisticas["geradas"] += 1
+        return imagem
+
+    def _gravar_disco(self, chave: str, imagem: Image.Image) -> None:
+        """Grava a miniatura de forma atómica (ficheiro temporário + rename)."""
+        ficheiro = self._ficheiro(chave)
+        temporario = None
+        try:
+            os.makedirs(os.path.dirname(ficheiro), exist_ok=True)
+            descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(ficheiro), suffix=".tmp")
+            with os.fdopen(descritor, "wb") as f:
+                imagem.save(f, format="PPM")
+            os.replace(temporario, ficheiro)
+        except OSError:
+            # Sem cache em disco a miniatura continua a ser servida a partir da memória
+            logger.warning("Não foi possível gravar a miniatura em %s.", ficheiro, exc_info=True)
+            if temporario and os.path.exists(temporario):
+                os.remove(temporario)
+
+    def limpar_memoria(self) -> None:
+        """Esvazia o LRU em memória (a cache em disco mantém-se)."""
+        self._memoria.clear()